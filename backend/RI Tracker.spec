@@ -6,7 +6,7 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=[('dist', 'dist')],
-    hiddenimports=['AppKit', 'objc', 'PyObjCTools', 'PyObjCTools.AppHelper'],
+    hiddenimports=['AppKit', 'objc', 'PyObjCTools', 'PyObjCTools.AppHelper', 'webview', 'requests', 'psutil', 'screeninfo'],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
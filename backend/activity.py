@@ -0,0 +1,217 @@
+# activity.py
+
+from app_logging import get_logger
+from idle_sources import detect_idle_source
+
+log = get_logger(__name__)
+
+
+class ActivityEngine:
+    """Active and idle time and input counts of the running session
+
+    All times are monotonic seconds. The time between two checks is booked as
+    active or idle as a whole, so active_time + idle_time is exactly the time
+    the machine was awake since the session started. Input arrives through
+    record() (the app window's events and the global input hooks); check()
+    finds transitions to idle, using the OS idle counter (idle_sources.py)
+    where there is one.
+
+    The engine has no threads and no notion of a session: Api owns the idle
+    monitor, the input listener and the session lifecycle and calls in here.
+    """
+
+    def __init__(self, clock, idle_threshold=60, event_throttle_interval=0.5, on_active=None):
+        """
+        Args:
+            clock: SystemClock or SimulatedClock
+            idle_threshold (float): Seconds without input before the user is idle
+            event_throttle_interval (float): Seconds between two counted events of a kind
+            on_active: Callable without arguments, called when input ends idleness
+                       (Api wakes its idle monitor)
+        """
+        self.clock = clock
+        self.idle_threshold = idle_threshold
+        self.event_throttle_interval = event_throttle_interval
+        self.on_active = on_active
+
+        self.activity_check_interval = 1  # shortest time between activity checks
+        self.max_activity_check_interval = 60  # longest sleep without a state change in sight
+        self.idle_poll_interval = 5  # checks while idle, when the OS reports idle time
+
+        # OS counter of the time since the last input; detected on first use
+        self.idle_source = None
+        self.idle_source_detected = False
+        self.system_idle_available = False
+
+        self.reset(None)
+
+    def reset(self, now):
+        """Zero all counters for a session starting at monotonic time `now`"""
+        self.active_time = 0
+        self.idle_time = 0
+        self.keyboard_events = 0
+        self.mouse_events = 0
+        self.keyboard_activity_rate = 0
+        self.mouse_activity_rate = 0
+        self.last_keyboard_event_time = 0
+        self.last_mouse_event_time = 0
+        self.restart(now)
+
+    def restart(self, now):
+        """Count the user as active from `now` on (tracking (re)started)"""
+        self.is_idle = False
+        self.last_activity_time = now
+        self.last_active_check_time = now
+
+    def detect_idle_source(self):
+        """Find the OS idle counter the first time this is called"""
+        if not self.idle_source_detected:
+            self.idle_source_detected = True
+            self.idle_source = detect_idle_source()
+            log.info('System idle source: %s', self.idle_source.name if self.idle_source else 'none')
+        return self.idle_source
+
+    def system_idle_seconds(self):
+        """Seconds since the last input from the OS idle counter, or None"""
+        if self.idle_source is None:
+            return None
+        return self.idle_source.idle_seconds()
+
+    def record(self, activity_type='mouse', at=None):
+        """Record a keyboard or mouse input
+
+        Args:
+            activity_type (str): 'keyboard' or 'mouse'
+            at (float): Monotonic time of the input (default: now)
+
+        Returns:
+            bool: True if the event was counted (not throttled)
+        """
+        current_time = self.clock.monotonic() if at is None else at
+        self.last_activity_time = current_time
+
+        # If user was idle, add the idle time
+        if self.is_idle and self.last_active_check_time is not None:
+            # A check may have run between the input and this call
+            current_time = max(current_time, self.last_active_check_time)
+            self.idle_time += current_time - self.last_active_check_time
+            self.last_active_check_time = current_time
+            self.is_idle = False
+            if self.on_active is not None:
+                self.on_active()
+
+        # Only count an event if enough time has passed since the last one of its kind
+        if activity_type == 'keyboard':
+            if current_time - self.last_keyboard_event_time >= self.event_throttle_interval:
+                self.keyboard_events += 1
+                self.last_keyboard_event_time = current_time
+                return True
+        elif current_time - self.last_mouse_event_time >= self.event_throttle_interval:
+            self.mouse_events += 1
+            self.last_mouse_event_time = current_time
+            return True
+        return False
+
+    def check(self):
+        """Book the time since the last check and find idle transitions
+
+        Prefers the OS idle counter where there is one, so input outside the app
+        window counts without global input hooks.
+        """
+        current_time = self.clock.monotonic()
+        system_idle_secs = self.system_idle_seconds()
+        exact = self.idle_source is None or self.idle_source.exact
+        # Only an exact counter sees input without events, so only it is polled while idle
+        self.system_idle_available = system_idle_secs is not None and exact
+
+        if system_idle_secs is not None and exact:
+            time_since_last_activity = system_idle_secs
+            # Keep last_activity_time coherent for consumers that rely on it
+            self.last_activity_time = current_time - system_idle_secs
+        elif system_idle_secs is not None:
+            # A hint source (logind) is set some delay after the last input the
+            # desktop saw, so it never knows of input later than the hooks do: the
+            # hooks' time since the last input is never shortened by it, and the
+            # reading only confirms idleness when the hooks have seen no input yet
+            if self.last_activity_time:
+                time_since_last_activity = current_time - self.last_activity_time
+            else:
+                time_since_last_activity = system_idle_secs
+        else:
+            # Fallback to internal last_activity_time tracking
+            if not self.last_activity_time:
+                return
+            time_since_last_activity = current_time - self.last_activity_time
+
+        if self.last_active_check_time is None:
+            if not self.is_idle and time_since_last_activity >= self.idle_threshold:
+                self.is_idle = True
+                self.last_active_check_time = current_time
+            return
+
+        # If previously active but now idle
+        if not self.is_idle and time_since_last_activity >= self.idle_threshold:
+            self.active_time += current_time - self.last_active_check_time
+            self.last_active_check_time = current_time
+            self.is_idle = True
+
+        # Idle, but the OS counter saw input since (no input event told us): idle
+        # until that input, active after it
+        elif self.is_idle and time_since_last_activity < self.idle_threshold:
+            returned_at = max(self.last_activity_time, self.last_active_check_time)
+            self.idle_time += returned_at - self.last_active_check_time
+            self.active_time += current_time - returned_at
+            self.last_active_check_time = current_time
+            self.is_idle = False
+
+        # Still idle or still active
+        else:
+            self.book(current_time)
+
+    def book(self, now=None):
+        """Add the time since the last check to the current state (idle or active)"""
+        if self.last_active_check_time is None:
+            return
+        now = self.clock.monotonic() if now is None else now
+        if self.is_idle:
+            self.idle_time += now - self.last_active_check_time
+        else:
+            self.active_time += now - self.last_active_check_time
+        self.last_active_check_time = now
+
+    def totals(self):
+        """Active and idle seconds including the time not booked yet
+
+        Returns:
+            dict: {'active', 'idle'} in seconds
+        """
+        active, idle = self.active_time, self.idle_time
+        if self.last_active_check_time is not None:
+            pending = max(0, self.clock.monotonic() - self.last_active_check_time)
+            if self.is_idle:
+                idle += pending
+            else:
+                active += pending
+        return {'active': active, 'idle': idle}
+
+    def update_rates(self, awake_seconds):
+        """Set the keyboard and mouse rates (events per minute awake)"""
+        if awake_seconds > 0:
+            minutes = awake_seconds / 60
+            self.keyboard_activity_rate = int(self.keyboard_events / minutes)
+            self.mouse_activity_rate = int(self.mouse_events / minutes)
+
+    def next_check_delay(self):
+        """Seconds until the idle state can next change
+
+        An active user can only become idle idle_threshold seconds after the last
+        input, so there is nothing to check before then. An idle user becomes active
+        through an input event, which calls on_active; only an exact OS idle counter
+        (which sends no events) has to be polled.
+        """
+        if self.is_idle:
+            return self.idle_poll_interval if self.system_idle_available else self.max_activity_check_interval
+        if self.last_activity_time is None:
+            return self.activity_check_interval
+        remaining = self.last_activity_time + self.idle_threshold - self.clock.monotonic()
+        return min(max(remaining, self.activity_check_interval), self.max_activity_check_interval)
@@ -0,0 +1,189 @@
+# app_logging.py
+
+import os
+import sys
+import time
+import queue
+import atexit
+import logging
+import threading
+import logging.handlers
+
+ROOT_LOGGER = 'ri_tracker'
+LOG_FILE_NAME = 'tracker.log'
+DEBUG_ENV_VAR = 'RI_TRACKER_DEBUG'
+
+LOG_FORMAT = '%(asctime)s %(levelname)-7s %(threadName)s %(name)s: %(message)s'
+
+
+class RepeatFilter(logging.Filter):
+    """Rate-limit records that repeat the same message template
+
+    At most `burst` records per (logger, level, template) are let through in each
+    `window` seconds. The first record let through after a suppressed stretch says
+    how many similar records were dropped. Filtering happens before the record is
+    queued, so suppressed records cost no formatting or I/O.
+    """
+
+    def __init__(self, burst=5, window=60.0, max_keys=1000, clock=time.monotonic):
+        super().__init__()
+        self.burst = burst
+        self.window = window
+        self.max_keys = max_keys
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._state = {}  # key -> [window_start, count, suppressed]
+        self.suppressed_total = 0
+
+    def filter(self, record):
+        key = (record.name, record.levelno, record.msg if isinstance(record.msg, str) else repr(record.msg))
+        now = self.clock()
+        with self._lock:
+            state = self._state.get(key)
+            if state is None:
+                if len(self._state) >= self.max_keys:
+                    self._state.clear()
+                state = self._state[key] = [now, 0, 0]
+            elif now - state[0] >= self.window:
+                state[0], state[1] = now, 0
+            if state[1] >= self.burst:
+                state[2] += 1
+                self.suppressed_total += 1
+                return False
+            state[1] += 1
+            suppressed, state[2] = state[2], 0
+        if suppressed and isinstance(record.msg, str) and not isinstance(record.args, dict):
+            record.msg = record.msg + ' (%d similar messages suppressed)'
+            record.args = tuple(record.args or ()) + (suppressed,)
+        return True
+
+
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops records instead of blocking when the queue is full
+
+    Records are queued before the writer starts (e.g. during import), so the queue
+    is bounded in case it never does.
+    """
+
+    def __init__(self, maxsize=10000):
+        super().__init__(queue.Queue(maxsize))
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_lock = threading.Lock()
+_queue_handler = None
+_repeat_filter = None
+_listener = None
+_log_file = None
+
+
+def _root():
+    """The application logger with its queue handler attached (once)"""
+    global _queue_handler, _repeat_filter
+    logger = logging.getLogger(ROOT_LOGGER)
+    with _lock:
+        if _queue_handler is None:
+            _repeat_filter = RepeatFilter()
+            _queue_handler = BoundedQueueHandler()
+            _queue_handler.addFilter(_repeat_filter)
+            logger.addHandler(_queue_handler)
+            logger.setLevel(logging.DEBUG if os.environ.get(DEBUG_ENV_VAR) == '1' else logging.INFO)
+            # Records go to our handlers only, never to the root logger's stderr fallback
+            logger.propagate = False
+    return logger
+
+
+def get_logger(name):
+    """Logger for a backend module, below the application logger"""
+    _root()
+    return logging.getLogger(f'{ROOT_LOGGER}.{name}')
+
+
+def _console_usable():
+    # Windowed PyInstaller builds have no stdout (None) or one that cannot be written to
+    stream = sys.stdout
+    if stream is None:
+        return False
+    try:
+        return not stream.closed
+    except Exception:
+        return False
+
+
+def setup_logging(log_dir, debug=False, max_bytes=1_000_000, backup_count=3):
+    """Start the background writer: a rotating file in log_dir plus stdout when available
+
+    Records logged before this call (e.g. during import) are written once the
+    writer starts. Calling it again only changes the debug setting.
+
+    Returns:
+        str: Path of the log file
+    """
+    global _listener, _log_file
+    logger = _root()
+    set_debug(debug or os.environ.get(DEBUG_ENV_VAR) == '1')
+    with _lock:
+        if _listener is not None:
+            return _log_file
+        handlers = []
+        formatter = logging.Formatter(LOG_FORMAT)
+        try:
+            os.makedirs(log_dir, exist_ok=True)
+            _log_file = os.path.join(log_dir, LOG_FILE_NAME)
+            file_handler = logging.handlers.RotatingFileHandler(
+                _log_file, maxBytes=max_bytes, backupCount=backup_count,
+                encoding='utf-8', errors='backslashreplace', delay=True
+            )
+            file_handler.setFormatter(formatter)
+            handlers.append(file_handler)
+        except OSError as e:
+            _log_file = None
+            logger.warning("Cannot write log file in %s: %s", log_dir, e)
+        if _console_usable():
+            console = logging.StreamHandler(sys.stdout)
+            console.setFormatter(formatter)
+            handlers.append(console)
+        _listener = logging.handlers.QueueListener(_queue_handler.queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+        return _log_file
+
+
+def set_debug(enabled):
+    """Switch debug records on or off; debug calls on hot paths are skipped when off"""
+    _root().setLevel(logging.DEBUG if enabled else logging.INFO)
+
+
+def is_debug():
+    return _root().isEnabledFor(logging.DEBUG)
+
+
+def get_log_file():
+    return _log_file
+
+
+def get_logging_metrics():
+    """Counters of the logging pipeline"""
+    _root()
+    return {
+        'debug': is_debug(),
+        'log_file': _log_file,
+        'suppressed': _repeat_filter.suppressed_total,
+        'dropped': _queue_handler.dropped,
+        'queued': _queue_handler.queue.qsize(),
+    }
+
+
+def shutdown_logging():
+    """Write out queued records and stop the writer thread"""
+    global _listener
+    with _lock:
+        listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
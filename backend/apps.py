@@ -0,0 +1,212 @@
+# apps.py
+
+import os
+import platform
+
+from lazy_import import lazy_import
+from app_logging import get_logger
+from metrics import metrics
+from clock import cached_iso_timestamp, epoch_from_iso
+
+log = get_logger(__name__)
+
+# Imported with the first application check
+psutil = lazy_import('psutil')
+
+# Executables that are part of each operating system (platform.system() names),
+# compared in lower case. Each platform filters only its own names: a Windows
+# program called Terminal or Mail is a user application.
+SYSTEM_PROCESS_NAMES = {
+    'Windows': frozenset(name.lower() for name in (
+        'System', 'Registry', 'smss.exe', 'csrss.exe', 'wininit.exe',
+        'services.exe', 'lsass.exe', 'svchost.exe', 'winlogon.exe',
+        'dwm.exe', 'conhost.exe', 'dllhost.exe', 'taskhostw.exe',
+        'explorer.exe', 'RuntimeBroker.exe', 'ShellExperienceHost.exe',
+        'SearchUI.exe', 'sihost.exe', 'ctfmon.exe', 'WmiPrvSE.exe',
+        'spoolsv.exe', 'SearchIndexer.exe', 'fontdrvhost.exe',
+        'WUDFHost.exe', 'LsaIso.exe', 'SgrmBroker.exe', 'audiodg.exe',
+        'dasHost.exe', 'SearchProtocolHost.exe', 'SearchFilterHost.exe'
+    )),
+
+    'Darwin': frozenset(name.lower() for name in (
+        'launchd', 'kernel_task', 'WindowServer', 'loginwindow', 'SystemUIServer',
+        'Finder', 'Dock', 'Spotlight', 'ControlCenter', 'NotificationCenter',
+        'mds', 'mds_stores', 'mdworker', 'distnoted', 'cfprefsd', 'iconservicesd',
+        'secd', 'securityd', 'opendirectoryd', 'powerd', 'coreaudiod', 'syslogd',
+        'fseventsd', 'systemstats', 'configd', 'watchdogd', 'amfid', 'keybagd',
+        'softwareupdated', 'corespeechd', 'mediaremoted', 'endpointsecurityd',
+        'logd', 'smd', 'UserEventAgent', 'APFSUserAgent', 'AirPlayUIAgent',
+        'Safari', 'Mail', 'Calendar', 'Contacts', 'Notes', 'Photos', 'Messages',
+        'FaceTime', 'Maps', 'Music', 'AppStore', 'System Preferences', 'Terminal',
+        'Activity Monitor', 'Console', 'Keychain Access', 'Preview', 'TextEdit',
+        'Calculator', 'Chess', 'Dictionary', 'Books', 'FindMy', 'Home', 'News',
+        'Podcasts', 'Reminders', 'Stocks', 'TV', 'Voice Memos', 'Weather'
+    )),
+}
+
+# Executables under these directories are system processes, compared in lower case
+SYSTEM_DIRS = {
+    'Windows': tuple(path.lower() for path in (
+        '\\Windows\\', '\\Windows\\System32\\', '\\Windows\\SysWOW64\\',
+        '\\Windows\\WinSxS\\', '\\Windows\\servicing\\', '\\ProgramData\\',
+        '\\Program Files\\Common Files\\', '\\Program Files (x86)\\Common Files\\'
+    )),
+
+    'Darwin': tuple(path.lower() for path in (
+        '/System/Library/', '/System/Applications/', '/Library/Apple/',
+        '/usr/libexec/', '/usr/sbin/', '/usr/bin/', '/sbin/', '/bin/',
+        '/Library/PrivateFrameworks/', '/Library/Frameworks/',
+        '/System/Library/CoreServices/', '/System/Library/PrivateFrameworks/'
+    )),
+}
+
+
+def is_system_process(app_name, exe_path, system=None):
+    """Whether an executable belongs to the operating system rather than the user
+
+    Args:
+        app_name (str): Executable name
+        exe_path (str): Executable path
+        system (str): platform.system() name whose lists apply (default: this system)
+    """
+    system = system or platform.system()
+    if app_name.lower() in SYSTEM_PROCESS_NAMES.get(system, ()):
+        return True
+    exe_path = exe_path.lower()
+    return any(system_dir in exe_path for system_dir in SYSTEM_DIRS.get(system, ()))
+
+
+def running_applications(system=None):
+    """User applications that are running now
+
+    Args:
+        system (str): platform.system() name whose system processes are left out
+                      (default: this system)
+
+    Returns:
+        dict: {executable name: executable path}, system processes left out
+    """
+    active_apps = {}
+    for proc in psutil.process_iter(['pid', 'name', 'exe', 'username']):
+        try:
+            proc_info = proc.info
+            if not proc_info['name'] or not proc_info['exe']:
+                continue
+
+            exe_path = proc_info['exe']
+            app_name = os.path.basename(exe_path)
+            if app_name in active_apps or is_system_process(app_name, exe_path, system):
+                continue
+            active_apps[app_name] = exe_path
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+            continue
+    return active_apps
+
+
+class AppUsage:
+    """Usage of one application in the current session interval
+
+    last_seen is epoch seconds; it is formatted only when the interval is sent.
+    """
+
+    __slots__ = ('name', 'exe', 'time_spent', 'last_seen')
+
+    def __init__(self, name, exe, time_spent=0.0, last_seen=None):
+        self.name = name
+        self.exe = exe
+        self.time_spent = time_spent
+        self.last_seen = last_seen
+
+    def to_dict(self):
+        """Checkpoint form, restored by from_dict()"""
+        return {'name': self.name, 'exe': self.exe, 'timeSpent': self.time_spent, 'lastSeen': self.last_seen}
+
+    @classmethod
+    def from_dict(cls, data):
+        # Checkpoints of earlier versions hold lastSeen as an ISO string
+        last_seen = data.get('lastSeen')
+        if isinstance(last_seen, str):
+            last_seen = epoch_from_iso(last_seen)
+        return cls(data.get('name'), data.get('exe'), data.get('timeSpent', 0), last_seen)
+
+
+class ApplicationTracker:
+    """Time each user application has been running during the session
+
+    usage maps an executable name to its AppUsage; each check() adds the time
+    since the previous check to every running app.
+    """
+
+    def __init__(self, clock, system=None):
+        """
+        Args:
+            clock: SystemClock or SimulatedClock
+            system (str): platform.system() name whose system processes are left
+                          out (default: this system)
+        """
+        self.clock = clock
+        self.system = system or platform.system()
+        self.usage = {}
+        self.last_check_time = None
+
+    def reset(self, now=None):
+        """Forget all applications; `now` (monotonic) starts the first interval"""
+        self.usage = {}
+        self.last_check_time = now
+
+    def to_checkpoint(self):
+        """usage as JSON-ready dicts for the session checkpoint"""
+        return {app_name: app.to_dict() for app_name, app in self.usage.items()}
+
+    def restore(self, entries):
+        """Replace usage with the entries of a checkpoint (see to_checkpoint)"""
+        self.usage = {app_name: AppUsage.from_dict(entry) for app_name, entry in entries.items()}
+
+    @metrics.timed('apps.check')
+    def check(self):
+        """Add the time since the last check to the applications running now"""
+        current_time = self.clock.monotonic()
+        if self.last_check_time is None:
+            self.last_check_time = current_time
+
+        time_elapsed = current_time - self.last_check_time
+        self.last_check_time = current_time
+        now = self.clock.time()
+
+        try:
+            active_apps = running_applications(self.system)
+
+            usage = self.usage
+            for app_name, exe_path in active_apps.items():
+                app = usage.get(app_name)
+                if app is None:
+                    usage[app_name] = AppUsage(app_name, exe_path, time_elapsed, now)
+                else:
+                    app.time_spent += time_elapsed
+                    app.last_seen = now
+
+            metrics.gauge('apps.active').set(len(active_apps))
+            metrics.gauge('apps.tracked').set(len(usage))
+        except Exception as e:
+            log.error('Error checking running applications: %s', e)
+            metrics.counter('apps.check.failed').inc()
+
+    def prepare_for_session(self):
+        """Application usage in the format of session updates
+
+        Returns:
+            list: {'name', 'timeSpent', 'timestamp'} for applications used more
+                  than a second, longest first
+        """
+        now = self.clock.time()
+        applications_data = [
+            {
+                'name': app_name,
+                'timeSpent': int(app.time_spent),
+                'timestamp': cached_iso_timestamp(now if app.last_seen is None else app.last_seen)
+            }
+            for app_name, app in self.usage.items()
+            if app.time_spent > 1
+        ]
+        applications_data.sort(key=lambda x: x['timeSpent'], reverse=True)
+        return applications_data
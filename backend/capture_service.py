@@ -0,0 +1,191 @@
+# capture_service.py
+
+import os
+import time
+import queue
+import tempfile
+import threading
+
+from app_logging import get_logger
+
+log = get_logger(__name__)
+
+
+class ScreenCaptureService:
+    """Long-lived screen grabber running on its own thread
+
+    Creating an `mss.mss()` instance opens a display connection, enumerates the
+    monitors and allocates buffers. Doing that for every screenshot is wasteful,
+    so this service keeps a single grabber open on a dedicated thread (mss handles
+    are not safe to share between threads on every platform) and serves capture
+    requests through a queue.
+
+    The monitor layout is cached when the grabber is opened. It is refreshed only
+    when `notify_display_change` is called or when a capture fails.
+    """
+
+    def __init__(self, request_timeout=30):
+        """
+        Args:
+            request_timeout (float): Seconds a caller waits for a capture before giving up
+        """
+        self.request_timeout = request_timeout
+        self._requests = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._display_changed = threading.Event()
+        self._monitors = []
+
+        self._metrics = {
+            'captures': 0,
+            'failures': 0,
+            'grabber_opens': 0,
+            'last_grab_ms': 0.0,
+            'last_encode_ms': 0.0,
+            'max_total_ms': 0.0,
+            'sum_total_ms': 0.0,
+        }
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def capture(self, output_path=None):
+        """Capture all monitors into a PNG file
+
+        Args:
+            output_path (str): Destination file; a temporary file is created when omitted
+
+        Returns:
+            str: Path to the PNG file, or None if the capture failed
+        """
+        if output_path is None:
+            with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as temp_file:
+                output_path = temp_file.name
+
+        self._ensure_thread()
+        request = {'path': output_path, 'done': threading.Event(), 'result': None}
+        self._requests.put(request)
+        if not request['done'].wait(self.request_timeout):
+            log.warning('Screenshot capture timed out')
+            return None
+        return request['result']
+
+    def notify_display_change(self):
+        """Mark the cached monitor layout as stale (e.g. a display was attached)"""
+        self._display_changed.set()
+
+    def get_monitors(self):
+        """Return the cached monitor layout (excluding the combined virtual monitor)"""
+        with self._lock:
+            return [dict(m) for m in self._monitors[1:]]
+
+    def get_metrics(self):
+        """Return capture counters and timings in milliseconds"""
+        with self._lock:
+            metrics = dict(self._metrics)
+            metrics['monitor_count'] = max(0, len(self._monitors) - 1)
+        captures = metrics['captures']
+        metrics['avg_total_ms'] = (metrics.pop('sum_total_ms') / captures) if captures else 0.0
+        return metrics
+
+    def stop(self, timeout=2.0):
+        """Close the grabber and stop the capture thread"""
+        thread = self._thread
+        if thread is None:
+            return
+        self._requests.put(None)
+        thread.join(timeout=timeout)
+        self._thread = None
+
+    # ------------------------------------------------------------------
+    # Capture thread
+    # ------------------------------------------------------------------
+    def _ensure_thread(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name="ScreenCapture", daemon=True)
+            self._thread.start()
+
+    def _open_grabber(self):
+        import mss
+
+        sct = mss.mss()
+        monitors = [dict(m) for m in sct.monitors]
+        with self._lock:
+            self._monitors = monitors
+            self._metrics['grabber_opens'] += 1
+
+        # Only log the layout when it is (re)read, not on every capture
+        log.info('Screen capture ready: %s monitor(s) detected', len(monitors) - 1)
+        for i, monitor in enumerate(monitors[1:], 1):
+            log.debug('Monitor %s: %sx%s at position (%s,%s)', i, monitor['width'], monitor['height'], monitor['left'], monitor['top'])
+        return sct
+
+    @staticmethod
+    def _close_grabber(sct):
+        if sct is None:
+            return
+        try:
+            sct.close()
+        except Exception:
+            pass
+
+    def _grab(self, sct, output_path):
+        import mss.tools
+
+        started = time.perf_counter()
+        # Monitor 0 is all monitors combined
+        screenshot = sct.grab(self._monitors[0])
+        grabbed = time.perf_counter()
+        mss.tools.to_png(screenshot.rgb, screenshot.size, output=output_path)
+        finished = time.perf_counter()
+
+        total_ms = (finished - started) * 1000
+        with self._lock:
+            self._metrics['captures'] += 1
+            self._metrics['last_grab_ms'] = (grabbed - started) * 1000
+            self._metrics['last_encode_ms'] = (finished - grabbed) * 1000
+            self._metrics['sum_total_ms'] += total_ms
+            self._metrics['max_total_ms'] = max(self._metrics['max_total_ms'], total_ms)
+
+    def _run(self):
+        sct = None
+        while True:
+            request = self._requests.get()
+            if request is None:
+                break
+
+            try:
+                if self._display_changed.is_set():
+                    self._display_changed.clear()
+                    self._close_grabber(sct)
+                    sct = None
+                if sct is None:
+                    sct = self._open_grabber()
+
+                try:
+                    self._grab(sct, request['path'])
+                except Exception as e:
+                    # The layout may have changed or the display connection dropped;
+                    # reopen the grabber once and retry
+                    log.error('Screen capture failed, reinitializing grabber: %s', e)
+                    self._close_grabber(sct)
+                    sct = None
+                    sct = self._open_grabber()
+                    self._grab(sct, request['path'])
+
+                request['result'] = request['path']
+            except Exception as e:
+                log.error('Error taking screenshot: %s', e)
+                with self._lock:
+                    self._metrics['failures'] += 1
+                try:
+                    if os.path.exists(request['path']):
+                        os.remove(request['path'])
+                except Exception:
+                    pass
+            finally:
+                request['done'].set()
+
+        self._close_grabber(sct)
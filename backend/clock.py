@@ -0,0 +1,191 @@
+# clock.py
+
+import sys
+import time
+import functools
+import threading
+from datetime import datetime, timezone
+
+
+def _platform_clocks():
+    """(monotonic, boottime) functions: time that stops while suspended, time that does not"""
+    if sys.platform.startswith('linux') and hasattr(time, 'CLOCK_BOOTTIME'):
+        # CLOCK_MONOTONIC (time.monotonic) stops in suspend, CLOCK_BOOTTIME keeps counting
+        return time.monotonic, lambda: time.clock_gettime(time.CLOCK_BOOTTIME)
+    if sys.platform == 'darwin' and hasattr(time, 'CLOCK_UPTIME_RAW'):
+        # Uptime stops in sleep; Darwin's CLOCK_MONOTONIC keeps counting
+        return (lambda: time.clock_gettime(time.CLOCK_UPTIME_RAW),
+                lambda: time.clock_gettime(time.CLOCK_MONOTONIC))
+    if sys.platform == 'win32':
+        try:
+            import ctypes
+            kernel32 = ctypes.windll.kernel32
+            kernel32.GetTickCount64.restype = ctypes.c_ulonglong
+
+            def unbiased_interrupt_time():
+                # 100 ns units, excluding time spent in sleep or hibernation
+                value = ctypes.c_ulonglong()
+                kernel32.QueryUnbiasedInterruptTime(ctypes.byref(value))
+                return value.value / 1e7
+
+            unbiased_interrupt_time()
+            return unbiased_interrupt_time, lambda: kernel32.GetTickCount64() / 1000.0
+        except Exception:
+            pass
+    # No suspend-aware clock pair: both are the same, so no suspend is ever detected
+    return time.monotonic, time.monotonic
+
+
+def iso_timestamp(epoch):
+    """UTC ISO 8601 time with milliseconds and a Z suffix, the server's format"""
+    return datetime.fromtimestamp(epoch, timezone.utc).isoformat(timespec='milliseconds').replace('+00:00', 'Z')
+
+
+# Usage entries updated by the same check share one time; format it once
+cached_iso_timestamp = functools.lru_cache(maxsize=1024)(iso_timestamp)
+
+
+def epoch_from_iso(timestamp):
+    """Epoch seconds of an iso_timestamp() string, None if it cannot be parsed"""
+    try:
+        return datetime.fromisoformat(timestamp.replace('Z', '+00:00')).timestamp()
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+class SystemClock:
+    """Wall-clock, monotonic and boot time of the operating system
+
+    Api reads all times through a clock object (Api.clock) so tests can swap in a
+    SimulatedClock and run hours of tracking without sleeping.
+    """
+
+    def __init__(self):
+        self._monotonic, self._boottime = _platform_clocks()
+
+    def time(self):
+        """Wall-clock time in epoch seconds (jumps when the system clock is changed)"""
+        return time.time()
+
+    def monotonic(self):
+        """Seconds that never go backwards and stop while the system is suspended"""
+        return self._monotonic()
+
+    def boottime(self):
+        """Like monotonic(), but keeps counting while the system is suspended"""
+        return self._boottime()
+
+    def now(self, tz=None):
+        """Wall-clock time as a datetime, like datetime.now(tz)"""
+        return datetime.now(tz)
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+
+class SimulatedClock:
+    """Clock whose time only moves when told to, for tests and simulations
+
+    advance() moves all times together, as real time passing does. jump()
+    changes only the wall clock, like an NTP correction or the user setting the
+    clock. suspend() lets wall-clock and boot time pass while monotonic time
+    stands still, like a laptop sleeping. sleep() advances instead of blocking.
+    """
+
+    def __init__(self, start=1_700_000_000.0, monotonic_start=1000.0):
+        """
+        Args:
+            start (float): Initial wall-clock time in epoch seconds
+            monotonic_start (float): Initial monotonic (and boot) time
+        """
+        self._lock = threading.Lock()
+        self._wall = float(start)
+        self._monotonic = float(monotonic_start)
+        self._boottime = float(monotonic_start)
+
+    def time(self):
+        with self._lock:
+            return self._wall
+
+    def monotonic(self):
+        with self._lock:
+            return self._monotonic
+
+    def boottime(self):
+        with self._lock:
+            return self._boottime
+
+    def now(self, tz=None):
+        return datetime.fromtimestamp(self.time(), tz)
+
+    def sleep(self, seconds):
+        self.advance(seconds)
+
+    def advance(self, seconds):
+        """Let `seconds` of real time pass"""
+        if seconds < 0:
+            raise ValueError("Time cannot run backwards; use jump() for clock changes")
+        with self._lock:
+            self._wall += seconds
+            self._monotonic += seconds
+            self._boottime += seconds
+
+    def jump(self, seconds):
+        """Move the wall clock by `seconds` (may be negative) without time passing"""
+        with self._lock:
+            self._wall += seconds
+
+    def suspend(self, seconds):
+        """Let `seconds` pass with the system suspended"""
+        if seconds < 0:
+            raise ValueError("Time cannot run backwards")
+        with self._lock:
+            self._wall += seconds
+            self._boottime += seconds
+
+
+class SuspendDetector:
+    """Finds system suspends from the gap between boot time and monotonic time
+
+    Monotonic time stands still while the machine sleeps and boot time does not,
+    so when boot time advanced more than monotonic time since the previous poll,
+    the difference was spent suspended. Wall-clock changes don't affect either.
+    """
+
+    def __init__(self, clock, threshold=2.0):
+        """
+        Args:
+            clock: SystemClock or SimulatedClock
+            threshold (float): Smallest gap in seconds reported as a suspend
+        """
+        self.clock = clock
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._last = None
+
+    def reset(self):
+        """Start measuring from now"""
+        with self._lock:
+            self._last = (self.clock.monotonic(), self.clock.boottime())
+
+    def poll(self):
+        """Check for a suspend since the previous poll
+
+        Returns:
+            tuple: (start, end) of the suspend in wall-clock epoch seconds, taking
+                   the resume as now, or None
+        """
+        monotonic, boottime = self.clock.monotonic(), self.clock.boottime()
+        with self._lock:
+            last, self._last = self._last, (monotonic, boottime)
+        if last is None:
+            return None
+        gap = (boottime - last[1]) - (monotonic - last[0])
+        if gap < self.threshold:
+            return None
+        end = self.clock.time()
+        return end - gap, end
+
+
+# Shared by everything that does not get a clock injected
+system_clock = SystemClock()
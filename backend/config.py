@@ -1,7 +1,20 @@
 # config.py
 
+import os
+
 APP_ENV = "production"  # or "production" or "local" or "development"
 
+# Overrides APP_ENV without editing this file (e.g. for test builds)
+APP_ENV = os.environ.get("RI_TRACKER_ENV", APP_ENV)
+
+# Base URL of a stand-in tracker server (loadtest/mock_server.py). When set, every
+# endpoint below is served by it; see server_urls().
+SERVER_ENV_VAR = "RI_TRACKER_SERVER"
+
+# Screenshot file server (the same for all environments)
+FILE_UPLOAD_URL = "http://5.78.136.221:3020/api/files/5a7f64a1-ab0e-4544-8fcb-4a7b2fc3d428/upload"
+FILE_UPLOAD_API_KEY = "2a978046cf9eebb8f8134281a3e5106d05723cae3eaf8ec58f2596d95feca3de"
+
 URL_CONFIG = {
     "local": {
         "LOGIN": "https://remotintegrity-auth.vercel.app/api/v1/auth/login/employee",
@@ -11,6 +24,8 @@ URL_CONFIG = {
         "WEEKLY_STATS": "http://localhost:3010/api/v1/stats/weekly",
         "FRONTEND_DEV": "http://localhost:5173",
         "FRONTEND_PROD": "dist/index.html",
+        "FILE_UPLOAD": FILE_UPLOAD_URL,
+        "FILE_UPLOAD_API_KEY": FILE_UPLOAD_API_KEY,
 
         "DEBUG": True
     },
@@ -22,6 +37,8 @@ URL_CONFIG = {
         "WEEKLY_STATS": "https://tracker-beta-kohl.vercel.app/api/v1/stats/weekly",
         "FRONTEND_DEV": "http://localhost:5173",
         "FRONTEND_PROD": "dist/index.html",
+        "FILE_UPLOAD": FILE_UPLOAD_URL,
+        "FILE_UPLOAD_API_KEY": FILE_UPLOAD_API_KEY,
 
         "DEBUG": True
     },
@@ -33,9 +50,72 @@ URL_CONFIG = {
         "WEEKLY_STATS": "https://tracker.remoteintegrity.com/api/v1/stats/weekly",
         "FRONTEND_DEV": "http://localhost:5173",  # Optional in production
         "FRONTEND_PROD": "dist/index.html",
+        "FILE_UPLOAD": FILE_UPLOAD_URL,
+        "FILE_UPLOAD_API_KEY": FILE_UPLOAD_API_KEY,
 
         "DEBUG": False
     }
 }
 
-URLS = URL_CONFIG[APP_ENV]
+
+
+def server_urls(base_url, debug=True):
+    """Endpoint URLs for a tracker server at base_url, using the production paths"""
+    base_url = base_url.rstrip('/')
+    return {
+        "LOGIN": f"{base_url}/api/v1/auth/login/employee",
+        "PROFILE": f"{base_url}/api/v1/employee",
+        "SESSIONS": f"{base_url}/api/v1/sessions/app",
+        "DAILY_STATS": f"{base_url}/api/v1/stats/daily",
+        "WEEKLY_STATS": f"{base_url}/api/v1/stats/weekly",
+        "FILE_UPLOAD": f"{base_url}/api/files/local/upload",
+        "FILE_UPLOAD_API_KEY": "local",
+        "FRONTEND_DEV": "http://localhost:5173",
+        "FRONTEND_PROD": "dist/index.html",
+
+        "DEBUG": debug
+    }
+
+
+def use_server(base_url, debug=True):
+    """Point URLS at the tracker server at base_url
+
+    URLS is updated in place, so modules that imported it (main.py) follow.
+    """
+    URLS.clear()
+    URLS.update(server_urls(base_url, debug=debug))
+
+
+URLS = dict(URL_CONFIG[APP_ENV])
+if os.environ.get(SERVER_ENV_VAR):
+    use_server(os.environ[SERVER_ENV_VAR])
+
+# Response cache lifetimes in seconds: (ttl, stale). A response is reused without a
+# request for `ttl` seconds, then served for `stale` more seconds while it is
+# revalidated in the background.
+CACHE_TTLS = {
+    "PROFILE": (300, 3600),
+    "STATS": (60, 540),
+    "RELEASES": (3600, 86400),
+}
+
+# Attach a compact summary of client-side latencies and error counters to session
+# updates (see Api.get_diagnostics). Can be switched at runtime with
+# Api.set_share_client_metrics.
+SHARE_CLIENT_METRICS = False
+
+# Periodic syncs (session updates, stats, app and link checks) are spread by +/- this
+# fraction of their interval, back off up to SYNC_MAX_BACKOFF seconds while the
+# server fails, and run LOW_POWER_FACTOR times less often on battery. The server can
+# steer the cadence with Retry-After and interval hints (see sync_cadence.py).
+SYNC_JITTER = 0.1
+SYNC_MAX_BACKOFF = 3600
+LOW_POWER_ON_BATTERY = True
+LOW_POWER_FACTOR = 3
+
+# Where the OS reports the time since the last input (see idle_sources.py), it is
+# used for idle detection either way. Set this to also drop the system-wide input
+# hooks, which run on every key press and mouse move; keyboard and mouse rates then
+# only count input to the app window, as on macOS, so the rates sent to the server
+# drop for everyone who works outside the app. Off by default for that reason.
+SYSTEM_IDLE_REPLACES_INPUT_HOOKS = False
@@ -0,0 +1,95 @@
+# idle_monitor.py
+
+import threading
+
+from app_logging import get_logger
+
+log = get_logger(__name__)
+
+
+class IdleMonitor:
+    """Runs the activity check only when the idle state can change
+
+    Polling every second wakes the process 3600 times an hour whether the user is
+    typing or away. Instead, the monitor asks `next_delay()` how long nothing can
+    change (for an active user: until the idle threshold after the last input) and
+    sleeps that long. Input while active only moves that deadline, which the next
+    check picks up, so it needs no wakeup. Input that ends an idle stretch calls
+    wake(), which runs the check right away.
+
+    The check and next_delay run on the monitor's own thread.
+    """
+
+    def __init__(self, check_func, next_delay, name='IdleMonitor'):
+        """
+        Args:
+            check_func: Callable taking no arguments; the activity check
+            next_delay: Callable returning the seconds until the next check
+            name (str): Thread name
+        """
+        self.check_func = check_func
+        self.next_delay = next_delay
+        self.name = name
+
+        self._cond = threading.Condition()
+        self._running = False
+        self._woken = False
+        self._generation = 0
+        self._metrics = {'checks': 0, 'early_wakeups': 0}
+
+    @property
+    def running(self):
+        with self._cond:
+            return self._running
+
+    def start(self):
+        """Start checking; does nothing if already running"""
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+            self._woken = False
+            self._generation += 1
+            generation = self._generation
+        threading.Thread(target=self._run, args=(generation,), name=self.name, daemon=True).start()
+
+    def stop(self):
+        """Stop checking (a check in progress still finishes)"""
+        with self._cond:
+            self._running = False
+            self._generation += 1
+            self._cond.notify_all()
+
+    def wake(self):
+        """Run the check now instead of at the planned time"""
+        with self._cond:
+            if self._running and not self._woken:
+                self._woken = True
+                self._cond.notify_all()
+
+    def get_metrics(self):
+        with self._cond:
+            return dict(self._metrics)
+
+    def _run(self, generation):
+        while True:
+            try:
+                delay = max(0.0, self.next_delay())
+            except Exception as e:
+                log.error('Error planning the next activity check: %s', e)
+                delay = 1.0
+            with self._cond:
+                if generation != self._generation:
+                    return
+                if not self._woken:
+                    self._cond.wait(delay)
+                if generation != self._generation:
+                    return
+                if self._woken:
+                    self._metrics['early_wakeups'] += 1
+                self._woken = False
+                self._metrics['checks'] += 1
+            try:
+                self.check_func()
+            except Exception as e:
+                log.error('Error in activity check: %s', e)
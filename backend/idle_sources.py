@@ -0,0 +1,443 @@
+# idle_sources.py
+
+import os
+import re
+import sys
+import time
+import shutil
+import threading
+import subprocess
+
+from app_logging import get_logger
+from metrics import metrics
+
+log = get_logger(__name__)
+
+# Readings above this are treated as garbage (some drivers report huge values)
+MAX_IDLE_SECONDS = 10 ** 7
+
+
+class IdleSource:
+    """Operating system counter of the time since the last user input
+
+    Reading the OS counter costs one call per activity check, while global input
+    hooks run Python code on every key press and mouse move. Sources are probed
+    by detect_idle_source(); idle_seconds() returns None whenever a reading fails.
+
+    `exact` sources report the time since the last input at any moment. Sources
+    that are not exact (the logind idle hint) only report idleness once the desktop
+    has declared the session idle and return None before that.
+    """
+
+    name = 'none'
+    exact = True
+
+    def idle_seconds(self):
+        """Seconds since the last keyboard or mouse input, or None if unknown"""
+        raise NotImplementedError
+
+    def close(self):
+        """Release OS handles"""
+
+    def __repr__(self):
+        return f'<{type(self).__name__} {self.name}>'
+
+
+def _sanitize(seconds):
+    if seconds is None or seconds < 0 or seconds > MAX_IDLE_SECONDS:
+        return None
+    return float(seconds)
+
+
+class QuartzIdleSource(IdleSource):
+    """macOS: Quartz event source counters (no Accessibility permission needed)"""
+
+    name = 'quartz'
+
+    def __init__(self):
+        # Import lazily to avoid a hard dependency on other platforms
+        import Quartz
+        self._quartz = Quartz
+
+    def idle_seconds(self):
+        try:
+            return _sanitize(self._quartz.CGEventSourceSecondsSinceLastEventType(
+                self._quartz.kCGEventSourceStateCombinedSessionState,
+                self._quartz.kCGAnyInputEventType
+            ))
+        except Exception:
+            return None
+
+
+class WindowsIdleSource(IdleSource):
+    """Windows: GetLastInputInfo, the tick count of the last input in the session"""
+
+    name = 'windows'
+
+    def __init__(self):
+        import ctypes
+        from ctypes import wintypes
+
+        class LASTINPUTINFO(ctypes.Structure):
+            _fields_ = [('cbSize', wintypes.UINT), ('dwTime', wintypes.DWORD)]
+
+        self._ctypes = ctypes
+        self._info = LASTINPUTINFO()
+        self._info.cbSize = ctypes.sizeof(LASTINPUTINFO)
+        self._user32 = ctypes.windll.user32
+        self._kernel32 = ctypes.windll.kernel32
+        self._kernel32.GetTickCount.restype = wintypes.DWORD
+
+    def idle_seconds(self):
+        try:
+            if not self._user32.GetLastInputInfo(self._ctypes.byref(self._info)):
+                return None
+            # Both are 32-bit millisecond tick counts that wrap every 49.7 days
+            elapsed_ms = (self._kernel32.GetTickCount() - self._info.dwTime) & 0xFFFFFFFF
+            return _sanitize(elapsed_ms / 1000.0)
+        except Exception:
+            return None
+
+
+class XScreenSaverIdleSource(IdleSource):
+    """X11: the MIT-SCREEN-SAVER extension's idle counter (libXss)"""
+
+    name = 'xscreensaver'
+
+    def __init__(self, display_name=None):
+        import ctypes
+        import ctypes.util
+
+        class XScreenSaverInfo(ctypes.Structure):
+            _fields_ = [('window', ctypes.c_ulong), ('state', ctypes.c_int), ('kind', ctypes.c_int),
+                        ('til_or_since', ctypes.c_ulong), ('idle', ctypes.c_ulong),
+                        ('eventMask', ctypes.c_ulong)]
+
+        xlib_path, xss_path = ctypes.util.find_library('X11'), ctypes.util.find_library('Xss')
+        if not xlib_path or not xss_path:
+            raise OSError('libX11 or libXss not found')
+        self._ctypes = ctypes
+        self._xlib = ctypes.CDLL(xlib_path)
+        self._xss = ctypes.CDLL(xss_path)
+        self._xlib.XOpenDisplay.restype = ctypes.c_void_p
+        self._xlib.XOpenDisplay.argtypes = [ctypes.c_char_p]
+        self._xlib.XDefaultRootWindow.restype = ctypes.c_ulong
+        self._xlib.XDefaultRootWindow.argtypes = [ctypes.c_void_p]
+        self._xlib.XCloseDisplay.argtypes = [ctypes.c_void_p]
+        self._xlib.XFree.argtypes = [ctypes.c_void_p]
+        self._xss.XScreenSaverQueryExtension.argtypes = [
+            ctypes.c_void_p, ctypes.POINTER(ctypes.c_int), ctypes.POINTER(ctypes.c_int)]
+        self._xss.XScreenSaverAllocInfo.restype = ctypes.POINTER(XScreenSaverInfo)
+        self._xss.XScreenSaverQueryInfo.argtypes = [
+            ctypes.c_void_p, ctypes.c_ulong, ctypes.POINTER(XScreenSaverInfo)]
+
+        self._display = self._xlib.XOpenDisplay(display_name.encode() if display_name else None)
+        if not self._display:
+            raise OSError('Cannot open X display')
+        self._info = None
+        event_base, error_base = ctypes.c_int(), ctypes.c_int()
+        if not self._xss.XScreenSaverQueryExtension(self._display, ctypes.byref(event_base),
+                                                    ctypes.byref(error_base)):
+            self.close()
+            raise OSError('X server has no MIT-SCREEN-SAVER extension')
+        self._root = self._xlib.XDefaultRootWindow(self._display)
+        self._info = self._xss.XScreenSaverAllocInfo()
+
+    def idle_seconds(self):
+        if not self._display or not self._info:
+            return None
+        try:
+            if not self._xss.XScreenSaverQueryInfo(self._display, self._root, self._info):
+                return None
+            return _sanitize(self._info.contents.idle / 1000.0)
+        except Exception:
+            return None
+
+    def close(self):
+        if self._info:
+            self._xlib.XFree(self._info)
+            self._info = None
+        if self._display:
+            self._xlib.XCloseDisplay(self._display)
+            self._display = None
+
+
+def _run(command, timeout=2.0):
+    """Output of a short D-Bus query command, or None if it fails"""
+    try:
+        result = subprocess.run(command, capture_output=True, text=True, timeout=timeout)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout if result.returncode == 0 else None
+
+
+class DBusConnection:
+    """One D-Bus connection kept open across readings (jeepney)
+
+    Forking gdbus or busctl for a reading costs a process start and a new bus
+    connection with authentication every time (milliseconds of CPU, up to the
+    2 s timeout when the bus is slow); a method call on an open connection is one
+    round trip on a Unix socket. The connection is opened on the first call and
+    again after a failure. jeepney is imported here, so it is only loaded on
+    systems that use a D-Bus idle source; without it the sources fall back to the
+    command line tools.
+    """
+
+    def __init__(self, bus, timeout=2.0):
+        """
+        Args:
+            bus (str): 'SESSION' or 'SYSTEM'
+            timeout (float): Seconds to wait for a reply
+        """
+        from jeepney import DBusAddress, new_method_call, Properties
+        from jeepney.wrappers import unwrap_msg
+        from jeepney.io.blocking import open_dbus_connection
+        self._address = DBusAddress
+        self._new_method_call = new_method_call
+        self._properties = Properties
+        self._unwrap = unwrap_msg
+        self._open = open_dbus_connection
+        self.bus = bus
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._connection = None
+
+    def call(self, bus_name, object_path, interface, method):
+        """Body of the reply to a method call without arguments; raises on errors"""
+        address = self._address(object_path, bus_name=bus_name, interface=interface)
+        return self._send(self._new_method_call(address, method))
+
+    def get_properties(self, bus_name, object_path, interface):
+        """All properties of an interface as {name: value}; raises on errors"""
+        address = self._address(object_path, bus_name=bus_name, interface=interface)
+        body = self._send(self._properties(address).get_all())
+        return {name: value for name, (_signature, value) in body[0].items()}
+
+    def _send(self, message):
+        with self._lock:
+            if self._connection is None:
+                self._connection = self._open(bus=self.bus)
+            try:
+                reply = self._connection.send_and_get_reply(message, timeout=self.timeout)
+            except Exception:
+                # Broken or timed out: reconnect on the next call
+                self._close()
+                raise
+        # Raises DBusErrorResponse for error replies (e.g. the service is not running)
+        return self._unwrap(reply)
+
+    def _close(self):
+        if self._connection is not None:
+            try:
+                self._connection.close()
+            except Exception:
+                pass
+            self._connection = None
+
+    def close(self):
+        with self._lock:
+            self._close()
+
+
+def _open_dbus(bus):
+    """DBusConnection, or None when jeepney is not installed"""
+    try:
+        return DBusConnection(bus)
+    except ImportError:
+        log.debug('jeepney not installed; reading idle time through command line tools')
+        return None
+
+
+class _CommandCache:
+    """Keeps the result of a forked D-Bus query for a while
+
+    Used only without jeepney. The monitor polls an idle source every few seconds
+    while the user is idle, and each query forks a process; within `max_age`
+    seconds the previous reading is reused (a counter extrapolated by the time
+    passed). The price is that input during that time is noticed up to `max_age`
+    seconds late.
+    """
+
+    def __init__(self, max_age, extrapolate=True, clock=time.monotonic):
+        self.max_age = max_age
+        self.extrapolate = extrapolate
+        self.clock = clock
+        self._value = None
+        self._read_at = None
+
+    def get(self, read):
+        """The cached reading (plus the time since it was taken), or a fresh read()"""
+        now = self.clock()
+        if self._read_at is not None and now - self._read_at < self.max_age:
+            if self._value is None or not self.extrapolate:
+                return self._value
+            return self._value + (now - self._read_at)
+        self._value = read()
+        self._read_at = now
+        return self._value
+
+
+class MutterIdleSource(IdleSource):
+    """GNOME on Wayland: org.gnome.Mutter.IdleMonitor.GetIdletime over D-Bus
+
+    Wayland gives clients no global idle counter, but GNOME's compositor exports one.
+    Read over a kept-open session bus connection when jeepney is installed, else
+    by running gdbus (see DBusConnection and _CommandCache for the costs).
+    """
+
+    name = 'mutter'
+    BUS_NAME = 'org.gnome.Mutter.IdleMonitor'
+    OBJECT_PATH = '/org/gnome/Mutter/IdleMonitor/Core'
+    INTERFACE = 'org.gnome.Mutter.IdleMonitor'
+    COMMAND = ['gdbus', 'call', '--session', '--dest', BUS_NAME, '--object-path', OBJECT_PATH,
+               '--method', INTERFACE + '.GetIdletime']
+
+    def __init__(self, connection=None, command_cache_age=2.0):
+        """
+        Args:
+            connection: DBusConnection to the session bus (default: opened here if
+                        jeepney is installed)
+            command_cache_age (float): Seconds a gdbus reading is reused
+        """
+        self._connection = connection or _open_dbus('SESSION')
+        if self._connection is None and not shutil.which('gdbus'):
+            raise OSError('Neither jeepney nor gdbus available')
+        self._cache = _CommandCache(command_cache_age)
+
+    def idle_seconds(self):
+        if self._connection is not None:
+            return self._read_bus()
+        return self._cache.get(self._read_command)
+
+    def _read_bus(self):
+        try:
+            with metrics.timer('idle_source.mutter'):
+                body = self._connection.call(self.BUS_NAME, self.OBJECT_PATH, self.INTERFACE, 'GetIdletime')
+            return _sanitize(body[0] / 1000.0)
+        except Exception as e:
+            log.debug('Mutter idle time read failed: %s', e)
+            return None
+
+    def _read_command(self):
+        # Prints "(uint64 12345,)" (milliseconds)
+        with metrics.timer('idle_source.mutter'):
+            output = _run(self.COMMAND)
+        match = re.search(r'(\d+)', output or '')
+        return _sanitize(int(match.group(1)) / 1000.0) if match else None
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+
+
+class LogindIdleSource(IdleSource):
+    """systemd-logind's IdleHint for the current session (Wayland and other desktops)
+
+    The desktop sets the hint after its own idle delay, so this source only knows
+    that the session is idle, and since when; while the hint is off it returns None
+    and the caller has to fall back to its own input tracking. Read over a
+    kept-open system bus connection when jeepney is installed, else by running
+    busctl.
+    """
+
+    name = 'logind'
+    exact = False
+    BUS_NAME = 'org.freedesktop.login1'
+    OBJECT_PATH = '/org/freedesktop/login1/session/auto'
+    INTERFACE = 'org.freedesktop.login1.Session'
+    COMMAND = ['busctl', 'get-property', BUS_NAME, OBJECT_PATH, INTERFACE, 'IdleHint', 'IdleSinceHintMonotonic']
+
+    def __init__(self, connection=None, command_cache_age=2.0):
+        """
+        Args:
+            connection: DBusConnection to the system bus (default: opened here if
+                        jeepney is installed)
+            command_cache_age (float): Seconds a busctl reading is reused
+        """
+        self._connection = connection or _open_dbus('SYSTEM')
+        if self._connection is None and not shutil.which('busctl'):
+            raise OSError('Neither jeepney nor busctl available')
+        # The idle start is a point in time; it needs no extrapolation
+        self._cache = _CommandCache(command_cache_age, extrapolate=False)
+        try:
+            self._read_hint(fail_silently=False)
+        except Exception as e:
+            self.close()
+            raise OSError(f'No logind session: {e}')
+
+    def idle_seconds(self):
+        if self._connection is not None:
+            since = self._read_hint()
+        else:
+            since = self._cache.get(self._read_hint)
+        if not since:
+            return None
+        return _sanitize(time.clock_gettime(time.CLOCK_MONOTONIC) - since)
+
+    def _read_hint(self, fail_silently=True):
+        """CLOCK_MONOTONIC seconds since which the session is idle, or None"""
+        try:
+            with metrics.timer('idle_source.logind'):
+                output = properties = None
+                if self._connection is not None:
+                    properties = self._connection.get_properties(self.BUS_NAME, self.OBJECT_PATH, self.INTERFACE)
+                else:
+                    output = _run(self.COMMAND)
+            if properties is not None:
+                idle, since_us = properties['IdleHint'], properties['IdleSinceHintMonotonic']
+            else:
+                # Prints "b true" and "t <microseconds of CLOCK_MONOTONIC>"
+                if output is None:
+                    raise OSError('busctl failed')
+                lines = output.split()
+                if len(lines) != 4:
+                    return None
+                idle, since_us = lines[1] == 'true', int(lines[3])
+        except Exception as e:
+            if not fail_silently:
+                raise
+            log.debug('logind idle hint read failed: %s', e)
+            return None
+        return since_us / 1e6 if idle else None
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+
+
+def _candidates(platform_name, env):
+    if platform_name == 'darwin':
+        return [QuartzIdleSource]
+    if platform_name == 'win32':
+        return [WindowsIdleSource]
+    if env.get('WAYLAND_DISPLAY'):
+        # XWayland's XScreenSaver counter only sees input to X clients
+        return [MutterIdleSource, LogindIdleSource]
+    if env.get('DISPLAY'):
+        return [XScreenSaverIdleSource, LogindIdleSource]
+    return [LogindIdleSource]
+
+
+def detect_idle_source(platform_name=None, env=None):
+    """Return the first idle source that works on this system
+
+    Args:
+        platform_name (str): sys.platform value to detect for (default: this system)
+        env (dict): Environment to read DISPLAY/WAYLAND_DISPLAY from (default: os.environ)
+
+    Returns:
+        IdleSource or None: None when only input hooks can tell idleness
+    """
+    platform_name = platform_name or sys.platform
+    env = os.environ if env is None else env
+    for source_class in _candidates(platform_name, env):
+        try:
+            source = source_class()
+        except Exception as e:
+            log.debug('Idle source %s unavailable: %s', source_class.name, e)
+            continue
+        if not source.exact or source.idle_seconds() is not None:
+            return source
+        log.debug('Idle source %s gave no reading', source_class.name)
+        source.close()
+    return None
@@ -0,0 +1,102 @@
+# input_listener.py
+
+import time
+import threading
+
+from app_logging import get_logger
+
+log = get_logger(__name__)
+
+
+class InputListener:
+    """System-wide keyboard and mouse hooks (pynput) that coalesce in the callback
+
+    pynput calls back into Python under the GIL for every key press and for every
+    pixel of mouse movement, hundreds of times a second while the mouse moves.
+    Activity is only counted once per `throttle` seconds anyway, so each callback
+    does one clock read and one comparison, and only the first event of each
+    throttle window is passed on to `on_activity(kind, timestamp)`.
+
+    With track_motion=False only clicks and scrolling count as mouse input.
+    """
+
+    KINDS = ('keyboard', 'mouse')
+
+    def __init__(self, on_activity, clock=time.monotonic, throttle=0.5, track_motion=True):
+        """
+        Args:
+            on_activity: Callable taking ('keyboard' or 'mouse', monotonic timestamp)
+            clock: Callable returning monotonic seconds
+            throttle (float): Seconds between events passed on, per kind
+            track_motion (bool): Whether mouse movement counts as activity
+        """
+        self.on_activity = on_activity
+        self.throttle = throttle
+        self.track_motion = track_motion
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._listeners = []
+        self._next_keyboard = 0.0
+        self._next_mouse = 0.0
+        self._forwarded = dict.fromkeys(self.KINDS, 0)
+
+    @property
+    def running(self):
+        with self._lock:
+            return bool(self._listeners)
+
+    def start(self, keyboard, mouse):
+        """Start the hooks; does nothing if already running
+
+        Args:
+            keyboard: pynput.keyboard module
+            mouse: pynput.mouse module
+        """
+        with self._lock:
+            if self._listeners:
+                return
+            listeners = [
+                keyboard.Listener(on_press=self._on_key),
+                mouse.Listener(on_move=self._on_mouse if self.track_motion else None,
+                               on_click=self._on_mouse, on_scroll=self._on_mouse),
+            ]
+            try:
+                for listener in listeners:
+                    listener.daemon = True
+                    listener.start()
+            except Exception:
+                for listener in listeners:
+                    listener.stop()
+                raise
+            self._listeners = listeners
+
+    def stop(self):
+        """Stop the hooks"""
+        with self._lock:
+            listeners, self._listeners = self._listeners, []
+        for listener in listeners:
+            listener.stop()
+
+    def get_metrics(self):
+        """Events passed on per kind (at most one per throttle window)"""
+        return dict(self._forwarded)
+
+    def _on_key(self, *args):
+        now = self._clock()
+        if now >= self._next_keyboard:
+            self._next_keyboard = now + self.throttle
+            self._forward('keyboard', now)
+
+    def _on_mouse(self, *args):
+        now = self._clock()
+        if now >= self._next_mouse:
+            self._next_mouse = now + self.throttle
+            self._forward('mouse', now)
+
+    def _forward(self, kind, timestamp):
+        self._forwarded[kind] += 1
+        try:
+            self.on_activity(kind, timestamp)
+        except Exception as e:
+            # An exception would stop the pynput listener
+            log.error('Error recording %s activity: %s', kind, e)
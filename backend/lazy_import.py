@@ -0,0 +1,40 @@
+# lazy_import.py
+
+import sys
+import importlib
+import importlib.util
+
+
+def module_available(name):
+    """Check whether a module can be imported, without importing it"""
+    if name in sys.modules:
+        return sys.modules[name] is not None
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def lazy_import(name):
+    """Import a module on first attribute access instead of now
+
+    The returned module object is registered in sys.modules, so later plain
+    `import name` statements get the same (lazy) module. The module code runs the
+    first time one of its attributes is used; a missing module still raises
+    ImportError immediately, like a normal import.
+
+    Loaders without exec_module support (some frozen importers) fall back to a
+    regular import.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named '{name}'", name=name)
+    if spec.loader is None or not hasattr(spec.loader, 'exec_module'):
+        return importlib.import_module(name)
+    spec.loader = importlib.util.LazyLoader(spec.loader)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
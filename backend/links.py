@@ -0,0 +1,338 @@
+# links.py
+
+import os
+import time
+import shutil
+import sqlite3
+import tempfile
+
+from app_logging import get_logger
+from metrics import metrics
+from clock import cached_iso_timestamp, epoch_from_iso
+import platforms
+
+log = get_logger(__name__)
+
+# Seconds between the browsers' time epochs and the Unix epoch
+CHROME_EPOCH_OFFSET = 11644473600  # Chrome: microseconds since 1601-01-01 UTC
+SAFARI_EPOCH_OFFSET = 978307200  # Safari: seconds since 2001-01-01 UTC
+
+# Visits read per history database (most recent first)
+HISTORY_LIMIT = 5000
+# Visits later than now plus this are treated as corrupt (allows for clock skew)
+MAX_CLOCK_SKEW = 86400
+
+# Browser-internal pages and local content are not tracked
+SKIPPED_URL_PREFIXES = ('about:', 'chrome://', 'edge://', 'brave://', 'firefox://', 'safari://', 'file://', 'data:')
+
+# Links per session update, to keep the payload small
+MAX_LINKS_PER_UPDATE = 100
+
+CHROMIUM_QUERY = """
+    SELECT urls.url, urls.title, visits.visit_time, urls.visit_count
+    FROM urls JOIN visits ON urls.id = visits.url
+    WHERE visits.visit_time > ?
+    ORDER BY visits.visit_time DESC, urls.visit_count DESC
+    LIMIT ?
+"""
+FIREFOX_QUERY = """
+    SELECT p.url, p.title, h.visit_date, p.visit_count
+    FROM moz_places p JOIN moz_historyvisits h ON p.id = h.place_id
+    WHERE h.visit_date > ?
+    ORDER BY h.visit_date DESC, p.visit_count DESC
+    LIMIT ?
+"""
+SAFARI_QUERY = """
+    SELECT i.url, v.title, v.visit_time, i.visit_count
+    FROM history_items i JOIN history_visits v ON i.id = v.history_item
+    WHERE v.visit_time > ?
+    ORDER BY v.visit_time DESC, i.visit_count DESC
+    LIMIT ?
+"""
+# Older Safari schemas have no visit_count
+SAFARI_BASIC_QUERY = """
+    SELECT i.url, v.title, v.visit_time
+    FROM history_items i JOIN history_visits v ON i.id = v.history_item
+    WHERE v.visit_time > ?
+    ORDER BY v.visit_time DESC
+    LIMIT ?
+"""
+
+
+def _chromium_rows(cursor, cutoff_time):
+    cursor.execute(CHROMIUM_QUERY, ((cutoff_time + CHROME_EPOCH_OFFSET) * 1000000, HISTORY_LIMIT))
+    return cursor.fetchall(), lambda visit_time: visit_time // 1000000 - CHROME_EPOCH_OFFSET
+
+
+def _firefox_rows(cursor, cutoff_time):
+    # Firefox stores microseconds since the Unix epoch
+    cursor.execute(FIREFOX_QUERY, (cutoff_time * 1000000, HISTORY_LIMIT))
+    return cursor.fetchall(), lambda visit_time: visit_time // 1000000
+
+
+def _safari_rows(cursor, cutoff_time):
+    query = SAFARI_BASIC_QUERY
+    try:
+        cursor.execute("PRAGMA table_info(history_items)")
+        if 'visit_count' in [column[1] for column in cursor.fetchall()]:
+            query = SAFARI_QUERY
+    except sqlite3.Error as schema_error:
+        log.error('Error checking Safari schema: %s', schema_error)
+    cursor.execute(query, (cutoff_time - SAFARI_EPOCH_OFFSET, HISTORY_LIMIT))
+    return cursor.fetchall(), lambda visit_time: visit_time + SAFARI_EPOCH_OFFSET
+
+
+def _read_history(browser, read_rows, history_file, cutoff_time, now=None):
+    """Recent visits from a copy of a browser's history database
+
+    The database is copied first, since the running browser keeps it locked.
+
+    Returns:
+        list: Dictionaries with url, title, visit_time (epoch seconds) and
+              visit_count (where the schema has one), newest first
+    """
+    history_data = []
+    now = time.time() if now is None else now
+
+    if not history_file or not os.path.exists(history_file):
+        log.debug('%s history file does not exist: %s', browser, history_file)
+        return history_data
+
+    try:
+        cutoff_time = int(cutoff_time)
+    except (TypeError, ValueError):
+        log.debug('Invalid cutoff time: %s, using current time - 600 seconds', cutoff_time)
+        cutoff_time = int(now) - 600
+
+    fd, temp_history = tempfile.mkstemp(prefix='temp_history_', suffix='.db')
+    os.close(fd)
+    try:
+        try:
+            shutil.copy2(history_file, temp_history)
+            log.debug('Successfully copied %s history file: %s', browser, history_file)
+        except (shutil.Error, IOError) as e:
+            log.error('Error copying %s history file %s: %s', browser, history_file, e)
+            return history_data
+
+        conn = sqlite3.connect(temp_history)
+        try:
+            rows, to_unix = read_rows(conn.cursor(), cutoff_time)
+            for row in rows:
+                try:
+                    url, title = row[0], row[1]
+                    unix_time = to_unix(row[2])
+                    if unix_time <= 0 or unix_time > now + MAX_CLOCK_SKEW or not url:
+                        continue
+                    entry = {'url': url, 'title': title or url, 'visit_time': unix_time}
+                    if len(row) > 3:
+                        entry['visit_count'] = row[3]
+                    history_data.append(entry)
+                except Exception as entry_error:
+                    log.warning('Error processing %s history entry: %s', browser, entry_error)
+            log.debug('Found %s %s history entries from %s', len(history_data), browser, history_file)
+        except sqlite3.Error as sql_error:
+            log.error('SQLite error when reading %s history: %s', browser, sql_error)
+        finally:
+            conn.close()
+    except Exception as e:
+        log.error('Error extracting %s history: %s', browser, e)
+    finally:
+        try:
+            if os.path.exists(temp_history):
+                os.remove(temp_history)
+        except Exception as cleanup_error:
+            log.error('Error cleaning up temporary %s history file: %s', browser, cleanup_error)
+
+    return history_data
+
+
+def read_chromium_history(history_file, cutoff_time, now=None):
+    """Visits after cutoff_time (epoch seconds) from a Chrome, Brave or Edge History file"""
+    return _read_history('Chrome', _chromium_rows, history_file, cutoff_time, now)
+
+
+def read_firefox_history(history_file, cutoff_time, now=None):
+    """Visits after cutoff_time (epoch seconds) from a Firefox places.sqlite"""
+    return _read_history('Firefox', _firefox_rows, history_file, cutoff_time, now)
+
+
+def read_safari_history(history_file, cutoff_time, now=None):
+    """Visits after cutoff_time (epoch seconds) from Safari's History.db"""
+    return _read_history('Safari', _safari_rows, history_file, cutoff_time, now)
+
+
+HISTORY_READERS = {
+    'chrome': read_chromium_history,
+    'brave': read_chromium_history,
+    'edge': read_chromium_history,
+    'firefox': read_firefox_history,
+    'safari': read_safari_history,
+}
+
+
+class LinkUsage:
+    """Time attributed to one URL in the current session interval
+
+    last_seen is epoch seconds; it is formatted only when the interval is sent.
+    """
+
+    __slots__ = ('url', 'title', 'time_spent', 'last_seen')
+
+    def __init__(self, url, title, time_spent=0.0, last_seen=None):
+        self.url = url
+        self.title = title
+        self.time_spent = time_spent
+        self.last_seen = last_seen
+
+    def to_dict(self):
+        """Checkpoint form, restored by from_dict()"""
+        return {'url': self.url, 'title': self.title, 'timeSpent': self.time_spent, 'lastSeen': self.last_seen}
+
+    @classmethod
+    def from_dict(cls, data):
+        # Checkpoints of earlier versions hold lastSeen as an ISO string
+        last_seen = data.get('lastSeen')
+        if isinstance(last_seen, str):
+            last_seen = epoch_from_iso(last_seen)
+        return cls(data.get('url'), data.get('title'), data.get('timeSpent', 0), last_seen)
+
+
+class LinkTracker:
+    """Time spent per URL, attributed from the browsers' history databases
+
+    usage maps a URL to its LinkUsage. Each check() spreads the time since the
+    previous check over the visits found.
+    """
+
+    def __init__(self, clock, history_paths=platforms.browser_history_paths):
+        """
+        Args:
+            clock: SystemClock or SimulatedClock
+            history_paths: Callable returning {browser: [history database paths]}
+        """
+        self.clock = clock
+        self.history_paths = history_paths
+        self.supported_browsers = ['chrome', 'brave', 'edge', 'firefox', 'safari']
+        self.usage = {}
+        self.last_check_time = None
+
+    def reset(self, now=None):
+        """Forget all links; `now` (monotonic) starts the first interval"""
+        self.usage = {}
+        self.last_check_time = now
+
+    def to_checkpoint(self):
+        """usage as JSON-ready dicts for the session checkpoint"""
+        return {url: link.to_dict() for url, link in self.usage.items()}
+
+    def restore(self, entries):
+        """Replace usage with the entries of a checkpoint (see to_checkpoint)"""
+        self.usage = {url: LinkUsage.from_dict(entry) for url, entry in entries.items()}
+
+    @metrics.timed('links.check')
+    def check(self, session_start, lookback):
+        """Read the browser histories and add the time since the last check to the links
+
+        On the first check (last_check_time is None) the history since the session
+        started is read; afterwards the last `lookback` seconds.
+
+        Args:
+            session_start (float): Wall-clock start of the session
+            lookback (int): Seconds of history read on later checks
+        """
+        current_time = self.clock.monotonic()
+
+        first_check = self.last_check_time is None
+        if first_check:
+            self.last_check_time = current_time
+
+        time_elapsed = current_time - self.last_check_time
+        self.last_check_time = current_time
+
+        now = self.clock.time()
+
+        if first_check:
+            cutoff_time = int(session_start)
+            log.debug('First browser history check - using timer start time to capture history only since timer started')
+        else:
+            cutoff_time = int(now) - lookback
+
+        try:
+            browser_paths = self.history_paths()
+            total_history_entries = 0
+            usage = self.usage
+
+            for browser_type in self.supported_browsers:
+                read_history = HISTORY_READERS.get(browser_type)
+                if read_history is None:
+                    continue
+                for history_file in browser_paths.get(browser_type, []):
+                    try:
+                        history_data = read_history(history_file, cutoff_time, now=now)
+                        total_history_entries += len(history_data)
+                        # Spread the time over the entries, but at least 1 second per entry
+                        time_per_entry = max(1, time_elapsed / max(1, total_history_entries))
+
+                        for entry in history_data:
+                            url = entry['url']
+                            title = entry['title']
+
+                            if url.startswith(SKIPPED_URL_PREFIXES):
+                                continue
+                            if not url or not title:
+                                continue
+
+                            url = url.rstrip('/')
+
+                            link = usage.get(url)
+                            if link is None:
+                                usage[url] = LinkUsage(url, title, time_per_entry, now)
+                            else:
+                                link.time_spent += time_per_entry
+                                link.last_seen = now
+                    except Exception as e:
+                        # Log the error but continue processing other history files
+                        log.warning('Error processing history file %s: %s', history_file, e)
+                        metrics.counter('links.history_file.failed').inc()
+
+            metrics.gauge('links.history_entries').set(total_history_entries)
+            metrics.gauge('links.tracked').set(len(usage))
+        except Exception as e:
+            log.error('Error checking browser links: %s', e)
+            metrics.counter('links.check.failed').inc()
+
+    def prepare_for_session(self):
+        """Link usage in the format of session updates
+
+        Links with more than a second of usage, longest first, with title and URL
+        truncated and at most MAX_LINKS_PER_UPDATE entries.
+
+        Returns:
+            list: Dictionaries with url, title, timeSpent and timestamp
+        """
+        now = self.clock.time()
+        total_links = len(self.usage)
+        links_data = [
+            {
+                'url': url[:2048],
+                'title': (str(link.title) if link.title else url)[:255],
+                'timeSpent': int(link.time_spent),
+                'timestamp': cached_iso_timestamp(now if link.last_seen is None else link.last_seen)
+            }
+            for url, link in self.usage.items()
+            if url and link.time_spent > 1
+        ]
+
+        log.debug('Links processing metrics: Total=%s, Valid=%s, Skipped=%s',
+                  total_links, len(links_data), total_links - len(links_data))
+
+        links_data.sort(key=lambda x: x['timeSpent'], reverse=True)
+
+        if len(links_data) > MAX_LINKS_PER_UPDATE:
+            log.warning('Limiting links from %s to %s to prevent oversized payloads', len(links_data), MAX_LINKS_PER_UPDATE)
+            links_data = links_data[:MAX_LINKS_PER_UPDATE]
+
+        if not links_data:
+            log.warning('No valid links found for session update. Check browser history access.')
+
+        return links_data
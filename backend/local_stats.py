@@ -0,0 +1,266 @@
+# local_stats.py
+
+import time
+import threading
+from datetime import datetime, timedelta
+
+from app_logging import get_logger
+
+log = get_logger(__name__)
+
+PERIODS = ('daily', 'weekly')
+
+
+def period_bounds(period, now=None):
+    """Local-time boundaries of the day or (Monday-based) week containing `now`
+
+    Returns:
+        tuple: (start_epoch, end_epoch) with end exclusive
+    """
+    now = time.time() if now is None else now
+    local_now = datetime.fromtimestamp(now)
+    start = local_now.replace(hour=0, minute=0, second=0, microsecond=0)
+    if period == 'weekly':
+        start -= timedelta(days=start.weekday())
+        end = start + timedelta(days=7)
+    elif period == 'daily':
+        end = start + timedelta(days=1)
+    else:
+        raise ValueError(f"Unknown stats period: {period}")
+    return start.timestamp(), end.timestamp()
+
+
+def _overlap(span_start, span_end, window_start, window_end):
+    return max(0.0, min(span_end, window_end) - max(span_start, window_start))
+
+
+def format_stats(total, active):
+    """Build a stats payload in the server's format (the *Hours fields hold seconds)"""
+    total = max(0, int(total))
+    active = max(0, min(int(active), total))
+    return {
+        'totalHours': total,
+        'activeHours': active,
+        'activePercentage': int(round(active * 100 / total)) if total else 0,
+    }
+
+
+class LocalStatsEngine:
+    """Daily/weekly totals computed from tracker.db, reconciled with the server
+
+    Totals come from finished sessions in `time_entries` (split across period
+    boundaries in proportion to their duration) plus the running session, so they
+    are available instantly and without a network request. With an
+    employee_provider, only the logged-in employee's entries count.
+
+    The server stays authoritative: it also knows sessions from other devices and
+    manual edits. A reconciliation stores the server numbers together with the
+    local totals at that moment, and later reads report the server numbers advanced
+    by the local growth since then. Reconciliation runs in the background, at most
+    one request per period at a time, once the last server snapshot is older than
+    `max_age` seconds.
+    """
+
+    def __init__(self, db, session_provider, fetchers, max_age=600, retry_after=60, clock=time.time,
+                 on_reconciled=None, employee_provider=None):
+        """
+        Args:
+            db (Database): tracker.db connection manager
+            session_provider: Callable returning None or a dict with 'start', 'active'
+                              and 'idle' (seconds) for the running session; its
+                              active + idle time is counted as ending now
+            fetchers (dict): {'daily': fn, 'weekly': fn}; each returns the server
+                             response dict ({'success', 'data'})
+            max_age (float): Seconds after which a server snapshot is refreshed
+            retry_after (float): Minimum seconds between automatic fetches of a period,
+                                 so a failing server is not asked on every read
+            clock: Wall-clock time source in epoch seconds
+            on_reconciled: Callable taking the period, called after new server
+                           numbers were stored
+            employee_provider: Optional callable returning the logged-in employee id
+                               (None when logged out); entries of other employees
+                               are not counted
+        """
+        self.db = db
+        self.session_provider = session_provider
+        self.fetchers = fetchers
+        self.max_age = max_age
+        self.retry_after = retry_after
+        self.clock = clock
+        self.on_reconciled = on_reconciled
+        self.employee_provider = employee_provider
+
+        self._lock = threading.Lock()
+        self._snapshots = {}  # {period: {'bounds', 'server', 'local', 'fetched_at'}}
+        self._in_flight = {}  # {period: threading.Event}
+        self._last_attempt = {}  # {period: epoch seconds}
+        self._metrics = {'local_reads': 0, 'server_fetches': 0, 'server_errors': 0}
+
+    # ------------------------------------------------------------------
+    # Local aggregation
+    # ------------------------------------------------------------------
+    def local_totals(self, period, now=None):
+        """Sum total/active/idle seconds of a period from local data
+
+        Returns:
+            dict: {'total', 'active', 'idle'} in seconds
+        """
+        now = self.clock() if now is None else now
+        start, end = period_bounds(period, now)
+        total = active = idle = 0.0
+
+        # Entries are stored at their end time; anything ending after the window
+        # start may overlap it.
+        if self.employee_provider is None:
+            rows = self.db.query(
+                'SELECT timestamp_utc, duration, active_seconds, idle_seconds FROM time_entries '
+                'WHERE timestamp_utc > ?',
+                (int(start),)
+            )
+        else:
+            # Logged out: nobody's entries count
+            employee_id = self.employee_provider()
+            rows = self.db.query(
+                'SELECT timestamp_utc, duration, active_seconds, idle_seconds FROM time_entries '
+                'WHERE employee_id = ? AND timestamp_utc > ?',
+                (employee_id, int(start))
+            ) if employee_id else []
+        for ended_at, duration, active_seconds, idle_seconds in rows:
+            duration = duration or 0
+            if duration <= 0:
+                continue
+            share = _overlap(ended_at - duration, ended_at, start, end) / duration
+            if share <= 0:
+                continue
+            total += duration * share
+            if active_seconds is None and idle_seconds is None:
+                # Entries from before the history columns existed count as active
+                active += duration * share
+            else:
+                active += (active_seconds or 0) * share
+                idle += (idle_seconds or 0) * share
+
+        session = self.session_provider()
+        if session:
+            # Same basis as the entry stored on stop: tracked time (active + idle),
+            # ending now. Wall-clock time since the start would include suspends.
+            tracked = max(0.0, session.get('active', 0) + session.get('idle', 0))
+            if tracked > 0:
+                share = _overlap(now - tracked, now, start, end) / tracked
+                total += tracked * share
+                active += session.get('active', 0) * share
+                idle += session.get('idle', 0) * share
+
+        return {'total': total, 'active': active, 'idle': idle}
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def get(self, period, now=None):
+        """Current stats for a period, served from local data
+
+        Returns:
+            dict: Server-format stats plus 'source' ('local' or 'reconciled')
+                  and 'serverSyncedAt' (epoch seconds or None)
+        """
+        now = self.clock() if now is None else now
+        local = self.local_totals(period, now)
+        bounds = period_bounds(period, now)
+
+        with self._lock:
+            self._metrics['local_reads'] += 1
+            snapshot = self._snapshots.get(period)
+            if snapshot is not None and snapshot['bounds'] != bounds:
+                # A new day/week started; the old server numbers no longer apply
+                snapshot = None
+                self._snapshots.pop(period, None)
+
+        if snapshot is None:
+            data = format_stats(local['total'], local['active'])
+            data['source'] = 'local'
+            data['serverSyncedAt'] = None
+        else:
+            server = snapshot['server']
+            grown_total = local['total'] - snapshot['local']['total']
+            grown_active = local['active'] - snapshot['local']['active']
+            data = dict(server)
+            data.update(format_stats(server.get('totalHours', 0) + grown_total,
+                                     server.get('activeHours', 0) + grown_active))
+            data['source'] = 'reconciled'
+            data['serverSyncedAt'] = snapshot['fetched_at']
+
+        stale = snapshot is None or now - snapshot['fetched_at'] >= self.max_age
+        if stale and now - self._last_attempt.get(period, 0) >= self.retry_after:
+            self.reconcile(period)
+        return data
+
+    def reconcile(self, period=None, wait=False, timeout=15):
+        """Fetch server stats in the background and store them as the new baseline
+
+        Args:
+            period (str): 'daily', 'weekly', or None for both
+            wait (bool): Block until the fetch finished (or timeout expired)
+        """
+        periods = PERIODS if period is None else (period,)
+        events = []
+        for p in periods:
+            with self._lock:
+                event = self._in_flight.get(p)
+                if event is None:
+                    event = threading.Event()
+                    self._in_flight[p] = event
+                    self._last_attempt[p] = self.clock()
+                    threading.Thread(target=self._fetch, args=(p, event), name=f"StatsReconcile-{p}",
+                                     daemon=True).start()
+            events.append(event)
+        if wait:
+            deadline = self.clock() + timeout
+            for event in events:
+                remaining = deadline - self.clock()
+                # A wait that timed out used up the timeout, whatever the clock says
+                if remaining <= 0 or not event.wait(remaining):
+                    break
+
+    def invalidate(self):
+        """Forget server snapshots (e.g. after logout)"""
+        with self._lock:
+            self._snapshots.clear()
+
+    def get_metrics(self):
+        with self._lock:
+            return dict(self._metrics)
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+    def _fetch(self, period, event):
+        reconciled = False
+        try:
+            now = self.clock()
+            local = self.local_totals(period, now)
+            result = self.fetchers[period]()
+            with self._lock:
+                self._metrics['server_fetches'] += 1
+                if result and result.get('success') and isinstance(result.get('data'), dict):
+                    self._snapshots[period] = {
+                        'bounds': period_bounds(period, now),
+                        'server': result['data'],
+                        'local': local,
+                        'fetched_at': now,
+                    }
+                    reconciled = True
+                else:
+                    self._metrics['server_errors'] += 1
+        except Exception as e:
+            log.error('Error reconciling %s stats: %s', period, e)
+            with self._lock:
+                self._metrics['server_errors'] += 1
+        finally:
+            with self._lock:
+                self._in_flight.pop(period, None)
+            event.set()
+        if reconciled and self.on_reconciled:
+            try:
+                self.on_reconciled(period)
+            except Exception as e:
+                log.error('Error in stats reconciliation callback: %s', e)
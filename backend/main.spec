@@ -6,7 +6,7 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=[('dist', 'dist')],
-    hiddenimports=[],
+    hiddenimports=['webview', 'requests', 'psutil', 'screeninfo'],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
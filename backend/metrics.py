@@ -0,0 +1,206 @@
+# metrics.py
+
+import time
+import threading
+import functools
+from contextlib import contextmanager
+
+
+class Counter:
+    """Monotonically increasing count"""
+
+    __slots__ = ('_lock', 'value')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def snapshot(self):
+        return self.value
+
+
+class Gauge:
+    """Last observed value"""
+
+    __slots__ = ('value',)
+
+    def __init__(self):
+        self.value = None
+
+    def set(self, value):
+        self.value = value
+
+    def snapshot(self):
+        return self.value
+
+
+class Histogram:
+    """Latency histogram with HDR-style log-linear buckets
+
+    Values are recorded as integer microseconds. Below 2**sub_bucket_bits they are
+    exact; above, each power of two is split into 2**(sub_bucket_bits - 1) buckets,
+    so a recorded value is off by less than 1 / 2**(sub_bucket_bits - 1) (about 3%
+    with the default 6 bits) whatever its magnitude. Only non-empty buckets are
+    stored, so a histogram of a few hundred distinct latencies stays small.
+    """
+
+    def __init__(self, sub_bucket_bits=6):
+        self.sub_bucket_bits = sub_bucket_bits
+        self._exact_limit = 1 << sub_bucket_bits
+        self._half = 1 << (sub_bucket_bits - 1)
+        self._lock = threading.Lock()
+        self._buckets = {}
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def _bucket(self, value):
+        if value < self._exact_limit:
+            return value
+        shift = value.bit_length() - self.sub_bucket_bits
+        mantissa = value >> shift
+        return self._exact_limit + (shift - 1) * self._half + (mantissa - self._half)
+
+    def _upper_bound(self, bucket):
+        """Highest value that falls into a bucket"""
+        if bucket < self._exact_limit:
+            return bucket
+        shift, offset = divmod(bucket - self._exact_limit, self._half)
+        shift += 1
+        return ((self._half + offset + 1) << shift) - 1
+
+    def record(self, value_us):
+        value = max(0, int(value_us))
+        bucket = self._bucket(value)
+        with self._lock:
+            self._buckets[bucket] = self._buckets.get(bucket, 0) + 1
+            self.count += 1
+            self.total += value
+            if self.min is None or value < self.min:
+                self.min = value
+            if self.max is None or value > self.max:
+                self.max = value
+
+    def percentile(self, percent):
+        """Value (microseconds) at or below which `percent` of the recorded values fall"""
+        with self._lock:
+            if not self.count:
+                return None
+            rank = max(1, -(-self.count * percent // 100))
+            seen = 0
+            for bucket in sorted(self._buckets):
+                seen += self._buckets[bucket]
+                if seen >= rank:
+                    return min(self._upper_bound(bucket), self.max)
+            return self.max
+
+    def snapshot(self):
+        """Count and latency summary in milliseconds"""
+        if not self.count:
+            return {'count': 0}
+        return {
+            'count': self.count,
+            'mean_ms': round(self.total / self.count / 1000, 3),
+            'min_ms': round(self.min / 1000, 3),
+            'p50_ms': round(self.percentile(50) / 1000, 3),
+            'p95_ms': round(self.percentile(95) / 1000, 3),
+            'p99_ms': round(self.percentile(99) / 1000, 3),
+            'max_ms': round(self.max / 1000, 3),
+        }
+
+
+class MetricsRegistry:
+    """Named counters, gauges and latency histograms shared by the tracking subsystems
+
+    Metrics are created on first use, so instrumented code does not need to
+    declare them. Recording a value takes one lock and a dict update.
+    """
+
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._metrics = {}
+
+    def _get(self, name, kind):
+        metric = self._metrics.get(name)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.setdefault(name, kind())
+        if not isinstance(metric, kind):
+            raise TypeError(f"Metric {name} is a {type(metric).__name__}, not a {kind.__name__}")
+        return metric
+
+    def counter(self, name):
+        return self._get(name, Counter)
+
+    def gauge(self, name):
+        return self._get(name, Gauge)
+
+    def histogram(self, name):
+        return self._get(name, Histogram)
+
+    @contextmanager
+    def timer(self, name):
+        """Record the duration of a with-block in the `name` histogram
+
+        Blocks that raise are timed as well and counted in `<name>.errors`.
+        """
+        start = self.clock()
+        try:
+            yield
+        except BaseException:
+            self.counter(f'{name}.errors').inc()
+            raise
+        finally:
+            self.histogram(name).record((self.clock() - start) * 1_000_000)
+
+    def timed(self, name=None):
+        """Decorator recording each call of a function in a histogram"""
+        def decorator(func):
+            metric_name = name or func.__name__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.timer(metric_name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def snapshot(self):
+        """All metrics: counters and gauges as values, histograms as summaries"""
+        with self._lock:
+            items = sorted(self._metrics.items())
+        return {name: metric.snapshot() for name, metric in items}
+
+    def compact(self):
+        """Small summary for session updates: p50/p95/max per histogram plus counters
+
+        Gauges are left out; they describe the moment and are in get_diagnostics().
+        """
+        with self._lock:
+            items = sorted(self._metrics.items())
+        summary = {}
+        for name, metric in items:
+            if isinstance(metric, Histogram):
+                if metric.count:
+                    summary[name] = [metric.count,
+                                     round(metric.percentile(50) / 1000, 1),
+                                     round(metric.percentile(95) / 1000, 1),
+                                     round(metric.max / 1000, 1)]
+            elif isinstance(metric, Counter):
+                if metric.value:
+                    summary[name] = metric.value
+        return summary
+
+    def reset(self):
+        with self._lock:
+            self._metrics.clear()
+
+
+# The process-wide registry used by main.py
+metrics = MetricsRegistry()
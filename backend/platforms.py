@@ -0,0 +1,134 @@
+# platforms.py
+
+import os
+import platform
+
+from app_logging import get_logger
+
+log = get_logger(__name__)
+
+# Release feeds checked for updates; each carries that platform's installers
+RELEASE_REPOS = {
+    'Darwin': "RemoteIntegrity/RI-Tracker-Lite-Mac-Releases",
+    'Windows': "RemoteIntegrity/RI-Tracker-Lite-Releases",
+}
+DEFAULT_RELEASE_REPO = RELEASE_REPOS['Windows']
+
+
+def data_dir(app_name, system=None):
+    """Directory for tracker.db and the logs
+
+    macOS: ~/Library/Application Support, which is kept between app sessions
+    Windows: %LOCALAPPDATA%
+    Other platforms: ~/.config
+    """
+    system = system or platform.system()
+    if system == 'Darwin':
+        return os.path.join(os.path.expanduser("~/Library/Application Support"), app_name)
+    return os.path.join(os.getenv('LOCALAPPDATA') or os.path.expanduser("~/.config"), app_name)
+
+
+def release_repo(system=None):
+    """GitHub repository whose releases are this platform's updates"""
+    return RELEASE_REPOS.get(system or platform.system(), DEFAULT_RELEASE_REPO)
+
+
+def find_chromium_history_files(base_path):
+    """Find Chromium-based browser history files
+
+    Looks for 'History' files in the profile directories (Default, Profile 1, ...)
+    of a Chrome, Brave or Edge user data directory.
+
+    Args:
+        base_path (str): Base path to the browser's user data directory
+
+    Returns:
+        list: A list of paths to history database files
+    """
+    history_files = []
+
+    if not os.path.exists(base_path):
+        return history_files
+
+    try:
+        profiles = ['Default'] + [f'Profile {i}' for i in range(1, 10)]
+
+        for profile in profiles:
+            history_file = os.path.join(base_path, profile, 'History')
+            if os.path.exists(history_file):
+                history_files.append(history_file)
+    except Exception as e:
+        log.error('Error finding Chromium history files: %s', e)
+
+    return history_files
+
+
+def find_firefox_history_files(profiles_path):
+    """Find Firefox history files ('places.sqlite' in the profile directories)
+
+    Args:
+        profiles_path (str): Path to Firefox profiles directory
+
+    Returns:
+        list: A list of paths to history database files
+    """
+    history_files = []
+
+    if not os.path.exists(profiles_path):
+        return history_files
+
+    try:
+        # Firefox profiles are in directories with random names
+        for root, dirs, files in os.walk(profiles_path):
+            for file in files:
+                if file == 'places.sqlite':
+                    history_files.append(os.path.join(root, file))
+    except Exception as e:
+        log.error('Error finding Firefox history files: %s', e)
+
+    return history_files
+
+
+def browser_history_paths(system=None):
+    """Get browser history database paths of the supported browsers on this platform
+
+    Returns:
+        dict: {browser: [history database paths]} for chrome, brave, edge, firefox
+              and safari
+    """
+    system = system or platform.system()
+    home = os.path.expanduser("~")
+
+    if system == "Windows":
+        local_app_data = os.environ.get('LOCALAPPDATA', os.path.join(home, 'AppData', 'Local'))
+        app_data = os.environ.get('APPDATA', os.path.join(home, 'AppData', 'Roaming'))
+        chromium = {
+            'chrome': os.path.join(local_app_data, 'Google', 'Chrome', 'User Data'),
+            'brave': os.path.join(local_app_data, 'BraveSoftware', 'Brave-Browser', 'User Data'),
+            'edge': os.path.join(local_app_data, 'Microsoft', 'Edge', 'User Data'),
+        }
+        firefox = os.path.join(app_data, 'Mozilla', 'Firefox', 'Profiles')
+        safari = None
+    elif system == "Darwin":
+        support = os.path.join(home, 'Library', 'Application Support')
+        chromium = {
+            'chrome': os.path.join(support, 'Google', 'Chrome'),
+            'brave': os.path.join(support, 'BraveSoftware', 'Brave-Browser'),
+            'edge': os.path.join(support, 'Microsoft Edge'),
+        }
+        firefox = os.path.join(support, 'Firefox', 'Profiles')
+        safari = os.path.join(home, 'Library', 'Safari', 'History.db')
+    else:  # Linux
+        chromium = {
+            'chrome': os.path.join(home, '.config', 'google-chrome'),
+            'brave': os.path.join(home, '.config', 'BraveSoftware', 'Brave-Browser'),
+            'edge': os.path.join(home, '.config', 'microsoft-edge'),
+        }
+        firefox = os.path.join(home, '.mozilla', 'firefox')
+        safari = None
+
+    browser_paths = {browser: find_chromium_history_files(path) for browser, path in chromium.items()}
+    browser_paths['firefox'] = find_firefox_history_files(firefox)
+    # Safari only exists on macOS
+    browser_paths['safari'] = [safari] if safari and os.path.exists(safari) else []
+    return browser_paths
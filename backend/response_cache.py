@@ -0,0 +1,227 @@
+# response_cache.py
+
+import json
+import time
+import threading
+
+from app_logging import get_logger
+from lazy_import import lazy_import
+
+# Loaded on first use (see lazy_import)
+requests = lazy_import('requests')
+
+log = get_logger(__name__)
+
+
+class CachedResponse:
+    """The parts of a requests.Response that callers of the cache use"""
+
+    def __init__(self, status_code, text, source, headers=None):
+        self.status_code = status_code
+        self.text = text
+        # 'fresh', 'stale', 'revalidated', 'network' or 'fallback' (stale after an error)
+        self.source = source
+        # Headers of the network response (e.g. Retry-After); empty when served from the cache
+        self.headers = headers or {}
+
+    @property
+    def from_cache(self):
+        return self.source != 'network'
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class ResponseCache:
+    """HTTP GET cache with TTLs, conditional revalidation and stale-while-revalidate
+
+    Each entry is served without a request for `ttl` seconds. After that, and for up
+    to `stale` more seconds, the cached body is still returned immediately while one
+    background request revalidates it. Older entries are revalidated before
+    answering. Revalidation sends If-None-Match / If-Modified-Since, so an unchanged
+    resource costs a 304 without a body (GitHub does not count those against the
+    rate limit). If a request fails, the cached body is served instead of the error.
+
+    Entries live in the http_cache table of tracker.db so a restart does not
+    refetch everything; the table is read once and written through asynchronously.
+    """
+
+    def __init__(self, db, session=None, request_timeout=15, clock=time.time):
+        """
+        Args:
+            db (Database): tracker.db connection manager
+            session: Object with a requests-compatible get(); defaults to requests
+            request_timeout (float): Timeout for network requests in seconds
+            clock: Wall-clock time source in epoch seconds (entry ages)
+        """
+        self.db = db
+        self.session = session or requests
+        self.request_timeout = request_timeout
+        self.clock = clock
+
+        self._lock = threading.Lock()
+        self._entries = None  # {url: entry dict}, loaded lazily
+        self._revalidating = set()
+        self._metrics = {
+            'fresh_hits': 0, 'stale_hits': 0, 'misses': 0, 'revalidations': 0,
+            'not_modified': 0, 'errors': 0, 'fallbacks': 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def get(self, url, headers=None, ttl=60, stale=0, cacheable=None):
+        """GET a URL through the cache
+
+        Args:
+            url (str): Full URL (including query string); used as the cache key
+            headers (dict): Request headers
+            ttl (float): Seconds a response is served without contacting the server
+            stale (float): Further seconds a response is served while revalidating
+                           in the background
+            cacheable: Optional callable(CachedResponse) -> bool deciding whether a
+                       200 response may be stored (e.g. only successful API replies)
+
+        Returns:
+            CachedResponse
+        """
+        now = self.clock()
+        with self._lock:
+            entry = self._load().get(url)
+            age = None if entry is None else now - entry['fetched_at']
+            if age is not None and age < ttl:
+                self._metrics['fresh_hits'] += 1
+                return CachedResponse(entry['status'], entry['body'], 'fresh')
+            if age is not None and age < ttl + stale:
+                self._metrics['stale_hits'] += 1
+                if url not in self._revalidating:
+                    self._revalidating.add(url)
+                    threading.Thread(target=self._revalidate_in_background,
+                                     args=(url, dict(headers or {}), entry, cacheable),
+                                     name="ResponseCacheRevalidate", daemon=True).start()
+                return CachedResponse(entry['status'], entry['body'], 'stale')
+            self._metrics['misses'] += 1
+
+        return self._fetch(url, dict(headers or {}), entry, cacheable)
+
+    def expire(self, url=None, prefix=None):
+        """Force the next get() of matching URLs to revalidate before answering
+
+        The entries are kept so a conditional request can still be answered with a 304.
+        """
+        with self._lock:
+            keys = [key for key in self._load()
+                    if (url is None and prefix is None) or key == url or (prefix and key.startswith(prefix))]
+            for key in keys:
+                self._entries[key]['fetched_at'] = 0
+        if keys:
+            self.db.executemany('UPDATE http_cache SET fetched_at = 0 WHERE url = ?',
+                                [(key,) for key in keys], wait=False)
+
+    def clear(self, prefix=None):
+        """Drop all entries, or those whose URL starts with prefix
+
+        Used on logout, since API responses are user specific.
+        """
+        with self._lock:
+            entries = self._load()
+            for key in [key for key in entries if prefix is None or key.startswith(prefix)]:
+                del entries[key]
+        if prefix is None:
+            self.db.execute_async('DELETE FROM http_cache')
+        else:
+            self.db.execute_async('DELETE FROM http_cache WHERE substr(url, 1, length(?)) = ?', (prefix, prefix))
+
+    def get_metrics(self):
+        """Counters plus the share of requests answered without waiting for the network"""
+        with self._lock:
+            metrics = dict(self._metrics)
+            metrics['entries'] = len(self._entries or {})
+        lookups = metrics['fresh_hits'] + metrics['stale_hits'] + metrics['misses']
+        metrics['hit_ratio'] = round((metrics['fresh_hits'] + metrics['stale_hits']) / lookups, 3) if lookups else 0.0
+        return metrics
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+    def _load(self):
+        # Called with the lock held
+        if self._entries is None:
+            self._entries = {}
+            try:
+                rows = self.db.query('SELECT url, status, body, etag, last_modified, fetched_at FROM http_cache')
+            except Exception as e:
+                log.error('Error loading response cache: %s', e)
+                rows = []
+            for url, status, body, etag, last_modified, fetched_at in rows:
+                self._entries[url] = {'status': status, 'body': body, 'etag': etag,
+                                      'last_modified': last_modified, 'fetched_at': fetched_at}
+        return self._entries
+
+    def _fetch(self, url, headers, entry, cacheable):
+        if entry is not None:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+            with self._lock:
+                self._metrics['revalidations'] += 1
+
+        try:
+            response = self.session.get(url, headers=headers, timeout=self.request_timeout)
+        except requests.exceptions.RequestException:
+            with self._lock:
+                self._metrics['errors'] += 1
+                if entry is not None:
+                    self._metrics['fallbacks'] += 1
+            if entry is not None:
+                return CachedResponse(entry['status'], entry['body'], 'fallback')
+            raise
+
+        now = self.clock()
+        if response.status_code == 304 and entry is not None:
+            with self._lock:
+                self._metrics['not_modified'] += 1
+                entry['fetched_at'] = now
+            self.db.execute_async('UPDATE http_cache SET fetched_at = ? WHERE url = ?', (now, url))
+            return CachedResponse(entry['status'], entry['body'], 'revalidated')
+
+        result = CachedResponse(response.status_code, response.text, 'network', response.headers)
+        if response.status_code == 200 and (cacheable is None or self._is_cacheable(cacheable, result)):
+            stored = {
+                'status': 200,
+                'body': response.text,
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'fetched_at': now,
+            }
+            with self._lock:
+                self._load()[url] = stored
+            self.db.execute_async(
+                'INSERT OR REPLACE INTO http_cache (url, status, body, etag, last_modified, fetched_at) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (url, 200, stored['body'], stored['etag'], stored['last_modified'], now)
+            )
+        elif entry is not None and response.status_code >= 500:
+            # Server trouble: keep showing what we had
+            with self._lock:
+                self._metrics['errors'] += 1
+                self._metrics['fallbacks'] += 1
+            return CachedResponse(entry['status'], entry['body'], 'fallback', response.headers)
+        return result
+
+    @staticmethod
+    def _is_cacheable(cacheable, response):
+        try:
+            return bool(cacheable(response))
+        except ValueError:
+            return False
+
+    def _revalidate_in_background(self, url, headers, entry, cacheable):
+        try:
+            self._fetch(url, headers, entry, cacheable)
+        except Exception as e:
+            log.error('Background revalidation of %s failed: %s', url, e)
+        finally:
+            with self._lock:
+                self._revalidating.discard(url)
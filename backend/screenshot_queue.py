@@ -0,0 +1,452 @@
+# screenshot_queue.py
+
+import os
+import json
+import time
+import uuid
+import heapq
+import random
+import shutil
+import threading
+
+from app_logging import get_logger
+from streaming_upload import CancelToken
+
+log = get_logger(__name__)
+
+
+class ScreenshotUploadQueue:
+    """Background upload queue for screenshots
+
+    Screenshots are moved into a spool directory as soon as they are captured and
+    uploaded by a small pool of worker threads. Failed uploads are retried with
+    exponential backoff, and anything still in the spool when the app exits is
+    picked up again on the next start.
+
+    Each spooled screenshot is stored as two files: the image itself and a JSON
+    sidecar holding its capture timestamp, session id and attempt count.
+
+    Completed uploads are kept per session until `drain_completed` collects them
+    for the next session update.
+
+    Every session with uploads in flight has its own CancelToken, passed to
+    upload_func; `cancel_session` fires it, so finishing one session never aborts
+    the uploads of another. An aborted upload is not counted as an attempt.
+    """
+
+    def __init__(self, upload_func, spool_dir, workers=2, max_pending=20, max_attempts=5,
+                 backoff_base=5, backoff_max=300, max_completed=100, on_change=None):
+        """
+        Args:
+            upload_func: Callable (path, timestamp, cancel_token=...) returning a dict with
+                         'url' and 'timestamp' on success, or None on failure. It must not
+                         delete the file, and should give up once cancel_token is cancelled.
+            spool_dir (str): Directory where not-yet-uploaded screenshots are kept
+            workers (int): Number of upload worker threads
+            max_pending (int): Maximum number of screenshots waiting in the spool;
+                               the oldest one is dropped when the limit is reached
+            max_attempts (int): Number of upload attempts before a screenshot is discarded
+            backoff_base (float): Delay in seconds before the first retry
+            backoff_max (float): Upper bound for the retry delay in seconds
+            max_completed (int): Maximum number of completed uploads kept for collection
+            on_change: Callable without arguments, called after a screenshot was
+                       enqueued or an upload attempt finished
+        """
+        self.upload_func = upload_func
+        self.spool_dir = spool_dir
+        self.workers = workers
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_completed = max_completed
+        self.on_change = on_change
+
+        self._cond = threading.Condition()
+        self._heap = []  # (next_attempt_time, seq, job)
+        self._seq = 0
+        self._in_flight = 0
+        self._in_flight_sessions = {}  # {session_id: number of jobs uploading}
+        self._cancel_tokens = {}  # {session_id: CancelToken of its uploads in flight}
+        self._completed = {}  # {session_id: [{'timestamp', 'imageUrl'}]}
+        self._completed_count = 0
+        # Cancelled sessions with jobs still uploading; forgotten when the last returns
+        self._cancelled_sessions = set()
+        self._threads = []
+        self._stop_event = threading.Event()
+
+        self._metrics = {
+            'enqueued': 0,
+            'uploaded': 0,
+            'failed_attempts': 0,
+            'retries': 0,
+            'dropped': 0,
+            'gave_up': 0,
+            'cancelled': 0,
+            'recovered': 0,
+            'last_upload_seconds': 0.0,
+            'total_upload_seconds': 0.0,
+        }
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    def start(self):
+        """Start the worker threads and re-queue screenshots left in the spool"""
+        with self._cond:
+            if self._threads:
+                return
+            self._stop_event.clear()
+            self._recover_spool()
+            for i in range(self.workers):
+                t = threading.Thread(target=self._worker, name=f"ScreenshotUpload-{i}", daemon=True)
+                self._threads.append(t)
+                t.start()
+
+    def stop(self, timeout=2.0):
+        """Stop the worker threads. Pending screenshots stay in the spool."""
+        with self._cond:
+            self._stop_event.set()
+            self._cond.notify_all()
+            threads = self._threads
+            self._threads = []
+        for t in threads:
+            t.join(timeout=timeout)
+
+    def flush(self, timeout=5.0):
+        """Wait until no upload is due or in flight, or until timeout expires
+
+        Jobs waiting for a backoff retry do not count as due, so a flush never
+        waits for the backoff delay of a failing upload.
+
+        Returns:
+            bool: True if the queue was idle before the timeout
+        """
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while self._in_flight or (self._heap and self._heap[0][0] <= time.monotonic()):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            return True
+
+    # ------------------------------------------------------------------
+    # Producer / consumer API
+    # ------------------------------------------------------------------
+    def enqueue(self, screenshot_path, timestamp, session_id=None):
+        """Move a captured screenshot into the spool and queue it for upload
+
+        Args:
+            screenshot_path (str): Path to the captured image; the file is moved
+            timestamp (str): ISO capture timestamp sent with the upload
+            session_id (str): Session the screenshot belongs to
+
+        Returns:
+            bool: True if the screenshot was queued
+        """
+        if not screenshot_path or not os.path.exists(screenshot_path):
+            log.warning('Screenshot path is invalid or file does not exist')
+            return False
+
+        job_id = uuid.uuid4().hex
+        _, ext = os.path.splitext(screenshot_path)
+        job = {
+            'id': job_id,
+            'path': os.path.join(self.spool_dir, job_id + (ext or '.png')),
+            'timestamp': timestamp,
+            'session_id': session_id,
+            'attempts': 0,
+        }
+
+        try:
+            os.makedirs(self.spool_dir, exist_ok=True)
+            shutil.move(screenshot_path, job['path'])
+            self._write_sidecar(job)
+        except Exception as e:
+            log.error('Error spooling screenshot: %s', e)
+            return False
+
+        with self._cond:
+            if session_id in self._cancelled_sessions:
+                self._discard(job)
+                self._metrics['cancelled'] += 1
+                return False
+            self._make_room()
+            self._push(job, time.monotonic())
+            self._metrics['enqueued'] += 1
+        self._notify_change()
+        return True
+
+    def drain_completed(self, session_id=None):
+        """Return and forget the uploaded screenshots of a session
+
+        Returns:
+            list: Screenshot entries in the session update format ({'timestamp', 'imageUrl'})
+        """
+        with self._cond:
+            entries = self._completed.pop(session_id, [])
+            self._completed_count -= len(entries)
+        entries.sort(key=lambda s: s.get('timestamp') or '')
+        return entries
+
+    def peek_completed(self, session_id=None):
+        """The uploaded screenshots of a session, without forgetting them
+
+        Returns:
+            list: Screenshot entries in the order drain_completed would return them
+        """
+        with self._cond:
+            entries = list(self._completed.get(session_id, []))
+        entries.sort(key=lambda s: s.get('timestamp') or '')
+        return entries
+
+    def cancel_session(self, session_id):
+        """Drop pending and in-flight screenshots of a finished session
+
+        Jobs currently uploading are discarded when their worker returns instead
+        of being retried or stored as completed.
+        """
+        with self._cond:
+            if self._in_flight_sessions.get(session_id):
+                self._cancelled_sessions.add(session_id)
+                # Abort the uploads of this session only
+                self._cancel_tokens[session_id].cancel()
+            kept = []
+            for item in self._heap:
+                if item[2]['session_id'] == session_id:
+                    self._discard(item[2])
+                    self._metrics['cancelled'] += 1
+                else:
+                    kept.append(item)
+            heapq.heapify(kept)
+            self._heap = kept
+            entries = self._completed.pop(session_id, [])
+            self._completed_count -= len(entries)
+            self._cond.notify_all()
+
+    def cancel_sessions_except(self, keep):
+        """Cancel every session with spooled or completed screenshots that is not in keep
+
+        Screenshots recovered from the spool belong to the sessions of earlier runs;
+        once nobody will collect them (the session was finished), they would be
+        uploaded for nothing and kept in memory until the app exits.
+
+        Args:
+            keep: Session ids whose screenshots are still going to be collected
+
+        Returns:
+            list: Cancelled session ids
+        """
+        with self._cond:
+            sessions = {item[2]['session_id'] for item in self._heap}
+            sessions.update(self._completed, self._in_flight_sessions)
+        cancelled = sorted((session_id for session_id in sessions if session_id not in keep), key=str)
+        for session_id in cancelled:
+            self.cancel_session(session_id)
+        return cancelled
+
+    def get_metrics(self):
+        """Return a snapshot of the queue counters"""
+        with self._cond:
+            metrics = dict(self._metrics)
+            metrics['pending'] = len(self._heap)
+            metrics['in_flight'] = self._in_flight
+            metrics['completed_waiting'] = self._completed_count
+            metrics['cancelled_sessions_in_flight'] = len(self._cancelled_sessions)
+        uploaded = metrics['uploaded']
+        metrics['avg_upload_seconds'] = (metrics.pop('total_upload_seconds') / uploaded) if uploaded else 0.0
+        return metrics
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+    def _push(self, job, due):
+        self._seq += 1
+        heapq.heappush(self._heap, (due, self._seq, job))
+        self._cond.notify()
+
+    def _make_room(self):
+        """Drop the oldest pending screenshot when the spool is full (lock held)"""
+        while len(self._heap) >= self.max_pending:
+            oldest = min(self._heap, key=lambda item: item[2].get('timestamp') or '')
+            self._heap.remove(oldest)
+            heapq.heapify(self._heap)
+            self._discard(oldest[2])
+            self._metrics['dropped'] += 1
+            log.warning('Screenshot spool full, dropped screenshot taken at %s', oldest[2].get('timestamp'))
+
+    def _sidecar_path(self, job):
+        return os.path.join(self.spool_dir, job['id'] + '.json')
+
+    def _write_sidecar(self, job):
+        with open(self._sidecar_path(job), 'w', encoding='utf-8') as f:
+            json.dump({
+                'path': os.path.basename(job['path']),
+                'timestamp': job['timestamp'],
+                'session_id': job['session_id'],
+                'attempts': job['attempts'],
+            }, f)
+
+    def _discard(self, job):
+        for path in (job['path'], self._sidecar_path(job)):
+            try:
+                if os.path.exists(path):
+                    os.remove(path)
+            except Exception as e:
+                log.warning('Failed to remove spooled file %s: %s', path, e)
+
+    def _recover_spool(self):
+        """Queue screenshots left over from a previous run (lock held)"""
+        if not os.path.isdir(self.spool_dir):
+            return
+        try:
+            names = sorted(n for n in os.listdir(self.spool_dir) if n.endswith('.json'))
+        except Exception as e:
+            log.error('Error reading screenshot spool: %s', e)
+            return
+
+        now = time.monotonic()
+        for name in names:
+            sidecar = os.path.join(self.spool_dir, name)
+            try:
+                with open(sidecar, 'r', encoding='utf-8') as f:
+                    meta = json.load(f)
+                job = {
+                    'id': name[:-len('.json')],
+                    'path': os.path.join(self.spool_dir, meta['path']),
+                    'timestamp': meta.get('timestamp'),
+                    'session_id': meta.get('session_id'),
+                    'attempts': int(meta.get('attempts', 0)),
+                }
+            except Exception as e:
+                log.warning('Skipping unreadable spool entry %s: %s', name, e)
+                try:
+                    os.remove(sidecar)
+                except Exception:
+                    pass
+                continue
+
+            if not os.path.exists(job['path']):
+                self._discard(job)
+                continue
+
+            self._make_room()
+            self._push(job, now)
+            self._metrics['recovered'] += 1
+
+        if self._metrics['recovered']:
+            log.info('Recovered %s screenshot(s) from spool', self._metrics['recovered'])
+
+    def _backoff(self, attempts):
+        delay = min(self.backoff_max, self.backoff_base * (2 ** (attempts - 1)))
+        # Spread retries so that a server outage does not end in a burst of uploads
+        return delay * random.uniform(0.5, 1.0)
+
+    def _next_job(self):
+        """Block until a job is due or the queue is stopped"""
+        with self._cond:
+            while not self._stop_event.is_set():
+                if self._heap:
+                    due = self._heap[0][0]
+                    wait = due - time.monotonic()
+                    if wait <= 0:
+                        _, _, job = heapq.heappop(self._heap)
+                        self._in_flight += 1
+                        session_id = job['session_id']
+                        self._in_flight_sessions[session_id] = self._in_flight_sessions.get(session_id, 0) + 1
+                        token = self._cancel_tokens.setdefault(session_id, CancelToken())
+                        return job, token
+                    self._cond.wait(wait)
+                else:
+                    self._cond.wait()
+            return None, None
+
+    def _worker(self):
+        while True:
+            job, token = self._next_job()
+            if job is None:
+                return
+
+            started = time.monotonic()
+            try:
+                result = self.upload_func(job['path'], job['timestamp'], cancel_token=token)
+            except Exception as e:
+                log.error('Error uploading screenshot: %s', e)
+                result = None
+            elapsed = time.monotonic() - started
+
+            with self._cond:
+                self._in_flight -= 1
+                self._finish_in_flight(job['session_id'])
+                if job['session_id'] in self._cancelled_sessions:
+                    # Cancelled, not failed: not counted as an attempt
+                    self._metrics['cancelled'] += 1
+                    self._discard(job)
+                    if job['session_id'] not in self._in_flight_sessions:
+                        self._cancelled_sessions.discard(job['session_id'])
+                elif result and result.get('url'):
+                    self._metrics['uploaded'] += 1
+                    self._metrics['last_upload_seconds'] = elapsed
+                    self._metrics['total_upload_seconds'] += elapsed
+                    self._store_completed(job, result)
+                    self._discard(job)
+                else:
+                    job['attempts'] += 1
+                    self._metrics['failed_attempts'] += 1
+                    if self._stop_event.is_set():
+                        # Keep the spooled file; it is retried on the next start
+                        self._persist_attempts(job)
+                    elif job['attempts'] >= self.max_attempts:
+                        self._metrics['gave_up'] += 1
+                        log.warning('Giving up on screenshot taken at %s after %s attempts', job['timestamp'], job['attempts'])
+                        self._discard(job)
+                    else:
+                        self._metrics['retries'] += 1
+                        self._persist_attempts(job)
+                        delay = self._backoff(job['attempts'])
+                        log.warning('Screenshot upload failed, retrying in %.0f seconds', delay)
+                        self._push(job, time.monotonic() + delay)
+                self._cond.notify_all()
+            self._notify_change()
+
+    def _finish_in_flight(self, session_id):
+        """Count a returned upload of a session (lock held)"""
+        remaining = self._in_flight_sessions.get(session_id, 1) - 1
+        if remaining:
+            self._in_flight_sessions[session_id] = remaining
+        else:
+            self._in_flight_sessions.pop(session_id, None)
+            # The next upload of the session gets a new token
+            self._cancel_tokens.pop(session_id, None)
+
+    def _notify_change(self):
+        """Call on_change (lock not held)"""
+        if self.on_change is None:
+            return
+        try:
+            self.on_change()
+        except Exception as e:
+            log.error('Error in upload queue change callback: %s', e)
+
+    def _persist_attempts(self, job):
+        try:
+            self._write_sidecar(job)
+        except Exception as e:
+            log.warning('Failed to update spool entry: %s', e)
+
+    def _store_completed(self, job, result):
+        """Keep an uploaded screenshot until the session update collects it (lock held)"""
+        entries = self._completed.setdefault(job['session_id'], [])
+        entries.append({
+            'timestamp': result.get('timestamp') or job['timestamp'],
+            'imageUrl': result['url'],
+        })
+        self._completed_count += 1
+        # Uploads of sessions that are never collected must not pile up
+        while self._completed_count > self.max_completed:
+            oldest_session = next(iter(self._completed))
+            self._completed[oldest_session].pop(0)
+            if not self._completed[oldest_session]:
+                del self._completed[oldest_session]
+            self._completed_count -= 1
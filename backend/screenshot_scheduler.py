@@ -0,0 +1,231 @@
+# screenshot_scheduler.py
+
+import time
+import random
+import threading
+
+from app_logging import get_logger
+
+log = get_logger(__name__)
+
+
+def plan_capture_offsets(count, window_start, window_end, rng=random):
+    """Pick `count` random offsets with one offset per equal-width stratum
+
+    Stratified sampling keeps the capture times unpredictable while making sure
+    they are spread over the whole window instead of clustering.
+
+    Args:
+        count (int): Number of captures
+        window_start (float): Earliest offset in seconds from the interval start
+        window_end (float): Latest offset in seconds from the interval start
+        rng: Random number generator with a `uniform` method
+
+    Returns:
+        list: Sorted offsets in seconds
+    """
+    if count <= 0:
+        return []
+    window_end = max(window_start, window_end)
+    width = (window_end - window_start) / count
+    return [window_start + i * width + rng.uniform(0, width) for i in range(count)]
+
+
+class ScreenshotScheduler:
+    """Runs a fixed quota of randomized screenshot captures per session interval
+
+    At the start of every session interval the capture times are planned up front
+    (see `plan_capture_offsets`). The captures are placed in the window
+    [min_offset, interval - headroom] so that uploads have `headroom` seconds to
+    finish before the periodic session update is built. A failed capture is
+    retried every `retry_delay` seconds until the quota is met or the retry
+    deadline (interval - retry_margin) has passed.
+
+    min_offset, headroom and per_interval are given for the base `interval`. When
+    the session update delay changes (server hints, backoff, low-power mode), set
+    `interval` to the new delay: the window scales with it, and so does the quota,
+    so the screenshot rate stays the same. An interval of at least
+    (1 - jitter_band) times the base (the sync jitter, or a longer delay) gets its
+    own rounded quota of at least one. Only shorter intervals carry fractional
+    quotas over to the next one (1 per 600 s at a 300 s interval takes one every
+    other interval).
+
+    All captures run on one scheduler thread, never on the session update path.
+    A discrete-event simulation plans with start_interval(background=False) and
+    takes the due captures itself with run_due().
+    """
+
+    def __init__(self, capture_func, per_interval=1, interval=600, min_offset=60, headroom=120,
+                 retry_delay=30, retry_margin=30, jitter_band=0.25, rng=None, clock=time.monotonic):
+        """
+        Args:
+            capture_func: Callable taking no arguments that captures and queues a
+                          screenshot and returns True on success
+            per_interval (int): Number of screenshots per base interval
+            interval (float): Base session update interval in seconds
+            min_offset (float): No capture earlier than this many seconds into a base interval
+            headroom (float): Seconds kept free at the end of a base interval for uploads
+            retry_delay (float): Seconds between attempts after a failed capture
+            retry_margin (float): No retries later than this many seconds before the interval ends
+            jitter_band (float): Intervals shorter than the base by at most this fraction
+                                 still take at least one screenshot
+            rng: Random number generator (mainly for tests)
+            clock: Monotonic time source of the capture times; after moving a
+                   simulated clock, call wake() so due captures are taken
+        """
+        self.capture_func = capture_func
+        self.per_interval = per_interval
+        self.base_interval = interval
+        self.interval = interval
+        self.min_offset = min_offset
+        self.headroom = headroom
+        self.retry_delay = retry_delay
+        self.retry_margin = retry_margin
+        self.jitter_band = jitter_band
+        self.rng = rng or random.Random()
+        self.clock = clock
+
+        self._cond = threading.Condition()
+        self._thread = None
+        self._running = False
+        self._generation = 0
+        self._interval_start = None
+        self._due = []  # monotonic times of the captures still to take
+        self._taken = 0
+        self._failed = 0
+        self._quota = per_interval
+        self._quota_credit = 0.5  # rounds fractional quotas of short intervals to the nearest interval
+
+    def _scaled_plan(self):
+        """(quota, window start, window end) for the current interval length"""
+        scale = self.interval / self.base_interval if self.base_interval else 1.0
+        if scale >= 1 - self.jitter_band:
+            # A jittered or stretched interval: its own quota, never none
+            quota = max(1, round(self.per_interval * scale)) if self.per_interval > 0 else 0
+            self._quota_credit = 0.5
+        else:
+            self._quota_credit += self.per_interval * scale
+            quota = int(self._quota_credit)
+            self._quota_credit -= quota
+        return quota, self.min_offset * scale, self.interval - self.headroom * scale
+
+    def start_interval(self, interval_start=None, background=True):
+        """Plan the captures of a new interval, replacing any remaining plan
+
+        Args:
+            interval_start (float): clock() value of the interval start; defaults to now
+            background (bool): Take the captures on the scheduler thread; otherwise
+                               the caller takes them with run_due()
+
+        Returns:
+            list: Planned offsets in seconds from the interval start
+        """
+        start = self.clock() if interval_start is None else interval_start
+        with self._cond:
+            quota, window_start, window_end = self._scaled_plan()
+        offsets = plan_capture_offsets(quota, window_start, window_end, self.rng)
+        with self._cond:
+            self._quota = quota
+            self._interval_start = start
+            self._due = [start + offset for offset in offsets]
+            self._taken = 0
+            self._failed = 0
+            self._running = True
+            self._generation += 1
+            if background and (self._thread is None or not self._thread.is_alive()):
+                self._thread = threading.Thread(target=self._run, name="ScreenshotScheduler", daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+        log.info('Screenshots scheduled at %s minutes into the interval', ', '.join(f"{o / 60:.1f}" for o in offsets))
+        return offsets
+
+    def stop(self):
+        """Cancel all remaining captures"""
+        with self._cond:
+            self._running = False
+            self._due = []
+            self._quota_credit = 0.5
+            self._generation += 1
+            self._cond.notify_all()
+
+    def run_due(self):
+        """Take the captures due by clock() on the calling thread
+
+        Returns:
+            float: clock() time of the next planned capture (or retry), or None
+        """
+        while True:
+            with self._cond:
+                if not self._running or not self._due:
+                    return None
+                if self._due[0] > self.clock():
+                    return self._due[0]
+                self._due.pop(0)
+                generation = self._generation
+            self._capture(generation)
+
+    def wake(self):
+        """Re-check the due captures (the clock moved without real time passing)"""
+        with self._cond:
+            self._cond.notify_all()
+
+    def quota_met(self):
+        """Return True when all captures of the current interval were taken"""
+        with self._cond:
+            return self._taken >= self._quota
+
+    def get_status(self):
+        """Return the progress of the current interval"""
+        with self._cond:
+            now = self.clock()
+            return {
+                'quota': self._quota,
+                'taken': self._taken,
+                'failed': self._failed,
+                'remaining_in': [round(max(0.0, due - now), 1) for due in self._due],
+            }
+
+    def _retry_deadline(self):
+        return self._interval_start + self.interval - self.retry_margin
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    if not self._running:
+                        self._thread = None
+                        return
+                    if self._due:
+                        wait = self._due[0] - self.clock()
+                        if wait <= 0:
+                            break
+                        self._cond.wait(wait)
+                    else:
+                        self._cond.wait()
+                self._due.pop(0)
+                generation = self._generation
+
+            self._capture(generation)
+
+    def _capture(self, generation):
+        """Take one planned capture; a failure is retried while the deadline allows"""
+        try:
+            success = bool(self.capture_func())
+        except Exception as e:
+            log.error('Error in scheduled screenshot: %s', e)
+            success = False
+
+        with self._cond:
+            # A new interval was planned (or the scheduler stopped) while capturing
+            if generation != self._generation:
+                return
+            if success:
+                self._taken += 1
+                return
+            self._failed += 1
+            retry_at = self.clock() + self.retry_delay
+            if retry_at <= self._retry_deadline():
+                self._due.append(retry_at)
+                self._due.sort()
+            else:
+                log.warning('Screenshot quota for this interval could not be met')
@@ -0,0 +1,286 @@
+# screenshots.py
+
+import os
+from datetime import timezone
+
+from app_logging import get_logger
+from capture_service import ScreenCaptureService
+from config import URLS
+from lazy_import import lazy_import
+from metrics import metrics
+from screenshot_queue import ScreenshotUploadQueue
+from screenshot_scheduler import ScreenshotScheduler
+from streaming_upload import stream_upload, UploadCancelled
+
+# Loaded on first use (see lazy_import)
+requests = lazy_import('requests')
+
+log = get_logger(__name__)
+
+
+class ScreenshotEngine:
+    """Captures, uploads and collects the screenshots of the running session
+
+    The scheduler (screenshot_scheduler.py) takes randomized captures during each
+    session interval, the capture service (capture_service.py) grabs the screen,
+    and the upload queue (screenshot_queue.py) spools and uploads them in the
+    background. Uploaded screenshots wait in the queue until the next session
+    update collects them into session_screenshots; collecting never waits for
+    the network.
+
+    Api owns the session: it passes callables for the running session id and
+    whether the timer runs, and calls begin_session(), collect() and
+    end_session() at the session's boundaries.
+    """
+
+    def __init__(self, clock, spool_dir, session_id, running, interval=600, min_interval=60,
+                 max_interval=480, per_interval=1, on_upload_change=None):
+        """
+        Args:
+            clock: SystemClock or SimulatedClock
+            spool_dir (str): Directory of screenshots waiting for upload
+            session_id: Callable returning the running session id (or None)
+            running: Callable returning True while the timer runs
+            interval (float): Seconds between session updates
+            min_interval (float): Earliest capture, seconds into an interval
+            max_interval (float): Latest capture, seconds into an interval
+            per_interval (int): Screenshots per interval
+            on_upload_change: Called without arguments when the upload queue changes
+        """
+        self.clock = clock
+        self.session_id = session_id
+        self.running = running
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.per_interval = per_interval
+
+        self.last_timestamp = None
+        self.session_screenshots = []  # Uploaded screenshots of the current interval
+
+        # Randomized, per-interval screenshot plan (captures run off the session update path)
+        self.scheduler = ScreenshotScheduler(
+            capture_func=self._take_scheduled,
+            per_interval=per_interval,
+            interval=interval,
+            min_offset=min_interval,
+            headroom=interval - max_interval,
+            clock=clock.monotonic
+        )
+
+        # Long-lived screen grabber, opened on first capture
+        self.capture_service = ScreenCaptureService()
+
+        self.upload_timeout = (10, 60)  # (connect, read) seconds
+        self.upload_progress = {"sent": 0, "total": 0}
+
+        # Background upload queue; screenshots waiting for upload are spooled in spool_dir
+        self.upload_queue = ScreenshotUploadQueue(
+            upload_func=self._upload_spooled,
+            spool_dir=spool_dir,
+            on_change=on_upload_change
+        )
+
+    @metrics.timed('screenshot.capture')
+    def take(self):
+        """Take a screenshot of all monitors
+
+        The grabber is kept open by self.capture_service, so only the first capture
+        pays for opening the display connection and enumerating monitors.
+
+        Returns:
+            str: Path to the temporary file containing the screenshot, or None if the capture failed
+        """
+        try:
+            temp_filename = self.capture_service.capture()
+            if not temp_filename:
+                metrics.counter('screenshot.capture.failed').inc()
+                return None
+
+            # Record the timestamp when the screenshot was taken (in UTC)
+            self.last_timestamp = self.clock.now(timezone.utc).isoformat(timespec='milliseconds').replace('+00:00', 'Z')
+            return temp_filename
+        except Exception as e:
+            log.error('Error taking screenshot: %s', e)
+            metrics.counter('screenshot.capture.failed').inc()
+            return None
+
+    @metrics.timed('screenshot.upload')
+    def upload(self, screenshot_path, timestamp=None, cleanup=True, cancel_token=None):
+        """Upload a screenshot to the file server and return its URL
+
+        The multipart body is streamed from the file in chunks with connect/read
+        timeouts, and the upload is aborted when cancel_token fires.
+
+        Args:
+            screenshot_path (str): Path to the screenshot file to upload
+            timestamp (str): Capture timestamp; defaults to the last capture's
+            cleanup (bool): Delete the file after the upload attempt
+            cancel_token (CancelToken): Aborts the upload (the upload queue's token
+                                        of the screenshot's session)
+
+        Returns:
+            dict: {url, timestamp} of the uploaded screenshot, or None if the upload failed
+        """
+        if not screenshot_path or not os.path.exists(screenshot_path):
+            log.warning('Screenshot path is invalid or file does not exist')
+            return None
+
+        def report_progress(sent, total):
+            self.upload_progress = {"sent": sent, "total": total}
+
+        try:
+            # Content-Type with the multipart boundary is set by stream_upload
+            headers = {
+                'x-api-key': URLS["FILE_UPLOAD_API_KEY"]
+            }
+
+            connect_timeout, read_timeout = self.upload_timeout
+            response = stream_upload(
+                URLS["FILE_UPLOAD"],
+                screenshot_path,
+                headers=headers,
+                content_type='image/png',
+                cancel_token=cancel_token,
+                progress=report_progress,
+                connect_timeout=connect_timeout,
+                read_timeout=read_timeout
+            )
+
+            log.debug('Image Upload response: %s', response.json())
+
+            # Clean up the temporary file regardless of upload success
+            if cleanup:
+                try:
+                    os.unlink(screenshot_path)
+                except Exception as cleanup_error:
+                    log.warning('Failed to clean up temporary file: %s', cleanup_error)
+
+            if response.status_code == 201:
+                data = response.json()
+                if data.get('success'):
+                    metrics.counter('screenshot.upload.ok').inc()
+                    return {
+                        'url': data['data']['url'],
+                        'timestamp': timestamp or self.last_timestamp
+                    }
+                else:
+                    log.warning('API returned success=false: %s', data.get('message', 'No error message'))
+            else:
+                log.error('API request failed with status code %s', response.status_code)
+
+            metrics.counter('screenshot.upload.failed').inc()
+            return None
+        except UploadCancelled:
+            log.info('Screenshot upload cancelled')
+            metrics.counter('screenshot.upload.cancelled').inc()
+            return None
+        except requests.exceptions.Timeout:
+            log.warning('Screenshot upload timed out')
+            metrics.counter('screenshot.upload.timeouts').inc()
+            return None
+        except Exception as e:
+            log.error('Error uploading screenshot: %s', e)
+            metrics.counter('screenshot.upload.failed').inc()
+            return None
+
+    def _upload_spooled(self, screenshot_path, timestamp, cancel_token=None):
+        """Upload callback for the background queue; the queue owns the spooled file"""
+        return self.upload(screenshot_path, timestamp=timestamp, cleanup=False, cancel_token=cancel_token)
+
+    def capture_and_enqueue(self):
+        """Take a screenshot and hand it to the background upload queue
+
+        Returns:
+            bool: True if the screenshot was captured and queued
+        """
+        screenshot_path = self.take()
+        if not screenshot_path:
+            log.error('Failed to take screenshot')
+            return False
+
+        # Make sure the workers are running (e.g. for a fallback before the first interval)
+        self.upload_queue.start()
+        queued = self.upload_queue.enqueue(screenshot_path, self.last_timestamp, self.session_id())
+        if queued:
+            log.debug('Screenshot captured and queued for upload')
+        return queued
+
+    def _take_scheduled(self):
+        """Capture callback for the screenshot scheduler"""
+        if not self.running():
+            log.info('Timer stopped before screenshot could be taken')
+            return False
+
+        # Capture only; the upload queue workers do the network part
+        return self.capture_and_enqueue()
+
+    def begin_session(self):
+        """Start the upload workers and clear the state of the previous session
+
+        Starting the queue also retries anything left in the spool.
+        """
+        self.upload_queue.start()
+        self.session_screenshots = []
+        self.last_timestamp = None
+        self.scheduler.stop()
+
+    def plan_interval(self):
+        """Plan the captures of the next session interval (of scheduler.interval seconds)
+
+        Calling this again replaces the remaining plan of the previous interval.
+        """
+        self.scheduler.start_interval()
+
+    def add(self, screenshots):
+        """Append uploaded screenshots to the current interval, skipping ones it has"""
+        known = {s.get('imageUrl') for s in self.session_screenshots}
+        for screenshot in screenshots:
+            if screenshot.get('imageUrl') not in known:
+                known.add(screenshot.get('imageUrl'))
+                self.session_screenshots.append(screenshot)
+
+    def collect(self, session_id, final=False):
+        """Screenshots to send with a session update, without waiting for uploads
+
+        Only uploads that have completed are sent; the scheduler leaves upload
+        headroom at the end of each interval, so normally that is all of them. An
+        upload still in flight is sent with the next update.
+
+        If the scheduler could not meet this interval's quota and nothing was
+        uploaded, a fallback screenshot is captured now and queued. It belongs to
+        the next interval: it is uploaded in the background and sent with the
+        next update, next to that interval's own screenshots.
+
+        Args:
+            session_id: Session the update is for
+            final (bool): The session's last update (no fallback capture)
+
+        Returns:
+            list: Copy of the interval's uploaded screenshots
+        """
+        self.add(self.upload_queue.drain_completed(session_id))
+        screenshots = self.session_screenshots.copy()
+        if not screenshots and not final and not self.scheduler.quota_met():
+            self.capture_and_enqueue()
+        return screenshots
+
+    def pending(self, session_id):
+        """Uploaded screenshots not sent yet, including ones waiting in the queue"""
+        return self.session_screenshots + self.upload_queue.peek_completed(session_id)
+
+    def end_session(self, session_id):
+        """Abort the uploads that did not make it into the session's final update
+
+        Only this session's uploads are cancelled; spooled screenshots of other
+        sessions keep uploading.
+        """
+        self.upload_queue.cancel_session(session_id)
+
+    def get_status(self):
+        """Counters of the upload queue, the screen grabber and the capture plan"""
+        return {
+            "queue": self.upload_queue.get_metrics(),
+            "capture": self.capture_service.get_metrics(),
+            "progress": dict(self.upload_progress),
+            "schedule": self.scheduler.get_status()
+        }
@@ -0,0 +1,177 @@
+# session_checkpoint.py
+
+import json
+import threading
+
+
+# Per-item tables that are diffed between checkpoints: kind -> state key
+ITEM_KINDS = {
+    'app': 'applications',
+    'link': 'links',
+    'screenshot': 'screenshots',
+}
+
+_SCALAR_FIELDS = ('checkpoint_at', 'active_seconds', 'idle_seconds', 'keyboard_events',
+                  'mouse_events', 'keyboard_rate', 'mouse_rate', 'sleep_seconds')
+
+
+def _items(kind, value):
+    """Flatten one part of the session state into {item_key: json payload}"""
+    if kind == 'screenshot':
+        # Screenshots of the current interval only ever get appended
+        return {str(i): json.dumps(entry, sort_keys=True) for i, entry in enumerate(value or [])}
+    return {str(key): json.dumps(entry, sort_keys=True) for key, entry in list((value or {}).items())}
+
+
+class SessionCheckpointer:
+    """Incremental checkpoints of the running session in tracker.db
+
+    The running session only lives in memory on the Api object, so a crash or a
+    force-quit used to lose everything since the last session update and left the
+    server session open. A checkpoint stores the session scalars in one row of
+    session_checkpoints and the per-interval usage (applications, links, uploaded
+    screenshots) as one row per item in session_checkpoint_items.
+
+    Checkpoints are incremental: the checkpointer remembers what it last wrote and
+    only upserts items whose value changed and deletes items that disappeared (e.g.
+    after a successful session update cleared the interval). A typical checkpoint is
+    one row update plus a handful of item upserts, queued on the database writer
+    thread so the caller never waits for the disk.
+    """
+
+    def __init__(self, db):
+        """
+        Args:
+            db (Database): tracker.db connection manager
+        """
+        self.db = db
+        self._lock = threading.Lock()
+        self._session_id = None
+        self._written = {}  # {(kind, item_key): payload}
+        self._metrics = {'checkpoints': 0, 'items_written': 0, 'items_deleted': 0}
+
+    def begin(self, session_id, employee_id, project_name, user_note, start_time):
+        """Record a newly started session (waits for the write)"""
+        with self._lock:
+            self._session_id = session_id
+            self._written = {}
+
+        def write(conn):
+            conn.execute('DELETE FROM session_checkpoint_items WHERE session_id = ?', (session_id,))
+            conn.execute(
+                'INSERT OR REPLACE INTO session_checkpoints (session_id, employee_id, project_name, user_note, '
+                'start_time, checkpoint_at, active_seconds, idle_seconds, keyboard_events, mouse_events, '
+                'keyboard_rate, mouse_rate, stopped) VALUES (?, ?, ?, ?, ?, ?, 0, 0, 0, 0, 0, 0, 0)',
+                (session_id, employee_id, project_name, user_note, start_time, start_time)
+            )
+        self.db.transaction(write)
+
+    def adopt(self, checkpoint):
+        """Continue checkpointing a session loaded with load() (after resuming it)"""
+        with self._lock:
+            self._session_id = checkpoint['session_id']
+            self._written = {}
+            for kind, key in ITEM_KINDS.items():
+                for item_key, payload in _items(kind, checkpoint[key]).items():
+                    self._written[(kind, item_key)] = payload
+
+    def checkpoint(self, state, stopped=False):
+        """Write the changes since the previous checkpoint
+
+        Args:
+            state (dict): checkpoint_at, active_seconds, idle_seconds, keyboard_events,
+                          mouse_events, keyboard_rate, mouse_rate, sleep_seconds, applications (dict),
+                          links (dict) and screenshots (list)
+            stopped (bool): The session was stopped locally but its final server
+                            update failed; recovery must only finalize it
+
+        Returns:
+            int: Number of item rows written or deleted
+        """
+        # Serialize on the caller's thread so later changes to the state don't leak in
+        current = {}
+        for kind, key in ITEM_KINDS.items():
+            for item_key, payload in _items(kind, state.get(key)).items():
+                current[(kind, item_key)] = payload
+
+        with self._lock:
+            session_id = self._session_id
+            if session_id is None:
+                return 0
+            upserts = [(session_id, kind, item_key, payload) for (kind, item_key), payload in current.items()
+                       if self._written.get((kind, item_key)) != payload]
+            deletes = [(session_id, kind, item_key) for (kind, item_key) in self._written
+                       if (kind, item_key) not in current]
+            self._written = current
+            self._metrics['checkpoints'] += 1
+            self._metrics['items_written'] += len(upserts)
+            self._metrics['items_deleted'] += len(deletes)
+
+        scalars = tuple(state.get(field, 0) for field in _SCALAR_FIELDS)
+
+        def write(conn):
+            conn.execute(
+                'UPDATE session_checkpoints SET checkpoint_at = ?, active_seconds = ?, idle_seconds = ?, '
+                'keyboard_events = ?, mouse_events = ?, keyboard_rate = ?, mouse_rate = ?, sleep_seconds = ?, '
+                'stopped = ? '
+                'WHERE session_id = ?',
+                scalars + (1 if stopped else 0, session_id)
+            )
+            if upserts:
+                conn.executemany('INSERT OR REPLACE INTO session_checkpoint_items '
+                                 '(session_id, kind, item_key, payload) VALUES (?, ?, ?, ?)', upserts)
+            if deletes:
+                conn.executemany('DELETE FROM session_checkpoint_items '
+                                 'WHERE session_id = ? AND kind = ? AND item_key = ?', deletes)
+        self.db.transaction(write, wait=False)
+        return len(upserts) + len(deletes)
+
+    def finish(self, session_id):
+        """Forget a session that was closed on the server"""
+        with self._lock:
+            if self._session_id == session_id:
+                self._session_id = None
+                self._written = {}
+
+        def write(conn):
+            conn.execute('DELETE FROM session_checkpoint_items WHERE session_id = ?', (session_id,))
+            conn.execute('DELETE FROM session_checkpoints WHERE session_id = ?', (session_id,))
+        self.db.transaction(write, wait=False)
+
+    def load(self):
+        """Sessions left behind by a previous run, oldest first
+
+        Returns:
+            list: Checkpoint dicts with the scalar fields plus applications, links
+                  and screenshots rebuilt from the item rows
+        """
+        self.db.flush()
+        rows = self.db.query(
+            'SELECT session_id, employee_id, project_name, user_note, start_time, stopped, '
+            + ', '.join(_SCALAR_FIELDS) + ' FROM session_checkpoints ORDER BY checkpoint_at'
+        )
+        checkpoints = []
+        for row in rows:
+            checkpoint = dict(zip(('session_id', 'employee_id', 'project_name', 'user_note', 'start_time',
+                                   'stopped') + _SCALAR_FIELDS, row))
+            checkpoint['stopped'] = bool(checkpoint['stopped'])
+            checkpoint['applications'] = {}
+            checkpoint['links'] = {}
+            screenshots = {}
+            for kind, item_key, payload in self.db.query(
+                    'SELECT kind, item_key, payload FROM session_checkpoint_items WHERE session_id = ?',
+                    (checkpoint['session_id'],)):
+                value = json.loads(payload)
+                if kind == 'app':
+                    checkpoint['applications'][item_key] = value
+                elif kind == 'link':
+                    checkpoint['links'][item_key] = value
+                elif kind == 'screenshot':
+                    screenshots[int(item_key)] = value
+            checkpoint['screenshots'] = [screenshots[i] for i in sorted(screenshots)]
+            checkpoints.append(checkpoint)
+        return checkpoints
+
+    def get_metrics(self):
+        with self._lock:
+            return dict(self._metrics)
@@ -0,0 +1,148 @@
+# startup_trace.py
+
+import os
+import sys
+import json
+import time
+import logging
+import threading
+import functools
+from contextlib import contextmanager
+
+from app_logging import get_logger
+
+log = get_logger(__name__)
+
+# Environment variable enabling the tracer: "1" writes the trace to the default
+# location, any other non-empty value is used as the trace file path
+TRACE_ENV_VAR = 'RI_TRACKER_TRACE_STARTUP'
+PROFILE_FLAG = '--profile-startup'
+
+# Reference point for all timestamps: as close to process launch as this module gets
+_T0 = time.perf_counter()
+
+
+class StartupTracer:
+    """Named spans between process launch and the first window, in Chrome trace format
+
+    Disabled tracers cost one attribute check per span. Recording stops at
+    finish(), so functions that are traced at startup and called again later (e.g.
+    load_auth_data) are not recorded twice.
+
+    The trace file can be opened in chrome://tracing or https://ui.perfetto.dev.
+    finish() logs the span summary table at info level with --profile-startup and
+    at debug level otherwise.
+    """
+
+    def __init__(self, enabled=False, trace_path=None, print_summary=False):
+        self.enabled = enabled
+        self.trace_path = trace_path
+        self.print_summary = print_summary
+        self._lock = threading.Lock()
+        self._events = []
+
+    @classmethod
+    def from_environment(cls, argv=None, environ=None):
+        """Build a tracer configured by TRACE_ENV_VAR and the --profile-startup switch"""
+        argv = sys.argv if argv is None else argv
+        environ = os.environ if environ is None else environ
+        env_value = environ.get(TRACE_ENV_VAR, '').strip()
+        profile = PROFILE_FLAG in argv[1:]
+        trace_path = env_value if env_value not in ('', '0', '1') else None
+        return cls(enabled=profile or env_value not in ('', '0'),
+                   trace_path=trace_path, print_summary=profile)
+
+    @staticmethod
+    def _now_us():
+        return (time.perf_counter() - _T0) * 1_000_000
+
+    @contextmanager
+    def span(self, name, **args):
+        """Record the duration of a with-block"""
+        if not self.enabled:
+            yield
+            return
+        start = self._now_us()
+        try:
+            yield
+        finally:
+            self._record({'name': name, 'ph': 'X', 'ts': start, 'dur': self._now_us() - start}, args)
+
+    def traced(self, name=None):
+        """Decorator recording each call of a function as a span"""
+        def decorator(func):
+            span_name = name or func.__qualname__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with self.span(span_name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def mark(self, name, **args):
+        """Record an instant event"""
+        if self.enabled:
+            self._record({'name': name, 'ph': 'i', 's': 'p', 'ts': self._now_us()}, args)
+
+    def _record(self, event, args):
+        event.update({'cat': 'startup', 'pid': os.getpid(), 'tid': threading.get_ident()})
+        if args:
+            event['args'] = {key: str(value) for key, value in args.items()}
+        with self._lock:
+            self._events.append(event)
+
+    def events(self):
+        with self._lock:
+            return list(self._events)
+
+    def to_chrome_trace(self):
+        """The recorded events as a Chrome trace document"""
+        events = self.events()
+        threads = {event['tid'] for event in events}
+        names = {t.ident: t.name for t in threading.enumerate()}
+        metadata = [{'name': 'thread_name', 'ph': 'M', 'pid': os.getpid(), 'tid': tid,
+                     'args': {'name': names.get(tid, f'thread-{tid}')}} for tid in threads]
+        return {'traceEvents': metadata + events, 'displayTimeUnit': 'ms'}
+
+    def summary_table(self):
+        """Spans as a text table, in start order, with their offset from launch"""
+        spans = sorted((e for e in self.events() if e['ph'] == 'X'), key=lambda e: e['ts'])
+        marks = sorted((e for e in self.events() if e['ph'] == 'i'), key=lambda e: e['ts'])
+        width = max([len(e['name']) for e in spans + marks] + [4])
+        lines = [f"{'span'.ljust(width)}  {'start ms':>9}  {'duration ms':>11}"]
+        lines.append('-' * len(lines[0]))
+        for event in spans:
+            lines.append(f"{event['name'].ljust(width)}  {event['ts'] / 1000:9.1f}  {event['dur'] / 1000:11.1f}")
+        for event in marks:
+            lines.append(f"{event['name'].ljust(width)}  {event['ts'] / 1000:9.1f}  {'(mark)':>11}")
+        return '\n'.join(lines)
+
+    def finish(self, default_path=None):
+        """Stop recording, write the trace file and log the summary
+
+        Returns:
+            str: Path of the written trace file, or None
+        """
+        if not self.enabled:
+            return None
+        self.mark('startup finished')
+        self.enabled = False
+
+        path = self.trace_path or default_path
+        if path:
+            try:
+                with open(path, 'w') as f:
+                    json.dump(self.to_chrome_trace(), f)
+                log.info('Startup trace written to %s', path)
+            except OSError as e:
+                log.error('Error writing startup trace: %s', e)
+                path = None
+        log.log(logging.INFO if self.print_summary else logging.DEBUG, 'Startup spans:\n%s', self.summary_table())
+        return path
+
+
+# The process-wide tracer used by main.py
+tracer = StartupTracer.from_environment()
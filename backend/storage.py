@@ -0,0 +1,441 @@
+# storage.py
+
+import json
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+from app_logging import get_logger
+
+log = get_logger(__name__)
+
+
+def _migration_1_initial_schema(conn):
+    """Tables created by the original init_db (safe on existing databases)"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS time_entries (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            project_name TEXT,
+            timestamp TEXT,
+            duration INTEGER
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS auth_data (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            token TEXT,
+            user_data TEXT
+        )
+    ''')
+
+
+def _migration_2_time_entry_history(conn):
+    """UTC epoch, session and activity columns plus indexes for history queries
+
+    `timestamp` stays as the local wall-clock text for older readers; the new
+    `timestamp_utc` column (epoch seconds) is what range queries use. Existing rows
+    are backfilled by interpreting their text timestamp as local time.
+    """
+    conn.execute('ALTER TABLE time_entries ADD COLUMN timestamp_utc INTEGER')
+    conn.execute('ALTER TABLE time_entries ADD COLUMN session_id TEXT')
+    conn.execute('ALTER TABLE time_entries ADD COLUMN active_seconds INTEGER')
+    conn.execute('ALTER TABLE time_entries ADD COLUMN idle_seconds INTEGER')
+    conn.execute("""
+        UPDATE time_entries
+        SET timestamp_utc = CAST(strftime('%s', timestamp, 'utc') AS INTEGER)
+        WHERE timestamp_utc IS NULL AND timestamp IS NOT NULL
+    """)
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_time_entries_timestamp ON time_entries (timestamp_utc)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_time_entries_project_timestamp '
+                 'ON time_entries (project_name, timestamp_utc)')
+
+
+def _migration_3_http_cache(conn):
+    """Cached GET responses (see response_cache.ResponseCache)"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS http_cache (
+            url TEXT PRIMARY KEY,
+            status INTEGER,
+            body TEXT,
+            etag TEXT,
+            last_modified TEXT,
+            fetched_at REAL
+        )
+    ''')
+
+
+def _migration_4_session_checkpoints(conn):
+    """Checkpoints of the running session (see session_checkpoint.SessionCheckpointer)"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS session_checkpoints (
+            session_id TEXT PRIMARY KEY,
+            employee_id TEXT,
+            project_name TEXT,
+            user_note TEXT,
+            start_time REAL,
+            checkpoint_at REAL,
+            active_seconds REAL,
+            idle_seconds REAL,
+            keyboard_events INTEGER,
+            mouse_events INTEGER,
+            keyboard_rate REAL,
+            mouse_rate REAL,
+            stopped INTEGER DEFAULT 0
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS session_checkpoint_items (
+            session_id TEXT,
+            kind TEXT,
+            item_key TEXT,
+            payload TEXT,
+            PRIMARY KEY (session_id, kind, item_key)
+        ) WITHOUT ROWID
+    ''')
+
+
+def _migration_5_sleep_time(conn):
+    """Time the system was suspended during a session, kept apart from active/idle time"""
+    conn.execute('ALTER TABLE time_entries ADD COLUMN sleep_seconds INTEGER')
+    conn.execute('ALTER TABLE session_checkpoints ADD COLUMN sleep_seconds REAL DEFAULT 0')
+
+
+def _migration_6_time_entry_employee(conn):
+    """Employee of each time entry, so local stats only count the logged-in user's time
+
+    Existing rows are assigned to the user logged in at migration time, the only
+    user the old schema could tell about.
+    """
+    conn.execute('ALTER TABLE time_entries ADD COLUMN employee_id TEXT')
+    row = conn.execute('SELECT user_data FROM auth_data ORDER BY id DESC LIMIT 1').fetchone()
+    try:
+        employee_id = (json.loads(row[0]) or {}).get('employeeId') if row and row[0] else None
+    except (ValueError, AttributeError):
+        employee_id = None
+    if employee_id:
+        conn.execute('UPDATE time_entries SET employee_id = ? WHERE employee_id IS NULL', (employee_id,))
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_time_entries_employee_timestamp '
+                 'ON time_entries (employee_id, timestamp_utc)')
+
+
+# Ordered (version, function) pairs. The schema version is kept in PRAGMA user_version,
+# so a migration runs exactly once per database. Only ever append to this list.
+MIGRATIONS = [
+    (1, _migration_1_initial_schema),
+    (2, _migration_2_time_entry_history),
+    (3, _migration_3_http_cache),
+    (4, _migration_4_session_checkpoints),
+    (5, _migration_5_sleep_time),
+    (6, _migration_6_time_entry_employee),
+]
+
+
+class Database:
+    """Long-lived SQLite access for tracker.db
+
+    The database runs in WAL mode with synchronous=NORMAL, so readers never wait
+    for the writer and commits only fsync at checkpoints.
+
+    All writes go through one writer thread that owns the only write connection.
+    Callers either wait for the result (`execute`, `transaction`) or hand the write
+    off without waiting (`execute_async`). Reads use a small pool of read-only
+    connections, which works with the short-lived threads created by
+    threading.Timer and pywebview.
+
+    sqlite3 caches compiled statements per connection, so passing the same SQL
+    string again reuses the prepared statement.
+    """
+
+    def __init__(self, path, migrations=None, read_pool_size=4, busy_timeout_ms=5000):
+        self.path = path
+        self.migrations = MIGRATIONS if migrations is None else migrations
+        self.read_pool_size = read_pool_size
+        self.busy_timeout_ms = busy_timeout_ms
+
+        self._lock = threading.Lock()
+        self._writes = queue.Queue()
+        self._writer = None
+        self._readers = queue.LifoQueue()
+        self._reader_count = 0
+        self._closed = False
+        self._schema_version = None
+
+    # ------------------------------------------------------------------
+    # Connections
+    # ------------------------------------------------------------------
+    def _connect(self, read_only=False):
+        conn = sqlite3.connect(self.path, timeout=self.busy_timeout_ms / 1000,
+                               check_same_thread=False, cached_statements=128)
+        conn.execute(f'PRAGMA busy_timeout = {int(self.busy_timeout_ms)}')
+        if read_only:
+            conn.execute('PRAGMA query_only = ON')
+        else:
+            # WAL is persistent in the database file; readers pick it up from there
+            conn.execute('PRAGMA journal_mode = WAL')
+            conn.execute('PRAGMA synchronous = NORMAL')
+            conn.execute('PRAGMA foreign_keys = ON')
+        return conn
+
+    def _ensure_writer(self):
+        with self._lock:
+            if self._closed:
+                raise sqlite3.ProgrammingError("Database is closed")
+            if self._writer is not None and self._writer.is_alive():
+                return
+            # Open on the caller's thread so connection errors surface immediately
+            conn = self._connect()
+            self._writer = threading.Thread(target=self._write_loop, args=(conn,),
+                                            name="TrackerDbWriter", daemon=True)
+            self._writer.start()
+
+    @contextmanager
+    def _reader(self):
+        try:
+            conn = self._readers.get_nowait()
+        except queue.Empty:
+            conn = None
+            with self._lock:
+                if self._reader_count < self.read_pool_size:
+                    self._reader_count += 1
+                    conn = self._connect(read_only=True)
+            if conn is None:
+                conn = self._readers.get()
+        try:
+            yield conn
+        finally:
+            if self._closed:
+                conn.close()
+            else:
+                self._readers.put(conn)
+
+    # ------------------------------------------------------------------
+    # Writer thread
+    # ------------------------------------------------------------------
+    def _write_loop(self, conn):
+        while True:
+            item = self._writes.get()
+            if item is None:
+                break
+            func, done, holder = item
+            try:
+                with conn:  # commit on success, roll back on error
+                    holder['result'] = func(conn)
+            except Exception as e:
+                holder['error'] = e
+                if done is None:
+                    log.error('SQLite background write error: %s', e)
+            finally:
+                if done is not None:
+                    done.set()
+        conn.close()
+
+    def _submit(self, func, wait=True):
+        self._ensure_writer()
+        done = threading.Event() if wait else None
+        holder = {}
+        self._writes.put((func, done, holder))
+        if not wait:
+            return None
+        done.wait()
+        if 'error' in holder:
+            raise holder['error']
+        return holder.get('result')
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def migrate(self):
+        """Apply pending schema migrations
+
+        Only the first call does any work; later calls return the cached version.
+
+        Returns:
+            int: The schema version after migrating
+        """
+        if self._schema_version is not None:
+            return self._schema_version
+
+        def run(conn):
+            version = conn.execute('PRAGMA user_version').fetchone()[0]
+            for target, migration in self.migrations:
+                if target <= version:
+                    continue
+                # Each migration and its version bump commit together
+                conn.execute('BEGIN IMMEDIATE')
+                migration(conn)
+                conn.execute(f'PRAGMA user_version = {int(target)}')
+                conn.commit()
+                version = target
+                log.info('Database migrated to schema version %s', target)
+            return version
+        self._schema_version = self._submit(run)
+        return self._schema_version
+
+    def execute(self, sql, params=()):
+        """Run a single write statement on the writer thread and wait for it
+
+        Returns:
+            int: Number of affected rows
+        """
+        return self._submit(lambda conn: conn.execute(sql, params).rowcount)
+
+    def insert(self, sql, params=()):
+        """Run an INSERT on the writer thread and wait for it
+
+        Returns:
+            int: Row id of the inserted row
+        """
+        return self._submit(lambda conn: conn.execute(sql, params).lastrowid)
+
+    def execute_async(self, sql, params=()):
+        """Queue a write without waiting for it; errors are logged"""
+        self._submit(lambda conn: conn.execute(sql, params), wait=False)
+
+    def executemany(self, sql, seq_of_params, wait=True):
+        """Run one statement for many parameter sets in a single transaction"""
+        return self._submit(lambda conn: conn.executemany(sql, seq_of_params).rowcount, wait=wait)
+
+    def transaction(self, func, wait=True):
+        """Run func(conn) in one write transaction on the writer thread
+
+        Returns:
+            The return value of func (None when wait is False)
+        """
+        return self._submit(func, wait=wait)
+
+    def query(self, sql, params=()):
+        """Run a read query on a pooled read-only connection
+
+        Returns:
+            list: All result rows
+        """
+        with self._reader() as conn:
+            return conn.execute(sql, params).fetchall()
+
+    def query_one(self, sql, params=()):
+        """Run a read query and return the first row or None"""
+        with self._reader() as conn:
+            return conn.execute(sql, params).fetchone()
+
+    def flush(self):
+        """Wait until all queued writes are done"""
+        self._submit(lambda conn: None)
+
+    def close(self):
+        """Finish queued writes and close all connections"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            writer = self._writer
+        if writer is not None and writer.is_alive():
+            self._writes.put(None)
+            writer.join(timeout=5)
+        while True:
+            try:
+                self._readers.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+# ----------------------------------------------------------------------
+# time_entries helpers
+# ----------------------------------------------------------------------
+TIME_ENTRY_INSERT_SQL = (
+    'INSERT INTO time_entries (project_name, timestamp, duration, timestamp_utc, session_id, '
+    'active_seconds, idle_seconds, sleep_seconds, employee_id) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)'
+)
+
+MAX_TIME_ENTRIES_PAGE = 500
+
+
+def to_epoch(value):
+    """Convert an epoch number or ISO-8601 string to integer epoch seconds (None passes through)"""
+    if value is None or value == '':
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    if parsed.tzinfo is None:
+        parsed = parsed.astimezone()  # naive values are local time
+    return int(parsed.timestamp())
+
+
+def record_time_entry(db, project_name, ended_at, duration, session_id=None, active_seconds=None,
+                      idle_seconds=None, sleep_seconds=None, employee_id=None, wait=False):
+    """Store a finished session in time_entries
+
+    Args:
+        db (Database): Connection manager
+        project_name (str): Project the time was tracked for
+        ended_at (float): Epoch seconds when the session ended
+        duration (int): Session length in seconds
+        session_id (str): Server session id
+        active_seconds (int): Active part of the duration
+        idle_seconds (int): Idle part of the duration
+        sleep_seconds (int): Time the system was suspended (not part of the duration)
+        employee_id (str): Employee who tracked the time
+        wait (bool): Wait for the write instead of queueing it
+    """
+    local_text = datetime.fromtimestamp(ended_at).strftime('%Y-%m-%d %H:%M:%S')
+    params = (project_name, local_text, duration, int(ended_at), session_id, active_seconds, idle_seconds,
+              sleep_seconds, employee_id)
+    if wait:
+        return db.insert(TIME_ENTRY_INSERT_SQL, params)
+    db.execute_async(TIME_ENTRY_INSERT_SQL, params)
+    return None
+
+
+def fetch_time_entries(db, start=None, end=None, project=None, limit=10, offset=0, employee_id=None):
+    """Newest-first page of time entries, optionally limited to a time range and project
+
+    Args:
+        db (Database): Connection manager
+        start: Inclusive lower bound (epoch seconds or ISO string)
+        end: Exclusive upper bound (epoch seconds or ISO string)
+        project (str): Only entries of this project
+        limit (int): Page size (capped at MAX_TIME_ENTRIES_PAGE)
+        offset (int): Number of entries to skip
+        employee_id (str): Only entries of this employee
+
+    Returns:
+        list: Entries as dicts
+    """
+    clauses = []
+    params = []
+    if employee_id:
+        clauses.append('employee_id = ?')
+        params.append(employee_id)
+    if project:
+        clauses.append('project_name = ?')
+        params.append(project)
+    start = to_epoch(start)
+    if start is not None:
+        clauses.append('timestamp_utc >= ?')
+        params.append(start)
+    end = to_epoch(end)
+    if end is not None:
+        clauses.append('timestamp_utc < ?')
+        params.append(end)
+
+    limit = max(1, min(int(limit), MAX_TIME_ENTRIES_PAGE))
+    offset = max(0, int(offset))
+    where = ('WHERE ' + ' AND '.join(clauses)) if clauses else ''
+    rows = db.query(
+        'SELECT project_name, timestamp, duration, timestamp_utc, session_id, active_seconds, idle_seconds, '
+        'sleep_seconds '
+        f'FROM time_entries {where} ORDER BY timestamp_utc DESC, id DESC LIMIT ? OFFSET ?',
+        tuple(params) + (limit, offset)
+    )
+    return [{
+        'project': row[0],
+        'timestamp': row[1],
+        'duration': row[2],
+        'timestamp_utc': row[3],
+        'session_id': row[4],
+        'active_time': row[5],
+        'idle_time': row[6],
+        'sleep_time': row[7],
+    } for row in rows]
@@ -0,0 +1,162 @@
+# streaming_upload.py
+
+import os
+import uuid
+import threading
+
+from app_logging import get_logger
+from lazy_import import lazy_import
+
+# Loaded on first use (see lazy_import)
+requests = lazy_import('requests')
+
+log = get_logger(__name__)
+
+
+class UploadCancelled(Exception):
+    """Raised when an upload is aborted through its CancelToken"""
+
+
+class CancelToken:
+    """Thread-safe cancellation flag shared between the timer and running uploads"""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise UploadCancelled("Upload cancelled")
+
+
+class MultipartFileStream:
+    """File-like multipart/form-data body that is read in chunks
+
+    requests sends objects with `read` and `__len__` as a streamed body with a
+    Content-Length header, so the file is never loaded into memory as a whole.
+    Every read reports progress and checks the cancel token.
+    """
+
+    def __init__(self, file_path, field_name='file', filename=None, content_type='application/octet-stream',
+                 cancel_token=None, progress=None):
+        """
+        Args:
+            file_path (str): File to send
+            field_name (str): Form field name of the file part
+            filename (str): File name sent to the server; defaults to the base name of file_path
+            content_type (str): MIME type of the file part
+            cancel_token (CancelToken): Aborts the upload when cancelled
+            progress: Callable (bytes_sent, total_bytes) invoked after every chunk
+        """
+        self.boundary = uuid.uuid4().hex
+        self.cancel_token = cancel_token
+        self.progress = progress
+
+        filename = filename or os.path.basename(file_path)
+        self._head = (
+            f'--{self.boundary}\r\n'
+            f'Content-Disposition: form-data; name="{field_name}"; filename="{filename}"\r\n'
+            f'Content-Type: {content_type}\r\n\r\n'
+        ).encode('utf-8')
+        self._tail = f'\r\n--{self.boundary}--\r\n'.encode('utf-8')
+        self._file = open(file_path, 'rb')
+        self._file_size = os.fstat(self._file.fileno()).st_size
+        self._total = len(self._head) + self._file_size + len(self._tail)
+        self._sent = 0
+
+    @property
+    def content_type(self):
+        return f'multipart/form-data; boundary={self.boundary}'
+
+    def __len__(self):
+        return self._total
+
+    def __iter__(self):
+        while True:
+            chunk = self.read(64 * 1024)
+            if not chunk:
+                return
+            yield chunk
+
+    def read(self, size=-1):
+        if self.cancel_token is not None:
+            self.cancel_token.raise_if_cancelled()
+        if size is None or size < 0:
+            size = self._total - self._sent
+
+        chunk = b''
+        head_len = len(self._head)
+        body_end = head_len + self._file_size
+
+        # Preamble
+        if self._sent < head_len and size > 0:
+            part = self._head[self._sent:self._sent + size]
+            chunk += part
+            size -= len(part)
+        # File contents
+        if size > 0 and self._sent + len(chunk) < body_end:
+            part = self._file.read(size)
+            chunk += part
+            size -= len(part)
+        # Closing boundary
+        position = self._sent + len(chunk)
+        if size > 0 and position >= body_end:
+            offset = position - body_end
+            chunk += self._tail[offset:offset + size]
+
+        self._sent += len(chunk)
+        if chunk and self.progress is not None:
+            try:
+                self.progress(self._sent, self._total)
+            except Exception as e:
+                log.error('Upload progress callback error: %s', e)
+        return chunk
+
+    def close(self):
+        try:
+            self._file.close()
+        except Exception:
+            pass
+
+
+def stream_upload(url, file_path, headers=None, field_name='file', filename=None,
+                  content_type='application/octet-stream', cancel_token=None, progress=None,
+                  connect_timeout=10, read_timeout=60):
+    """Upload a file as multipart/form-data without buffering the whole body
+
+    Args:
+        url (str): Upload endpoint
+        file_path (str): File to upload
+        headers (dict): Extra request headers (e.g. the API key)
+        field_name (str): Form field name of the file part
+        filename (str): File name sent to the server
+        content_type (str): MIME type of the file part
+        cancel_token (CancelToken): Aborts the upload between chunks when cancelled
+        progress: Callable (bytes_sent, total_bytes)
+        connect_timeout (float): Seconds to wait for the connection
+        read_timeout (float): Seconds to wait for the server between reads
+
+    Returns:
+        requests.Response: The server response
+
+    Raises:
+        UploadCancelled: If the cancel token was triggered
+        requests.exceptions.RequestException: On connection errors and timeouts
+    """
+    if cancel_token is not None:
+        cancel_token.raise_if_cancelled()
+
+    body = MultipartFileStream(file_path, field_name=field_name, filename=filename, content_type=content_type,
+                               cancel_token=cancel_token, progress=progress)
+    try:
+        request_headers = dict(headers or {})
+        request_headers['Content-Type'] = body.content_type
+        return requests.post(url, data=body, headers=request_headers, timeout=(connect_timeout, read_timeout))
+    finally:
+        body.close()
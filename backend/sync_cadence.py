@@ -0,0 +1,281 @@
+# sync_cadence.py
+
+import time
+import random
+import threading
+from email.utils import parsedate_to_datetime
+
+from app_logging import get_logger
+
+log = get_logger(__name__)
+
+# Server interval hints are clamped to this range of multiples of the base interval,
+# so a bad hint can neither hammer the server nor stop syncing for hours
+HINT_RANGE = (0.5, 8.0)
+
+
+def parse_retry_after(value, now=None):
+    """Seconds to wait according to a Retry-After header value
+
+    Args:
+        value: delta-seconds ("120") or an HTTP date
+        now (float): Current epoch time for HTTP dates (default: time.time())
+
+    Returns:
+        float: Non-negative seconds, or None if the value is missing or invalid
+    """
+    if value is None:
+        return None
+    value = str(value).strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError, IndexError):
+        return None
+    return max(0.0, when - (time.time() if now is None else now))
+
+
+class _Channel:
+    __slots__ = ('override', 'next_hint', 'failures', 'not_before', 'attempt_failed', 'last_delay')
+
+    def __init__(self):
+        self.override = None      # server-provided interval, replaces the base interval
+        self.next_hint = None     # server-provided delay for the next sync only
+        self.failures = 0         # consecutive failed syncs
+        self.not_before = None    # clock() value before which the server asked us not to come back
+        self.attempt_failed = False
+        self.last_delay = None
+
+
+class SyncCadence:
+    """Delays of the periodic syncs: jitter, server hints, error backoff and low-power mode
+
+    Each channel ('session', 'stats', 'links', 'apps') is scheduled with
+    `next_delay(channel, base)`, where base is the caller's configured interval.
+    The delay is derived in this order:
+
+    - the server's persistent interval for the channel (`syncIntervals` in a
+      response body) replaces base; a one-shot `nextUpdateIn` replaces it for the
+      next sync only. Both are clamped to HINT_RANGE times base.
+    - on battery (or when forced), the interval is stretched by low_power_factor.
+    - after consecutive failures (5xx, 429, network errors), the interval grows by
+      backoff_factor per failure, up to max_backoff.
+    - the result is jittered by +/- jitter so clients that started together drift
+      apart instead of syncing in lockstep.
+    - a Retry-After from the server is a floor; the time after it is jittered
+      upwards only, so throttled clients don't all return at the same instant.
+
+    Outcomes are recorded per sync attempt: several requests made for one sync
+    (e.g. daily and weekly stats) count as one failure.
+    """
+
+    def __init__(self, jitter=0.1, backoff_factor=2.0, max_backoff=3600, low_power_factor=3.0,
+                 power_source=None, power_check_interval=60, rng=None, clock=time.monotonic):
+        """
+        Args:
+            jitter (float): Relative jitter applied to every delay (0.1 = +/- 10%)
+            backoff_factor (float): Interval multiplier per consecutive failure
+            max_backoff (float): Longest delay in seconds reached by backing off
+            low_power_factor (float): Interval multiplier in low-power mode
+            power_source: Optional callable returning True when running on battery
+            power_check_interval (float): Seconds between power_source calls
+            rng: Random number generator (mainly for tests)
+            clock: Monotonic clock in seconds
+        """
+        self.jitter = jitter
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.low_power_factor = low_power_factor
+        self.power_source = power_source
+        self.power_check_interval = power_check_interval
+        self.rng = rng or random.Random()
+        self.clock = clock
+
+        self._lock = threading.Lock()
+        self._channels = {}
+        self._forced_low_power = None  # None: follow power_source
+        self._on_battery = False
+        self._power_checked_at = None
+
+    # ------------------------------------------------------------------
+    # Scheduling
+    # ------------------------------------------------------------------
+    def next_delay(self, channel, base):
+        """Seconds until the next sync of a channel; starts a new sync attempt
+
+        Args:
+            channel (str): Channel name
+            base (float): Configured interval in seconds
+
+        Returns:
+            float: Delay in seconds
+        """
+        low_power = self.low_power
+        with self._lock:
+            state = self._channel(channel)
+            interval = self._clamp(state.override, base) if state.override else base
+            if state.next_hint:
+                interval = self._clamp(state.next_hint, base)
+                state.next_hint = None
+            if low_power:
+                interval *= self.low_power_factor
+            if state.failures:
+                interval = min(interval * self.backoff_factor ** state.failures, max(self.max_backoff, interval))
+            delay = interval * self.rng.uniform(1 - self.jitter, 1 + self.jitter)
+
+            if state.not_before is not None:
+                wait = state.not_before - self.clock()
+                if wait > 0 and delay < wait:
+                    delay = wait * self.rng.uniform(1, 1 + self.jitter)
+                state.not_before = None
+
+            state.attempt_failed = False
+            state.last_delay = delay
+            return delay
+
+    # ------------------------------------------------------------------
+    # Outcomes and server hints
+    # ------------------------------------------------------------------
+    def record_success(self, channel):
+        """A sync request of the channel succeeded"""
+        with self._lock:
+            state = self._channel(channel)
+            if not state.attempt_failed:
+                state.failures = 0
+
+    def record_failure(self, channel, retry_after=None):
+        """A sync request failed (server error, throttling or network error)
+
+        Args:
+            retry_after (float): Seconds the server asked us to wait, if any
+        """
+        with self._lock:
+            state = self._channel(channel)
+            if not state.attempt_failed:
+                state.attempt_failed = True
+                state.failures += 1
+                log.warning('%s sync failed (%s in a row)', channel, state.failures)
+            if retry_after is not None:
+                self._set_not_before(state, retry_after)
+
+    def record_response(self, channel, status_code, headers=None):
+        """Record the outcome of an HTTP response and honor its Retry-After header
+
+        5xx and 429 count as failures; other statuses (including 4xx client
+        errors, which backing off would not fix) count as successes.
+        """
+        retry_after = parse_retry_after((headers or {}).get('Retry-After'))
+        if status_code == 429 or status_code >= 500:
+            self.record_failure(channel, retry_after)
+            return
+        self.record_success(channel)
+        if retry_after is not None:
+            with self._lock:
+                self._set_not_before(self._channel(channel), retry_after)
+
+    def apply_hints(self, channel, body):
+        """Apply the interval hints of a response body
+
+        Args:
+            channel (str): Channel the response belongs to
+            body: Parsed JSON body. `nextUpdateIn` (seconds) sets the channel's next
+                  delay; `syncIntervals` ({channel: seconds or null}) sets or clears
+                  persistent intervals of any channel. Both may also be inside `data`.
+        """
+        if not isinstance(body, dict):
+            return
+        sources = [body]
+        if isinstance(body.get('data'), dict):
+            sources.append(body['data'])
+        with self._lock:
+            for source in sources:
+                next_hint = self._seconds(source.get('nextUpdateIn'))
+                if next_hint:
+                    self._channel(channel).next_hint = next_hint
+                intervals = source.get('syncIntervals')
+                if isinstance(intervals, dict):
+                    for name, seconds in intervals.items():
+                        state = self._channel(name)
+                        override = self._seconds(seconds)
+                        if override != state.override:
+                            log.info('Server set the %s sync interval to %s', name, override or 'default')
+                        state.override = override
+
+    # ------------------------------------------------------------------
+    # Low-power mode
+    # ------------------------------------------------------------------
+    @property
+    def low_power(self):
+        """True when syncs are stretched (forced on, or on battery with power_source)"""
+        if self._forced_low_power is not None:
+            return self._forced_low_power
+        if self.power_source is None:
+            return False
+        now = self.clock()
+        if self._power_checked_at is None or now - self._power_checked_at >= self.power_check_interval:
+            self._power_checked_at = now
+            try:
+                on_battery = bool(self.power_source())
+            except Exception as e:
+                log.debug('Power source check failed: %s', e)
+                on_battery = False
+            if on_battery != self._on_battery:
+                log.info('Switching to %s sync cadence', 'low-power' if on_battery else 'normal')
+            self._on_battery = on_battery
+        return self._on_battery
+
+    def set_low_power(self, enabled):
+        """Force low-power mode on (True) or off (False), or follow the power source (None)"""
+        self._forced_low_power = None if enabled is None else bool(enabled)
+
+    def get_status(self):
+        """Return the mode and per-channel scheduling state"""
+        low_power = self.low_power
+        with self._lock:
+            return {
+                'low_power': low_power,
+                'low_power_mode': 'auto' if self._forced_low_power is None else self._forced_low_power,
+                'channels': {
+                    name: {
+                        'interval_override': state.override,
+                        'next_hint': state.next_hint,
+                        'failures': state.failures,
+                        'last_delay': round(state.last_delay, 1) if state.last_delay is not None else None,
+                    }
+                    for name, state in self._channels.items()
+                },
+            }
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+    def _channel(self, name):
+        # Called with the lock held
+        state = self._channels.get(name)
+        if state is None:
+            state = self._channels[name] = _Channel()
+        return state
+
+    def _set_not_before(self, state, seconds):
+        # Called with the lock held
+        not_before = self.clock() + seconds
+        if state.not_before is None or not_before > state.not_before:
+            state.not_before = not_before
+
+    @staticmethod
+    def _clamp(seconds, base):
+        low, high = HINT_RANGE
+        return min(max(seconds, base * low), base * high)
+
+    @staticmethod
+    def _seconds(value):
+        if isinstance(value, bool):
+            return None
+        try:
+            seconds = float(value)
+        except (TypeError, ValueError):
+            return None
+        return seconds if seconds > 0 else None
@@ -0,0 +1,2717 @@
+import os
+from startup_trace import tracer
+import sqlite3
+import time
+import sys
+import json
+import threading
+import subprocess
+import platform
+import shutil
+import random
+import tempfile
+import base64
+import glob
+import re
+from pathlib import Path
+from datetime import datetime, timezone, timedelta
+from lazy_import import lazy_import, module_available
+from app_logging import get_logger, setup_logging, set_debug, is_debug, get_log_file, get_logging_metrics
+
+log = get_logger(__name__)
+
+# Heavy third-party modules are imported on first use so the window can appear
+# before they load: webview when the window is created, screeninfo for its size,
+# requests with the first network call and psutil with the first application check.
+webview = lazy_import('webview')
+requests = lazy_import('requests')
+psutil = lazy_import('psutil')
+screeninfo = lazy_import('screeninfo')
+
+from config import URLS, CACHE_TTLS, SHARE_CLIENT_METRICS, SYNC_JITTER, SYNC_MAX_BACKOFF, LOW_POWER_ON_BATTERY, LOW_POWER_FACTOR
+from config import SYSTEM_IDLE_REPLACES_INPUT_HOOKS
+from storage import Database, record_time_entry, fetch_time_entries
+from local_stats import LocalStatsEngine
+from response_cache import ResponseCache
+from session_checkpoint import SessionCheckpointer
+from metrics import metrics
+from clock import system_clock, SuspendDetector
+from idle_monitor import IdleMonitor
+from input_listener import InputListener
+from ui_events import UiEventChannel
+from sync_cadence import SyncCadence, parse_retry_after
+from activity import ActivityEngine
+from screenshots import ScreenshotEngine
+from apps import ApplicationTracker
+from links import LinkTracker, read_chromium_history, read_firefox_history, read_safari_history
+import platforms
+
+
+from tzlocal import get_localzone
+
+local_tz = str(get_localzone())
+
+# pynput (system-wide keyboard and mouse tracking) is imported by _load_pynput()
+# when tracking starts; importing it opens a connection to the display server.
+keyboard = None
+mouse = None
+if module_available('pynput'):
+    # Check if we're on macOS
+    if platform.system() == 'Darwin':
+        # pynput is available, but we need to check permissions on macOS
+        # We'll set this to True initially, but the actual check will happen
+        # when the user tries to enable system-wide tracking
+        log.info('macOS detected. System-wide activity tracking will require permissions.')
+        PYNPUT_AVAILABLE = True
+        MACOS_PERMISSIONS_CHECKED = False
+    else:
+        # On other platforms, we can use pynput directly
+        PYNPUT_AVAILABLE = True
+        MACOS_PERMISSIONS_CHECKED = True
+else:
+    log.warning('pynput library not available. System-wide activity tracking will be disabled.')
+    PYNPUT_AVAILABLE = False
+    MACOS_PERMISSIONS_CHECKED = False
+
+
+def _load_pynput():
+    """Import pynput's keyboard and mouse modules once
+
+    Returns:
+        bool: True if the listeners can be used
+    """
+    global keyboard, mouse, PYNPUT_AVAILABLE
+    if keyboard is not None and mouse is not None:
+        return True
+    if not PYNPUT_AVAILABLE:
+        return False
+    try:
+        from pynput import keyboard as _keyboard, mouse as _mouse
+        keyboard, mouse = _keyboard, _mouse
+        return True
+    except Exception as e:
+        # e.g. no display server to connect to
+        log.warning('pynput could not be loaded: %s. System-wide activity tracking will be disabled.', e)
+        PYNPUT_AVAILABLE = False
+        return False
+
+
+# Optional macOS Status Bar support (PyObjC), loaded by _load_macos_menu_support()
+# when the status item is first created
+MAC_MENU_AVAILABLE = platform.system() == 'Darwin' and module_available('AppKit')
+HAVE_APPHELPER = False
+_MAC_MENU_LOADED = False
+AppKit = None
+objc = None
+AppHelper = None
+
+
+def _load_macos_menu_support():
+    """Import AppKit/objc and define the status bar menu delegate once
+
+    Returns:
+        bool: True if the macOS status bar item can be used
+    """
+    global MAC_MENU_AVAILABLE, HAVE_APPHELPER, _MAC_MENU_LOADED, AppKit, objc, AppHelper, RiMenuDelegate
+    if _MAC_MENU_LOADED or not MAC_MENU_AVAILABLE:
+        return MAC_MENU_AVAILABLE
+    _MAC_MENU_LOADED = True
+    try:
+        import AppKit as _AppKit  # PyObjC AppKit bridge
+        from Foundation import NSObject
+        import objc as _objc
+        AppKit, objc = _AppKit, _objc
+        try:
+            from PyObjCTools import AppHelper as _AppHelper
+            AppHelper = _AppHelper
+            HAVE_APPHELPER = True
+        except Exception:
+            HAVE_APPHELPER = False
+    except Exception as _e:
+        # AppKit not available; menu bar display will be disabled gracefully
+        MAC_MENU_AVAILABLE = False
+        HAVE_APPHELPER = False
+        # One-time diagnostic to help identify packaging issues
+        log.warning('macOS detected but AppKit is not available. Status bar timer will be disabled.\nIf you are running a packaged app, ensure PyInstaller includes hidden imports: AppKit, objc, PyObjCTools, PyObjCTools.AppHelper.')
+        return False
+
+    # Define a small delegate for menu actions
+    try:
+        class RiMenuDelegate(NSObject):
+            def initWithApi_(self, api):
+                self = objc.super(RiMenuDelegate, self).init()
+                if self is None:
+                    return None
+                self._api = api
+                return self
+
+            def openApp_(self, sender):
+                try:
+                    if getattr(self, '_api', None) is not None and getattr(self._api, 'window', None) is not None:
+                        try:
+                            self._api.window.show()
+                        except Exception:
+                            pass
+                        try:
+                            AppKit.NSApp.activateIgnoringOtherApps_(True)
+                        except Exception:
+                            pass
+                except Exception as e:
+                    log.error('Failed to open app from menu: %s', e)
+
+            def quitApp_(self, sender):
+                try:
+                    AppKit.NSApp.terminate_(None)
+                except Exception:
+                    os._exit(0)
+
+            def screensChanged_(self, notification):
+                # Display attached/detached or resolution changed: refresh cached monitor layout
+                try:
+                    if getattr(self, '_api', None) is not None:
+                        self._api.capture_service.notify_display_change()
+                except Exception as e:
+                    log.error('Failed to handle display change: %s', e)
+    except Exception as _e_def:
+        log.error('Failed to define RiMenuDelegate: %s', _e_def)
+    return True
+
+
+APP_NAME = "RI_Tracker"
+APP_VERSION = "1.0.15"  # Current version of the application
+# Updates come from the release feed of this platform
+GITHUB_REPO = platforms.release_repo()
+# ~/Library/Application Support on macOS, %LOCALAPPDATA% on Windows, ~/.config elsewhere
+DATA_DIR = platforms.data_dir(APP_NAME)
+
+_data_dir_prepared = False
+
+
+@tracer.traced()
+def prepare_data_dir():
+    """Create DATA_DIR and move data from older locations (runs once, before tracker.db is opened)"""
+    global _data_dir_prepared
+    if _data_dir_prepared:
+        return
+    _data_dir_prepared = True
+
+    if platform.system() == 'Darwin':
+        # Migration logic for existing users who have data in the old location
+        # Previously, the app was using ~/.config on macOS which might not be properly persisted
+        old_data_dir = os.path.join(os.path.expanduser("~/.config"), APP_NAME)
+        old_db_file = os.path.join(old_data_dir, 'tracker.db')
+        if os.path.exists(old_db_file) and os.path.getsize(old_db_file) > 0:
+            log.info('Found data in old location: %s', old_db_file)
+            # Ensure new directory exists
+            os.makedirs(DATA_DIR, exist_ok=True)
+            new_db_file = os.path.join(DATA_DIR, 'tracker.db')
+            # Only copy if the new file doesn't exist or is empty
+            # This prevents overwriting newer data with older data
+            if not os.path.exists(new_db_file) or os.path.getsize(new_db_file) == 0:
+                try:
+                    shutil.copy2(old_db_file, new_db_file)
+                    log.info('Migrated database from %s to %s', old_db_file, new_db_file)
+                except Exception as e:
+                    log.error('Error migrating database: %s', e)
+
+    # Ensure the directory exists
+    os.makedirs(DATA_DIR, exist_ok=True)
+
+
+# Save db in local app data
+db_file = os.path.join(DATA_DIR, 'tracker.db')
+#db_file = 'tracker.db'
+
+# One long-lived connection manager (WAL, single writer thread) for the whole app
+db = Database(db_file)
+
+@tracer.traced()
+def on_battery_power():
+    """Return True when the machine runs on battery (False if unknown)"""
+    battery = psutil.sensors_battery()
+    return battery is not None and not battery.power_plugged
+
+
+def init_db():
+    """Create or upgrade the tracker.db schema (see storage.MIGRATIONS)"""
+    prepare_data_dir()
+    db.migrate()
+
+
+def _component_attribute(component, name):
+    """Api attribute kept as the state of one of its components (e.g. self.activity)"""
+    return property(lambda self: getattr(getattr(self, component), name),
+                    lambda self, value: setattr(getattr(self, component), name, value))
+
+
+class Api:
+    def __init__(self, defer_startup=False, clock=None):
+        """
+        Args:
+            defer_startup: Skip loading auth data from tracker.db here; finish_startup()
+                           does it once the window is up
+            clock: Source of wall-clock and monotonic time (default: the system clock);
+                   tests pass a clock.SimulatedClock
+        """
+        self.clock = clock or system_clock
+        # Elapsed times are measured on the monotonic clock, which wall-clock changes don't
+        # affect and which stands still while the system is suspended; suspends are
+        # detected separately and booked as sleep time
+        self.suspend_detector = SuspendDetector(self.clock)
+        self.start_time = None
+        self.current_project = None
+        self.auth_token = None
+        self.user_data = None
+        self.session_id = None
+        self.sleep_time = 0
+        self.sleep_intervals = []  # Suspends since the last session update: [{start, end, seconds}]
+        self.start_boottime = None
+        self.user_note = "I am working on Task"
+        
+        # Window reference for UI interactions
+        self.window = None
+        
+        # Timer, stats and upload state pushed to the UI once it subscribed
+        # (subscribe_events); see ui_events.py
+        self.ui_events = UiEventChannel()
+        self.last_session_sync = None  # {'success', 'at'} of the last session update
+        
+        # Active/idle time and input counts (see activity.py); active_time, is_idle and
+        # the other activity attributes of Api are its state. Input that ends idleness
+        # wakes the idle monitor
+        self.activity = ActivityEngine(self.clock, on_active=lambda: self.idle_monitor.wake())
+        # Checks only when the idle state can change (see _next_activity_check_delay)
+        self.idle_monitor = IdleMonitor(self._activity_tick, self._next_activity_check_delay,
+                                        name='ActivityCheck')
+        
+        # System-wide activity tracking variables (pynput)
+        self.input_listener = InputListener(self._on_system_input, clock=self.clock.monotonic)
+        self.system_tracking_enabled = PYNPUT_AVAILABLE and (not platform.system() == 'Darwin' or MACOS_PERMISSIONS_CHECKED)
+        self.macos_permissions_checked = MACOS_PERMISSIONS_CHECKED
+        # Track if we've already prompted the user to open Input Monitoring settings this session
+        self.macos_permission_prompted = False
+        # Drop the hooks where the OS idle counter is exact (see config.py); the input
+        # rates then only count the app window's events
+        self.system_idle_replaces_input_hooks = SYSTEM_IDLE_REPLACES_INPUT_HOOKS
+        
+        # Delays of the periodic syncs: jitter, server interval hints, error backoff and
+        # a stretched cadence on battery (see SyncCadence)
+        self.sync_cadence = SyncCadence(
+            jitter=SYNC_JITTER,
+            max_backoff=SYNC_MAX_BACKOFF,
+            low_power_factor=LOW_POWER_FACTOR,
+            power_source=on_battery_power if LOW_POWER_ON_BATTERY else None,
+            clock=self.clock.monotonic
+        )
+        
+        # Stats update variables
+        self.stats_timer = None
+        self.stats_update_interval = 600  # 10 minutes in seconds
+        
+        # GET responses (profile, stats, release check) are cached in tracker.db
+        self.response_cache = ResponseCache(db, clock=self.clock.time)
+        
+        # Daily/weekly stats are computed locally and reconciled with the server in the background
+        self.stats_engine = LocalStatsEngine(
+            db,
+            session_provider=self._current_session_totals,
+            fetchers={'daily': self._fetch_daily_stats, 'weekly': self._fetch_weekly_stats},
+            max_age=self.stats_update_interval,
+            clock=self.clock.time,
+            on_reconciled=lambda period: self._publish_stats(),
+            # Local totals only count the logged-in user's time entries
+            employee_provider=lambda: (self.user_data or {}).get('employeeId')
+        )
+        
+        # Session update variables
+        self.session_update_timer = None
+        self.session_update_interval = 600  # 10 minutes in seconds
+        
+        # Crash recovery: the running session is checkpointed to tracker.db
+        self.checkpointer = SessionCheckpointer(db)
+        self.checkpoint_timer = None
+        self.checkpoint_interval = 30  # seconds between checkpoints
+        self.session_resume_window = 300  # resume orphaned sessions checkpointed this recently
+        
+        # Attach a compact latency/counter summary to session updates (opt-in)
+        self.share_client_metrics = SHARE_CLIENT_METRICS
+        
+        # Screenshot capture, background upload and collection (see screenshots.py);
+        # screenshots_for_session, upload_queue and the other screenshot attributes of
+        # Api are its state. Screenshots waiting for upload are spooled in DATA_DIR
+        self.screenshots = ScreenshotEngine(
+            self.clock,
+            spool_dir=os.path.join(DATA_DIR, 'screenshot_spool'),
+            session_id=lambda: self.session_id,
+            running=lambda: bool(self.start_time),
+            interval=self.session_update_interval,
+            on_upload_change=self._publish_upload_status
+        )
+        
+        # Application tracking (see apps.py); applications_usage and
+        # last_app_check_time are its state
+        self.app_tracker = ApplicationTracker(self.clock)
+        self.app_check_interval = 5  # seconds between application checks
+        self.app_timer = None
+        self.applications_for_session = []  # List to store applications for the current session update
+        
+        # Browser link tracking (see links.py); links_usage and last_link_check_time
+        # are its state
+        self.link_tracker = LinkTracker(self.clock, history_paths=self.get_browser_paths)
+        self.link_check_interval = 30  # seconds between link checks
+        self.link_timer = None
+        self.links_for_session = []  # List to store links for the current session update
+        
+        # macOS menu bar timer variables
+        self.menubar_item = None
+        self.menubar_update_thread = None
+        self.menubar_stop_event = threading.Event()
+        self._menubar_error_logged = False
+        self._menubar_delegate = None  # Keep a strong ref to menu delegate to avoid GC
+        
+        if not defer_startup:
+            self.load_auth_data()
+    
+    def finish_startup(self):
+        """Initialization that can wait until the window is shown
+        
+        Runs on a background thread started by webview.start(). Opens and migrates
+        tracker.db, loads the saved login and creates the macOS status bar item (on
+        the main thread).
+        """
+        tracer.mark('GUI loop started')
+        self.load_auth_data()
+        
+        menubar_created = threading.Event()
+        if platform.system() == 'Darwin' and _load_macos_menu_support() and HAVE_APPHELPER:
+            def create_menubar():
+                try:
+                    self._ensure_menubar_item()
+                finally:
+                    menubar_created.set()
+            try:
+                AppHelper.callAfter(create_menubar)
+            except Exception as e:
+                log.error('Failed to initialize macOS menu bar item at startup: %s', e)
+                menubar_created.set()
+        else:
+            menubar_created.set()
+        
+        # Startup ends with the menu bar item; write the trace if tracing is enabled
+        if tracer.enabled:
+            menubar_created.wait(5)
+            tracer.finish(default_path=os.path.join(DATA_DIR, 'startup_trace.json'))
+
+    @tracer.traced('Api.load_auth_data')
+    def load_auth_data(self):
+        """Load authentication data from the database"""
+        try:
+            # Ensure the database directory exists
+            os.makedirs(os.path.dirname(db_file), exist_ok=True)
+            
+            # Ensure the database schema is up to date (no-op when already migrated)
+            init_db()
+            
+            result = db.query_one('SELECT token, user_data FROM auth_data ORDER BY id DESC LIMIT 1')
+            if result:
+                self.auth_token = result[0]
+                try:
+                    user_data_str = result[1]
+                    log.debug('Raw user data from DB: %s...', user_data_str[:100])  # Print first 100 chars
+                    self.user_data = json.loads(user_data_str)
+                    log.info('Authentication data loaded successfully for user: %s', self.user_data.get('name', 'Unknown'))
+                    log.debug('Token length: %s, User data keys: %s', len(self.auth_token), list(self.user_data.keys()))
+                    return True
+                except json.JSONDecodeError as json_err:
+                    log.error('JSON decode error in auth data: %s', json_err)
+                    log.debug('Problematic JSON string: %s...', user_data_str[:100])
+                    self.auth_token = None
+                    self.user_data = None
+                    return False
+            log.info('No authentication data found in database')
+            return False
+        except sqlite3.Error as e:
+            log.error('SQLite error loading auth data: %s', e)
+            self.auth_token = None
+            self.user_data = None
+            return False
+        except Exception as e:
+            log.error('Unexpected error loading auth data: %s', e)
+            self.auth_token = None
+            self.user_data = None
+            return False
+
+    def save_auth_data(self, token, user_data):
+        """Save authentication data to the database"""
+        try:
+            # Ensure the database directory exists
+            os.makedirs(os.path.dirname(db_file), exist_ok=True)
+            
+            # Ensure the database schema is up to date (no-op when already migrated)
+            init_db()
+            
+            user_data_json = json.dumps(user_data)
+            
+            def replace_auth_data(conn):
+                # Clear existing data and save new data in one transaction
+                conn.execute('DELETE FROM auth_data')
+                conn.execute(
+                    'INSERT INTO auth_data (token, user_data) VALUES (?, ?)',
+                    (token, user_data_json)
+                )
+            
+            db.transaction(replace_auth_data)
+                
+            # Update in-memory state
+            self.auth_token = token
+            self.user_data = user_data
+            
+            log.info('Authentication data saved successfully for user: %s', user_data.get('name', 'Unknown'))
+            return True
+            
+        except sqlite3.Error as e:
+            log.error('SQLite error saving auth data: %s', e)
+            return False
+        except json.JSONDecodeError as e:
+            log.error('JSON encode error in auth data: %s', e)
+            return False
+        except Exception as e:
+            log.error('Unexpected error saving auth data: %s', e)
+            return False
+
+    def clear_auth_data(self):
+        """Clear authentication data from the database"""
+        try:
+            # Ensure the database exists before attempting to clear it
+            if os.path.exists(db_file):
+                db.execute('DELETE FROM auth_data')
+                log.info('Authentication data cleared successfully')
+            else:
+                log.info('No database file found to clear')
+                
+            # Clear in-memory state regardless of database operation
+            self.auth_token = None
+            self.user_data = None
+            return True
+            
+        except sqlite3.Error as e:
+            log.error('SQLite error clearing auth data: %s', e)
+            # Still clear in-memory state even if database operation fails
+            self.auth_token = None
+            self.user_data = None
+            return False
+        except Exception as e:
+            log.error('Unexpected error clearing auth data: %s', e)
+            # Still clear in-memory state even if operation fails
+            self.auth_token = None
+            self.user_data = None
+            return False
+
+    def login(self, email, password, remember_me=False):
+        """Login to the remote API and store the token if remember_me is True"""
+        try:
+            response = requests.post(
+                URLS["LOGIN"],
+                json={"email": email, "password": password},
+                headers={"Content-Type": "application/json"}
+            )
+            data = response.json()
+            
+            if data.get('success'):
+                # Store token and user data
+                token = data['data']['token']
+                user_data = data['data']['employee']
+                
+                # Only save auth data if remember_me is True
+                if remember_me:
+                    self.save_auth_data(token, user_data)
+                else:
+                    # If not remembering, just set in memory but don't save to database
+                    self.auth_token = token
+                    self.user_data = user_data
+                if self.window:
+                    self.window.evaluate_js('window.toastFromPython("Login successful!", "success")')
+                return {"success": True, "data": data['data']}
+            else:
+                return {"success": False, "message": data.get('message', 'Login failed')}
+        except Exception as e:
+            log.error('Login error: %s', e)
+            return {"success": False, "message": f"An error occurred during login: {str(e)}"}
+
+    def get_profile(self):
+        """Get user profile data using the stored token"""
+        if not self.auth_token:
+            return {"success": False, "message": "Not authenticated"}
+        
+        try:
+            # Get employee ID from stored user data
+            employee_id = self.user_data.get('employeeId')
+            if not employee_id:
+                return {"success": False, "message": "Employee ID not found"}
+                
+            ttl, stale = CACHE_TTLS['PROFILE']
+            response = self.response_cache.get(
+                f"{URLS['PROFILE']}/{employee_id}",
+                headers={
+                    "Authorization": f"Bearer {self.auth_token}",
+                    "Content-Type": "application/json"
+                },
+                ttl=ttl,
+                stale=stale,
+                cacheable=lambda r: r.json().get('success')
+            )
+            data = response.json()
+            
+            if data.get('success'):
+                return {"success": True, "data": data['data']}
+            else:
+                return {"success": False, "message": data.get('message', 'Failed to get profile')}
+        except Exception as e:
+            log.error('Profile error: %s', e)
+            return {"success": False, "message": f"An error occurred: {str(e)}"}
+
+    def logout(self):
+        """Logout and clear stored authentication data"""
+        result = self.clear_auth_data()
+        self.stats_engine.invalidate()
+        # Profile and stats responses belong to the user who logged out
+        for key in ('PROFILE', 'DAILY_STATS', 'WEEKLY_STATS'):
+            self.response_cache.clear(prefix=URLS[key])
+        return {"success": result}
+
+    def reload_auth_data(self):
+        """Force a reload of authentication data from the database"""
+        log.debug('Forcing reload of authentication data from database')
+        result = self.load_auth_data()
+        return {"success": result, "authenticated": self.auth_token is not None}
+        
+    def is_authenticated(self):
+        """Check if user is authenticated"""
+        is_auth = self.auth_token is not None
+        log.debug('Authentication check: token exists = %s', is_auth)
+        if is_auth and self.user_data:
+            log.debug('User data available for: %s', self.user_data.get('name', 'Unknown'))
+        return {"authenticated": is_auth, "user_data_available": self.user_data is not None}
+
+    def get_current_user(self):
+        """Get current user data"""
+        log.debug('get_current_user called, user_data exists: %s', self.user_data is not None)
+        if self.user_data:
+            # Make a copy to ensure we're not returning a reference that might be modified
+            user_data_copy = json.loads(json.dumps(self.user_data))
+            log.debug('Returning user data for: %s', user_data_copy.get('name', 'Unknown'))
+            return {"success": True, "user": user_data_copy}
+        log.debug('No user data available when get_current_user was called')
+        return {"success": False, "message": "No user data available"}
+        
+    def get_current_session_time(self):
+        """Get the current elapsed time for the active session in seconds"""
+        if self.start_time is None:
+            return {
+                "success": False,
+                "message": "No active session",
+                "elapsed_time": 0
+            }
+        
+        elapsed_time = int(self._session_elapsed())
+        
+        return {
+            "success": True,
+            "elapsed_time": elapsed_time
+        }
+    
+    def subscribe_events(self):
+        """Push state updates to the UI from now on
+        
+        Updates arrive at window.receiveFromPython as {seq, events: {topic: state}},
+        coalesced and batched (see UiEventChannel). Topics:
+            session: running, session_id, elapsed_time, is_idle
+            stats: daily and weekly, as returned by get_stats
+            uploads: pending, uploaded, gave_up, last_session_sync
+        
+        Returns:
+            dict: success and state, the current state of every topic
+        """
+        if not self.window:
+            return {"success": False, "message": "No window"}
+        self._publish_session_state()
+        self._publish_stats()
+        self._publish_upload_status()
+        state = self.ui_events.snapshot()
+        self.ui_events.attach(self.window)
+        return {"success": True, "state": state}
+
+    def unsubscribe_events(self):
+        """Stop pushing state updates to the UI"""
+        self.ui_events.detach()
+        return {"success": True}
+
+    def _publish_session_state(self):
+        """Push the timer state to the UI"""
+        running = self.start_time is not None
+        self.ui_events.publish('session', {
+            "running": running,
+            "session_id": self.session_id if running else None,
+            "elapsed_time": int(self._session_elapsed()) if running else 0,
+            "is_idle": self.is_idle if running else False
+        })
+    
+    def _publish_stats(self):
+        """Push the daily/weekly stats to the UI"""
+        self.ui_events.publish('stats', self.get_stats())
+    
+    def _publish_upload_status(self):
+        """Push the screenshot queue and session update status to the UI"""
+        queue = self.upload_queue.get_metrics()
+        self.ui_events.publish('uploads', {
+            "pending": queue['pending'] + queue['in_flight'],
+            "uploaded": queue['uploaded'],
+            "gave_up": queue['gave_up'],
+            "last_session_sync": self.last_session_sync
+        })
+    
+    def _record_session_sync(self, success):
+        """Remember the outcome of a session update for the UI"""
+        self.last_session_sync = {"success": success, "at": self.clock.time()}
+        self._publish_upload_status()
+
+    def test_long_error_message(self):
+        """Test function to simulate a long error message"""
+        # Simulate a long error message for testing the UI
+        long_message = "Employee already has an active session. Please stop the current session before starting a new one. Active session ID: jhbasuydgfbyus6854657234jbhj"
+        window.evaluate_js('window.toastFromPython("Test long error message", "error")')
+        return {"success": False, "message": long_message}
+
+    def create_session(self, user_note="I am working on Task"):
+        """Create a new session via API
+        
+        Args:
+            user_note: User's note about what they're working on
+        """
+        if not self.auth_token:
+            if self.window:
+                self.window.evaluate_js('window.toastFromPython("Not authenticated. Please log in.", "error")')
+                #window.evaluate_js('window.toastFromPython("Not authenticated. Please log in.", "error")')
+            return {"success": False, "message": "Not authenticated"}
+        
+        try:
+            # Get employee and company IDs
+            employee_id = self.user_data.get('employeeId')
+            company_id = None
+            
+            # Try to get company ID from user data first
+            if self.user_data.get('companyId'):
+                if isinstance(self.user_data['companyId'], dict):
+                    company_id = self.user_data['companyId'].get('_id')
+                else:
+                    company_id = self.user_data['companyId']
+            
+            if not employee_id or not company_id:
+                # If not found in user_data, try to get from profile
+                profile = self.get_profile()
+                if profile.get('success') and profile.get('data'):
+                    if not employee_id:
+                        employee_id = profile['data'].get('_id')
+                    if not company_id and profile['data'].get('companyId'):
+                        if isinstance(profile['data']['companyId'], dict):
+                            company_id = profile['data']['companyId'].get('_id')
+                        else:
+                            company_id = profile['data']['companyId']
+            
+            if not employee_id or not company_id:
+                if self.window:
+                    self.window.evaluate_js('window.toastFromPython("Employee ID or Company ID not found. Please check your profile.", "error")')
+                return {"success": False, "message": "Employee ID or Company ID not found"}
+
+
+            # Step 1: get local time with tz info (e.g., Dhaka time if user machine is set to Dhaka timezone)
+            local_time = self.clock.now().astimezone()
+
+            # Step 2: convert local time to UTC
+            utc_time = local_time.astimezone(timezone.utc)
+
+            # Step 3: format UTC time as ISO string for backend
+            start_time = utc_time.isoformat(timespec='milliseconds').replace('+00:00', 'Z')
+
+            # Create session data
+            #start_time = datetime.now(timezone.utc).isoformat(timespec='milliseconds').replace('+00:00', 'Z')
+
+            session_data = {
+                "employeeId": employee_id,
+                "companyId": company_id,
+                "startTime": start_time,
+                "notes": "Session from RI Tracker Lite APP v1.",
+                "userNote": user_note
+                # "timezone": "America/New_York"
+                #"timezone": "UTC"
+            }
+            
+            # Send request to create session
+            response = requests.post(
+                URLS["SESSIONS"],
+                json=session_data,
+                headers={
+                    "Authorization": f"Bearer {self.auth_token}",
+                    "Content-Type": "application/json"
+                }
+            )
+            
+            data = response.json()
+            
+            if data.get('success'):
+                self.session_id = data['data']['_id']
+                return {"success": True, "data": data['data']}
+            else:
+                error_message = data.get('message', 'Failed to create session')
+                # Check if the error message contains information about an active session
+                if "active session" in error_message.lower():
+                    # Format the message to be more readable
+                    error_message = f"Employee already has an active session. Please stop the current session before starting a new one. Active session ID: {error_message.split('ID:')[-1].strip() if 'ID:' in error_message else 'Unknown'}"
+                
+                # window.evaluate_js('window.toastFromPython("Failed to create session!", "error")')
+                # return {"success": False, "message": error_message}
+                if self.window:
+                    self.window.evaluate_js('window.toastFromPython("Failed to create session!", "error")')
+                return {"success": False, "message": error_message}
+        except Exception as e:
+            log.error('Create session error: %s', e)
+            if self.window:
+                self.window.evaluate_js('window.toastFromPython("Failed to create session!", "error")')
+            return {"success": False, "message": f"An error occurred: {str(e)}"}
+    
+    @metrics.timed('session.update')
+    def update_session(self, active_time, idle_time=0, keyboard_rate=0, mouse_rate=0, is_final_update=False, user_note="I am working on Task", end_time=None, sleep_time=0):
+        """Update an existing session via API
+        
+        Args:
+            active_time: Time spent actively working (in seconds)
+            idle_time: Time spent idle (in seconds)
+            keyboard_rate: Keyboard activity rate (events per minute)
+            mouse_rate: Mouse activity rate (events per minute)
+            is_final_update: Whether this is the final update (when timer is stopped)
+            user_note: User's note about what they're working on
+            end_time: Session end as epoch seconds for final updates (default: now)
+            sleep_time: Time the system was suspended during the session (in seconds)
+        """
+        if not self.auth_token or not self.session_id:
+            return {"success": False, "message": "Not authenticated or no active session"}
+        
+        try:
+            # Step 1: get local time with tz info (e.g., Dhaka time if user machine is set to Dhaka timezone)
+            if end_time is None:
+                local_time = self.clock.now().astimezone()
+            else:
+                local_time = datetime.fromtimestamp(end_time).astimezone()
+
+            # Step 2: convert local time to UTC
+            utc_time = local_time.astimezone(timezone.utc)
+
+            # Step 3: format UTC time as ISO string for backend
+            end_time = utc_time.isoformat(timespec='milliseconds').replace('+00:00', 'Z')
+
+            # Create session update data
+            # end_time = datetime.now(timezone.utc).isoformat(timespec='milliseconds').replace('+00:00', 'Z')
+
+            # Collect screenshots uploaded in the background since the last update
+            screenshots_data = self.screenshots.collect(self.session_id, final=is_final_update)
+            
+            update_data = self._build_session_update(
+                active_time, idle_time, keyboard_rate, mouse_rate, screenshots_data,
+                user_note, end_time=end_time if is_final_update else None, sleep_time=sleep_time
+            )
+            log.debug('Update session data prepared: %s screenshots, %s applications, %s links',
+                      len(screenshots_data), len(update_data["applications"]), len(update_data["links"]))
+            
+            # Send request to update session with timeout
+            # Use a 30-second timeout to prevent hanging for long-running sessions
+            with metrics.timer('session.update.request'):
+                response = requests.patch(
+                    f'{URLS["SESSIONS"]}/{self.session_id}',
+                    json=update_data,
+                    headers={
+                        "Authorization": f"Bearer {self.auth_token}",
+                        "Content-Type": "application/json"
+                    },
+                    # timeout=30  # 30 second timeout
+                )
+            
+            # Server errors back off the next update; Retry-After and interval hints are honored
+            self.sync_cadence.record_response('session', response.status_code, response.headers)
+            data = response.json()
+            self.sync_cadence.apply_hints('session', data)
+            metrics.counter('session.update.ok' if data.get('success') else 'session.update.failed').inc()
+            
+            self._record_session_sync(bool(data.get('success')))
+            if data.get('success'):
+                # Only reset session_id if this is the final update
+                if is_final_update:
+                    self.session_id = None
+                return {"success": True, "data": data['data']}
+            else:
+                # return {"success": False, "message": data.get('message', 'Failed to update session')}
+                error_message = data.get('message', 'Failed to update session')
+                if self.window:
+                    self.window.evaluate_js('window.toastFromPython("Failed to update session!", "error")')
+                return {"success": False, "message": error_message}
+        # except requests.exceptions.Timeout:
+        #     print("Update session timeout: Request timed out after 30 seconds")
+        #     # For final updates, we should still consider the timer stopped locally
+        #     if is_final_update:
+        #         self.session_id = None
+        #     return {"success": False, "message": "Request timed out. The server took too long to respond."}
+        # except requests.exceptions.ConnectionError:
+        #     print("Update session connection error: Failed to connect to the server")
+        #     # For final updates, we should still consider the timer stopped locally
+        #     if is_final_update:
+        #         self.session_id = None
+        #     return {"success": False, "message": "Connection error. Failed to connect to the server."}
+        # except requests.exceptions.RequestException as e:
+        #     print(f"Update session request error: {e}")
+        #     # For final updates, we should still consider the timer stopped locally
+        #     if is_final_update:
+        #         self.session_id = None
+        #     return {"success": False, "message": f"Request error: {str(e)}"}
+        except Exception as e:
+            log.error('Update session error: %s', e)
+            metrics.counter('session.update.failed').inc()
+            self.sync_cadence.record_failure('session')
+            self._record_session_sync(False)
+            # For final updates, we should still consider the timer stopped locally
+            # if is_final_update:
+            #     self.session_id = None
+            if self.window:
+                self.window.evaluate_js('window.toastFromPython("Failed to update session!", "error")')
+            return {"success": False, "message": f"An error occurred: {str(e)}"}
+    
+    def _build_session_update(self, active_time, idle_time, keyboard_rate, mouse_rate, screenshots_data,
+                              user_note, end_time=None, sleep_time=0):
+        """Build the PATCH body of a session update
+        
+        Args:
+            screenshots_data: Uploaded screenshots ({url, timestamp}) to send
+            end_time: ISO end time; only set for the final update (timer stopped)
+            sleep_time: Seconds the system was suspended during the session; the
+                        suspends since the last update are sent as sleepIntervals
+            
+        Returns:
+            dict: The session update payload
+        """
+        # Get application usage data
+        applications_data = self.prepare_applications_for_session()
+        
+        # Get link usage data
+        links_data = self.prepare_links_for_session()
+        
+        update_data = {
+            "activeTime": active_time,
+            "idleTime": idle_time,
+            "sleepTime": sleep_time,
+            "sleepIntervals": list(self.sleep_intervals),
+            "keyboardActivityRate": keyboard_rate,
+            "mouseActivityRate": mouse_rate,
+            "screenshots": screenshots_data,
+            "applications": applications_data,
+            "links": links_data,
+            "notes": "Session from RI Tracker Lite APP v1.",
+            "userNote": user_note
+            # "timezone": "UTC"
+        }
+
+        # Only include endTime when this is the final update (timer is stopped)
+        if end_time is not None:
+            update_data["endTime"] = end_time
+        if self.share_client_metrics:
+            update_data["clientMetrics"] = self._client_metrics()
+        return update_data
+    
+    def start_stats_updates(self):
+        """Start periodic stats updates"""
+        if self.stats_timer:
+            return
+            
+        def update_stats():
+            if not self.start_time:
+                return
+                
+            # Refresh the server baseline; the UI gets the local numbers now and the
+            # server's once they arrive (on_reconciled)
+            self.stats_engine.reconcile()
+            self._publish_stats()
+            
+            # Schedule the next update if timer is still running
+            if self.start_time:
+                self.stats_timer = threading.Timer(self.sync_cadence.next_delay('stats', self.stats_update_interval), update_stats)
+                self.stats_timer.daemon = True
+                self.stats_timer.start()
+        
+        # Start the stats update timer
+        self.stats_timer = threading.Timer(self.sync_cadence.next_delay('stats', self.stats_update_interval), update_stats)
+        self.stats_timer.daemon = True
+        self.stats_timer.start()
+        
+        # Get initial stats
+        daily_stats = self.get_daily_stats()
+        weekly_stats = self.get_weekly_stats()
+        return {"daily": daily_stats, "weekly": weekly_stats}
+    
+    def stop_stats_updates(self):
+        """Stop periodic stats updates"""
+        if self.stats_timer:
+            self.stats_timer.cancel()
+            self.stats_timer = None
+            
+    def start_session_updates(self):
+        """Start periodic session updates"""
+        if self.session_update_timer:
+            return
+            
+        def update_session_periodically():
+            if not self.start_time:
+                return
+                
+            # Book a suspend that ended since the last activity check as sleep
+            self._check_suspend()
+            
+            # Update activity metrics
+            self.update_activity_metrics()
+            
+            # Book the time since the last activity check
+            self.activity.book()
+            
+            # Update the session with current metrics (not final update)
+            result = self.update_session(
+                active_time=int(self.active_time),
+                idle_time=int(self.idle_time),
+                keyboard_rate=self.keyboard_activity_rate,
+                mouse_rate=self.mouse_activity_rate,
+                is_final_update=False,
+                user_note=self.user_note if hasattr(self, 'user_note') else "I am working on Task",
+                sleep_time=int(self.sleep_time)
+            )
+            
+            # Clear the screenshots array for the next interval
+            self.screenshots_for_session = []
+            
+            # Suspends of this interval were sent
+            self.sleep_intervals = []
+            
+            # Clear the applications usage data for the next interval
+            self.applications_usage = {}
+            
+            # Clear the links usage data for the next interval
+            self.links_usage = {}
+            
+            # The interval was sent; drop it from the checkpoint right away so a crash
+            # now doesn't send it twice
+            if result.get("success"):
+                self.checkpoint_session()
+            
+            # Schedule the next update if timer is still running, with a screenshot
+            # plan covering the interval until then
+            if self.start_time:
+                delay = self._next_session_update_delay()
+                self.schedule_screenshot()
+                self.session_update_timer = threading.Timer(delay, update_session_periodically)
+                self.session_update_timer.daemon = True
+                self.session_update_timer.start()
+        
+        # Start the session update timer and schedule the first screenshot
+        delay = self._next_session_update_delay()
+        self.session_update_timer = threading.Timer(delay, update_session_periodically)
+        self.session_update_timer.daemon = True
+        self.session_update_timer.start()
+        self.schedule_screenshot()
+    
+    def _next_session_update_delay(self):
+        """Delay until the next periodic session update; the screenshot plan follows it"""
+        delay = self.sync_cadence.next_delay('session', self.session_update_interval)
+        self.screenshots.scheduler.interval = delay
+        return delay
+        
+    def stop_session_updates(self):
+        """Stop periodic session updates"""
+        if self.session_update_timer:
+            self.session_update_timer.cancel()
+            self.session_update_timer = None
+        
+        # Also stop any pending screenshots
+        self.screenshots.scheduler.stop()
+    
+    def _checkpoint_state(self, current_time=None):
+        """Snapshot of the running session for the checkpointer"""
+        current_time = self.clock.time() if current_time is None else current_time
+        totals = self._current_session_totals() or {'active': self.active_time, 'idle': self.idle_time}
+        return {
+            'checkpoint_at': current_time,
+            'active_seconds': totals['active'],
+            'idle_seconds': totals['idle'],
+            'sleep_seconds': self.sleep_time,
+            'keyboard_events': self.keyboard_events,
+            'mouse_events': self.mouse_events,
+            'keyboard_rate': self.keyboard_activity_rate,
+            'mouse_rate': self.mouse_activity_rate,
+            'applications': self.app_tracker.to_checkpoint(),
+            'links': self.link_tracker.to_checkpoint(),
+            # Uploads of this interval wait in the queue until the next session update
+            'screenshots': self.screenshots.pending(self.session_id)
+        }
+    
+    def checkpoint_session(self):
+        """Write a checkpoint of the running session to tracker.db"""
+        if not self.start_time or not self.session_id:
+            return 0
+        try:
+            return self.checkpointer.checkpoint(self._checkpoint_state())
+        except Exception as e:
+            log.error('Error checkpointing session: %s', e)
+            return 0
+    
+    def start_checkpoints(self):
+        """Start periodic session checkpoints"""
+        if self.checkpoint_timer:
+            return
+        
+        def checkpoint_periodically():
+            if not self.start_time:
+                return
+            
+            self.checkpoint_session()
+            
+            # Schedule the next checkpoint if timer is still running
+            if self.start_time:
+                self.checkpoint_timer = threading.Timer(self.checkpoint_interval, checkpoint_periodically)
+                self.checkpoint_timer.daemon = True
+                self.checkpoint_timer.start()
+        
+        self.checkpoint_timer = threading.Timer(self.checkpoint_interval, checkpoint_periodically)
+        self.checkpoint_timer.daemon = True
+        self.checkpoint_timer.start()
+    
+    def stop_checkpoints(self):
+        """Stop periodic session checkpoints"""
+        if self.checkpoint_timer:
+            self.checkpoint_timer.cancel()
+            self.checkpoint_timer = None
+    
+    def recover_orphaned_session(self):
+        """Resume or close a session left open by a crash or force-quit
+        
+        A session whose last checkpoint is within self.session_resume_window seconds
+        (and that belongs to the logged-in user) is resumed: tracking continues with the
+        same server session and the time the app was not running counts as idle. Any
+        other orphaned session is closed on the server with the totals and the endTime
+        of its last checkpoint and stored in time_entries; screenshots of it left in
+        the upload spool are sent with that final update. Spooled screenshots of
+        sessions without a checkpoint were finished earlier and are discarded.
+        
+        Returns:
+            dict: {"success", "resumed": session id or None, "finalized": [session ids]}
+        """
+        if self.start_time:
+            return {"success": False, "message": "A session is already running"}
+        try:
+            checkpoints = self.checkpointer.load()
+        except Exception as e:
+            log.error('Error loading session checkpoints: %s', e)
+            return {"success": False, "message": str(e)}
+        if not checkpoints:
+            self._discard_finished_uploads(set())
+            return {"success": True, "resumed": None, "finalized": []}
+        if not self.auth_token:
+            # Keep the checkpoints until someone logs in
+            return {"success": False, "message": "Not authenticated"}
+        
+        employee_id = (self.user_data or {}).get('employeeId')
+        now = self.clock.time()
+        latest = checkpoints[-1]
+        resumable = (not latest['stopped']
+                     and latest['employee_id'] == employee_id
+                     and now - latest['checkpoint_at'] <= self.session_resume_window)
+        
+        finalized = []
+        for checkpoint in checkpoints:
+            if resumable and checkpoint is latest:
+                continue
+            if checkpoint['employee_id'] not in (None, employee_id):
+                # Another user's session; it can only be closed with their token
+                continue
+            if self._finalize_orphaned_session(checkpoint):
+                finalized.append(checkpoint['session_id'])
+        
+        resumed = None
+        if resumable:
+            self._resume_orphaned_session(latest, now)
+            resumed = latest['session_id']
+        # Sessions that were skipped or failed to finalize keep their screenshots
+        self._discard_finished_uploads({checkpoint['session_id'] for checkpoint in checkpoints
+                                        if checkpoint['session_id'] not in finalized})
+        return {"success": True, "resumed": resumed, "finalized": finalized}
+    
+    def _discard_finished_uploads(self, keep):
+        """Drop spooled screenshots of sessions nobody will send them with
+        
+        Args:
+            keep (set): Session ids besides the running one whose screenshots stay
+        """
+        # Starting the queue recovers the spool of earlier runs
+        self.upload_queue.start()
+        cancelled = self.upload_queue.cancel_sessions_except(keep | {self.session_id})
+        if cancelled:
+            log.info('Discarded spooled screenshots of %s finished session(s)', len(cancelled))
+    
+    def _finalize_orphaned_session(self, checkpoint):
+        """Close an orphaned session with the data of its last checkpoint"""
+        session_id = checkpoint['session_id']
+        ended_at = checkpoint['checkpoint_at']
+        active = int(checkpoint['active_seconds'] or 0)
+        idle = int(checkpoint['idle_seconds'] or 0)
+        sleep = int(checkpoint['sleep_seconds'] or 0)
+        log.info('Finalizing orphaned session %s at its last checkpoint', session_id)
+        
+        # update_session sends the session's state, so load the checkpoint into it
+        self.session_id = session_id
+        self.app_tracker.restore(checkpoint['applications'])
+        self.link_tracker.restore(checkpoint['links'])
+        self.screenshots_for_session = []
+        self.screenshots.add(checkpoint['screenshots'])
+        # There is no next update to carry late uploads, so (off the UI path, at
+        # startup) give the spooled screenshots of the session time to go out
+        self.upload_queue.start()
+        self.upload_queue.flush(timeout=15)
+        try:
+            result = self.update_session(
+                active_time=active,
+                idle_time=idle,
+                keyboard_rate=checkpoint['keyboard_rate'] or 0,
+                mouse_rate=checkpoint['mouse_rate'] or 0,
+                is_final_update=True,
+                user_note=checkpoint['user_note'] or "I am working on Task",
+                end_time=ended_at,
+                sleep_time=sleep
+            )
+        finally:
+            self.session_id = None
+            self.applications_usage = {}
+            self.links_usage = {}
+            self.screenshots_for_session = []
+        
+        if not result.get("success"):
+            log.error('Failed to finalize orphaned session %s: %s', session_id, result.get('message'))
+            return False
+        
+        # Sessions stopped locally were already stored when they were stopped
+        if not checkpoint['stopped']:
+            record_time_entry(
+                db, checkpoint['project_name'], ended_at, active + idle,
+                session_id=session_id, active_seconds=active, idle_seconds=idle, sleep_seconds=sleep,
+                employee_id=checkpoint['employee_id']
+            )
+        self.upload_queue.cancel_session(session_id)
+        self.checkpointer.finish(session_id)
+        return True
+    
+    def _resume_orphaned_session(self, checkpoint, current_time):
+        """Continue tracking an orphaned session"""
+        log.info('Resuming orphaned session %s', checkpoint['session_id'])
+        self._reset_session_state(checkpoint['project_name'], checkpoint['user_note'] or "I am working on Task",
+                                  current_time)
+        self.session_id = checkpoint['session_id']
+        self.start_time = checkpoint['start_time']
+        self.start_boottime = self.clock.boottime() - max(0, current_time - self.start_time)
+        # Nothing was tracked while the app was not running
+        self.active_time = checkpoint['active_seconds'] or 0
+        self.idle_time = (checkpoint['idle_seconds'] or 0) + max(0, current_time - checkpoint['checkpoint_at'])
+        self.sleep_time = checkpoint['sleep_seconds'] or 0
+        self.keyboard_events = checkpoint['keyboard_events'] or 0
+        self.mouse_events = checkpoint['mouse_events'] or 0
+        self.app_tracker.restore(checkpoint['applications'])
+        self.link_tracker.restore(checkpoint['links'])
+        self.screenshots_for_session = []
+        self.screenshots.add(checkpoint['screenshots'])
+        self.checkpointer.adopt(checkpoint)
+        self._start_trackers()
+        self._publish_session_state()
+    
+    def take_screenshot(self):
+        """Take a screenshot of all monitors (see ScreenshotEngine.take)
+        
+        Returns:
+            str: Path to the temporary file containing the screenshot, or None if the capture failed
+        """
+        return self.screenshots.take()
+    
+    def upload_screenshot(self, screenshot_path, timestamp=None, cleanup=True):
+        """Upload a screenshot to the file server (see ScreenshotEngine.upload)
+        
+        Args:
+            screenshot_path (str): Path to the screenshot file to upload
+            timestamp (str): Capture timestamp; defaults to the last screenshot_timestamp
+            cleanup (bool): Delete the file after the upload attempt
+            
+        Returns:
+            dict: Dictionary containing the URL and timestamp of the uploaded screenshot,
+                  or None if the upload failed
+        """
+        return self.screenshots.upload(screenshot_path, timestamp=timestamp, cleanup=cleanup)
+    
+    def capture_and_enqueue_screenshot(self):
+        """Take a screenshot and hand it to the background upload queue
+        
+        Returns:
+            bool: True if the screenshot was captured and queued
+        """
+        return self.screenshots.capture_and_enqueue()
+    
+    def get_screenshot_upload_status(self):
+        """Get counters of the background screenshot upload queue and the screen grabber"""
+        status = self.screenshots.get_status()
+        return {
+            "success": True,
+            "metrics": status["queue"],
+            "capture": status["capture"],
+            "progress": status["progress"],
+            "schedule": status["schedule"]
+        }
+            
+    def schedule_screenshot(self):
+        """Plan the screenshots of the next session interval
+        
+        The screenshot scheduler picks self.screenshots_per_interval random capture times
+        (one per equal slice of the window between self.screenshot_min_interval and
+        self.screenshot_max_interval) and takes them on its own thread. Failed captures are
+        retried, so every interval reaches its quota before the session update is built.
+        The screenshots are handed to the background upload queue and collected by the
+        next session update.
+        
+        Calling this again replaces the remaining plan of the previous interval.
+        
+        Returns:
+            None
+        """
+        if not self.start_time:
+            log.info('Cannot schedule screenshot: Timer not running')
+            return
+        
+        self.screenshots.plan_interval()
+    
+    def _session_elapsed(self):
+        """Seconds since the session started, including suspends but not clock changes"""
+        return max(0.0, self.clock.boottime() - self.start_boottime)
+    
+    def _check_suspend(self):
+        """Book a system suspend detected since the last check as sleep time
+        
+        Returns:
+            float: Seconds slept (0 if there was no suspend)
+        """
+        suspend = self.suspend_detector.poll()
+        if suspend is None or not self.start_time:
+            return 0
+        start, end = suspend
+        seconds = end - start
+        self.sleep_time += seconds
+        self.sleep_intervals.append({
+            "start": datetime.fromtimestamp(start, timezone.utc).isoformat(timespec='milliseconds').replace('+00:00', 'Z'),
+            "end": datetime.fromtimestamp(end, timezone.utc).isoformat(timespec='milliseconds').replace('+00:00', 'Z'),
+            "seconds": int(round(seconds))
+        })
+        metrics.counter('session.suspends').inc()
+        log.info('System was suspended for %.0f seconds; booked as sleep time', seconds)
+        return seconds
+    
+    def _format_elapsed(self):
+        if not self.start_time:
+            return "00:00:00"
+        elapsed = int(self._session_elapsed())
+        h = elapsed // 3600
+        m = (elapsed % 3600) // 60
+        s = elapsed % 60
+        return f"{h:02d}:{m:02d}:{s:02d}"
+
+    @tracer.traced('Api._ensure_menubar_item')
+    def _ensure_menubar_item(self):
+        """Create macOS menu bar status item if available and not already created.
+        Also attach a small menu with Open App and Quit actions.
+        """
+        if not (platform.system() == 'Darwin' and _load_macos_menu_support()):
+            return
+        try:
+            # Create status item if needed
+            if self.menubar_item is None:
+                status_bar = AppKit.NSStatusBar.systemStatusBar()
+                self.menubar_item = status_bar.statusItemWithLength_(AppKit.NSVariableStatusItemLength)
+
+            # Set initial title
+            initial = self._format_elapsed()
+            try:
+                if hasattr(self.menubar_item, 'button') and self.menubar_item.button() is not None:
+                    self.menubar_item.button().setTitle_(initial)
+                else:
+                    self.menubar_item.setTitle_(initial)
+            except Exception:
+                self.menubar_item.setTitle_(initial)
+
+            # Optional tooltip
+            try:
+                self.menubar_item.setToolTip_("RI Tracker - Timer")
+            except Exception:
+                pass
+
+            # Attach dropdown menu with actions
+            try:
+                # Create delegate once and keep a strong reference
+                if self._menubar_delegate is None and 'RiMenuDelegate' in globals():
+                    self._menubar_delegate = RiMenuDelegate.alloc().initWithApi_(self)
+                    # Let the screenshot grabber know when the display layout changes
+                    try:
+                        AppKit.NSNotificationCenter.defaultCenter().addObserver_selector_name_object_(
+                            self._menubar_delegate,
+                            "screensChanged:",
+                            AppKit.NSApplicationDidChangeScreenParametersNotification,
+                            None
+                        )
+                    except Exception as e:
+                        log.error('Failed to observe display changes: %s', e)
+
+                menu = AppKit.NSMenu.alloc().init()
+                open_item = AppKit.NSMenuItem.alloc().initWithTitle_action_keyEquivalent_("Open App", "openApp:", "")
+                quit_item = AppKit.NSMenuItem.alloc().initWithTitle_action_keyEquivalent_("Quit", "quitApp:", "")
+                if self._menubar_delegate is not None:
+                    open_item.setTarget_(self._menubar_delegate)
+                    quit_item.setTarget_(self._menubar_delegate)
+                menu.addItem_(open_item)
+                menu.addItem_(quit_item)
+                self.menubar_item.setMenu_(menu)
+            except Exception as e:
+                if not self._menubar_error_logged:
+                    log.error('Failed to attach macOS status bar menu: %s', e)
+                    self._menubar_error_logged = True
+        except Exception as e:
+            if not self._menubar_error_logged:
+                log.error('Failed to create macOS status bar item: %s', e)
+                self._menubar_error_logged = True
+
+    def _update_menubar_title(self, text):
+        """Thread-safe update for status item title on macOS."""
+        if not self.menubar_item:
+            return
+        try:
+            if HAVE_APPHELPER:
+                # Schedule on main thread
+                try:
+                    if hasattr(self.menubar_item, 'button') and self.menubar_item.button() is not None:
+                        AppHelper.callAfter(self.menubar_item.button().setTitle_, text)
+                    else:
+                        AppHelper.callAfter(self.menubar_item.setTitle_, text)
+                except Exception:
+                    AppHelper.callAfter(self.menubar_item.setTitle_, text)
+            else:
+                # Best-effort direct call
+                try:
+                    if hasattr(self.menubar_item, 'button') and self.menubar_item.button() is not None:
+                        self.menubar_item.button().setTitle_(text)
+                    else:
+                        self.menubar_item.setTitle_(text)
+                except Exception:
+                    self.menubar_item.setTitle_(text)
+        except Exception as e:
+            if not self._menubar_error_logged:
+                log.error('Failed to update macOS status bar title: %s', e)
+                self._menubar_error_logged = True
+
+    def _start_menubar_updates(self):
+        if not (platform.system() == 'Darwin' and _load_macos_menu_support()):
+            return
+        self._ensure_menubar_item()
+        # If already running, do nothing
+        if self.menubar_update_thread and self.menubar_update_thread.is_alive():
+            return
+        self.menubar_stop_event.clear()
+        def runner():
+            while not self.menubar_stop_event.is_set() and self.start_time:
+                text = self._format_elapsed()
+                self._update_menubar_title(text)
+                # Wait up to 1 second, exit early if stop requested
+                if self.menubar_stop_event.wait(1.0):
+                    break
+        self.menubar_update_thread = threading.Thread(target=runner, name="MenuBarTimer", daemon=True)
+        self.menubar_update_thread.start()
+
+    def _stop_menubar_updates(self):
+        if not (platform.system() == 'Darwin' and _MAC_MENU_LOADED and MAC_MENU_AVAILABLE):
+            return
+        try:
+            self.menubar_stop_event.set()
+            if self.menubar_update_thread and self.menubar_update_thread.is_alive():
+                self.menubar_update_thread.join(timeout=1.5)
+        except Exception:
+            pass
+        # Keep the status item visible but reset title
+        try:
+            if self.menubar_item is not None:
+                text = "00:00:00"
+                if HAVE_APPHELPER:
+                    try:
+                        if hasattr(self.menubar_item, 'button') and self.menubar_item.button() is not None:
+                            AppHelper.callAfter(self.menubar_item.button().setTitle_, text)
+                        else:
+                            AppHelper.callAfter(self.menubar_item.setTitle_, text)
+                    except Exception:
+                        AppHelper.callAfter(self.menubar_item.setTitle_, text)
+                else:
+                    try:
+                        if hasattr(self.menubar_item, 'button') and self.menubar_item.button() is not None:
+                            self.menubar_item.button().setTitle_(text)
+                        else:
+                            self.menubar_item.setTitle_(text)
+                    except Exception:
+                        self.menubar_item.setTitle_(text)
+        except Exception as e:
+            if not self._menubar_error_logged:
+                log.error('Failed to reset macOS status bar title: %s', e)
+                self._menubar_error_logged = True
+        self.menubar_update_thread = None
+
+    def start_timer(self, project_name, user_note="I am working on Task"):
+        """Start the timer and create a new session
+
+        Args:
+            project_name: The name of the project
+            user_note: User's note about what they're working on
+        """
+        # On macOS, do not attempt Input Monitoring; rely on browser events
+        if platform.system() == 'Darwin':
+            self.system_tracking_enabled = False
+            self.macos_permissions_checked = False
+            # Informative log only; no prompts
+            log.info('macOS detected: Skipping Input Monitoring. Using browser events for activity tracking.')
+
+        # First, try to create the session via API
+        result = self.create_session(user_note)
+        
+        # If session creation failed, do not start any timers or menu bar updates
+        if not result.get("success"):
+            return result
+        
+        # Only after successful session creation, start the local timer and trackers
+        current_time = self.clock.time()
+        self._reset_session_state(project_name, user_note, current_time)
+        
+        # Checkpoint the new session so a crash can be recovered on the next start
+        self.checkpointer.begin(self.session_id, self.user_data.get('employeeId'), project_name,
+                                user_note, current_time)
+        
+        stats = self._start_trackers()
+        self._publish_session_state()
+        self.ui_events.publish('stats', stats)
+        
+        # Add stats to the result
+        if result.get("success"):
+            result["stats"] = stats
+        
+        return result
+
+    def _reset_session_state(self, project_name, user_note, current_time):
+        """Reset all per-session tracking state for a session starting at current_time"""
+        # Start screenshot upload workers (also retries anything left in the spool)
+        self.screenshots.begin_session()
+        self.start_time = current_time
+        self.start_boottime = self.clock.boottime()
+        self.current_project = project_name
+        self.user_note = user_note
+
+        # Reset all activity tracking variables (times below are monotonic)
+        now = self.clock.monotonic()
+        self.activity.reset(now)
+        self.sleep_time = 0
+        self.sleep_intervals = []
+        self.suspend_detector.reset()
+            
+        # Reset application tracking variables
+        self.applications_usage = {}
+        self.last_app_check_time = now
+        self.applications_for_session = []
+        if self.app_timer:
+            self.app_timer.cancel()
+            self.app_timer = None
+            
+        # Reset link tracking variables
+        self.links_usage = {}
+        self.last_link_check_time = now
+        self.links_for_session = []
+        if self.link_timer:
+            self.link_timer.cancel()
+            self.link_timer = None
+
+    def _start_trackers(self):
+        """Start the timers and trackers of a running session
+        
+        Returns:
+            dict: Initial daily/weekly stats
+        """
+        # Start/ensure macOS menu bar timer display (now aligned with app timer start)
+        self._start_menubar_updates()
+        
+        # Start activity tracking
+        self.start_activity_tracking()
+        
+        # Start application tracking
+        self.start_application_tracking()
+        
+        # Start link tracking
+        self.start_link_tracking()
+        
+        # Start stats updates
+        stats = self.start_stats_updates()
+        
+        # Start session updates (every 10 minutes)
+        self.start_session_updates()
+        
+        # Start session checkpoints
+        self.start_checkpoints()
+        
+        return stats
+
+    def stop_timer(self):
+        """Stop the timer and update the session"""
+        if self.start_time:
+            ended_at = self.clock.time()
+            self._check_suspend()
+            
+            # Book the time since the last activity check in the current state
+            # (a full check_idle_status could still change the state at the end)
+            self.activity.book()
+            
+            # Update activity metrics
+            self.update_activity_metrics()
+            
+            # Stop activity tracking
+            self.stop_activity_tracking()
+            
+            # Stop application tracking
+            self.stop_application_tracking()
+            
+            # Stop link tracking
+            self.stop_link_tracking()
+            
+            # Stop session updates
+            self.stop_session_updates()
+            
+            # Stop session checkpoints
+            self.stop_checkpoints()
+            
+            # Active and idle time are consecutive monotonic intervals, so together they
+            # are exactly the time the machine was awake; suspends are kept apart as
+            # sleep time and wall-clock changes don't enter at all
+            self.active_time = int(self.active_time)
+            self.idle_time = int(self.idle_time)
+            self.sleep_time = int(self.sleep_time)
+            duration = self.active_time + self.idle_time
+            
+            # Store in local database
+            record_time_entry(
+                db, self.current_project, ended_at, duration,
+                session_id=self.session_id,
+                active_seconds=self.active_time,
+                idle_seconds=self.idle_time,
+                sleep_seconds=self.sleep_time,
+                employee_id=(self.user_data or {}).get('employeeId')
+            )
+            
+            # Update the session with all metrics (final update)
+            finished_session_id = self.session_id
+            result = self.update_session(
+                active_time=self.active_time,
+                idle_time=self.idle_time,
+                keyboard_rate=self.keyboard_activity_rate,
+                mouse_rate=self.mouse_activity_rate,
+                is_final_update=True,
+                user_note=self.user_note if hasattr(self, 'user_note') else "I am working on Task",
+                end_time=ended_at,
+                sleep_time=self.sleep_time
+            )
+            
+            # Abort uploads that did not make it into the final update
+            self.screenshots.end_session(finished_session_id)
+            
+            # The session is closed on the server; otherwise keep the checkpoint so the
+            # next start retries closing it with this end time
+            if result.get("success"):
+                self.checkpointer.finish(finished_session_id)
+            else:
+                state = self._checkpoint_state(ended_at)
+                state['active_seconds'] = self.active_time
+                state['idle_seconds'] = self.idle_time
+                self.checkpointer.checkpoint(state, stopped=True)
+            
+            # Stop stats updates
+            self.stop_stats_updates()
+            
+            # Stop/clear macOS menu bar timer display
+            self._stop_menubar_updates()
+            
+            # Reset timer state
+            self.start_time = None
+            self.current_project = None
+            
+            # Get final stats from local data (the time entry above is now part of it);
+            # the server numbers are refreshed in the background
+            db.flush()
+            daily_stats = self.get_daily_stats()
+            weekly_stats = self.get_weekly_stats()
+            self._publish_session_state()
+            self.ui_events.publish('stats', {"daily": daily_stats, "weekly": weekly_stats})
+            self.stats_engine.reconcile()
+            
+            # Add stats to the result
+            if result.get("success"):
+                result["stats"] = {
+                    "daily": daily_stats,
+                    "weekly": weekly_stats
+                }
+            
+            return result
+        
+        return {"success": False, "message": "Timer not running"}
+
+    def record_activity(self, activity_type='mouse', at=None):
+        """Record user activity (keyboard or mouse)
+        
+        Args:
+            activity_type (str): 'keyboard' or 'mouse'
+            at (float): Monotonic time of the input (default: now)
+        """
+        self.activity.record(activity_type, at=at)
+    
+    def get_system_idle_seconds(self):
+        """Return the seconds since the last user input anywhere on the system
+        
+        Read from the OS idle source (Quartz on macOS, GetLastInputInfo on Windows,
+        XScreenSaver, Mutter or logind on Linux), which needs no input monitoring
+        permission and works while the app is minimized.
+        
+        Returns:
+            float: Idle seconds, or None if there is no source or no reading
+        """
+        return self.activity.system_idle_seconds()
+    
+    def check_idle_status(self):
+        """Check if user is idle based on last activity time (see ActivityEngine.check)"""
+        if not self.start_time:
+            return
+        
+        self._check_suspend()
+        self.activity.check()
+    
+    def update_activity_metrics(self):
+        """Update activity metrics based on current state"""
+        if not self.start_time:
+            return
+            
+        # Rates are per minute awake
+        self.activity.update_rates(self._session_elapsed() - self.sleep_time)
+    
+    def start_activity_tracking(self):
+        """Start the activity tracking thread and system-wide input listeners"""
+        if self.idle_monitor.running:
+            return
+        
+        # Initialize activity tracking
+        self.activity.restart(self.clock.monotonic())
+        self.activity.detect_idle_source()
+        
+        # On macOS, avoid system-wide listeners entirely; rely on browser events to prevent crashes
+        if platform.system() == 'Darwin':
+            self.system_tracking_enabled = False
+            log.info('On macOS, using browser events for activity tracking (system-wide listeners disabled)')
+        
+        # With an exact OS idle counter the global hooks are only needed for the input
+        # rates; if configured, those then come from the app window's events like on macOS
+        use_input_hooks = self.system_tracking_enabled and not (
+            self.system_idle_replaces_input_hooks and self.idle_source is not None and self.idle_source.exact)
+        if self.system_tracking_enabled and not use_input_hooks:
+            log.info('Using the %s idle counter instead of system-wide input listeners', self.idle_source.name)
+        
+        # pynput is imported the first time the listeners are needed
+        if use_input_hooks and not _load_pynput():
+            self.system_tracking_enabled = False
+            use_input_hooks = False
+        
+        # Start system-wide input listeners if enabled
+        if use_input_hooks:
+            try:
+                self.input_listener.throttle = self.event_throttle_interval
+                self.input_listener.start(keyboard, mouse)
+                
+                log.info('System-wide activity tracking started')
+            except Exception as e:
+                log.error('Error starting system-wide activity tracking: %s', e)
+                self.system_tracking_enabled = False
+                
+                # If on macOS and error is permission-related, update permission status
+                if platform.system() == 'Darwin':
+                    error_str = str(e).lower()
+                    if "permission" in error_str or "accessibility" in error_str or "privacy" in error_str:
+                        self.macos_permissions_checked = False
+        else:
+            if platform.system() == 'Darwin':
+                if not self.macos_permissions_checked:
+                    log.info('On macOS, system-wide tracking requires input monitoring permissions. Using browser events instead.')
+                else:
+                    log.info('On macOS, activity tracking will rely on browser events instead of system-wide tracking')
+            elif not self.system_tracking_enabled:
+                log.info('System-wide activity tracking is disabled, falling back to browser events')
+        
+        # Start the activity checks
+        self.idle_monitor.start()
+    
+    def _activity_tick(self):
+        """One activity check of the idle monitor"""
+        if not self.start_time:
+            return
+        self.check_idle_status()
+        self.update_activity_metrics()
+        # Keeps the UI's clock in step (suspends, idle changes) without it asking
+        self._publish_session_state()
+    
+    def _next_activity_check_delay(self):
+        """Seconds until the idle state can next change (see ActivityEngine.next_check_delay)"""
+        return self.activity.next_check_delay()
+    
+    def stop_activity_tracking(self):
+        """Stop the activity tracking thread and system-wide input listeners"""
+        self.idle_monitor.stop()
+        
+        # Stop system-wide input listeners
+        if self.input_listener.running:
+            try:
+                self.input_listener.stop()
+                log.info('System-wide activity tracking stopped')
+            except Exception as e:
+                log.error('Error stopping system-wide activity tracking: %s', e)
+    
+    def record_keyboard_activity(self):
+        """JavaScript interface method to record keyboard activity"""
+        return self._record_window_input('keyboard')
+    
+    def record_mouse_activity(self):
+        """JavaScript interface method to record mouse activity"""
+        return self._record_window_input('mouse')
+    
+    def _record_window_input(self, activity_type):
+        """Record an input event of the app window (also when system-wide tracking is disabled)"""
+        if not self.start_time:
+            return {"success": False, "message": "Timer not running"}
+        if self.activity.record(activity_type):
+            log.debug('%s event recorded', activity_type.capitalize())
+        return {"success": True}
+    
+    # System-wide activity tracking callback functions for pynput
+    def _on_system_input(self, activity_type, timestamp):
+        """Callback of the system-wide input listener (at most once per throttle window)"""
+        if self.start_time:
+            self.record_activity(activity_type, at=timestamp)
+    
+    def check_macos_permissions(self):
+        """Safe macOS Input Monitoring permission check that never probes.
+
+        On macOS 14/15, probing Input Monitoring (e.g., creating listeners) from the wrong thread can crash.
+        We avoid probing entirely and conservatively report as not granted to prevent crashes.
+        """
+        if platform.system() != 'Darwin':
+            return {"success": True, "has_permissions": True}
+
+        # If we previously cached a positive state, honor it; otherwise, do not probe
+        if getattr(self, "macos_permissions_checked", False):
+            return {"success": True, "has_permissions": True}
+
+        return {"success": True, "has_permissions": False, "message": "Input Monitoring not used on macOS; using browser events"}
+    
+    def request_macos_permissions(self):
+        """Guide the user to enable input monitoring permissions on macOS"""
+        if platform.system() != 'Darwin':
+            return {"success": False, "message": "Not on macOS, permissions not required"}
+            
+        # Open System Preferences to the Security & Privacy pane
+        try:
+            # First check if we already have permissions
+            try:
+                check_result = self.check_macos_permissions()
+                if check_result.get("has_permissions", False):
+                    return {"success": True, "message": "Permissions already granted"}
+            except Exception as e:
+                log.error('Error checking permissions before request: %s', e)
+                # Continue with the request even if the check fails
+                
+            # Open System Preferences to the Security & Privacy pane, Input Monitoring tab
+            try:
+                log.info('Opening System Preferences to Input Monitoring settings...')
+                subprocess.run([
+                    "open", 
+                    "x-apple.systempreferences:com.apple.preference.security?Privacy_ListenEvent"
+                ], timeout=5)  # Add timeout to prevent hanging
+                
+                return {
+                    "success": True, 
+                    "message": "Please enable input monitoring for this application in System Preferences"
+                }
+            except subprocess.TimeoutExpired:
+                log.warning('Opening System Preferences timed out, but may still have worked')
+                return {
+                    "success": True, 
+                    "message": "Attempted to open System Preferences (timed out)"
+                }
+            except Exception as e:
+                log.error('Error opening System Preferences: %s', e)
+                return {
+                    "success": False, 
+                    "message": f"Error opening System Preferences: {str(e)}"
+                }
+        except Exception as e:
+            log.error('Unexpected error in request_macos_permissions: %s', e)
+            return {"success": False, "message": f"Error requesting permissions: {str(e)}"}
+    
+    def toggle_system_tracking(self, enable=True):
+        """Enable or disable system-wide activity tracking"""
+        # If trying to enable on macOS, check permissions first
+        if enable and platform.system() == 'Darwin' and not self.macos_permissions_checked:
+            check_result = self.check_macos_permissions()
+            if not check_result.get("has_permissions", False):
+                return {
+                    "success": False, 
+                    "message": "Input monitoring permissions required",
+                    "needs_permissions": True
+                }
+        
+        # Update the tracking state
+        self.system_tracking_enabled = enable and PYNPUT_AVAILABLE
+        
+        # If timer is running, restart activity tracking with new settings
+        if self.start_time:
+            self.stop_activity_tracking()
+            self.start_activity_tracking()
+        
+        return {
+            "success": True,
+            "system_tracking_enabled": self.system_tracking_enabled
+        }
+    
+    def get_system_tracking_status(self):
+        """Get the current status of system-wide activity tracking"""
+        return {
+            "success": True,
+            "system_tracking_enabled": self.system_tracking_enabled,
+            "pynput_available": PYNPUT_AVAILABLE,
+            "is_macos": platform.system() == 'Darwin',
+            "macos_permissions_checked": self.macos_permissions_checked,
+            "idle_source": self.idle_source.name if self.idle_source else None,
+            "input_hooks_active": self.input_listener.running
+        }
+    
+    def get_activity_stats(self):
+        """Get current activity statistics"""
+        if not self.start_time:
+            return {"success": False, "message": "Timer not running"}
+            
+        return {
+            "success": True,
+            "active_time": self.active_time,
+            "idle_time": self.idle_time,
+            "keyboard_rate": self.keyboard_activity_rate,
+            "mouse_rate": self.mouse_activity_rate,
+            "is_idle": self.is_idle
+        }
+        
+    # Application and link state lives in the trackers (apps.py, links.py)
+    applications_usage = _component_attribute('app_tracker', 'usage')
+    last_app_check_time = _component_attribute('app_tracker', 'last_check_time')
+    links_usage = _component_attribute('link_tracker', 'usage')
+    last_link_check_time = _component_attribute('link_tracker', 'last_check_time')
+    
+    # Activity state lives in the activity engine (activity.py)
+    active_time = _component_attribute('activity', 'active_time')
+    idle_time = _component_attribute('activity', 'idle_time')
+    is_idle = _component_attribute('activity', 'is_idle')
+    idle_threshold = _component_attribute('activity', 'idle_threshold')
+    last_activity_time = _component_attribute('activity', 'last_activity_time')
+    last_active_check_time = _component_attribute('activity', 'last_active_check_time')
+    keyboard_events = _component_attribute('activity', 'keyboard_events')
+    mouse_events = _component_attribute('activity', 'mouse_events')
+    keyboard_activity_rate = _component_attribute('activity', 'keyboard_activity_rate')
+    mouse_activity_rate = _component_attribute('activity', 'mouse_activity_rate')
+    last_keyboard_event_time = _component_attribute('activity', 'last_keyboard_event_time')
+    last_mouse_event_time = _component_attribute('activity', 'last_mouse_event_time')
+    event_throttle_interval = _component_attribute('activity', 'event_throttle_interval')
+    activity_check_interval = _component_attribute('activity', 'activity_check_interval')
+    max_activity_check_interval = _component_attribute('activity', 'max_activity_check_interval')
+    idle_poll_interval = _component_attribute('activity', 'idle_poll_interval')
+    idle_source = _component_attribute('activity', 'idle_source')
+    _idle_source_detected = _component_attribute('activity', 'idle_source_detected')
+    _system_idle_available = _component_attribute('activity', 'system_idle_available')
+    
+    # Screenshot state lives in the screenshot engine (screenshots.py)
+    screenshots_for_session = _component_attribute('screenshots', 'session_screenshots')
+    screenshot_timestamp = _component_attribute('screenshots', 'last_timestamp')
+    screenshot_min_interval = _component_attribute('screenshots', 'min_interval')
+    screenshot_max_interval = _component_attribute('screenshots', 'max_interval')
+    screenshots_per_interval = _component_attribute('screenshots', 'per_interval')
+    screenshot_scheduler = _component_attribute('screenshots', 'scheduler')
+    capture_service = _component_attribute('screenshots', 'capture_service')
+    upload_queue = _component_attribute('screenshots', 'upload_queue')
+    screenshot_upload_timeout = _component_attribute('screenshots', 'upload_timeout')
+    screenshot_upload_progress = _component_attribute('screenshots', 'upload_progress')
+
+    def check_running_applications(self):
+        """Add the time since the last check to the running (non-system) applications"""
+        if not self.start_time:
+            return
+        self.app_tracker.check()
+            
+    def start_application_tracking(self):
+        """Start the application tracking thread"""
+        if self.app_timer:
+            return
+            
+        def app_check():
+            if not self.start_time:
+                return
+                
+            self.check_running_applications()
+            
+            # Schedule the next check if timer is still running
+            if self.start_time:
+                self.app_timer = threading.Timer(self.sync_cadence.next_delay('apps', self.app_check_interval), app_check)
+                self.app_timer.daemon = True
+                self.app_timer.start()
+        
+        # Initialize application tracking
+        self.last_app_check_time = self.clock.monotonic()
+        
+        # Start the application check timer
+        self.app_timer = threading.Timer(self.sync_cadence.next_delay('apps', self.app_check_interval), app_check)
+        self.app_timer.daemon = True
+        self.app_timer.start()
+    
+    def stop_application_tracking(self):
+        """Stop the application tracking thread"""
+        if self.app_timer:
+            self.app_timer.cancel()
+            self.app_timer = None
+            
+    def prepare_applications_for_session(self):
+        """Prepare application data for session updates
+        
+        Returns:
+            list: A list of application usage data in the format required by the API
+        """
+        return self.app_tracker.prepare_for_session()
+        
+    def get_browser_paths(self):
+        """Get browser history database paths based on platform
+        
+        Returns:
+            dict: A dictionary of browser history database paths
+        """
+        return platforms.browser_history_paths()
+        
+    def get_chrome_history(self, history_file, cutoff_time):
+        """Extract history since cutoff_time (Unix timestamp) from Chrome/Brave/Edge"""
+        return read_chromium_history(history_file, cutoff_time, now=self.clock.time())
+        
+    def get_firefox_history(self, history_file, cutoff_time):
+        """Extract history since cutoff_time (Unix timestamp) from Firefox"""
+        return read_firefox_history(history_file, cutoff_time, now=self.clock.time())
+        
+    def get_safari_history(self, history_file, cutoff_time):
+        """Extract history since cutoff_time (Unix timestamp) from Safari"""
+        return read_safari_history(history_file, cutoff_time, now=self.clock.time())
+        
+    def check_browser_links(self):
+        """Check browser links and update link usage data
+        
+        On the first check after the timer starts (when last_link_check_time is
+        None), the history since the timer started is read; afterwards the last
+        session update interval (see LinkTracker.check).
+        """
+        if not self.start_time:
+            return
+        self.link_tracker.check(self.start_time, self.session_update_interval)
+            
+    def start_link_tracking(self):
+        """Start the link tracking thread
+        
+        This method starts a periodic thread to check browser links and update
+        the link usage data. The thread runs every self.link_check_interval seconds.
+        """
+        # Don't start if already running
+        if self.link_timer:
+            return
+            
+        def link_check():
+            """Inner function to check browser links periodically"""
+            # Stop if timer is no longer running
+            if not self.start_time:
+                return
+                
+            try:
+                # Check browser links
+                self.check_browser_links()
+            except Exception as e:
+                # Log error but continue execution
+                log.error('Error in link check thread: %s', e)
+            
+            # Schedule the next check if timer is still running
+            if self.start_time:
+                self.link_timer = threading.Timer(self.sync_cadence.next_delay('links', self.link_check_interval), link_check)
+                self.link_timer.daemon = True
+                self.link_timer.start()
+        
+        # Initialize link tracking
+        self.last_link_check_time = self.clock.monotonic()
+        
+        # Start the link check timer
+        self.link_timer = threading.Timer(self.sync_cadence.next_delay('links', self.link_check_interval), link_check)
+        self.link_timer.daemon = True
+        self.link_timer.start()
+        
+        log.info('Link tracking started with interval of %s seconds', self.link_check_interval)
+    
+    def stop_link_tracking(self):
+        """Stop the link tracking thread
+        
+        This method stops the periodic thread that checks browser links.
+        """
+        if self.link_timer:
+            self.link_timer.cancel()
+            self.link_timer = None
+            log.info('Link tracking stopped')
+            
+    def prepare_links_for_session(self):
+        """Prepare link data for session updates
+        
+        If nothing was collected yet soon after the timer started, the browser
+        histories are read now. See LinkTracker.prepare_for_session for the format.
+        
+        Returns:
+            list: A list of link usage data in the format required by the API
+        """
+        try:
+            if not self.links_usage:
+                log.warning('links_usage is empty. No browser history data collected.')
+                # Soon after the timer started: read the history since then now
+                if self.last_link_check_time is not None and self.clock.monotonic() - self.last_link_check_time < 60:
+                    log.debug('This appears to be soon after startup. Forcing a browser history check...')
+                    self.last_link_check_time = None
+                    self.check_browser_links()
+            return self.link_tracker.prepare_for_session()
+        except Exception as e:
+            log.error('Error preparing links for session: %s', e)
+            return []
+    
+    def _current_session_totals(self):
+        """Running session totals for the local stats engine, or None when stopped"""
+        start_time = self.start_time
+        if not start_time:
+            return None
+        # Includes the time since the last activity check, which is not booked yet
+        return dict(self.activity.totals(), start=start_time)
+    
+    def get_daily_stats(self):
+        """Get daily stats for the current employee from local data (reconciled with the server)"""
+        if not self.auth_token:
+            return {"success": False, "message": "Not authenticated"}
+        try:
+            return {"success": True, "data": self.stats_engine.get('daily')}
+        except Exception as e:
+            log.error('Daily stats error: %s', e)
+            return {"success": False, "message": f"An error occurred: {str(e)}"}
+    
+    def get_weekly_stats(self):
+        """Get weekly stats for the current employee from local data (reconciled with the server)"""
+        if not self.auth_token:
+            return {"success": False, "message": "Not authenticated"}
+        try:
+            return {"success": True, "data": self.stats_engine.get('weekly')}
+        except Exception as e:
+            log.error('Weekly stats error: %s', e)
+            return {"success": False, "message": f"An error occurred: {str(e)}"}
+    
+    def get_stats(self, refresh=False):
+        """Get daily and weekly stats in one call
+        
+        Args:
+            refresh: Wait for a server reconciliation before answering (manual sync)
+        """
+        if refresh and self.auth_token:
+            self.response_cache.expire(prefix=URLS['DAILY_STATS'])
+            self.response_cache.expire(prefix=URLS['WEEKLY_STATS'])
+            self.stats_engine.reconcile(wait=True)
+        return {"daily": self.get_daily_stats(), "weekly": self.get_weekly_stats()}
+    
+    def get_cache_metrics(self):
+        """Get hit ratio and counters of the response cache and the local stats engine"""
+        return {
+            "success": True,
+            "responses": self.response_cache.get_metrics(),
+            "stats": self.stats_engine.get_metrics()
+        }
+    
+    def _client_metrics(self):
+        """Compact metrics summary attached to session updates when sharing is enabled"""
+        return {
+            "version": APP_VERSION,
+            "platform": platform.system(),
+            "metrics": metrics.compact()
+        }
+
+    def get_diagnostics(self):
+        """Get latency histograms, counters and gauges of every tracking subsystem
+        
+        Returns:
+            dict: The metrics registry plus the counters of the response cache, the
+                  screenshot pipeline, session checkpoints, logging and UI pushes
+        """
+        return {
+            "success": True,
+            "version": APP_VERSION,
+            "platform": platform.system(),
+            "share_client_metrics": self.share_client_metrics,
+            "metrics": metrics.snapshot(),
+            "cache": {
+                "responses": self.response_cache.get_metrics(),
+                "stats": self.stats_engine.get_metrics()
+            },
+            "screenshots": self.screenshots.get_status(),
+            "checkpoints": self.checkpointer.get_metrics(),
+            "logging": get_logging_metrics(),
+            "sync": self.sync_cadence.get_status(),
+            "activity_checks": self.idle_monitor.get_metrics(),
+            "input_events": self.input_listener.get_metrics(),
+            "ui_events": self.ui_events.get_metrics()
+        }
+
+    def set_share_client_metrics(self, enabled):
+        """Opt in or out of attaching a metrics summary to session updates
+        
+        Args:
+            enabled (bool): Whether session updates carry the summary
+        """
+        self.share_client_metrics = bool(enabled)
+        return {"success": True, "share_client_metrics": self.share_client_metrics}
+
+    def set_low_power_mode(self, enabled=None):
+        """Stretch the sync and tracking intervals (low-power mode)
+        
+        Args:
+            enabled (bool): True or False to force the mode, None to follow the
+                            battery state (when LOW_POWER_ON_BATTERY is set)
+        """
+        self.sync_cadence.set_low_power(enabled)
+        return {"success": True, "sync": self.sync_cadence.get_status()}
+
+    def set_debug_logging(self, enabled):
+        """Switch debug logging on or off at runtime
+
+        Args:
+            enabled (bool): Whether debug records are written
+
+        Returns:
+            dict: The resulting debug setting and the path of the log file
+        """
+        set_debug(bool(enabled))
+        log.info('Debug logging %s', 'enabled' if is_debug() else 'disabled')
+        return {"success": True, "debug": is_debug(), "log_file": get_log_file()}
+
+    def get_logging_metrics(self):
+        """Get suppressed/dropped record counters of the logging pipeline"""
+        return {"success": True, **get_logging_metrics()}
+
+    def _record_stats_response(self, response):
+        """Feed the outcome of a stats request (not served from the cache) to the stats cadence"""
+        if response.source == 'network':
+            self.sync_cadence.record_response('stats', response.status_code, response.headers)
+            if response.status_code == 200:
+                self.sync_cadence.apply_hints('stats', response.json())
+        elif response.source == 'fallback':
+            self.sync_cadence.record_failure('stats', parse_retry_after(response.headers.get('Retry-After')))
+    
+    def _fetch_daily_stats(self):
+        """Get daily stats for the current employee from the server"""
+        if not self.auth_token:
+            return {"success": False, "message": "Not authenticated"}
+        
+        try:
+            # Get employee ID from stored user data
+            employee_id = self.user_data.get('employeeId')
+            if not employee_id:
+                return {"success": False, "message": "Employee ID not found"}
+                
+            ttl, stale = CACHE_TTLS['STATS']
+            response = self.response_cache.get(
+                f'{URLS["DAILY_STATS"]}/{employee_id}?timezone={local_tz}',
+                headers={
+                    "Authorization": f"Bearer {self.auth_token}",
+                    "Content-Type": "application/json"
+                },
+                ttl=ttl,
+                stale=stale,
+                cacheable=lambda r: r.json().get('success')
+            )
+            self._record_stats_response(response)
+            data = response.json()
+            
+            if data.get('success'):
+                return {"success": True, "data": data['data']}
+            else:
+                return {"success": False, "message": data.get('message', 'Failed to get daily stats')}
+        except Exception as e:
+            log.error('Daily stats error: %s', e)
+            self.sync_cadence.record_failure('stats')
+            return {"success": False, "message": f"An error occurred: {str(e)}"}
+    
+    def _fetch_weekly_stats(self):
+        """Get weekly stats for the current employee from the server"""
+        if not self.auth_token:
+            return {"success": False, "message": "Not authenticated"}
+        
+        try:
+            # Get employee ID from stored user data
+            employee_id = self.user_data.get('employeeId')
+            if not employee_id:
+                return {"success": False, "message": "Employee ID not found"}
+                
+            ttl, stale = CACHE_TTLS['STATS']
+            response = self.response_cache.get(
+                f'{URLS["WEEKLY_STATS"]}/{employee_id}?timezone={local_tz}',
+                headers={
+                    "Authorization": f"Bearer {self.auth_token}",
+                    "Content-Type": "application/json"
+                },
+                ttl=ttl,
+                stale=stale,
+                cacheable=lambda r: r.json().get('success')
+            )
+            self._record_stats_response(response)
+            data = response.json()
+            
+            if data.get('success'):
+                return {"success": True, "data": data['data']}
+            else:
+                return {"success": False, "message": data.get('message', 'Failed to get weekly stats')}
+        except Exception as e:
+            log.error('Weekly stats error: %s', e)
+            self.sync_cadence.record_failure('stats')
+            return {"success": False, "message": f"An error occurred: {str(e)}"}
+    
+    def get_time_entries(self, limit=10, offset=0, start=None, end=None, project=None):
+        """Get a page of local time entries, newest first
+        
+        Args:
+            limit: Page size
+            offset: Number of entries to skip
+            start: Only entries that ended at or after this time (epoch seconds or ISO string)
+            end: Only entries that ended before this time (epoch seconds or ISO string)
+            project: Only entries of this project
+        """
+        try:
+            return fetch_time_entries(db, start=start, end=end, project=project, limit=limit, offset=offset,
+                                      employee_id=(self.user_data or {}).get('employeeId'))
+        except (ValueError, sqlite3.Error) as e:
+            log.error('Error reading time entries: %s', e)
+            return []
+            
+    def compare_versions(self, version1, version2):
+        """Compare two version strings and return True if version2 is newer than version1"""
+        v1_parts = [int(x) for x in version1.split('.')]
+        v2_parts = [int(x) for x in version2.split('.')]
+        
+        # Pad with zeros if versions have different lengths
+        while len(v1_parts) < len(v2_parts):
+            v1_parts.append(0)
+        while len(v2_parts) < len(v1_parts):
+            v2_parts.append(0)
+            
+        # Compare each part
+        for i in range(len(v1_parts)):
+            if v2_parts[i] > v1_parts[i]:
+                return True
+            elif v2_parts[i] < v1_parts[i]:
+                return False
+                
+        # If we get here, versions are equal
+        return False
+        
+    def check_for_updates(self):
+        """Check for updates by querying the GitHub API for the latest release"""
+        try:
+            # Get the latest release from GitHub (cached; revalidated with ETags, which do
+            # not count against the unauthenticated rate limit when unchanged)
+            ttl, stale = CACHE_TTLS['RELEASES']
+            response = self.response_cache.get(
+                f"https://api.github.com/repos/{GITHUB_REPO}/releases/latest",
+                headers={"Accept": "application/vnd.github+json"},
+                ttl=ttl,
+                stale=stale
+            )
+
+            if response.status_code != 200:
+                return {
+                    "success": False,
+                    "message": f"Failed to check for updates. Status code: {response.status_code}"
+                }
+
+            release_data = response.json()
+            latest_version = release_data.get('tag_name', '').lstrip('v')
+
+            # If no version found, return error
+            if not latest_version:
+                return {
+                    "success": False,
+                    "message": "Could not determine latest version"
+                }
+
+            # Determine best asset for this platform
+            assets = release_data.get('assets') or []
+            download_url = ''
+            platform_name = platform.system()
+            if assets:
+                # Try to find a platform-specific asset
+                if platform_name == 'Darwin':
+                    # Prefer .dmg, fallback to .zip containing .app
+                    dmg = next((a for a in assets if a.get('name', '').lower().endswith('.dmg')), None)
+                    zip_app = next((a for a in assets if a.get('name', '').lower().endswith('.zip')), None)
+                    candidate = dmg or zip_app
+                    if candidate:
+                        download_url = candidate.get('browser_download_url', '')
+                elif platform_name == 'Windows':
+                    exe = next((a for a in assets if a.get('name', '').lower().endswith('.exe')), None)
+                    msi = next((a for a in assets if a.get('name', '').lower().endswith('.msi')), None)
+                    candidate = exe or msi
+                    if candidate:
+                        download_url = candidate.get('browser_download_url', '')
+                else:
+                    # Linux or others: pick first available
+                    download_url = assets[0].get('browser_download_url', '')
+
+            # Compare versions
+            update_available = self.compare_versions(APP_VERSION, latest_version)
+
+            return {
+                "success": True,
+                "update_available": update_available,
+                "current_version": APP_VERSION,
+                "latest_version": latest_version,
+                "release_notes": release_data.get('body', ''),
+                "download_url": download_url
+            }
+        except Exception as e:
+            log.error('Error checking for updates: %s', e)
+            return {
+                "success": False,
+                "message": f"An error occurred while checking for updates: {str(e)}"
+            }
+            
+    def download_update(self, download_url):
+        """Download the update from the provided URL"""
+        try:
+            # Create updates directory if it doesn't exist
+            updates_dir = os.path.join(DATA_DIR, 'updates')
+            os.makedirs(updates_dir, exist_ok=True)
+            
+            # Download the file
+            response = requests.get(download_url, stream=True)
+            if response.status_code != 200:
+                return {
+                    "success": False,
+                    "message": f"Failed to download update. Status code: {response.status_code}"
+                }
+                
+            # Get filename from URL
+            filename = os.path.basename(download_url)
+            file_path = os.path.join(updates_dir, filename)
+            
+            # Save the file
+            with open(file_path, 'wb') as f:
+                for chunk in response.iter_content(chunk_size=8192):
+                    if chunk:
+                        f.write(chunk)
+                        
+            return {
+                "success": True,
+                "file_path": file_path
+            }
+        except Exception as e:
+            log.error('Error downloading update: %s', e)
+            return {
+                "success": False,
+                "message": f"An error occurred while downloading the update: {str(e)}"
+            }
+            
+    def install_update(self, file_path):
+        """Install the update and restart the application"""
+        try:
+            # Check if file exists
+            if not os.path.exists(file_path):
+                return {
+                    "success": False,
+                    "message": "Update file not found"
+                }
+
+            # Get file extension
+            _, ext = os.path.splitext(file_path)
+
+            # macOS DMG handling
+            if platform.system() == 'Darwin' and ext.lower() == '.dmg':
+                try:
+                    volumes_dir = '/Volumes'
+                    before_vols = set(os.listdir(volumes_dir))
+                except Exception:
+                    before_vols = set()
+
+                # Attach DMG
+                attach_cmd = ['hdiutil', 'attach', file_path, '-nobrowse']
+                try:
+                    subprocess.check_output(attach_cmd, stderr=subprocess.STDOUT)
+                except subprocess.CalledProcessError as e:
+                    return {"success": False, "message": f"Failed to mount DMG: {e.output.decode(errors='ignore')}"}
+
+                # Find new mount point
+                time.sleep(0.5)
+                try:
+                    after_vols = set(os.listdir(volumes_dir))
+                except Exception:
+                    after_vols = set()
+                new_vols = list(after_vols - before_vols)
+                mount_point = None
+                if new_vols:
+                    # Pick the first new volume
+                    mount_point = os.path.join(volumes_dir, new_vols[0])
+                else:
+                    # Fallback: try to parse via hdiutil info
+                    try:
+                        info_out = subprocess.check_output(['hdiutil', 'info']).decode('utf-8', errors='ignore')
+                        for line in info_out.splitlines():
+                            if line.strip().startswith('/Volumes/'):
+                                mount_point = line.strip()
+                                break
+                    except Exception:
+                        pass
+
+                if not mount_point or not os.path.exists(mount_point):
+                    return {"success": False, "message": "Could not determine DMG mount point"}
+
+                # Locate .app inside the mounted volume
+                app_bundle = None
+                for root, dirs, files in os.walk(mount_point):
+                    for d in dirs:
+                        if d.endswith('.app'):
+                            app_bundle = os.path.join(root, d)
+                            break
+                    if app_bundle:
+                        break
+
+                if not app_bundle:
+                    # Detach and error
+                    try:
+                        subprocess.call(['hdiutil', 'detach', mount_point, '-force'])
+                    finally:
+                        return {"success": False, "message": "No .app found inside DMG"}
+
+                dest_app = os.path.join('/Applications', os.path.basename(app_bundle))
+
+                # Copy using 'ditto' for best results on macOS
+                try:
+                    # Ensure destination directory exists or remove old app to replace
+                    if os.path.exists(dest_app):
+                        # Attempt to replace existing app
+                        subprocess.call(['rm', '-rf', dest_app])
+                    subprocess.check_call(['ditto', app_bundle, dest_app])
+                except subprocess.CalledProcessError as e:
+                    # Try fallback copy
+                    try:
+                        if os.path.exists(dest_app):
+                            shutil.rmtree(dest_app)
+                        shutil.copytree(app_bundle, dest_app)
+                    except Exception as copy_err:
+                        # Detach then fail
+                        subprocess.call(['hdiutil', 'detach', mount_point, '-force'])
+                        return {"success": False, "message": f"Failed to copy app: {copy_err}"}
+
+                # Detach DMG
+                subprocess.call(['hdiutil', 'detach', mount_point, '-force'])
+
+                # Relaunch installed app and exit current
+                try:
+                    subprocess.Popen(['open', dest_app])
+                except Exception:
+                    pass
+                threading.Timer(1.0, lambda: os._exit(0)).start()
+                return {"success": True, "message": "Installing update..."}
+
+            # Handle different file types (Windows etc.)
+            if ext.lower() == '.exe':
+                # For Windows executable installers
+                subprocess.Popen([file_path, '/SILENT', '/CLOSEAPPLICATIONS'])
+                threading.Timer(1.0, lambda: os._exit(0)).start()
+                return {"success": True, "message": "Installing update..."}
+
+            elif ext.lower() == '.msi':
+                # For MSI installers
+                subprocess.Popen(['msiexec', '/i', file_path, '/quiet', '/norestart'])
+                threading.Timer(1.0, lambda: os._exit(0)).start()
+                return {"success": True, "message": "Installing update..."}
+
+            elif ext.lower() in ['.zip', '.7z']:
+                return {
+                    "success": False,
+                    "message": "Archive installation not implemented"
+                }
+
+            else:
+                return {
+                    "success": False,
+                    "message": f"Unsupported update file type: {ext}"
+                }
+
+        except Exception as e:
+            log.error('Error installing update: %s', e)
+            return {
+                "success": False,
+                "message": f"An error occurred while installing the update: {str(e)}"
+            }
+
+    def is_timer_running(self):
+        """Check if the timer is currently running"""
+        return self.start_time is not None
+
+    def handle_close_event(self):
+        """Handle window close event, showing confirmation dialog if timer is running"""
+        if not self.is_timer_running():
+            # Timer is not running, allow window to close
+            return True
+
+        # On macOS, we need to handle this differently to prevent freezing
+        if platform.system() == 'Darwin':
+            # Stop the timer automatically without confirmation on macOS
+            # This prevents the app from freezing when showing a dialog
+            try:
+                self.stop_timer()
+                log.info('Timer stopped due to app close on macOS')
+                return True
+            except Exception as e:
+                log.error('Error stopping timer on app close: %s', e)
+                # Still allow the app to close even if there was an error stopping the timer
+                return True
+        else:
+            # On other platforms, show confirmation dialog
+            result = self.window.create_confirmation_dialog(
+                "Timer Running",
+                "Your timer is currently running. Are you sure you want to close the app?"
+            )
+
+            if result:
+                # User confirmed, stop the timer and update the session
+                try:
+                    self.stop_timer()
+                    log.info('Timer stopped due to app close')
+                    return True
+                except Exception as e:
+                    log.error('Error stopping timer on app close: %s', e)
+                    # Still allow the app to close even if there was an error stopping the timer
+                    return True
+            else:
+                # User cancelled, prevent window from closing
+                return False
+
+
+tracer.mark('main imported')
+
+
+def run(argv=None, base_dir=None):
+    """Open the tracker window and run until it is closed
+
+    Args:
+        argv (list): Command line arguments (default: sys.argv[1:]); --dev enables
+                     debug mode
+        base_dir (str): Directory containing dist/ with the built frontend (default:
+                        the PyInstaller bundle, or this directory)
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    # Determine if we're in development or production mode
+    #DEBUG = True
+    DEBUG = URLS["DEBUG"]
+    if '--dev' in argv:
+        DEBUG = True
+
+    # Start the log writer; records logged during import are written now
+    with tracer.span('setup_logging'):
+        setup_logging(os.path.join(DATA_DIR, 'logs'), debug=DEBUG)
+
+    # Print database path information for debugging
+    log.info('Database path: %s', db_file)
+    log.info('Database directory: %s', os.path.dirname(db_file))
+    log.info('Database directory exists: %s', os.path.exists(os.path.dirname(db_file)))
+    log.info('Database file exists: %s', os.path.exists(db_file))
+    
+    # Create API instance; tracker.db is opened and migrated by finish_startup()
+    # once the window is shown
+    with tracer.span('Api.__init__'):
+        api = Api(defer_startup=True)
+
+    # Handle PyInstaller bundled resources
+    # When running as a PyInstaller executable, resources are in a temporary directory
+    # accessible through sys._MEIPASS
+    base_dir = base_dir or getattr(sys, '_MEIPASS', os.path.abspath(os.path.dirname(__file__)))
+    
+    # Get the appropriate URL
+    if DEBUG:
+        #url = "http://localhost:5173"
+        url = os.path.join(base_dir, "dist", "index.html")
+        debug = True
+        log.info('Running in DEVELOPMENT mode with DevTools enabled')
+    else:
+        url = os.path.join(base_dir, "dist", "index.html")
+        debug = False
+        log.info('Running in PRODUCTION mode')
+
+    # Get primary monitor size
+    with tracer.span('screeninfo.get_monitors'):
+        monitor = screeninfo.get_monitors()[0]
+    screen_width = monitor.width
+    screen_height = monitor.height
+
+    # Set window size relative to screen size
+    win_width = min(400, screen_width + 50)
+    win_height = min(630, screen_height + 100)
+
+    # Create the window
+    with tracer.span('webview.create_window'):
+        window = webview.create_window(
+            "RI Tracker",
+            url,
+            js_api=api,
+            width=win_width,
+            height=win_height,
+            min_size=(300, 400),
+            resizable=False,
+            confirm_close=False,  # We'll handle confirmation ourselves
+        )
+
+    # Store window reference in the API instance
+    api.window = window
+
+    # Set up the on_closing event handler
+    window.events.closing += api.handle_close_event
+    
+    # On macOS, avoid Input Monitoring permission flow entirely; rely on browser events
+    if platform.system() == 'Darwin':
+        api.system_tracking_enabled = False
+        api.macos_permissions_checked = False
+        log.info('macOS detected at startup: Input Monitoring disabled. Using browser events.')
+
+    # Start the application; finish_startup runs once the GUI loop is up and also
+    # creates the macOS menu bar item (shows 00:00:00 when idle)
+    #webview.start(debug=debug)  # Optional: use 'cef' or 'qt' for better styling support
+    tracer.mark('webview.start')
+    webview.start(api.finish_startup, debug=debug)
+
@@ -0,0 +1,150 @@
+# ui_events.py
+
+import json
+import time
+import threading
+
+from app_logging import get_logger
+from metrics import metrics
+
+log = get_logger(__name__)
+
+# Receiver installed by the frontend (frontend/src/hooks/useBackendEvents.jsx)
+JS_RECEIVER = 'window.receiveFromPython'
+
+
+class UiEventChannel:
+    """Pushes state updates from the backend to the UI through window.evaluate_js
+
+    The UI used to poll: its own 1-second counter, a get_current_session_time
+    round trip on every window focus, and stats only when it asked. Instead the
+    backend publishes the state of a topic ('session', 'stats', 'uploads') when it
+    changes, and the channel delivers it:
+
+    - coalesced: only the latest payload per topic is kept, so a topic that
+      changes ten times before the next delivery is sent once.
+    - batched: everything pending goes out in one evaluate_js call, at most one
+      call every min_interval seconds.
+    - with backpressure: evaluate_js blocks until the page has run the call, and
+      there is only ever one call in flight. When the page is slow (busy or
+      hidden) the next call waits as long as the last one took, and updates keep
+      coalescing meanwhile, so pending state never grows beyond one entry per
+      topic.
+
+    Nothing is pushed before the UI subscribes (attach()); a call that fails
+    (page reloading, window closed) detaches the channel until the UI subscribes
+    again and takes the current state from snapshot().
+    """
+
+    def __init__(self, min_interval=0.25, receiver=JS_RECEIVER, clock=time.monotonic):
+        """
+        Args:
+            min_interval (float): Shortest time in seconds between two deliveries
+            receiver (str): JavaScript function called with each batch
+            clock: Monotonic time source
+        """
+        self.min_interval = min_interval
+        self.receiver = receiver
+        self._clock = clock
+
+        self._cond = threading.Condition()
+        self._window = None
+        self._pending = {}  # {topic: latest payload not yet delivered}
+        self._state = {}  # {topic: latest payload}
+        self._seq = 0
+        self._next_delivery = 0.0
+        self._thread = None
+        self._metrics = {'published': 0, 'coalesced': 0, 'batches': 0, 'delivered': 0, 'failed': 0}
+
+    @property
+    def attached(self):
+        with self._cond:
+            return self._window is not None
+
+    def attach(self, window):
+        """Deliver updates to window from now on (the UI subscribed)"""
+        with self._cond:
+            self._window = window
+            # The subscriber takes the current state from snapshot()
+            self._pending.clear()
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='UiEvents', daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+
+    def detach(self):
+        """Stop delivering; published state is still kept for the next subscriber"""
+        with self._cond:
+            self._window = None
+            self._pending.clear()
+            self._cond.notify_all()
+
+    def publish(self, topic, payload):
+        """Set the state of a topic; the UI receives it with the next batch
+
+        Args:
+            topic (str): 'session', 'stats' or 'uploads'
+            payload: JSON-serializable state of the topic
+        """
+        with self._cond:
+            self._metrics['published'] += 1
+            self._state[topic] = payload
+            if self._window is None:
+                return
+            if topic in self._pending:
+                self._metrics['coalesced'] += 1
+            self._pending[topic] = payload
+            self._cond.notify_all()
+
+    def snapshot(self):
+        """Latest payload of every topic published so far"""
+        with self._cond:
+            return dict(self._state)
+
+    def get_metrics(self):
+        with self._cond:
+            result = dict(self._metrics)
+            result['pending'] = len(self._pending)
+            result['attached'] = self._window is not None
+            return result
+
+    def _take_batch(self):
+        """Wait for pending updates and the next delivery slot (lock not held)"""
+        with self._cond:
+            while True:
+                if self._window is not None and self._pending:
+                    wait = self._next_delivery - self._clock()
+                    if wait <= 0:
+                        batch, self._pending = self._pending, {}
+                        self._seq += 1
+                        return self._window, self._seq, batch
+                    # Updates published meanwhile join this batch
+                    self._cond.wait(wait)
+                else:
+                    self._cond.wait()
+
+    def _run(self):
+        while True:
+            window, seq, batch = self._take_batch()
+            script = f'{self.receiver} && {self.receiver}({json.dumps({"seq": seq, "events": batch})})'
+            started = self._clock()
+            try:
+                window.evaluate_js(script)
+                failed = False
+            except Exception as e:
+                log.debug('UI push failed, waiting for the UI to subscribe again: %s', e)
+                failed = True
+            took = self._clock() - started
+            metrics.histogram('ui.push').record(took * 1_000_000)
+
+            with self._cond:
+                self._metrics['batches'] += 1
+                if failed:
+                    self._metrics['failed'] += 1
+                    if self._window is window:
+                        self._window = None
+                        self._pending.clear()
+                else:
+                    self._metrics['delivered'] += len(batch)
+                # A slow page gets as much time between calls as the last call took
+                self._next_delivery = self._clock() + max(self.min_interval, took)
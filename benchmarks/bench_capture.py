@@ -0,0 +1,74 @@
+"""Screen capture latency: cold grabber per capture vs. the long-lived capture service
+
+Needs a display. On a headless Linux machine run it under Xvfb:
+
+    xvfb-run -s "-screen 0 1920x1080x24" python benchmarks/bench_capture.py --iterations 50
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import statistics
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+import mss
+import mss.tools
+
+from capture_service import ScreenCaptureService
+
+
+def cold_capture(output_path):
+    """The previous take_screenshot path: a new grabber for every capture"""
+    with mss.mss() as sct:
+        screenshot = sct.grab(sct.monitors[0])
+        mss.tools.to_png(screenshot.rgb, screenshot.size, output=output_path)
+
+
+def measure(capture, iterations, output_path):
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        capture(output_path)
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def summarize(name, samples):
+    samples = sorted(samples)
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    print(f"{name:<6} n={len(samples):<4} mean={statistics.mean(samples):8.2f} ms  "
+          f"median={statistics.median(samples):8.2f} ms  p95={p95:8.2f} ms  max={samples[-1]:8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=30)
+    args = parser.parse_args()
+
+    if sys.platform.startswith('linux') and not os.environ.get('DISPLAY'):
+        print("No DISPLAY set; run this benchmark under xvfb-run")
+        return 1
+
+    output_path = os.path.join(tempfile.gettempdir(), 'bench_capture.png')
+    service = ScreenCaptureService()
+    try:
+        # Warm up the service so its one-time grabber setup is not part of the samples
+        service.capture(output_path)
+
+        cold = measure(cold_capture, args.iterations, output_path)
+        warm = measure(service.capture, args.iterations, output_path)
+    finally:
+        service.stop()
+        if os.path.exists(output_path):
+            os.remove(output_path)
+
+    summarize("cold", cold)
+    summarize("warm", warm)
+    print(f"Service metrics: {service.get_metrics()}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
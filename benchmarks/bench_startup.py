@@ -0,0 +1,93 @@
+"""Cold-start import cost of backend/main.py, measured with `python -X importtime`
+
+Each run imports main in a fresh interpreter (with HOME pointed at a temporary
+directory so no real tracker.db is touched) and reports the cumulative import time
+of main and the slowest imports below it. HEAVY_MODULES lists the modules that are
+meant to load on first use only; the report flags any that were imported eagerly.
+
+    python benchmarks/bench_startup.py --runs 5 --top 15
+"""
+import os
+import sys
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+# Imported on first use by main.py (lazy_import / _load_pynput / _load_macos_menu_support / capture_service)
+HEAVY_MODULES = ('webview', 'requests', 'psutil', 'screeninfo', 'pynput', 'mss', 'AppKit', 'objc')
+
+
+def parse_importtime(stderr):
+    """Parse `-X importtime` output
+
+    Returns:
+        list: (module, self_us, cumulative_us) for every top-level or nested import
+    """
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len('import time:'):].split('|')
+            rows.append((name.strip(), int(self_us), int(cumulative_us)))
+        except ValueError:
+            continue
+    return rows
+
+
+def measure_import(module='main', python=sys.executable):
+    """Import a backend module in a fresh interpreter
+
+    Returns:
+        dict: {'total_ms': cumulative import time of the module, 'rows': parsed rows}
+    """
+    with tempfile.TemporaryDirectory() as home:
+        env = dict(os.environ, HOME=home, LOCALAPPDATA=home)
+        result = subprocess.run(
+            [python, '-X', 'importtime', '-c', f'import {module}'],
+            cwd=BACKEND_DIR, env=env, capture_output=True, text=True, timeout=120
+        )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+    rows = parse_importtime(result.stderr)
+    total = next((cumulative for name, _, cumulative in rows if name == module), None)
+    if total is None:
+        raise RuntimeError(f"No importtime line for {module}")
+    return {'total_ms': total / 1000, 'rows': rows}
+
+
+def eager_heavy_modules(rows):
+    """Heavy modules that were imported while importing main"""
+    imported = {name for name, _, _ in rows}
+    return [name for name in HEAVY_MODULES if name in imported]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=15)
+    parser.add_argument('--module', default='main')
+    args = parser.parse_args()
+
+    # The first run warms the OS file cache and writes .pyc files
+    measure_import(args.module)
+    runs = [measure_import(args.module) for _ in range(args.runs)]
+    totals = [run['total_ms'] for run in runs]
+
+    print(f"import {args.module}: median {statistics.median(totals):.1f} ms, "
+          f"min {min(totals):.1f} ms, max {max(totals):.1f} ms over {args.runs} runs")
+
+    rows = runs[-1]['rows']
+    print(f"\nSlowest imports (cumulative, last run):")
+    for name, self_us, cumulative_us in sorted(rows, key=lambda r: r[2], reverse=True)[:args.top]:
+        print(f"  {cumulative_us / 1000:8.1f} ms  {self_us / 1000:8.1f} ms self  {name}")
+
+    eager = eager_heavy_modules(rows)
+    print(f"\nHeavy modules imported eagerly: {', '.join(eager) if eager else 'none'}")
+
+
+if __name__ == '__main__':
+    main()
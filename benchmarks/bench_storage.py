@@ -0,0 +1,114 @@
+"""tracker.db write throughput and latency with concurrent readers
+
+Compares the old access pattern (a new sqlite3 connection per operation with the
+default rollback journal) to the long-lived WAL Database from backend/storage.py.
+
+    python benchmarks/bench_storage.py --inserts 2000 --readers 4
+"""
+import os
+import sys
+import time
+import sqlite3
+import argparse
+import tempfile
+import threading
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from storage import Database
+
+INSERT_SQL = 'INSERT INTO time_entries (project_name, timestamp, duration) VALUES (?, ?, ?)'
+READ_SQL = 'SELECT project_name, timestamp, duration FROM time_entries ORDER BY id DESC LIMIT 10'
+
+
+class ConnectPerCall:
+    """The previous pattern: sqlite3.connect(db_file) around every statement"""
+
+    def __init__(self, path):
+        self.path = path
+        with sqlite3.connect(path) as conn:
+            conn.execute('CREATE TABLE IF NOT EXISTS time_entries (id INTEGER PRIMARY KEY AUTOINCREMENT, '
+                         'project_name TEXT, timestamp TEXT, duration INTEGER)')
+
+    def insert(self, sql, params):
+        with sqlite3.connect(self.path, timeout=10) as conn:
+            conn.execute(sql, params)
+
+    def query(self, sql):
+        with sqlite3.connect(self.path, timeout=10) as conn:
+            return conn.execute(sql).fetchall()
+
+    def close(self):
+        pass
+
+
+def percentile(samples, pct):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * pct / 100))]
+
+
+def run(store, inserts, readers):
+    stop = threading.Event()
+    read_latencies = []
+    lock = threading.Lock()
+
+    def reader():
+        while not stop.is_set():
+            started = time.perf_counter()
+            store.query(READ_SQL)
+            elapsed = (time.perf_counter() - started) * 1000
+            with lock:
+                read_latencies.append(elapsed)
+
+    threads = [threading.Thread(target=reader, daemon=True) for _ in range(readers)]
+    for t in threads:
+        t.start()
+
+    write_latencies = []
+    started = time.perf_counter()
+    for i in range(inserts):
+        t0 = time.perf_counter()
+        store.insert(INSERT_SQL, (f'project-{i % 5}', '2024-01-01 09:00:00', i))
+        write_latencies.append((time.perf_counter() - t0) * 1000)
+    total = time.perf_counter() - started
+
+    stop.set()
+    for t in threads:
+        t.join()
+
+    return {
+        'inserts_per_sec': inserts / total,
+        'write_p50_ms': percentile(write_latencies, 50),
+        'write_p99_ms': percentile(write_latencies, 99),
+        'read_p99_ms': percentile(read_latencies, 99) if read_latencies else 0.0,
+        'reads': len(read_latencies),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--inserts', type=int, default=2000)
+    parser.add_argument('--readers', type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy = ConnectPerCall(os.path.join(tmp, 'legacy.db'))
+        wal = Database(os.path.join(tmp, 'wal.db'))
+        wal.migrate()
+        try:
+            results = {
+                'connect-per-call': run(legacy, args.inserts, args.readers),
+                'wal-manager': run(wal, args.inserts, args.readers),
+            }
+        finally:
+            wal.close()
+
+    print(f"{'store':<18}{'inserts/s':>12}{'write p50':>12}{'write p99':>12}{'read p99':>12}{'reads':>8}")
+    for name, r in results.items():
+        print(f"{name:<18}{r['inserts_per_sec']:>12.0f}{r['write_p50_ms']:>10.2f}ms"
+              f"{r['write_p99_ms']:>10.2f}ms{r['read_p99_ms']:>10.2f}ms{r['reads']:>8}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
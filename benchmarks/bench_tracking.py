@@ -0,0 +1,226 @@
+"""Hot paths of the tracking engine, with stored results for regression comparison
+
+Each case runs in-process against an Api instance with generated inputs: a fake
+psutil process table, Chromium/Firefox/Safari history databases of configurable
+size, and synthetic usage dictionaries. Nothing is sent over the network and
+HOME is pointed at a temporary directory, so no real tracker.db is touched.
+
+    python benchmarks/bench_tracking.py --save baseline
+    ... change something ...
+    python benchmarks/bench_tracking.py --compare baseline
+
+Results are written to benchmarks/results/<name>.json. --compare exits with
+status 1 when a case's best time got slower than --threshold times the
+baseline's; the best of the repeats is compared because it is the least
+affected by other load on the machine.
+"""
+import os
+import sys
+import json
+import time
+import random
+import timeit
+import argparse
+import platform
+import tempfile
+import statistics
+from datetime import datetime, timezone
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from fixtures import make_chromium_history, make_firefox_history, make_safari_history, FakePsutil
+import apps
+from apps import AppUsage
+from links import LinkUsage
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+
+def measure(func, repeat=5, min_time=0.2):
+    """Time func like timeit: calibrate a loop count, then take `repeat` samples
+
+    Returns:
+        dict: Per-call microseconds (median, min, max) and the loop count
+    """
+    timer = timeit.Timer(func)
+    number, elapsed = timer.autorange()
+    if elapsed < min_time:
+        number = max(1, int(number * min_time / max(elapsed, 1e-9)))
+    samples = [t / number * 1_000_000 for t in timer.repeat(repeat=repeat, number=number)]
+    return {
+        'median_us': statistics.median(samples),
+        'min_us': min(samples),
+        'max_us': max(samples),
+        'loops': number,
+        'repeat': repeat,
+    }
+
+
+def _screenshot_frame(width, height, seed=5):
+    """RGB buffer that compresses like a desktop: a few distinct rows, repeated"""
+    rng = random.Random(seed)
+    rows = [bytes(rng.randrange(256) for _ in range(width * 3)) for _ in range(16)]
+    flat = bytes([236, 236, 236]) * width
+    return b''.join(flat if rng.random() < 0.6 else rng.choice(rows) for _ in range(height))
+
+
+def build_cases(tracker, args, tmp):
+    """Benchmark cases as (name, func)"""
+    now = time.time()
+    cases = []
+
+    def tracking_api():
+        api = tracker.Api(defer_startup=True)
+        api.start_time = now - 3600
+        api.last_activity_time = now
+        api.last_active_check_time = now
+        return api
+
+    # Activity ingest: what every pynput/browser event costs
+    api_ingest = tracking_api()
+    cases.append(('activity.ingest.mouse', lambda: api_ingest.record_activity('mouse')))
+    cases.append(('activity.ingest.keyboard', lambda: api_ingest.record_activity('keyboard')))
+
+    # The 1-second idle check
+    api_idle = tracking_api()
+    cases.append(('activity.check_idle_status', api_idle.check_idle_status))
+
+    # Application scan against a fixed process table
+    api_apps = tracking_api()
+    fake_psutil = FakePsutil(processes=args.processes)
+    api_apps.app_tracker.system = fake_psutil.system
+    real_psutil = apps.psutil
+
+    def check_apps():
+        apps.psutil = fake_psutil
+        try:
+            api_apps.check_running_applications()
+        finally:
+            apps.psutil = real_psutil
+    cases.append((f'apps.check[{args.processes} processes]', check_apps))
+
+    # Browser history extraction from generated databases
+    api_links = tracking_api()
+    cutoff = int(now) - 3600
+    histories = {
+        'chromium': (api_links.get_chrome_history, make_chromium_history),
+        'firefox': (api_links.get_firefox_history, make_firefox_history),
+        'safari': (api_links.get_safari_history, make_safari_history),
+    }
+    for browser, (extract, make) in histories.items():
+        path = make(os.path.join(tmp, f'{browser}.db'), args.history_visits, args.history_urls, now)
+        cases.append((f'links.history.{browser}[{args.history_visits} visits]',
+                      lambda extract=extract, path=path: extract(path, cutoff)))
+
+    # Session payload preparation from populated usage dictionaries
+    api_payload = tracking_api()
+    stamp = datetime.now(timezone.utc).isoformat(timespec='milliseconds').replace('+00:00', 'Z')
+    for i in range(args.links):
+        url = f'https://example{i % 97}.com/page/{i}'
+        api_payload.links_usage[url] = LinkUsage(url, f'Example page {i}', 2 + i % 300, now - i % 30)
+    for i in range(args.apps):
+        api_payload.applications_usage[f'app{i}'] = AppUsage(f'app{i}', f'/opt/app{i}/app{i}', 2 + i * 7, now)
+    screenshots = [{'url': f'https://files.example.com/{i}.png', 'timestamp': stamp} for i in range(3)]
+    cases.append((f'links.prepare_for_session[{args.links} links]', api_payload.prepare_links_for_session))
+    cases.append(('session.update_payload', lambda: json.dumps(api_payload._build_session_update(
+        3000, 600, 40, 120, screenshots, "I am working on Task"))))
+
+    # PNG encode of a full-HD frame (the CPU part of take_screenshot)
+    try:
+        import mss.tools
+    except ImportError:
+        mss = None
+    if mss is not None:
+        frame = _screenshot_frame(1920, 1080)
+        cases.append(('screenshot.encode_png[1920x1080]',
+                      lambda: mss.tools.to_png(frame, (1920, 1080), level=6)))
+    return cases
+
+
+def environment(args):
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'params': {k: v for k, v in vars(args).items() if k not in ('save', 'compare', 'filter')},
+    }
+
+
+def results_path(name):
+    return name if name.endswith('.json') else os.path.join(RESULTS_DIR, f'{name}.json')
+
+
+def save_results(name, report):
+    path = results_path(name)
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    return path
+
+
+def compare(report, baseline, threshold):
+    """Best-time ratios against a baseline report
+
+    Returns:
+        list: (name, baseline_us, current_us, ratio, regressed) for cases in both
+    """
+    rows = []
+    for name, result in report['results'].items():
+        before = baseline['results'].get(name)
+        if not before:
+            continue
+        ratio = result['min_us'] / before['min_us'] if before['min_us'] else float('inf')
+        rows.append((name, before['min_us'], result['min_us'], ratio, ratio > threshold))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--processes', type=int, default=400, help='size of the fake process table')
+    parser.add_argument('--history-visits', type=int, default=20000, help='visits per history database')
+    parser.add_argument('--history-urls', type=int, default=2000, help='distinct URLs per history database')
+    parser.add_argument('--links', type=int, default=500, help='entries in links_usage')
+    parser.add_argument('--apps', type=int, default=60, help='entries in applications_usage')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--filter', default='', help='only run cases whose name contains this')
+    parser.add_argument('--save', metavar='NAME', help='store results as benchmarks/results/NAME.json')
+    parser.add_argument('--compare', metavar='NAME', help='compare with a stored result')
+    parser.add_argument('--threshold', type=float, default=1.25, help='slowdown ratio counted as a regression')
+    args = parser.parse_args()
+
+    baseline = None
+    if args.compare:
+        with open(results_path(args.compare)) as f:
+            baseline = json.load(f)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # tracker.py resolves DATA_DIR from HOME at import time
+        os.environ['HOME'] = tmp
+        os.environ['LOCALAPPDATA'] = tmp
+        import tracker
+
+        results = {}
+        for name, func in build_cases(tracker, args, tmp):
+            if args.filter not in name:
+                continue
+            results[name] = measure(func, repeat=args.repeat)
+            print(f"{name:<45}{results[name]['median_us']:>12.1f} us  (min {results[name]['min_us']:.1f})")
+
+    report = {'environment': environment(args), 'results': results}
+    if args.save:
+        print(f"\nSaved to {save_results(args.save, report)}")
+
+    if baseline is None:
+        return 0
+    rows = compare(report, baseline, args.threshold)
+    print(f"\n{'case':<45}{'baseline':>12}{'current':>12}{'ratio':>8}")
+    for name, before, after, ratio, regressed in rows:
+        flag = '  REGRESSION' if regressed else ''
+        print(f"{name:<45}{before:>10.1f}us{after:>10.1f}us{ratio:>8.2f}{flag}")
+    return 1 if any(row[4] for row in rows) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,151 @@
+"""Generated inputs for the tracking benchmarks: browser history databases and a fake psutil
+
+The history databases carry only the tables and columns main.py reads, filled
+with `visits` visits spread over `urls` distinct URLs in the `span` seconds
+before `now`. Generation is seeded, so every run reads the same data.
+"""
+import random
+import sqlite3
+
+CHROME_EPOCH_OFFSET = 11644473600  # seconds between 1601-01-01 and 1970-01-01
+SAFARI_EPOCH_OFFSET = 978307200  # seconds between 1970-01-01 and 2001-01-01
+
+
+def _visits(visits, urls, now, span, seed):
+    rng = random.Random(seed)
+    pages = [(f'https://example{i % 97}.com/page/{i}', f'Example page {i}') for i in range(urls)]
+    for _ in range(visits):
+        page = rng.randrange(urls)
+        yield page + 1, pages[page], now - rng.uniform(0, span)
+
+
+def _url_rows(urls, visit_counts):
+    return [(i + 1, f'https://example{i % 97}.com/page/{i}', f'Example page {i}', visit_counts.get(i + 1, 0))
+            for i in range(urls)]
+
+
+def _fill(path, schema, url_sql, visit_sql, visit_row, visits, urls, now, span, seed):
+    counts = {}
+    visit_rows = []
+    for page_id, _, visit_time in _visits(visits, urls, now, span, seed):
+        counts[page_id] = counts.get(page_id, 0) + 1
+        visit_rows.append(visit_row(page_id, visit_time))
+    conn = sqlite3.connect(path)
+    try:
+        conn.executescript(schema)
+        conn.executemany(url_sql, _url_rows(urls, counts))
+        conn.executemany(visit_sql, visit_rows)
+        conn.commit()
+    finally:
+        conn.close()
+    return path
+
+
+def make_chromium_history(path, visits, urls, now, span=3600, seed=1):
+    """Chrome/Brave/Edge `History` file; times are microseconds since 1601"""
+    return _fill(
+        path,
+        """
+        CREATE TABLE urls (id INTEGER PRIMARY KEY, url TEXT, title TEXT, visit_count INTEGER);
+        CREATE TABLE visits (id INTEGER PRIMARY KEY, url INTEGER, visit_time INTEGER);
+        CREATE INDEX visits_time_index ON visits (visit_time);
+        """,
+        'INSERT INTO urls (id, url, title, visit_count) VALUES (?, ?, ?, ?)',
+        'INSERT INTO visits (url, visit_time) VALUES (?, ?)',
+        lambda page_id, t: (page_id, int((t + CHROME_EPOCH_OFFSET) * 1_000_000)),
+        visits, urls, now, span, seed
+    )
+
+
+def make_firefox_history(path, visits, urls, now, span=3600, seed=2):
+    """Firefox `places.sqlite`; times are microseconds since 1970"""
+    return _fill(
+        path,
+        """
+        CREATE TABLE moz_places (id INTEGER PRIMARY KEY, url TEXT, title TEXT, visit_count INTEGER);
+        CREATE TABLE moz_historyvisits (id INTEGER PRIMARY KEY, place_id INTEGER, visit_date INTEGER);
+        CREATE INDEX moz_historyvisits_dateindex ON moz_historyvisits (visit_date);
+        """,
+        'INSERT INTO moz_places (id, url, title, visit_count) VALUES (?, ?, ?, ?)',
+        'INSERT INTO moz_historyvisits (place_id, visit_date) VALUES (?, ?)',
+        lambda page_id, t: (page_id, int(t * 1_000_000)),
+        visits, urls, now, span, seed
+    )
+
+
+def make_safari_history(path, visits, urls, now, span=3600, seed=3):
+    """Safari `History.db`; times are seconds since 2001, titles live on the visits"""
+    counts = {}
+    visit_rows = []
+    for page_id, (_, title), visit_time in _visits(visits, urls, now, span, seed):
+        counts[page_id] = counts.get(page_id, 0) + 1
+        visit_rows.append((page_id, visit_time - SAFARI_EPOCH_OFFSET, title))
+    conn = sqlite3.connect(path)
+    try:
+        conn.executescript("""
+            CREATE TABLE history_items (id INTEGER PRIMARY KEY, url TEXT, visit_count INTEGER);
+            CREATE TABLE history_visits (id INTEGER PRIMARY KEY, history_item INTEGER, visit_time REAL, title TEXT);
+            CREATE INDEX history_visits__last_visit ON history_visits (visit_time);
+        """)
+        conn.executemany('INSERT INTO history_items (id, url, visit_count) VALUES (?, ?, ?)',
+                         [(i, url, count) for i, url, _, count in _url_rows(urls, counts)])
+        conn.executemany('INSERT INTO history_visits (history_item, visit_time, title) VALUES (?, ?, ?)',
+                         visit_rows)
+        conn.commit()
+    finally:
+        conn.close()
+    return path
+
+
+class _FakeProcess:
+    __slots__ = ('info',)
+
+    def __init__(self, info):
+        self.info = info
+
+
+class FakePsutil:
+    """Stands in for psutil in check_running_applications: a fixed process table
+
+    Roughly a desktop's mix: a third are system processes filtered by name or path,
+    a few have no executable, the rest are user applications (with duplicates, as
+    for multi-process browsers).
+    """
+
+    class NoSuchProcess(Exception):
+        pass
+
+    class AccessDenied(Exception):
+        pass
+
+    class ZombieProcess(Exception):
+        pass
+
+    # System processes of each platform.system() name, by name and by directory
+    SYSTEM = {
+        'Windows': [('svchost.exe', 'C:\\Windows\\System32\\svchost.exe'),
+                    ('helper.exe', 'C:\\Windows\\SysWOW64\\helper.exe'),
+                    ('explorer.exe', 'C:\\Windows\\explorer.exe')],
+        'Darwin': [('launchd', '/sbin/launchd'),
+                   ('Finder', '/System/Library/CoreServices/Finder.app/Contents/MacOS/Finder'),
+                   ('kworker', '/usr/sbin/kworker')],
+    }
+
+    def __init__(self, processes=400, apps=40, seed=4, system='Windows'):
+        """The process table of a `system` machine: a third system processes"""
+        rng = random.Random(seed)
+        self.system = system
+        self.processes = []
+        for pid in range(processes):
+            kind = rng.random()
+            if kind < 0.33:
+                name, exe = rng.choice(self.SYSTEM[system])
+            elif kind < 0.40:
+                name, exe = f'kthread{pid}', None
+            else:
+                app = rng.randrange(apps)
+                name, exe = f'app{app}', f'/opt/app{app}/app{app}'
+            self.processes.append(_FakeProcess({'pid': pid, 'name': name, 'exe': exe, 'username': 'user'}))
+
+    def process_iter(self, attrs=None):
+        return iter(self.processes)
@@ -1,9 +1,10 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import {BsThreeDotsVertical} from "react-icons/bs";
 import ProfilePage from './Pages/ProfilePage';
 import Login from "./Pages/Login";
 import { AuthProvider, useAuth } from './context/AuthContext';
 import useAxiosSecure from "./hooks/useAxiosSecure.jsx";
+import useBackendEvents from "./hooks/useBackendEvents.jsx";
 import {QueryClient, QueryClientProvider, useQuery} from "@tanstack/react-query";
 import logo from "/icon.ico";
 import { Toaster, toast } from 'sonner'
@@ -454,32 +455,52 @@ function AppContent() {
         activePercentage: 0
     });
     const [statsLastUpdated, setStatsLastUpdated] = useState(null);
+    const [uploadStatus, setUploadStatus] = useState(null);
+
+    // Backend elapsed time and when it was received; the displayed time runs on from it
+    const timerAnchor = useRef({ elapsed: 0, receivedAt: Date.now() });
+
+    // Timer, stats and upload state are pushed by the backend when they change
+    useBackendEvents({
+        session: (session) => {
+            timerAnchor.current = { elapsed: session.elapsed_time, receivedAt: Date.now() };
+            setTime(session.elapsed_time);
+            setIsRunning(session.running);
+        },
+        stats: (stats) => {
+            // Local numbers first; the backend pushes the server's after reconciling
+            if (stats.daily.success) {
+                setDailyStats(stats.daily.data);
+            }
+            if (stats.weekly.success) {
+                setWeeklyStats(stats.weekly.data);
+            }
+            setStatsLastUpdated(new Date());
+        },
+        uploads: setUploadStatus,
+    });
 
-    // Effect to fetch stats when the app is opened
+    // Effect to resume or close a session left open by a crash or force-quit
     useEffect(() => {
-        const fetchInitialStats = async () => {
+        const recoverSession = async () => {
             try {
-                const dailyResult = await window.pywebview.api.get_daily_stats();
-                const weeklyResult = await window.pywebview.api.get_weekly_stats();
-
-                if (dailyResult.success) {
-                    setDailyStats(dailyResult.data);
+                const result = await window.pywebview.api.recover_orphaned_session();
+                if (result.success && result.resumed) {
+                    // The elapsed time arrives with the pushed session state
+                    setSessionInfo({ _id: result.resumed });
+                    setIsRunning(true);
+                    toast.info("Resumed your previous session");
+                } else if (result.success && result.finalized && result.finalized.length > 0) {
+                    toast.info("Your previous session was closed at its last saved point");
                 }
-
-                if (weeklyResult.success) {
-                    setWeeklyStats(weeklyResult.data);
-                }
-
-                setStatsLastUpdated(new Date());
             } catch (error) {
-                toast.error("Failed to get stats!");
-                console.error("Initial stats fetch error:", error);
+                console.error("Session recovery error:", error);
             }
         };
 
-        fetchInitialStats();
+        recoverSession();
     }, []);
-    
+
     // Handle checking for updates (used for manual checks from profile page)
     const handleCheckForUpdates = async () => {
         try {
@@ -603,8 +624,11 @@ function AppContent() {
         //let visibilityHiddenTimestamp = null;
         
         if (isRunning) {
+            // Count from the last pushed elapsed time, so the display does not drift
+            // and catches up by itself after the machine slept
             interval = setInterval(() => {
-                setTime(prevTime => prevTime + 1);
+                const { elapsed, receivedAt } = timerAnchor.current;
+                setTime(elapsed + Math.floor((Date.now() - receivedAt) / 1000));
             }, 1000);
 
             const handleKeyDown = () => {
@@ -619,18 +643,6 @@ function AppContent() {
                 window.pywebview.api.record_mouse_activity();
             };
 
-            // Sync timer with backend when window regains focus
-            const handleWindowFocus = async () => {
-                try {
-                    const result = await window.pywebview.api.get_current_session_time();
-                    if (result.success) {
-                        setTime(result.elapsed_time);
-                    }
-                } catch (error) {
-                    console.error("Error syncing timer on focus:", error);
-                }
-            };
-            
             // Handle visibility change (for sleep mode detection)
             // const handleVisibilityChange = async () => {
             //     if (document.visibilityState === 'hidden') {
@@ -679,7 +691,6 @@ function AppContent() {
             window.addEventListener('keydown', handleKeyDown);
             window.addEventListener('mousemove', handleMouseMove);
             window.addEventListener('click', handleMouseClick);
-            window.addEventListener('focus', handleWindowFocus);
             // document.addEventListener('visibilitychange', handleVisibilityChange);
 
             window.pywebview.api.record_mouse_activity();
@@ -689,7 +700,6 @@ function AppContent() {
                 window.removeEventListener('keydown', handleKeyDown);
                 window.removeEventListener('mousemove', handleMouseMove);
                 window.removeEventListener('click', handleMouseClick);
-                window.removeEventListener('focus', handleWindowFocus);
                 // document.removeEventListener('visibilitychange', handleVisibilityChange);
             };
         } else {
@@ -910,6 +920,7 @@ function AppContent() {
                                                 const result = await window.pywebview.api.start_timer(selectedProject, userNote);
                                                 if (result.success) {
                                                     setSessionInfo(result.data);
+                                                    timerAnchor.current = { elapsed: 0, receivedAt: Date.now() };
                                                     setIsRunning(true);
 
                                                     if (result.stats) {
@@ -1064,8 +1075,12 @@ function AppContent() {
                     <div className="flex justify-between items-center">
                         <div className="flex items-center gap-2 text-xs text-gray-500">
                             <div className="flex items-center gap-1.5">
-                                <div className="w-1.5 h-1.5 bg-green-400 rounded-full animate-pulse"></div>
-                                <span>Synced</span>
+                                <div className={`w-1.5 h-1.5 ${uploadStatus?.last_session_sync?.success === false ? 'bg-amber-400' : 'bg-green-400'} rounded-full animate-pulse`}></div>
+                                <span>
+                                    {uploadStatus?.last_session_sync?.success === false
+                                        ? 'Sync pending'
+                                        : uploadStatus?.pending > 0 ? `Uploading ${uploadStatus.pending}` : 'Synced'}
+                                </span>
                             </div>
                             <span className="font-medium text-gray-700">
                                 {formatLastUpdated(statsLastUpdated)}
@@ -1103,8 +1118,8 @@ function AppContent() {
                                         }
                                     }
 
-                                    const dailyResult = await window.pywebview.api.get_daily_stats();
-                                    const weeklyResult = await window.pywebview.api.get_weekly_stats();
+                                    // Manual sync: wait for the server numbers
+                                    const { daily: dailyResult, weekly: weeklyResult } = await window.pywebview.api.get_stats(true);
 
                                     if (dailyResult.success) {
                                         setDailyStats(dailyResult.data);
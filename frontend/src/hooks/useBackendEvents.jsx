@@ -0,0 +1,52 @@
+import { useEffect, useRef } from 'react'
+
+// Topic handlers of the mounted subscriber, and the topics pushed since it subscribed
+let topicHandlers = {}
+let pushedTopics = new Set()
+
+const dispatch = (events, isSnapshot = false) => {
+    Object.entries(events || {}).forEach(([topic, payload]) => {
+        // A push that overtook the subscription reply is newer than its snapshot
+        if (isSnapshot && pushedTopics.has(topic)) return
+        if (!isSnapshot) pushedTopics.add(topic)
+        const handler = topicHandlers[topic]
+        if (handler) handler(payload)
+    })
+}
+
+// Called by the backend (ui_events.py) with {seq, events: {topic: state}}
+window.receiveFromPython = (batch) => {
+    dispatch(batch.events)
+    return batch.seq
+}
+
+// Subscribe to state pushed by the backend instead of polling it.
+// handlers: {session, stats, uploads}; each gets the latest state of its topic,
+// first from the subscription snapshot and then whenever it changes.
+const useBackendEvents = (handlers) => {
+    const handlersRef = useRef(handlers)
+    handlersRef.current = handlers
+
+    useEffect(() => {
+        pushedTopics = new Set()
+        topicHandlers = Object.fromEntries(
+            ['session', 'stats', 'uploads'].map(topic => [
+                topic,
+                (payload) => handlersRef.current[topic] && handlersRef.current[topic](payload)
+            ])
+        )
+
+        window.pywebview.api.subscribe_events()
+            .then(result => {
+                if (result.success) dispatch(result.state, true)
+            })
+            .catch(error => console.error('Event subscription error:', error))
+
+        return () => {
+            topicHandlers = {}
+            window.pywebview.api.unsubscribe_events()
+        }
+    }, [])
+}
+
+export default useBackendEvents
@@ -0,0 +1,415 @@
+"""Fleet simulator: thousands of headless clients against the mock server, in virtual time
+
+Every simulated client is a real Api instance whose network calls (login,
+create_session, update_session, the daily/weekly stats fetchers and screenshot
+uploads) are routed in-process to a MockTrackerBackend. A discrete-event loop
+fires each client's periodic work at the times its timers would, so a full day
+for thousands of clients runs in minutes without sleeping, and the server logs
+every request at its virtual time. Screenshots follow the client's own
+ScreenshotEngine plan: its scheduler runs on the virtual clock without a
+thread, and only the screen grab and upload are modelled.
+
+Start times cluster in the morning (normally distributed around --start, with a
+share of users starting exactly on a quarter hour) and everybody takes a lunch
+break, which is what makes timers anchored to the start time line up. The
+report is the request-rate histogram over the day.
+
+    python loadtest/fleet.py --clients 2000
+    python loadtest/fleet.py --clients 2000 --strategy jitter --jitter 0.2 --json fleet.json
+
+--strategy selects how a client schedules its periodic requests:
+    anchored      every interval after the timer started (the current client)
+    jitter        each interval stretched or shrunk by up to --jitter
+    random-phase  first tick at a random point of the first interval, then anchored
+    client        the client's own SyncCadence (jitter, backoff, server hints)
+
+--server-interval makes the server ask for a different session update interval
+through the response hints the client honors with --strategy client.
+"""
+import os
+import sys
+import json
+import heapq
+import random
+import argparse
+import tempfile
+import statistics
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from mock_server import MockTrackerBackend, Faults
+from response_cache import ResponseCache
+
+DAY = 24 * 3600
+STRATEGIES = ('anchored', 'jitter', 'random-phase', 'client')
+
+
+class VirtualClock:
+    """Simulated wall clock in epoch seconds; advanced by the event loop only"""
+
+    def __init__(self, start=0.0):
+        self.now = start
+
+    def __call__(self):
+        return self.now
+
+
+class InProcessResponse:
+    """The parts of requests.Response the client reads"""
+
+    def __init__(self, status_code, headers, body):
+        self.status_code = status_code
+        self.headers = headers
+        self.text = json.dumps(body)
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class InProcessRequests:
+    """requests-compatible module object that hands requests to a MockTrackerBackend
+
+    Installed as tracker.requests (and as the response cache session) for the
+    simulation; exceptions are those of the real requests package so the
+    client's error handling is unchanged.
+    """
+
+    def __init__(self, backend):
+        import requests
+        self.exceptions = requests.exceptions
+        self.backend = backend
+
+    def request(self, method, url, json=None, data=None, headers=None, **kwargs):
+        if json is not None:
+            body = _json_bytes(json)
+        elif hasattr(data, 'read'):
+            body = data.read()
+        else:
+            body = data or b''
+        parts = urlsplit(url)
+        path = parts.path + (f'?{parts.query}' if parts.query else '')
+        status, response_headers, response = self.backend.handle(method, path, headers or {}, body)
+        return InProcessResponse(status, response_headers, response)
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def patch(self, url, **kwargs):
+        return self.request('PATCH', url, **kwargs)
+
+
+def _json_bytes(payload):
+    return json.dumps(payload).encode('utf-8')
+
+
+def next_delay(strategy, interval, rng, first=False, jitter=0.2):
+    """Seconds until a client's next periodic request under a cadence strategy"""
+    if strategy == 'jitter':
+        return interval * rng.uniform(1 - jitter, 1 + jitter)
+    if strategy == 'random-phase' and first:
+        return rng.uniform(0, interval)
+    return interval
+
+
+def draw_workday(rng, start_hour=9.0, spread_minutes=25, round_share=0.4):
+    """One client's work blocks as (start, end) seconds since midnight
+
+    Around four hours of work, a 45-75 minute lunch, then four more hours.
+    round_share of clients start exactly on a quarter hour.
+    """
+    start = rng.gauss(start_hour * 3600, spread_minutes * 60)
+    if rng.random() < round_share:
+        start = round(start / 900) * 900
+    morning = rng.uniform(3.5, 4.5) * 3600
+    lunch = rng.uniform(45, 75) * 60
+    afternoon = 8 * 3600 - morning
+    return ((start, start + morning), (start + morning + lunch, start + morning + lunch + afternoon))
+
+
+class FleetSimulation:
+    """Discrete-event simulation of a fleet of Api instances over one day"""
+
+    def __init__(self, tracker, clients, strategy='anchored', jitter=0.2, faults=None, seed=1,
+                 start_hour=9.0, spread_minutes=25, round_share=0.4, day_start=1_700_000_000.0):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown strategy {strategy}; expected one of {', '.join(STRATEGIES)}")
+        self.tracker = tracker
+        self.strategy = strategy
+        self.jitter = jitter
+        self.rng = random.Random(seed)
+        self.day_start = day_start - day_start % DAY
+        self.clock = VirtualClock(self.day_start)
+        self.backend = MockTrackerBackend(faults, clock=self.clock, sleep=lambda seconds: None, seed=seed)
+        self.transport = InProcessRequests(self.backend)
+        self.events = []
+        self._sequence = 0
+        self.clients = []
+        for number in range(clients):
+            api = tracker.Api(defer_startup=True)
+            api.response_cache = ResponseCache(tracker.db, session=self.transport)
+            api.system_tracking_enabled = False
+            api.sync_cadence.rng = random.Random(self.rng.random())
+            api.sync_cadence.clock = self.clock
+            # Virtual clients run on mains power; the host's battery is not theirs
+            api.sync_cadence.power_source = lambda: False
+            client = {
+                'number': number,
+                'api': api,
+                'blocks': draw_workday(self.rng, start_hour, spread_minutes, round_share),
+                'generation': 0,
+                'running': False,
+                'plan': 0,
+            }
+            # The engine plans and collects as in the app; the simulation takes the
+            # planned captures on the virtual clock and models the grab and upload
+            engine = api.screenshots
+            engine.running = lambda client=client: client['running']
+            engine.capture_and_enqueue = lambda client=client: self._upload(client)
+            engine.scheduler.clock = self.clock
+            engine.scheduler.rng = random.Random(self.rng.random())
+            self.clients.append(client)
+
+    def _schedule(self, when, action, client, generation=None, data=None):
+        self._sequence += 1
+        heapq.heappush(self.events, (when, self._sequence, action, client,
+                                     client['generation'] if generation is None else generation, data))
+
+    def _start_block(self, client, block):
+        api = client['api']
+        now = self.clock.now
+        if not api.auth_token:
+            api.login(f"user{client['number']}@example.com", 'password')
+        if not api.create_session('Fleet simulation').get('success'):
+            return
+        client['generation'] += 1
+        client['session_start'] = now
+        client['running'] = True
+        api.screenshots.session_screenshots = []
+        self._schedule_session_update(client, first=True)
+        self._schedule(now + self._delay(api, 'stats', api.stats_update_interval, first=True), 'stats', client)
+        self._schedule(self.day_start + block[1], 'stop', client)
+
+    def _tick(self, action, client, data=None):
+        api = client['api']
+        now = self.clock.now
+        if action == 'session':
+            elapsed = int(now - client['session_start'])
+            api.update_session(active_time=int(elapsed * 0.85), idle_time=elapsed - int(elapsed * 0.85),
+                               user_note='Fleet simulation')
+            api.screenshots_for_session = []
+            self._schedule_session_update(client)
+        elif action == 'stats':
+            api._fetch_daily_stats()
+            api._fetch_weekly_stats()
+            self._schedule(now + self._delay(api, action, api.stats_update_interval), action, client)
+        elif action == 'capture':
+            if data == client['plan']:
+                self._schedule_capture(client, api.screenshots.scheduler.run_due())
+
+    def _schedule_session_update(self, client, first=False):
+        """Schedule the next session update and plan that interval's screenshots
+
+        As in the app, the scheduler interval follows the session delay, so hints,
+        jitter and low power stretch the capture window and quota with it.
+        """
+        api = client['api']
+        now = self.clock.now
+        delay = self._delay(api, 'session', api.session_update_interval, first=first)
+        self._schedule(now + delay, 'session', client)
+        scheduler = api.screenshots.scheduler
+        scheduler.interval = delay
+        scheduler.start_interval(now, background=False)
+        client['plan'] += 1  # captures of the replaced plan are dropped
+        self._schedule_capture(client, scheduler.run_due())
+
+    def _schedule_capture(self, client, when):
+        if when is not None:
+            self._schedule(when, 'capture', client, data=client['plan'])
+
+    def _delay(self, api, kind, interval, first=False):
+        if self.strategy == 'client':
+            return api.sync_cadence.next_delay(kind, interval)
+        return next_delay(self.strategy, interval, self.rng, first=first, jitter=self.jitter)
+
+    def _upload(self, client):
+        """Stands in for ScreenshotEngine.capture_and_enqueue: uploads at once, in virtual time
+
+        Returns:
+            bool: True if the screenshot was uploaded
+        """
+        response = self.transport.post(self.tracker.URLS['FILE_UPLOAD'], data=b'\x89PNG fleet',
+                                       headers={'x-api-key': self.tracker.URLS['FILE_UPLOAD_API_KEY']})
+        if response.status_code != 201:
+            return False
+        timestamp = datetime.fromtimestamp(self.clock.now, timezone.utc)
+        client['api'].screenshots.add([{
+            'timestamp': timestamp.isoformat(timespec='milliseconds').replace('+00:00', 'Z'),
+            'imageUrl': response.json()['data']['url'],
+        }])
+        return True
+
+    def _stop(self, client):
+        api = client['api']
+        elapsed = int(self.clock.now - client['session_start'])
+        client['running'] = False
+        api.screenshots.scheduler.stop()
+        api.update_session(active_time=int(elapsed * 0.85), idle_time=elapsed - int(elapsed * 0.85),
+                           is_final_update=True, user_note='Fleet simulation')
+        client['generation'] += 1
+
+    def run(self, progress=None):
+        """Simulate the day; returns the backend's request log
+
+        tracker.requests is replaced by the in-process transport while running. Stats
+        are fetched every stats_update_interval, so their cache lifetime is set to
+        zero: every fetch is a request, as for a real client whose entry expired.
+        """
+        for client in self.clients:
+            for block in client['blocks']:
+                self._schedule(self.day_start + block[0], 'start', client, generation=-1, data=block)
+
+        real_requests, stats_ttl = self.tracker.requests, self.tracker.CACHE_TTLS['STATS']
+        self.tracker.requests = self.transport
+        self.tracker.CACHE_TTLS['STATS'] = (0, 0)
+        try:
+            self._loop(progress)
+        finally:
+            self.tracker.requests = real_requests
+            self.tracker.CACHE_TTLS['STATS'] = stats_ttl
+        return self.backend.request_log
+
+    def _loop(self, progress):
+        handled = 0
+        while self.events:
+            when, _, action, client, generation, data = heapq.heappop(self.events)
+            self.clock.now = when
+            if action == 'start':
+                self._start_block(client, data)
+            elif generation != client['generation']:
+                continue  # timer of a stopped session
+            elif action == 'stop':
+                self._stop(client)
+            else:
+                self._tick(action, client, data)
+            handled += 1
+            if progress and handled % 20000 == 0:
+                progress(handled, len(self.backend.request_log))
+
+
+def rate_histogram(request_log, origin, bucket=60):
+    """Requests per bucket, per endpoint and in total
+
+    Returns:
+        dict: {'bucket': seconds, 'start': offset of the first bucket, 'series': {name: [counts]}}
+    """
+    if not request_log:
+        return {'bucket': bucket, 'start': 0, 'series': {'total': []}}
+    first = int((min(t for t, _, _ in request_log) - origin) // bucket)
+    last = int((max(t for t, _, _ in request_log) - origin) // bucket)
+    series = {'total': [0] * (last - first + 1)}
+    for t, endpoint, _ in request_log:
+        index = int((t - origin) // bucket) - first
+        series['total'][index] += 1
+        series.setdefault(endpoint or 'unrouted', [0] * (last - first + 1))[index] += 1
+    return {'bucket': bucket, 'start': first * bucket, 'series': series}
+
+
+def summarize(histogram):
+    """Peak, mean and percentile request rates (per second) of each series"""
+    bucket = histogram['bucket']
+    summary = {}
+    for name, counts in histogram['series'].items():
+        busy = [c for c in counts if c] or [0]
+        ordered = sorted(busy)
+        peak_index = counts.index(max(counts)) if counts else 0
+        summary[name] = {
+            'requests': sum(counts),
+            'peak_rps': round(max(busy) / bucket, 2),
+            'peak_at': _clock_time(histogram['start'] + peak_index * bucket),
+            'p50_rps': round(statistics.median(busy) / bucket, 2),
+            'p99_rps': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] / bucket, 2),
+            'mean_rps': round(statistics.mean(busy) / bucket, 2),
+            'peak_to_mean': round(max(busy) / statistics.mean(busy), 1) if sum(busy) else 0,
+        }
+    return summary
+
+
+def _clock_time(seconds):
+    seconds = int(seconds) % DAY
+    return f'{seconds // 3600:02d}:{seconds % 3600 // 60:02d}'
+
+
+def render_histogram(histogram, window=(8 * 3600, 11 * 3600), width=60):
+    """Text bar chart of the total request rate inside a time-of-day window"""
+    bucket = histogram['bucket']
+    counts = histogram['series']['total']
+    lines = []
+    peak = max(counts) if counts else 0
+    for index, count in enumerate(counts):
+        offset = histogram['start'] + index * bucket
+        if not window[0] <= offset < window[1]:
+            continue
+        bar = '#' * (round(count * width / peak) if peak else 0)
+        lines.append(f'{_clock_time(offset)} {count / bucket:8.2f}/s {bar}')
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clients', type=int, default=1000)
+    parser.add_argument('--strategy', choices=STRATEGIES, default='anchored')
+    parser.add_argument('--jitter', type=float, default=0.2, help='relative jitter for --strategy jitter')
+    parser.add_argument('--start', type=float, default=9.0, help='mean start hour')
+    parser.add_argument('--spread', type=float, default=25, help='standard deviation of start times in minutes')
+    parser.add_argument('--round-share', type=float, default=0.4, help='share of clients starting on a quarter hour')
+    parser.add_argument('--bucket', type=int, default=60, help='histogram bucket in seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--server-interval', type=float, default=None,
+                        help='session update interval the server asks for (see --strategy client)')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--json', metavar='PATH', help='write summary and full histogram to PATH')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as home:
+        # tracker.py resolves DATA_DIR from HOME at import time
+        os.environ['HOME'] = home
+        os.environ['LOCALAPPDATA'] = home
+        import config
+        config.use_server('http://fleet.invalid')
+        import tracker
+        tracker.init_db()
+
+        simulation = FleetSimulation(tracker, args.clients, strategy=args.strategy, jitter=args.jitter,
+                                     faults=Faults(error_rate=args.error_rate), seed=args.seed,
+                                     start_hour=args.start, spread_minutes=args.spread,
+                                     round_share=args.round_share)
+        if args.server_interval:
+            simulation.backend.sync_hints = {'syncIntervals': {'session': args.server_interval}}
+        log = simulation.run(progress=lambda events, requests: print(
+            f"  {events} events, {requests} requests", file=sys.stderr))
+        tracker.db.close()
+
+    histogram = rate_histogram(log, simulation.day_start, args.bucket)
+    summary = summarize(histogram)
+    print(f"{args.clients} clients, strategy {args.strategy}, {len(log)} requests\n")
+    print(f"{'endpoint':<18}{'requests':>10}{'peak/s':>9}{'at':>7}{'p50/s':>8}{'p99/s':>8}{'mean/s':>8}{'peak/mean':>10}")
+    for name, row in sorted(summary.items(), key=lambda item: -item[1]['requests']):
+        print(f"{name:<18}{row['requests']:>10}{row['peak_rps']:>9.2f}{row['peak_at']:>7}{row['p50_rps']:>8.2f}"
+              f"{row['p99_rps']:>8.2f}{row['mean_rps']:>8.2f}{row['peak_to_mean']:>10.1f}")
+    print(f"\nTotal request rate, 08:00-11:00 ({args.bucket}s buckets):")
+    print(render_histogram(histogram))
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'params': vars(args), 'summary': summary, 'histogram': histogram,
+                       'server': simulation.backend.summary()}, f)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
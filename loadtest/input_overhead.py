@@ -0,0 +1,104 @@
+"""CPU cost of the system-wide input hooks during continuous mouse motion
+
+pynput calls the Python callback for every mouse move event, so the hook's cost
+per event decides how much CPU the tracker burns while the user moves the mouse.
+This times each callback on a stream of move events (on top of a no-op
+callback) and reports its cost per event and the share of one core it takes
+at --rate events per second (1000 is a gaming mouse's polling rate):
+
+    legacy      every event goes through Api.record_activity, as before InputListener
+    coalesced   InputListener: one clock read and compare per event
+
+    python loadtest/input_overhead.py --rate 1000
+
+--live runs the real pynput listener instead (needs a display) and reports the
+CPU used while you move the mouse for --seconds.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+
+def _make_api():
+    os.environ.setdefault('HOME', tempfile.mkdtemp(prefix='input-overhead-'))
+    from main import Api
+    api = Api(defer_startup=True)
+    api._reset_session_state('Input overhead', 'Measuring', time.time())
+    api.last_activity_time = api.last_active_check_time = api.clock.monotonic()
+    return api
+
+
+def _cost_per_event(callback, events=200_000, repeats=3):
+    """Best-of-`repeats` CPU seconds per callback(x, y) call"""
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.process_time()
+        for x in range(events):
+            callback(x, 100)
+        best = min(best, (time.process_time() - start) / events)
+    return best
+
+
+def measure(rate):
+    from input_listener import InputListener
+
+    api = _make_api()
+    try:
+        def legacy(*args):
+            if api.start_time:
+                api.record_activity('mouse')
+
+        listener = InputListener(api._on_system_input, clock=api.clock.monotonic,
+                                 throttle=api.event_throttle_interval)
+        baseline = _cost_per_event(lambda *args: None)
+        report = {'rate': rate}
+        for name, callback in (('legacy', legacy), ('coalesced', listener._on_mouse)):
+            cost = max(0.0, _cost_per_event(callback) - baseline)
+            report[name] = {
+                'us_per_event': round(1e6 * cost, 3),
+                'cpu_percent': round(100 * cost * rate, 3),
+            }
+        report['forwarded'] = listener.get_metrics()
+        return report
+    finally:
+        api.upload_queue.stop()
+
+
+def measure_live(seconds):
+    import tracker
+    from input_listener import InputListener
+
+    if not tracker._load_pynput():
+        raise SystemExit('pynput cannot hook input here (no display?)')
+    api = _make_api()
+    listener = InputListener(api._on_system_input, clock=api.clock.monotonic,
+                             throttle=api.event_throttle_interval)
+    listener.start(tracker.keyboard, tracker.mouse)
+    print(f'Move the mouse for {seconds} seconds...', file=sys.stderr)
+    try:
+        cpu_start = time.process_time()
+        time.sleep(seconds)
+        cpu = time.process_time() - cpu_start
+    finally:
+        listener.stop()
+        api.upload_queue.stop()
+    return {'seconds': seconds, 'cpu_percent': round(100 * cpu / seconds, 3), 'forwarded': listener.get_metrics()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rate', type=int, default=1000, help='Mouse move events per second')
+    parser.add_argument('--seconds', type=float, default=5, help='Duration of the --live measurement')
+    parser.add_argument('--live', action='store_true', help='Measure the real pynput listener')
+    args = parser.parse_args()
+    report = measure_live(args.seconds) if args.live else measure(args.rate)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
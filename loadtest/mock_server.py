@@ -0,0 +1,355 @@
+"""Local stand-in for the tracker servers, for offline end-to-end, load and soak tests
+
+Implements the endpoints the client uses (see config.server_urls) with in-memory
+state: employee login, profile, sessions (POST/PATCH), daily/weekly stats and
+the screenshot file upload. Latency, errors and rate limits can be injected for
+all endpoints or per endpoint, and every request is counted and logged so load
+tests can report request volume and shape.
+
+    python loadtest/mock_server.py --port 8787 --latency 0.05 --error-rate 0.01
+    RI_TRACKER_SERVER=http://127.0.0.1:8787 python backend/main.py
+
+MockTrackerBackend holds the logic and can be called in-process (the fleet
+simulator does); MockTrackerServer serves it over HTTP.
+"""
+import re
+import sys
+import json
+import time
+import uuid
+import random
+import hashlib
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit
+
+ENDPOINTS = ('login', 'profile', 'sessions.create', 'sessions.update', 'stats.daily', 'stats.weekly', 'upload')
+
+ROUTES = [
+    ('POST', re.compile(r'^/api/v1/auth/login/employee$'), 'login'),
+    ('GET', re.compile(r'^/api/v1/employee/(?P<id>[^/]+)$'), 'profile'),
+    ('POST', re.compile(r'^/api/v1/sessions/app$'), 'sessions.create'),
+    ('PATCH', re.compile(r'^/api/v1/sessions/app/(?P<id>[^/]+)$'), 'sessions.update'),
+    ('GET', re.compile(r'^/api/v1/stats/daily/(?P<id>[^/]+)$'), 'stats.daily'),
+    ('GET', re.compile(r'^/api/v1/stats/weekly/(?P<id>[^/]+)$'), 'stats.weekly'),
+    ('POST', re.compile(r'^/api/files/(?P<bucket>[^/]+)/upload$'), 'upload'),
+]
+
+
+class Faults:
+    """Injected behaviour of an endpoint
+
+    Attributes:
+        latency: Seconds added to every response
+        jitter: Up to this many extra seconds, uniformly distributed
+        error_rate: Fraction of requests answered with error_status
+        error_status: HTTP status of injected errors
+        rate_limit: Requests per minute allowed per client (None: unlimited);
+                    requests over the limit get 429 with a Retry-After header
+    """
+
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, error_status=500, rate_limit=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.rate_limit = rate_limit
+
+
+class MockTrackerBackend:
+    """In-memory tracker server logic
+
+    Args:
+        faults: Faults applied to endpoints without their own (default: none)
+        clock: Time source for rate limits and the request log; the fleet
+               simulator passes its virtual clock
+        sleep: Called with the injected latency; the fleet simulator passes a no-op
+        seed: Seed for error injection and jitter
+
+    `sync_hints` is merged into every successful session update response, e.g.
+    {'syncIntervals': {'session': 900}} or {'nextUpdateIn': 1200}, to steer the
+    clients' sync cadence.
+    """
+
+    def __init__(self, faults=None, clock=time.time, sleep=time.sleep, seed=None):
+        self.default_faults = faults or Faults()
+        self.endpoint_faults = {}
+        self.clock = clock
+        self.sleep = sleep
+        self.rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.sessions = {}
+        self._employee_sessions = {}  # employeeId -> [session]
+        self.uploads = 0
+        self.counts = {endpoint: 0 for endpoint in ENDPOINTS}
+        self.statuses = {}
+        self.request_log = []  # (time, endpoint, status)
+        self._buckets = {}  # (endpoint, client) -> [tokens, updated]
+        self.sync_hints = {}
+
+    def configure(self, endpoint=None, **faults):
+        """Set faults for one endpoint, or the defaults when endpoint is None"""
+        if endpoint is None:
+            self.default_faults = Faults(**faults)
+        elif endpoint not in ENDPOINTS:
+            raise ValueError(f"Unknown endpoint {endpoint}; expected one of {', '.join(ENDPOINTS)}")
+        else:
+            self.endpoint_faults[endpoint] = Faults(**faults)
+
+    def faults_for(self, endpoint):
+        return self.endpoint_faults.get(endpoint, self.default_faults)
+
+    def reset_counters(self):
+        with self._lock:
+            self.counts = {endpoint: 0 for endpoint in ENDPOINTS}
+            self.statuses = {}
+            self.request_log = []
+
+    def summary(self):
+        """Request counts per endpoint and per status"""
+        with self._lock:
+            return {
+                'requests': sum(self.counts.values()),
+                'endpoints': dict(self.counts),
+                'statuses': {str(status): count for status, count in sorted(self.statuses.items())},
+                'sessions': len(self.sessions),
+                'open_sessions': sum(1 for s in self.sessions.values() if not s.get('endTime')),
+                'uploads': self.uploads,
+            }
+
+    def _allow(self, endpoint, client, limit):
+        """Token bucket per endpoint and client; returns seconds to wait, or 0"""
+        now = self.clock()
+        rate = limit / 60.0
+        with self._lock:
+            tokens, updated = self._buckets.get((endpoint, client), (float(limit), now))
+            tokens = min(float(limit), tokens + (now - updated) * rate)
+            if tokens >= 1:
+                self._buckets[(endpoint, client)] = (tokens - 1, now)
+                return 0
+            self._buckets[(endpoint, client)] = (tokens, now)
+            return (1 - tokens) / rate
+
+    def _record(self, endpoint, status):
+        with self._lock:
+            if endpoint:
+                self.counts[endpoint] += 1
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+            self.request_log.append((self.clock(), endpoint, status))
+
+    def handle(self, method, path, headers=None, body=b''):
+        """Answer one request
+
+        Returns:
+            tuple: (status, response headers dict, JSON-serializable body)
+        """
+        headers = {key.lower(): value for key, value in (headers or {}).items()}
+        path = urlsplit(path).path
+        for route_method, pattern, endpoint in ROUTES:
+            match = pattern.match(path)
+            if match and route_method == method:
+                break
+        else:
+            self._record(None, 404)
+            return 404, {}, {'success': False, 'message': f'No route for {method} {path}'}
+
+        faults = self.faults_for(endpoint)
+        if faults.latency or faults.jitter:
+            self.sleep(faults.latency + self.rng.uniform(0, faults.jitter))
+
+        client = headers.get('authorization') or headers.get('x-api-key') or headers.get('x-client', 'anonymous')
+        if faults.rate_limit:
+            wait = self._allow(endpoint, client, faults.rate_limit)
+            if wait:
+                self._record(endpoint, 429)
+                return 429, {'Retry-After': str(max(1, int(wait + 0.999)))}, {
+                    'success': False, 'message': 'Too many requests'}
+
+        if faults.error_rate and self.rng.random() < faults.error_rate:
+            self._record(endpoint, faults.error_status)
+            return faults.error_status, {}, {'success': False, 'message': 'Injected server error'}
+
+        try:
+            payload = json.loads(body) if body and endpoint != 'upload' else {}
+        except ValueError:
+            self._record(endpoint, 400)
+            return 400, {}, {'success': False, 'message': 'Invalid JSON'}
+
+        status, response = getattr(self, '_' + endpoint.replace('.', '_'))(match, headers, payload, body)
+        self._record(endpoint, status)
+        return status, {}, response
+
+    @staticmethod
+    def _employee_id(email):
+        return hashlib.sha1(email.lower().encode('utf-8')).hexdigest()[:24]
+
+    def _authorized(self, headers):
+        return headers.get('authorization', '').startswith('Bearer ')
+
+    def _login(self, match, headers, payload, body):
+        email = payload.get('email')
+        if not email or not payload.get('password'):
+            return 400, {'success': False, 'message': 'Email and password are required'}
+        employee_id = self._employee_id(email)
+        return 200, {'success': True, 'data': {
+            'token': f'mock-{employee_id}-{uuid.uuid4().hex[:8]}',
+            'employee': {'employeeId': employee_id, 'companyId': 'mock-company',
+                         'email': email, 'fullName': email.split('@')[0]}
+        }}
+
+    def _profile(self, match, headers, payload, body):
+        if not self._authorized(headers):
+            return 401, {'success': False, 'message': 'Unauthorized'}
+        return 200, {'success': True, 'data': {
+            '_id': match.group('id'), 'companyId': {'_id': 'mock-company', 'name': 'Mock Company'},
+            'fullName': 'Mock Employee'
+        }}
+
+    def _sessions_create(self, match, headers, payload, body):
+        if not self._authorized(headers):
+            return 401, {'success': False, 'message': 'Unauthorized'}
+        if not payload.get('employeeId') or not payload.get('startTime'):
+            return 400, {'success': False, 'message': 'employeeId and startTime are required'}
+        session_id = uuid.uuid4().hex[:24]
+        session = dict(payload, _id=session_id, activeTime=0, idleTime=0, updates=0)
+        with self._lock:
+            self.sessions[session_id] = session
+            self._employee_sessions.setdefault(session['employeeId'], []).append(session)
+        return 201, {'success': True, 'data': {k: v for k, v in session.items() if k != 'updates'}}
+
+    def _sessions_update(self, match, headers, payload, body):
+        if not self._authorized(headers):
+            return 401, {'success': False, 'message': 'Unauthorized'}
+        with self._lock:
+            session = self.sessions.get(match.group('id'))
+            if session is None:
+                return 404, {'success': False, 'message': 'Session not found'}
+            session.update({key: payload[key] for key in ('activeTime', 'idleTime', 'sleepTime', 'endTime', 'userNote')
+                            if key in payload})
+            session['updates'] += 1
+            session['screenshots'] = session.get('screenshots', 0) + len(payload.get('screenshots') or [])
+            data = {'_id': session['_id'], 'activeTime': session['activeTime'], 'idleTime': session['idleTime']}
+        return 200, dict(self.sync_hints, success=True, data=data)
+
+    def _stats(self, employee_id):
+        with self._lock:
+            sessions = self._employee_sessions.get(employee_id, [])
+            active = sum(int(s.get('activeTime') or 0) for s in sessions)
+            total = active + sum(int(s.get('idleTime') or 0) for s in sessions)
+        return 200, {'success': True, 'data': {
+            'totalHours': total, 'activeHours': active,
+            'activePercentage': int(round(active * 100 / total)) if total else 0
+        }}
+
+    def _stats_daily(self, match, headers, payload, body):
+        if not self._authorized(headers):
+            return 401, {'success': False, 'message': 'Unauthorized'}
+        return self._stats(match.group('id'))
+
+    def _stats_weekly(self, match, headers, payload, body):
+        if not self._authorized(headers):
+            return 401, {'success': False, 'message': 'Unauthorized'}
+        return self._stats(match.group('id'))
+
+    def _upload(self, match, headers, payload, body):
+        if not headers.get('x-api-key'):
+            return 401, {'success': False, 'message': 'Missing API key'}
+        if not body:
+            return 400, {'success': False, 'message': 'Empty upload'}
+        with self._lock:
+            self.uploads += 1
+            number = self.uploads
+        return 201, {'success': True, 'data': {
+            'url': f'http://mock-files.local/{match.group("bucket")}/{number}.png', 'size': len(body)}}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def _serve(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        status, headers, response = self.server.backend.handle(self.command, self.path, dict(self.headers), body)
+        data = json.dumps(response).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    do_GET = do_POST = do_PATCH = _serve
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            sys.stderr.write("%s %s\n" % (self.address_string(), format % args))
+
+
+class MockTrackerServer:
+    """MockTrackerBackend served over HTTP on a background thread
+
+        server = MockTrackerServer(port=0)
+        config.use_server(server.start())
+        ...
+        server.stop()
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, backend=None, verbose=False):
+        self.backend = backend or MockTrackerBackend()
+        self.httpd = ThreadingHTTPServer((host, port), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.backend = self.backend
+        self.httpd.verbose = verbose
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        """Serve in a daemon thread; returns the base URL"""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name='MockTrackerServer', daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8787)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every response')
+    parser.add_argument('--jitter', type=float, default=0.0, help='up to this many extra seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of requests that fail')
+    parser.add_argument('--error-status', type=int, default=500)
+    parser.add_argument('--rate-limit', type=int, default=None, help='requests per minute per client and endpoint')
+    parser.add_argument('--sync-hints', type=json.loads, default={},
+                        help='JSON merged into session update responses, e.g. \'{"nextUpdateIn": 900}\'')
+    parser.add_argument('--verbose', action='store_true', help='log every request')
+    args = parser.parse_args()
+
+    backend = MockTrackerBackend(Faults(args.latency, args.jitter, args.error_rate, args.error_status,
+                                        args.rate_limit))
+    backend.sync_hints = args.sync_hints
+    server = MockTrackerServer(args.host, args.port, backend, verbose=args.verbose)
+    print(f"Mock tracker server on {server.base_url} (RI_TRACKER_SERVER={server.base_url})")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+        print(json.dumps(backend.summary(), indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,236 @@
+"""Headless soak test: one client tracking simulated 8-hour days against the mock server
+
+Drives Api.start_timer/stop_timer through work days (two blocks around a lunch
+break) with a simulated user producing input events and idle stretches. All
+client intervals (activity, apps, links, session/stats updates, checkpoints,
+screenshots, idle threshold, cache lifetimes) are divided by --speedup, so a day
+takes hours / speedup of wall time while the client does the same number of
+ticks, requests and uploads as in a real day.
+
+    python loadtest/soak.py --days 1 --speedup 120
+    python loadtest/soak.py --days 3 --speedup 240 --error-rate 0.05 --latency 0.2 --json soak.json
+
+The report lists client CPU time, peak and final memory, and the requests the
+server received per endpoint and status. Screenshots are synthetic PNGs (no
+display is needed) unless --real-screenshots is given.
+"""
+import os
+import sys
+import json
+import time
+import zlib
+import struct
+import random
+import argparse
+import tempfile
+import threading
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from mock_server import MockTrackerBackend, MockTrackerServer, Faults
+
+# Api attributes holding intervals in seconds; all are divided by the speedup
+SCALED_INTERVALS = (
+    'activity_check_interval', 'max_activity_check_interval', 'idle_poll_interval',
+    'app_check_interval', 'link_check_interval',
+    'session_update_interval', 'stats_update_interval', 'checkpoint_interval',
+    'idle_threshold', 'event_throttle_interval', 'screenshot_min_interval', 'screenshot_max_interval',
+)
+
+# Work blocks of a day in hours from the start of the day: 4 h, lunch, 4 h
+DAY_BLOCKS = ((0.0, 4.0), (5.0, 9.0))
+
+
+def synthetic_png(width=1280, height=800, seed=0):
+    """A PNG of roughly screenshot size, built with zlib only"""
+    rng = random.Random(seed)
+    row_pool = [b'\x00' + bytes(rng.randrange(256) for _ in range(width * 3)) for _ in range(8)]
+    flat = b'\x00' + b'\xec' * (width * 3)
+    raw = b''.join(flat if rng.random() < 0.7 else rng.choice(row_pool) for _ in range(height))
+
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data) & 0xffffffff)
+
+    header = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)
+    return b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', header) + chunk(b'IDAT', zlib.compress(raw, 6)) + chunk(b'IEND', b'')
+
+
+def scale_client(tracker, api, speedup):
+    """Divide the client's intervals and cache lifetimes by speedup"""
+    for name in SCALED_INTERVALS:
+        setattr(api, name, getattr(api, name) / speedup)
+    scheduler = api.screenshot_scheduler
+    for name in ('interval', 'base_interval', 'min_offset', 'headroom', 'retry_delay', 'retry_margin'):
+        setattr(scheduler, name, getattr(scheduler, name) / speedup)
+    api.stats_engine.max_age = api.stats_update_interval
+    for key, (ttl, stale) in list(tracker.CACHE_TTLS.items()):
+        tracker.CACHE_TTLS[key] = (ttl / speedup, stale / speedup)
+
+
+class SimulatedUser(threading.Thread):
+    """Input events while working, with occasional idle stretches
+
+    Events arrive every `event_gap` simulated seconds on average; with
+    probability `idle_chance` per simulated minute the user goes idle for 2-15
+    simulated minutes.
+    """
+
+    def __init__(self, api, speedup, event_gap=3.0, idle_chance=0.02, seed=None):
+        super().__init__(name='SimulatedUser', daemon=True)
+        self.api = api
+        self.speedup = speedup
+        self.event_gap = event_gap
+        self.idle_chance = idle_chance
+        self.rng = random.Random(seed)
+        self.stop_event = threading.Event()
+        self.events = 0
+
+    def run(self):
+        next_idle_check = 0.0
+        while not self.stop_event.is_set():
+            gap = self.rng.expovariate(1 / self.event_gap)
+            next_idle_check -= gap
+            if next_idle_check <= 0:
+                next_idle_check = 60.0
+                if self.rng.random() < self.idle_chance:
+                    gap += self.rng.uniform(120, 900)
+            if self.stop_event.wait(gap / self.speedup):
+                break
+            self.api.record_activity('keyboard' if self.rng.random() < 0.4 else 'mouse')
+            self.events += 1
+
+    def stop(self):
+        self.stop_event.set()
+        self.join(timeout=5)
+
+
+def _rss_bytes(psutil):
+    try:
+        return psutil.Process().memory_info().rss
+    except Exception:
+        return None
+
+
+def run_soak(days=1, speedup=120, faults=None, real_screenshots=False, seed=1, log=print):
+    """Run the soak test in this process
+
+    Returns:
+        dict: Client resource use, simulated activity and the server's request summary
+    """
+    backend = MockTrackerBackend(faults, seed=seed)
+    server = MockTrackerServer(backend=backend)
+    base_url = server.start()
+
+    with tempfile.TemporaryDirectory() as home:
+        # tracker.py resolves DATA_DIR from HOME at import time
+        os.environ['HOME'] = home
+        os.environ['LOCALAPPDATA'] = home
+        import config
+        config.use_server(base_url)
+        import tracker
+        tracker.init_db()
+
+        api = tracker.Api(defer_startup=True)
+        api.system_tracking_enabled = False
+        scale_client(tracker, api, speedup)
+
+        if not real_screenshots:
+            png = synthetic_png()
+
+            def capture(output_path=None):
+                fd, path = tempfile.mkstemp(suffix='.png', dir=home)
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(png)
+                return path
+            api.capture_service.capture = capture
+
+        login = api.login('soak@example.com', 'password')
+        if not login.get('success'):
+            raise RuntimeError(f"Login against the mock server failed: {login}")
+
+        psutil = tracker.psutil
+        cpu_start = time.process_time()
+        wall_start = time.perf_counter()
+        rss_samples = [_rss_bytes(psutil)]
+        sessions = failures = events = 0
+
+        for day in range(days):
+            day_start = time.perf_counter()
+            for block_start, block_end in DAY_BLOCKS:
+                # Wait (compressed) for the block to begin
+                delay = day_start + block_start * 3600 / speedup - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                result = api.start_timer('Soak test', 'Simulated work')
+                if not result.get('success'):
+                    failures += 1
+                    log(f"day {day + 1}: start_timer failed: {result.get('message')}")
+                    continue
+                user = SimulatedUser(api, speedup, seed=seed + day)
+                user.start()
+                block_end_at = day_start + block_end * 3600 / speedup
+                while time.perf_counter() < block_end_at:
+                    time.sleep(min(1.0, max(0.0, block_end_at - time.perf_counter())))
+                    rss_samples.append(_rss_bytes(psutil))
+                user.stop()
+                events += user.events
+                result = api.stop_timer()
+                sessions += 1
+                if not result.get('success'):
+                    failures += 1
+                    log(f"day {day + 1}: stop_timer failed: {result.get('message')}")
+            log(f"day {day + 1}/{days} done: {json.dumps(backend.summary()['endpoints'])}")
+
+        cpu = time.process_time() - cpu_start
+        wall = time.perf_counter() - wall_start
+        api.upload_queue.stop()
+        rss = [value for value in rss_samples if value]
+        summary = backend.summary()
+
+    server.stop()
+    simulated_hours = days * sum(end - start for start, end in DAY_BLOCKS)
+    return {
+        'days': days,
+        'speedup': speedup,
+        'simulated_work_hours': simulated_hours,
+        'wall_seconds': round(wall, 1),
+        'client': {
+            'cpu_seconds': round(cpu, 2),
+            'cpu_seconds_per_work_hour': round(cpu / simulated_hours, 3),
+            'cpu_percent_of_wall': round(cpu * 100 / wall, 1) if wall else None,
+            'rss_peak_mb': round(max(rss) / 2 ** 20, 1) if rss else None,
+            'rss_final_mb': round(rss[-1] / 2 ** 20, 1) if rss else None,
+            'sessions': sessions,
+            'failed_calls': failures,
+            'input_events': events,
+        },
+        'server': summary,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--days', type=int, default=1)
+    parser.add_argument('--speedup', type=float, default=120, help='simulated seconds per wall-clock second')
+    parser.add_argument('--latency', type=float, default=0.0, help='server latency in seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of failing requests')
+    parser.add_argument('--rate-limit', type=int, default=None, help='requests per minute per endpoint')
+    parser.add_argument('--real-screenshots', action='store_true', help='capture the real screen')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--json', metavar='PATH', help='also write the report to PATH')
+    args = parser.parse_args()
+
+    report = run_soak(
+        days=args.days, speedup=args.speedup,
+        faults=Faults(latency=args.latency, error_rate=args.error_rate, rate_limit=args.rate_limit),
+        real_screenshots=args.real_screenshots, seed=args.seed
+    )
+    print(json.dumps(report, indent=2))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,89 @@
+import os
+import sys
+import logging
+import tempfile
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+import app_logging
+from app_logging import RepeatFilter, BoundedQueueHandler, get_logger
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _record(msg, *args, name='ri_tracker.test', level=logging.INFO):
+    return logging.LogRecord(name, level, __file__, 1, msg, args, None)
+
+
+def test_repeat_filter_suppresses_and_annotates():
+    """Repeats beyond the burst are dropped; the next record through reports how many"""
+    clock = FakeClock()
+    repeat = RepeatFilter(burst=3, window=10, clock=clock)
+
+    passed = [repeat.filter(_record("Error checking idle status: %s", i)) for i in range(10)]
+    assert passed == [True] * 3 + [False] * 7
+    assert repeat.suppressed_total == 7
+
+    # A different template has its own budget
+    assert repeat.filter(_record("Session updated"))
+
+    clock.now = 11
+    record = _record("Error checking idle status: %s", 'late')
+    assert repeat.filter(record)
+    assert record.getMessage() == "Error checking idle status: late (7 similar messages suppressed)"
+
+    # The counter was reset by the annotated record
+    record = _record("Error checking idle status: %s", 'again')
+    assert repeat.filter(record)
+    assert record.getMessage() == "Error checking idle status: again"
+    print("Repeat filter test passed")
+
+
+def test_bounded_queue_drops_when_full():
+    """A full queue drops records instead of blocking the caller"""
+    handler = BoundedQueueHandler(maxsize=2)
+    for i in range(5):
+        handler.handle(_record("record %s", i))
+    assert handler.queue.qsize() == 2
+    assert handler.dropped == 3
+    print("Bounded queue test passed")
+
+
+def test_records_written_to_log_file_and_debug_toggle():
+    """Records reach the rotating file; debug records only while debug is on"""
+    log = get_logger('test_logging')
+    with tempfile.TemporaryDirectory() as tmp:
+        path = app_logging.setup_logging(tmp, debug=False)
+        try:
+            assert path == os.path.join(tmp, app_logging.LOG_FILE_NAME)
+            assert not log.isEnabledFor(logging.DEBUG)
+
+            log.debug("hidden debug line")
+            log.warning("visible warning %d", 1)
+            app_logging.set_debug(True)
+            assert app_logging.is_debug()
+            log.debug("visible debug line")
+            app_logging.set_debug(False)
+        finally:
+            app_logging.shutdown_logging()
+
+        with open(path, encoding='utf-8') as f:
+            content = f.read()
+    assert "visible warning 1" in content
+    assert "visible debug line" in content
+    assert "hidden debug line" not in content
+    assert app_logging.get_logging_metrics()['debug'] is False
+    print("Log file test passed")
+
+
+if __name__ == "__main__":
+    test_repeat_filter_suppresses_and_annotates()
+    test_bounded_queue_drops_when_full()
+    test_records_written_to_log_file_and_debug_toggle()
@@ -81,7 +81,7 @@ def test_application_tracking():
     for app in applications_data:
         app_name = app['name']
         app_time = app['timeSpent']
-        app_exe = raw_applications.get(app_name, {}).get('exe', 'Unknown')
+        app_exe = raw_applications[app_name].exe if app_name in raw_applications else 'Unknown'
         
         # Check if this is a system process
         is_system = False
@@ -0,0 +1,66 @@
+import os
+import sys
+import time
+import tempfile
+
+# Add the backend and benchmarks directories to the Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+sys.path.append(os.path.join(os.path.dirname(__file__), 'benchmarks'))
+
+import apps
+from main import Api
+from fixtures import make_chromium_history, make_firefox_history, make_safari_history, FakePsutil
+from bench_tracking import compare
+
+
+def test_history_fixtures_match_browser_schemas():
+    """The generated history databases are read by the real extractors"""
+    api = Api(defer_startup=True)
+    now = time.time()
+    with tempfile.TemporaryDirectory() as tmp:
+        chromium = make_chromium_history(os.path.join(tmp, 'History'), 300, 50, now, span=1800)
+        firefox = make_firefox_history(os.path.join(tmp, 'places.sqlite'), 300, 50, now, span=1800)
+        safari = make_safari_history(os.path.join(tmp, 'History.db'), 300, 50, now, span=1800)
+
+        for extract, path in ((api.get_chrome_history, chromium),
+                              (api.get_firefox_history, firefox),
+                              (api.get_safari_history, safari)):
+            entries = extract(path, int(now) - 3600)
+            assert len(entries) == 300, (path, len(entries))
+            assert entries[0]['url'].startswith('https://example') and entries[0]['title']
+
+            # Visits before the cutoff are not returned
+            assert len(extract(path, int(now) + 60)) == 0
+    print("History fixture test passed")
+
+
+def test_fake_process_table_filters_system_processes():
+    """check_running_applications runs against the fake process table"""
+    api = Api(defer_startup=True)
+    api.start_time = time.time() - 60
+    real_psutil = apps.psutil
+    apps.psutil = FakePsutil(processes=200, apps=10)
+    api.app_tracker.system = apps.psutil.system
+    try:
+        api.check_running_applications()
+    finally:
+        apps.psutil = real_psutil
+    assert api.applications_usage
+    assert set(api.applications_usage) <= {f'app{i}' for i in range(10)}
+    print("Fake process table test passed")
+
+
+def test_compare_flags_regressions():
+    """Cases slower than the threshold are flagged; new cases are ignored"""
+    baseline = {'results': {'a': {'min_us': 100.0}, 'b': {'min_us': 100.0}}}
+    report = {'results': {'a': {'min_us': 110.0}, 'b': {'min_us': 200.0}, 'c': {'min_us': 5.0}}}
+    rows = {row[0]: row for row in compare(report, baseline, threshold=1.25)}
+    assert set(rows) == {'a', 'b'}
+    assert not rows['a'][4] and rows['b'][4]
+    print("Compare test passed")
+
+
+if __name__ == "__main__":
+    test_history_fixtures_match_browser_schemas()
+    test_fake_process_table_filters_system_processes()
+    test_compare_flags_regressions()
@@ -0,0 +1,114 @@
+import os
+import sys
+import types
+import tempfile
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from capture_service import ScreenCaptureService
+
+
+class FakeShot:
+    rgb = b'\x00' * 12
+    size = (2, 2)
+
+
+class FakeGrabber:
+    """Stand-in for mss.mss() that counts how often it is created"""
+    instances = 0
+    fail_next_grab = False
+
+    def __init__(self):
+        FakeGrabber.instances += 1
+        self.monitors = [
+            {'left': 0, 'top': 0, 'width': 3840, 'height': 1080},
+            {'left': 0, 'top': 0, 'width': 1920, 'height': 1080},
+            {'left': 1920, 'top': 0, 'width': 1920, 'height': 1080},
+        ]
+
+    def grab(self, monitor):
+        if FakeGrabber.fail_next_grab:
+            FakeGrabber.fail_next_grab = False
+            raise RuntimeError("XGetImage() failed")
+        return FakeShot()
+
+    def close(self):
+        pass
+
+
+def _install_fake_mss():
+    """Swap in a fake mss so the service can be tested without a display"""
+    fake = types.ModuleType('mss')
+    tools = types.ModuleType('mss.tools')
+
+    def to_png(rgb, size, output=None):
+        with open(output, 'wb') as f:
+            f.write(b'\x89PNG')
+
+    tools.to_png = to_png
+    fake.mss = FakeGrabber
+    fake.tools = tools
+    saved = {name: sys.modules.get(name) for name in ('mss', 'mss.tools')}
+    sys.modules['mss'] = fake
+    sys.modules['mss.tools'] = tools
+    return saved
+
+
+def _restore_mss(saved):
+    for name, module in saved.items():
+        if module is None:
+            sys.modules.pop(name, None)
+        else:
+            sys.modules[name] = module
+
+
+def test_grabber_is_reused():
+    """Several captures share one grabber and one monitor enumeration"""
+    saved = _install_fake_mss()
+    FakeGrabber.instances = 0
+    service = ScreenCaptureService()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            for i in range(5):
+                path = service.capture(os.path.join(tmp, f'{i}.png'))
+                assert path and os.path.exists(path)
+
+        assert FakeGrabber.instances == 1, "Grabber should be opened once"
+        metrics = service.get_metrics()
+        assert metrics['captures'] == 5
+        assert metrics['monitor_count'] == 2
+        assert len(service.get_monitors()) == 2
+    finally:
+        service.stop()
+        _restore_mss(saved)
+    print("Grabber reuse test passed")
+
+
+def test_grabber_refresh_on_error_and_display_change():
+    """A failed grab or a display change reopens the grabber"""
+    saved = _install_fake_mss()
+    FakeGrabber.instances = 0
+    service = ScreenCaptureService()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            assert service.capture(os.path.join(tmp, 'a.png'))
+
+            FakeGrabber.fail_next_grab = True
+            assert service.capture(os.path.join(tmp, 'b.png')), "Capture should recover after reopening"
+            assert FakeGrabber.instances == 2
+
+            service.notify_display_change()
+            assert service.capture(os.path.join(tmp, 'c.png'))
+            assert FakeGrabber.instances == 3
+
+        assert service.get_metrics()['grabber_opens'] == 3
+    finally:
+        service.stop()
+        _restore_mss(saved)
+    print("Grabber refresh test passed")
+
+
+if __name__ == "__main__":
+    test_grabber_is_reused()
+    test_grabber_refresh_on_error_and_display_change()
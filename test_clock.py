@@ -0,0 +1,124 @@
+import os
+import sys
+import time
+from datetime import timezone
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from clock import SimulatedClock, SuspendDetector, system_clock
+
+
+def test_simulated_clock():
+    """Simulated time moves only when told to; jumps change the wall clock only"""
+    clock = SimulatedClock(start=1_700_000_000, monotonic_start=50)
+    clock.advance(90)
+    clock.sleep(10)
+    assert clock.time() == 1_700_000_100 and clock.monotonic() == 150
+    assert clock.now(timezone.utc).timestamp() == 1_700_000_100
+
+    clock.jump(-3600)
+    assert clock.time() == 1_699_996_500 and clock.monotonic() == 150
+    try:
+        clock.advance(-1)
+        assert False, "advance() must not run backwards"
+    except ValueError:
+        pass
+
+    assert abs(system_clock.time() - time.time()) < 1
+    assert system_clock.boottime() >= system_clock.monotonic() - 1
+    print("Simulated clock test passed")
+
+
+def test_suspend_detector():
+    """A gap between boot time and monotonic time is reported as a suspend; clock jumps are not"""
+    clock = SimulatedClock(start=1_700_000_000)
+    detector = SuspendDetector(clock, threshold=2.0)
+    assert detector.poll() is None  # first poll only starts measuring
+
+    clock.advance(30)
+    clock.jump(7200)
+    assert detector.poll() is None
+
+    clock.advance(5)
+    clock.suspend(1800)
+    clock.advance(1)
+    assert detector.poll() == (clock.time() - 1800, clock.time())
+    assert detector.poll() is None
+    print("Suspend detector test passed")
+
+
+def test_tracking_day_without_sleeping():
+    """An 8-hour session with an idle stretch runs on simulated time in well under a second"""
+    from main import Api
+
+    clock = SimulatedClock()
+    api = Api(defer_startup=True, clock=clock)
+    api._reset_session_state('Clock test', 'Testing', clock.time())
+    try:
+        started = time.perf_counter()
+        for second in range(8 * 3600):
+            # Input every 5 seconds, except for a 30 minute break after four hours
+            if second % 5 == 0 and not 4 * 3600 <= second < 4 * 3600 + 1800:
+                api.record_activity('keyboard' if second % 2 else 'mouse')
+            clock.advance(1)
+            api.check_idle_status()
+        api.update_activity_metrics()
+        elapsed = time.perf_counter() - started
+
+        assert elapsed < 5, elapsed
+        assert api.get_current_session_time()['elapsed_time'] == 8 * 3600
+        assert api._format_elapsed() == "08:00:00"
+        assert abs(api.active_time + api.idle_time - 8 * 3600) < 1e-6
+        # Idle from the idle threshold after the last input until input resumes
+        assert abs(api.idle_time - (1800 + 5 - api.idle_threshold)) <= 5
+        assert api.keyboard_activity_rate + api.mouse_activity_rate == 10
+    finally:
+        api.upload_queue.stop()
+    print("Simulated tracking day test passed")
+
+
+def _work(api, clock, seconds):
+    """Input every 5 seconds with an activity check every second"""
+    for second in range(seconds):
+        if second % 5 == 0:
+            api.record_activity('mouse')
+        clock.advance(1)
+        api.check_idle_status()
+
+
+def test_sleep_and_clock_changes():
+    """Clock changes don't touch active/idle time; a suspend is booked as sleep and sent"""
+    from main import Api
+
+    clock = SimulatedClock()
+    api = Api(defer_startup=True, clock=clock)
+    api._reset_session_state('Clock test', 'Testing', clock.time())
+    try:
+        _work(api, clock, 3600)
+        clock.jump(-3600)  # the user (or NTP) sets the clock back an hour
+        _work(api, clock, 1800)
+        clock.suspend(2 * 3600)  # lid closed
+        _work(api, clock, 1800)
+
+        assert abs(api.active_time + api.idle_time - 7200) < 1e-6
+        assert api.idle_time == 0
+        assert api.sleep_time == 7200
+        assert [interval['seconds'] for interval in api.sleep_intervals] == [7200]
+        # The timer shows the time since the start, sleep included
+        assert api._format_elapsed() == "04:00:00"
+
+        update = api._build_session_update(int(api.active_time), int(api.idle_time), 0, 0, [], 'Testing',
+                                           sleep_time=int(api.sleep_time))
+        assert update['sleepTime'] == 7200 and len(update['sleepIntervals']) == 1
+        assert api._checkpoint_state()['sleep_seconds'] == 7200
+    finally:
+        api.upload_queue.stop()
+    print("Sleep and clock change test passed")
+
+
+if __name__ == "__main__":
+    test_simulated_clock()
+    test_suspend_detector()
+    test_tracking_day_without_sleeping()
+    test_sleep_and_clock_changes()
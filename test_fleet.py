@@ -0,0 +1,77 @@
+import os
+import sys
+
+# Add the backend and loadtest directories to the Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+sys.path.append(os.path.join(os.path.dirname(__file__), 'loadtest'))
+
+import config
+import tracker
+from fleet import FleetSimulation, rate_histogram, summarize, DAY
+
+
+def _simulate(strategy, clients=30, server_interval=None):
+    saved_urls = dict(config.URLS)
+    config.use_server('http://fleet.invalid')
+    try:
+        simulation = FleetSimulation(tracker, clients, strategy=strategy, seed=5, round_share=1.0)
+        if server_interval:
+            simulation.backend.sync_hints = {'syncIntervals': {'session': server_interval}}
+        log = simulation.run()
+    finally:
+        config.URLS.clear()
+        config.URLS.update(saved_urls)
+    return simulation, log
+
+
+def test_fleet_day_in_virtual_time():
+    """A simulated day produces the expected requests at virtual times, without sleeping"""
+    real_requests = tracker.requests
+    simulation, log = _simulate('anchored')
+    assert tracker.requests is real_requests
+
+    summary = simulation.backend.summary()
+    endpoints = summary['endpoints']
+    assert endpoints['login'] == 30
+    assert endpoints['sessions.create'] == 60  # two work blocks per client
+    assert summary['open_sessions'] == 0
+    # About 8 hours of 10-minute updates per client, plus the final updates
+    assert 30 * 44 <= endpoints['sessions.update'] <= 30 * 52
+    assert endpoints['stats.daily'] == endpoints['stats.weekly'] > 0
+    # The client's own scheduler plans one screenshot per 10 minutes, and every
+    # upload reaches the server with a session update
+    assert 30 * 44 <= endpoints['upload'] <= endpoints['sessions.update']
+    assert sum(s.get('screenshots', 0) for s in simulation.backend.sessions.values()) == endpoints['upload']
+
+    # Every request happened during the simulated day
+    assert all(simulation.day_start <= t < simulation.day_start + DAY for t, _, _ in log)
+    histogram = rate_histogram(log, simulation.day_start, bucket=60)
+    assert sum(histogram['series']['total']) == len(log)
+    print("Virtual day test passed")
+
+
+def test_server_interval_keeps_screenshot_rate():
+    """Halving the update interval by server hint doubles the updates, not the screenshots"""
+    default, _ = _simulate('client')
+    hinted, _ = _simulate('client', server_interval=300)
+    default_counts = default.backend.summary()['endpoints']
+    hinted_counts = hinted.backend.summary()['endpoints']
+    assert hinted_counts['sessions.update'] > 1.8 * default_counts['sessions.update']
+    assert abs(hinted_counts['upload'] - default_counts['upload']) <= 0.05 * default_counts['upload']
+    print("Server interval screenshot rate test passed")
+
+
+def test_jitter_flattens_the_herd():
+    """With everybody starting on a quarter hour, jitter lowers the peak update rate"""
+    _, anchored = _simulate('anchored')
+    _, jittered = _simulate('jitter')
+    anchored_peak = summarize(rate_histogram(anchored, 0, bucket=60))['sessions.update']['peak_rps']
+    jittered_peak = summarize(rate_histogram(jittered, 0, bucket=60))['sessions.update']['peak_rps']
+    assert jittered_peak < anchored_peak
+    print("Jitter test passed")
+
+
+if __name__ == "__main__":
+    test_fleet_day_in_virtual_time()
+    test_server_interval_keeps_screenshot_rate()
+    test_jitter_flattens_the_herd()
@@ -0,0 +1,85 @@
+import os
+import sys
+import threading
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from clock import SimulatedClock
+from idle_monitor import IdleMonitor
+
+
+def test_monitor_sleeps_until_woken():
+    """The monitor sleeps for next_delay() and wake() runs the check right away"""
+    checked = threading.Event()
+    monitor = IdleMonitor(checked.set, lambda: 3600)
+    monitor.start()
+    try:
+        assert not checked.wait(0.2)
+        monitor.wake()
+        assert checked.wait(2)
+        assert monitor.get_metrics() == {'checks': 1, 'early_wakeups': 1}
+    finally:
+        monitor.stop()
+    assert not monitor.running
+    print("Monitor wake test passed")
+
+
+def _simulate(api, clock, seconds, input_every=None):
+    """Run the idle monitor's schedule on simulated time; returns the number of checks
+
+    Input events arrive every `input_every` seconds (None: no input). Like the
+    monitor thread, the next check is planned after each check and re-planned when
+    input wakes the monitor.
+    """
+    end = clock.monotonic() + seconds
+    next_input = clock.monotonic() + input_every if input_every else float('inf')
+    next_check = clock.monotonic() + api._next_activity_check_delay()
+    checks = 0
+    woken = []
+    api.idle_monitor.wake = lambda: woken.append(True)
+    while True:
+        now = clock.monotonic()
+        upcoming = min(next_input, next_check, end)
+        clock.advance(upcoming - now)
+        if upcoming == end:
+            return checks
+        if upcoming == next_input:
+            api.record_activity('keyboard')
+            next_input += input_every
+            if not woken:
+                continue
+            woken.clear()
+        api._activity_tick()
+        checks += 1
+        next_check = clock.monotonic() + api._next_activity_check_delay()
+
+
+def test_adaptive_checks_keep_accounting():
+    """Steady typing and long idle stretches need about one check a minute, with exact totals"""
+    from main import Api
+
+    clock = SimulatedClock()
+    api = Api(defer_startup=True, clock=clock)
+    api._reset_session_state('Idle test', 'Testing', clock.time())
+    try:
+        typing_checks = _simulate(api, clock, 1800, input_every=5)
+        away_checks = _simulate(api, clock, 1800)
+        back_checks = _simulate(api, clock, 600, input_every=5)
+        api.check_idle_status()
+
+        assert typing_checks <= 31, typing_checks
+        assert away_checks <= 31, away_checks
+        assert back_checks <= 12, back_checks
+        # Idle starts idle_threshold after the last input (5 s before the break) and
+        # ends with the first input back (5 s after it)
+        assert abs(api.active_time + api.idle_time - 4200) < 1e-6
+        assert api.idle_time == 1800 + 10 - api.idle_threshold, api.idle_time
+    finally:
+        api.upload_queue.stop()
+    print("Adaptive idle check test passed")
+
+
+if __name__ == "__main__":
+    test_monitor_sleeps_until_woken()
+    test_adaptive_checks_keep_accounting()
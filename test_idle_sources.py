@@ -0,0 +1,192 @@
+import os
+import sys
+import time
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from clock import SimulatedClock
+import idle_sources
+from idle_sources import IdleSource, LogindIdleSource, MutterIdleSource, detect_idle_source
+from metrics import metrics
+
+
+class FakeIdleSource(IdleSource):
+    name = 'fake'
+
+    def __init__(self, exact=True):
+        self.exact = exact
+        self.idle = 0.0
+
+    def idle_seconds(self):
+        return self.idle
+
+
+def test_detect_falls_through():
+    """Sources that cannot load on this system are skipped instead of failing"""
+    assert detect_idle_source('win32' if sys.platform != 'win32' else 'darwin', {}) is None
+    source = detect_idle_source()
+    assert source is None or source.idle_seconds() is None or source.idle_seconds() >= 0
+    print("Idle source detection test passed")
+
+
+def test_system_idle_replaces_input_hooks():
+    """With an OS idle counter, idleness follows it; the global input hooks are only
+    dropped when configured, since the input rates then miss input outside the app"""
+    from main import Api
+
+    clock = SimulatedClock()
+    api = Api(defer_startup=True, clock=clock)
+    assert api.system_idle_replaces_input_hooks is False
+    api.system_idle_replaces_input_hooks = True
+    source = FakeIdleSource()
+    api.idle_source, api._idle_source_detected = source, True
+    api.system_tracking_enabled = True
+    api._reset_session_state('Idle source test', 'Testing', clock.time())
+    try:
+        api.start_activity_tracking()
+        assert not api.input_listener.running
+        assert api.get_system_tracking_status()['idle_source'] == 'fake'
+
+        # Input elsewhere on the system keeps the user active without any hook
+        clock.advance(120)
+        source.idle = 3
+        api.check_idle_status()
+        assert not api.is_idle and api._next_activity_check_delay() == api.idle_threshold - 3
+
+        clock.advance(100)
+        source.idle = 103
+        api.check_idle_status()
+        assert api.is_idle and api._next_activity_check_delay() == api.idle_poll_interval
+
+        clock.advance(5)
+        source.idle = 0
+        api.check_idle_status()
+        assert not api.is_idle
+        assert abs(api.active_time + api.idle_time - 225) < 1e-6
+    finally:
+        api.stop_activity_tracking()
+        api.upload_queue.stop()
+    print("Idle source tracking test passed")
+
+
+def test_hint_source_falls_back():
+    """A hint-only source without a reading leaves idleness to the app's own input tracking"""
+    from main import Api
+
+    clock = SimulatedClock()
+    api = Api(defer_startup=True, clock=clock)
+    source = FakeIdleSource(exact=False)
+    source.idle = None
+    api.idle_source = source
+    api._reset_session_state('Idle source test', 'Testing', clock.time())
+    try:
+        api.last_activity_time = clock.monotonic()
+        clock.advance(api.idle_threshold + 1)
+        api.check_idle_status()
+        assert api.is_idle and not api._system_idle_available
+    finally:
+        api.upload_queue.stop()
+    print("Idle hint fallback test passed")
+
+
+def test_hint_source_only_confirms_idleness():
+    """A hint that turns on minutes after the last input neither ends idleness nor moves the last input"""
+    from main import Api
+
+    clock = SimulatedClock()
+    api = Api(defer_startup=True, clock=clock)
+    source = FakeIdleSource(exact=False)
+    source.idle = None
+    api.idle_source = source
+    api._reset_session_state('Idle source test', 'Testing', clock.time())
+    try:
+        api.record_activity('keyboard')
+        last_input = api.last_activity_time
+        for second in range(600):
+            clock.advance(1)
+            # The desktop declares the session idle 300 seconds after the last input
+            source.idle = None if second < 300 else float(second - 300)
+            api.check_idle_status()
+            assert api.is_idle == (second + 1 >= api.idle_threshold), second
+            assert api.last_activity_time == last_input
+        assert abs(api.idle_time - (600 - api.idle_threshold)) < 1e-6
+        assert abs(api.active_time - api.idle_threshold) < 1e-6
+        assert not api._system_idle_available
+
+        # Input reaches the hooks while the hint is still on
+        api.record_activity('mouse')
+        clock.advance(1)
+        api.check_idle_status()
+        assert not api.is_idle
+    finally:
+        api.upload_queue.stop()
+    print("Idle hint confirmation test passed")
+
+
+class FakeDBusConnection:
+    """Answers method calls and property reads like jeepney's DBusConnection wrapper"""
+
+    def __init__(self, replies):
+        self.replies = replies
+        self.calls = 0
+        self.closed = False
+
+    def call(self, bus_name, object_path, interface, method):
+        self.calls += 1
+        return self.replies[method]
+
+    def get_properties(self, bus_name, object_path, interface):
+        self.calls += 1
+        return dict(self.replies['properties'])
+
+    def close(self):
+        self.closed = True
+
+
+def test_dbus_sources_keep_one_connection():
+    """D-Bus idle sources read through the connection they were given and time each read"""
+    before = metrics.histogram('idle_source.mutter').count
+    connection = FakeDBusConnection({'GetIdletime': (12500,)})
+    mutter = MutterIdleSource(connection=connection)
+    assert [mutter.idle_seconds() for _ in range(3)] == [12.5] * 3
+    assert connection.calls == 3
+    assert metrics.histogram('idle_source.mutter').count - before == 3
+    mutter.close()
+    assert connection.closed
+
+    since = time.clock_gettime(time.CLOCK_MONOTONIC) - 30
+    connection = FakeDBusConnection({'properties': {'IdleHint': True, 'IdleSinceHintMonotonic': int(since * 1e6)}})
+    logind = LogindIdleSource(connection=connection)
+    assert 30 <= logind.idle_seconds() < 31
+    connection.replies['properties']['IdleHint'] = False
+    assert logind.idle_seconds() is None
+    print("D-Bus connection test passed")
+
+
+def test_command_readings_are_cached():
+    """Without jeepney a forked reading is reused for a while, extrapolated by the time passed"""
+    now = [100.0]
+    reads = []
+    cache = idle_sources._CommandCache(2.0, clock=lambda: now[0])
+    read = lambda: reads.append(now[0]) or 10.0
+    assert cache.get(read) == 10.0
+    now[0] += 1.5
+    assert cache.get(read) == 11.5 and len(reads) == 1
+    now[0] += 1.0
+    assert cache.get(read) == 10.0 and len(reads) == 2
+
+    hint = idle_sources._CommandCache(2.0, extrapolate=False, clock=lambda: now[0])
+    assert hint.get(lambda: 5000.0) == 5000.0
+    now[0] += 1.0
+    assert hint.get(lambda: None) == 5000.0
+    print("Command cache test passed")
+
+
+if __name__ == "__main__":
+    test_detect_falls_through()
+    test_system_idle_replaces_input_hooks()
+    test_hint_source_falls_back()
+    test_hint_source_only_confirms_idleness()
+    test_dbus_sources_keep_one_connection()
+    test_command_readings_are_cached()
@@ -0,0 +1,83 @@
+import os
+import sys
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from clock import SimulatedClock
+from input_listener import InputListener
+
+
+class FakeListener:
+    """Stands in for pynput's keyboard.Listener and mouse.Listener"""
+
+    def __init__(self, **callbacks):
+        self.callbacks = callbacks
+        self.started = self.stopped = False
+
+    def start(self):
+        self.started = True
+
+    def stop(self):
+        self.stopped = True
+
+
+class FakeModule:
+    Listener = FakeListener
+
+
+def test_callbacks_coalesce():
+    """A second of 1000 Hz mouse motion reaches the tracker twice; keys and clicks count too"""
+    clock = SimulatedClock()
+    seen = []
+    listener = InputListener(lambda kind, at: seen.append((kind, at)), clock=clock.monotonic, throttle=0.5)
+    start = clock.monotonic()
+    for x in range(1000):
+        listener._on_mouse(x, 100)
+        clock.advance(0.001)
+    clock.advance(0.5)
+    listener._on_key('a')
+    listener._on_mouse(5, 5, 'left', True)
+    assert [kind for kind, at in seen] == ['mouse', 'mouse', 'keyboard', 'mouse'], seen
+    assert seen[0][1] == start and abs(seen[1][1] - start - 0.5) < 0.002
+    assert seen[2][1] == seen[3][1] == clock.monotonic()
+    assert listener.get_metrics() == {'keyboard': 1, 'mouse': 3}
+
+    keyboard, mouse = FakeModule(), FakeModule()
+    clicks_only = InputListener(lambda kind, at: None, track_motion=False)
+    clicks_only.start(keyboard, mouse)
+    key_hook, mouse_hook = clicks_only._listeners
+    assert clicks_only.running and key_hook.started and mouse_hook.started
+    assert mouse_hook.callbacks['on_move'] is None and mouse_hook.callbacks['on_click'] is not None
+    clicks_only.stop()
+    assert not clicks_only.running and key_hook.stopped and mouse_hook.stopped
+    print("Input listener coalescing test passed")
+
+
+def test_listener_feeds_activity():
+    """Forwarded input keeps the session active and ends idle stretches at the input's time"""
+    from main import Api
+
+    clock = SimulatedClock()
+    api = Api(defer_startup=True, clock=clock)
+    api._reset_session_state('Input test', 'Testing', clock.time())
+    try:
+        api.last_activity_time = api.last_active_check_time = clock.monotonic()
+        clock.advance(api.idle_threshold + 30)
+        api.check_idle_status()
+        assert api.is_idle
+
+        moved_at = clock.monotonic() + 10
+        clock.advance(12)
+        api.input_listener._clock = lambda: moved_at
+        api.input_listener._on_mouse(1, 1)
+        assert not api.is_idle and api.mouse_events == 1
+        assert api.idle_time == 10 and api.last_activity_time == moved_at
+    finally:
+        api.upload_queue.stop()
+    print("Input listener activity test passed")
+
+
+if __name__ == "__main__":
+    test_callbacks_coalesce()
+    test_listener_feeds_activity()
@@ -0,0 +1,214 @@
+import os
+import sys
+import tempfile
+from datetime import datetime
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from storage import Database, record_time_entry
+from local_stats import LocalStatsEngine, period_bounds
+
+
+def _epoch(text):
+    return datetime.fromisoformat(text).timestamp()
+
+
+def _engine(db, session=None, server=None, calls=None):
+    def fetch(period):
+        def fetcher():
+            if calls is not None:
+                calls.append(period)
+            if server is None:
+                return {'success': False, 'message': 'offline'}
+            return {'success': True, 'data': dict(server[period])}
+        return fetcher
+
+    return LocalStatsEngine(db, lambda: session, {'daily': fetch('daily'), 'weekly': fetch('weekly')},
+                            max_age=600, retry_after=60)
+
+
+def test_period_bounds():
+    """Days start at local midnight and weeks on Monday"""
+    now = _epoch('2024-05-15T13:45:00')  # a Wednesday
+    assert period_bounds('daily', now) == (_epoch('2024-05-15T00:00:00'), _epoch('2024-05-16T00:00:00'))
+    assert period_bounds('weekly', now) == (_epoch('2024-05-13T00:00:00'), _epoch('2024-05-20T00:00:00'))
+    print("Period bounds test passed")
+
+
+def test_local_totals_split_sessions_and_include_running_session():
+    """Finished sessions are split at midnight and the running session is added"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, 'tracker.db'))
+        try:
+            db.migrate()
+            # 23:00 - 01:00: one hour belongs to each day
+            record_time_entry(db, 'p', _epoch('2024-05-15T01:00:00'), 7200, active_seconds=6000, idle_seconds=1200)
+            # Earlier in the same week
+            record_time_entry(db, 'p', _epoch('2024-05-13T10:00:00'), 3600, active_seconds=3600, idle_seconds=0)
+            db.flush()
+
+            now = _epoch('2024-05-15T10:30:00')
+            session = {'start': _epoch('2024-05-15T10:00:00'), 'active': 1500, 'idle': 300}
+            engine = _engine(db, session=session)
+
+            daily = engine.local_totals('daily', now)
+            assert round(daily['total']) == 3600 + 1800
+            assert round(daily['active']) == 3000 + 1500
+
+            weekly = engine.local_totals('weekly', now)
+            assert round(weekly['total']) == 7200 + 3600 + 1800
+        finally:
+            db.close()
+    print("Local totals test passed")
+
+
+def test_reconciled_stats_follow_local_growth():
+    """After a server sync, the server numbers advance with local tracking"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, 'tracker.db'))
+        try:
+            db.migrate()
+            server = {
+                'daily': {'totalHours': 10000, 'activeHours': 8000, 'activePercentage': 80},
+                'weekly': {'totalHours': 50000, 'activeHours': 40000, 'activePercentage': 80},
+            }
+            calls = []
+            engine = _engine(db, server=server, calls=calls)
+
+            first = engine.get('daily')
+            assert first['source'] == 'local' and first['totalHours'] == 0
+
+            engine.reconcile(wait=True)
+            record_time_entry(db, 'p', datetime.now().timestamp(), 600, active_seconds=600, idle_seconds=0, wait=True)
+
+            daily = engine.get('daily')
+            assert daily['source'] == 'reconciled'
+            assert daily['totalHours'] == 10600
+            assert daily['activeHours'] == 8600
+            assert daily['serverSyncedAt'] is not None
+        finally:
+            db.close()
+    print("Reconciliation test passed")
+
+
+def test_failing_server_is_not_polled_on_every_read():
+    """Reads keep working offline and do not trigger a request each time"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, 'tracker.db'))
+        try:
+            db.migrate()
+            calls = []
+            engine = _engine(db, server=None, calls=calls)
+            for _ in range(20):
+                assert engine.get('daily')['source'] == 'local'
+            engine.reconcile('daily', wait=True)
+            assert calls.count('daily') <= 2
+            assert engine.get_metrics()['server_errors'] >= 1
+        finally:
+            db.close()
+    print("Offline read test passed")
+
+
+def test_running_session_total_excludes_suspend():
+    """A suspended session counts its tracked time before and after it is stopped"""
+    sys.path.append(os.path.join(os.path.dirname(__file__), 'loadtest'))
+    import config
+    import tracker
+    from clock import SimulatedClock
+    from mock_server import MockTrackerBackend
+    from fleet import InProcessRequests
+
+    real_requests, saved_urls = tracker.requests, dict(config.URLS)
+    config.use_server('http://stats.invalid')
+    tracker.requests = InProcessRequests(MockTrackerBackend())
+    clock = SimulatedClock(start=_epoch('2031-03-12T08:00:00'))
+    api = tracker.Api(defer_startup=True, clock=clock)
+    try:
+        api.load_auth_data()  # migrates tracker.db
+        assert api.login('stats@example.com', 'secret', True)['success']
+        before = api.stats_engine.local_totals('daily')
+
+        assert api.create_session('Testing')['success']
+        api._reset_session_state('Project', 'Testing', clock.time())
+        for _ in range(3600):
+            api.record_activity('mouse')
+            clock.advance(1)
+            api.check_idle_status()
+        clock.suspend(2 * 3600)  # lid closed
+        for _ in range(1800):
+            api.record_activity('mouse')
+            clock.advance(1)
+            api.check_idle_status()
+
+        running = api.stats_engine.local_totals('daily')
+        assert round(running['total'] - before['total']) == 5400, running
+        assert round(running['active'] - before['active']) == 5400
+
+        api.stop_timer()
+        stopped = api.stats_engine.local_totals('daily')
+        assert round(stopped['total'] - before['total']) == 5400, stopped
+        assert round(stopped['active'] - before['active']) == 5400
+    finally:
+        api.start_time = None
+        api.upload_queue.stop()
+        tracker.requests = real_requests
+        config.URLS.clear()
+        config.URLS.update(saved_urls)
+    print("Suspended session totals test passed")
+
+
+def test_local_totals_follow_logged_in_employee():
+    """After a logout and a login as someone else, the previous user's time is not counted"""
+    sys.path.append(os.path.join(os.path.dirname(__file__), 'loadtest'))
+    import config
+    import tracker
+    from clock import SimulatedClock
+    from mock_server import MockTrackerBackend
+    from fleet import InProcessRequests
+
+    real_requests, saved_urls = tracker.requests, dict(config.URLS)
+    config.use_server('http://stats.invalid')
+    tracker.requests = InProcessRequests(MockTrackerBackend())
+    clock = SimulatedClock(start=_epoch('2031-04-09T08:00:00'))
+    api = tracker.Api(defer_startup=True, clock=clock)
+    try:
+        api.load_auth_data()  # migrates tracker.db
+        assert api.login('first@example.com', 'secret', True)['success']
+        first = api.stats_engine.local_totals('daily')
+        assert api.create_session('Testing')['success']
+        api._reset_session_state('Project', 'Testing', clock.time())
+        for _ in range(600):
+            api.record_activity('mouse')
+            clock.advance(1)
+            api.check_idle_status()
+        session_id = api.session_id
+        api.stop_timer()
+        assert round(api.stats_engine.local_totals('daily')['total'] - first['total']) == 600
+
+        api.logout()
+        assert api.stats_engine.local_totals('daily')['total'] == 0
+        assert api.login('second@example.com', 'secret', True)['success']
+        assert api.stats_engine.local_totals('daily')['total'] == 0
+        assert session_id not in [e['session_id'] for e in api.get_time_entries(limit=100)]
+
+        api.logout()
+        assert api.login('first@example.com', 'secret', True)['success']
+        assert round(api.stats_engine.local_totals('daily')['total'] - first['total']) == 600
+        assert session_id in [e['session_id'] for e in api.get_time_entries(limit=100)]
+    finally:
+        api.start_time = None
+        api.upload_queue.stop()
+        tracker.requests = real_requests
+        config.URLS.clear()
+        config.URLS.update(saved_urls)
+    print("Per-employee totals test passed")
+
+
+if __name__ == "__main__":
+    test_period_bounds()
+    test_local_totals_split_sessions_and_include_running_session()
+    test_reconciled_stats_follow_local_growth()
+    test_failing_server_is_not_polled_on_every_read()
+    test_running_session_total_excludes_suspend()
+    test_local_totals_follow_logged_in_employee()
@@ -38,7 +38,7 @@ def test_macos_app_filtering():
     # Print the detected applications
     print("\nDetected applications:")
     for app_name, app_info in api.applications_usage.items():
-        print(f"- {app_name}: {app_info['exe']}")
+        print(f"- {app_name}: {app_info.exe}")
     
     # Check if any system applications were detected
     system_apps_detected = []
@@ -0,0 +1,89 @@
+import os
+import sys
+import json
+import random
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from metrics import MetricsRegistry, Histogram
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_histogram_percentiles_within_precision():
+    """Percentiles stay within the bucket precision across several orders of magnitude"""
+    rng = random.Random(7)
+    values = [int(rng.lognormvariate(9, 1.5)) for _ in range(20000)]
+    histogram = Histogram()
+    for value in values:
+        histogram.record(value)
+
+    values.sort()
+    for percent in (50, 90, 99):
+        exact = values[int(len(values) * percent / 100) - 1]
+        estimate = histogram.percentile(percent)
+        assert estimate >= exact and estimate <= exact * 1.04 + 1, (percent, exact, estimate)
+    assert histogram.percentile(100) == values[-1]
+    assert histogram.count == len(values)
+
+    # Small values are exact and storage stays sparse
+    small = Histogram()
+    for value in (1, 2, 3, 3, 40):
+        small.record(value)
+    assert small.percentile(50) == 3 and small.percentile(100) == 40
+    assert len(histogram._buckets) < 600
+    print("Histogram precision test passed")
+
+
+def test_registry_timer_and_counters():
+    """Timed blocks land in histograms, failures are counted, snapshots serialize"""
+    clock = FakeClock()
+    registry = MetricsRegistry(clock=clock)
+
+    @registry.timed('apps.check')
+    def check(duration, fail=False):
+        clock.now += duration
+        if fail:
+            raise RuntimeError("psutil failed")
+
+    check(0.010)
+    check(0.030)
+    try:
+        check(0.5, fail=True)
+    except RuntimeError:
+        pass
+    registry.counter('screenshot.upload.ok').inc(3)
+    registry.gauge('apps.tracked').set(12)
+
+    snapshot = registry.snapshot()
+    assert snapshot['apps.check']['count'] == 3
+    assert snapshot['apps.check']['min_ms'] == 10.0
+    assert snapshot['apps.check']['max_ms'] == 500.0
+    assert snapshot['apps.check.errors'] == 1
+    assert snapshot['screenshot.upload.ok'] == 3
+    assert snapshot['apps.tracked'] == 12
+    json.dumps(snapshot)
+
+    compact = registry.compact()
+    assert compact['apps.check'][0] == 3 and compact['apps.check'][3] == 500.0
+    assert 'apps.tracked' not in compact
+    assert len(json.dumps(compact)) < 200
+
+    try:
+        registry.gauge('apps.check')
+        assert False, "A histogram name cannot be reused for a gauge"
+    except TypeError:
+        pass
+    print("Registry test passed")
+
+
+if __name__ == "__main__":
+    test_histogram_percentiles_within_precision()
+    test_registry_timer_and_counters()
@@ -0,0 +1,107 @@
+import os
+import sys
+import json
+
+# Add the backend and loadtest directories to the Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+sys.path.append(os.path.join(os.path.dirname(__file__), 'loadtest'))
+
+import config
+from mock_server import MockTrackerBackend, MockTrackerServer, Faults
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _login(backend):
+    status, _, body = backend.handle('POST', '/api/v1/auth/login/employee', {},
+                                     json.dumps({'email': 'a@example.com', 'password': 'x'}).encode())
+    assert status == 200 and body['success']
+    return {'Authorization': f"Bearer {body['data']['token']}"}, body['data']['employee']['employeeId']
+
+
+def test_sessions_and_stats_round_trip():
+    """Sessions created and patched through the backend show up in the stats"""
+    backend = MockTrackerBackend()
+    headers, employee_id = _login(backend)
+
+    status, _, body = backend.handle('POST', '/api/v1/sessions/app', headers, json.dumps({
+        'employeeId': employee_id, 'companyId': 'c', 'startTime': '2024-01-01T09:00:00.000Z'}).encode())
+    assert status == 201
+    session_id = body['data']['_id']
+
+    status, _, body = backend.handle('PATCH', f'/api/v1/sessions/app/{session_id}', headers, json.dumps({
+        'activeTime': 300, 'idleTime': 100, 'screenshots': [{'url': 'u'}]}).encode())
+    assert status == 200 and body['data']['activeTime'] == 300
+
+    status, _, body = backend.handle('GET', f'/api/v1/stats/daily/{employee_id}?timezone=UTC', headers)
+    assert body['data'] == {'totalHours': 400, 'activeHours': 300, 'activePercentage': 75}
+
+    assert backend.handle('GET', '/api/v1/stats/daily/x', {})[0] == 401
+    assert backend.handle('GET', '/nope', headers)[0] == 404
+    summary = backend.summary()
+    assert summary['endpoints']['sessions.update'] == 1 and summary['open_sessions'] == 1
+    print("Round trip test passed")
+
+
+def test_injected_errors_and_rate_limits():
+    """Injected errors use the configured status; rate-limited requests get 429 with Retry-After"""
+    clock = FakeClock()
+    slept = []
+    backend = MockTrackerBackend(clock=clock, sleep=slept.append, seed=3)
+    headers, employee_id = _login(backend)
+    path = f'/api/v1/stats/weekly/{employee_id}'
+
+    backend.configure('stats.weekly', error_rate=1.0, error_status=503, latency=0.25)
+    assert backend.handle('GET', path, headers)[0] == 503
+    assert slept == [0.25]
+
+    backend.configure('stats.weekly', rate_limit=2)
+    statuses = [backend.handle('GET', path, headers)[0] for _ in range(3)]
+    assert statuses == [200, 200, 429]
+    status, response_headers, _ = backend.handle('GET', path, headers)
+    assert status == 429 and int(response_headers['Retry-After']) == 30
+
+    # The bucket refills with time
+    clock.now += 30
+    assert backend.handle('GET', path, headers)[0] == 200
+    assert backend.summary()['statuses']['429'] == 2
+    print("Fault injection test passed")
+
+
+def test_client_against_http_server():
+    """The real client logs in, opens and closes a session against the HTTP server"""
+    from main import Api
+
+    server = MockTrackerServer()
+    saved_urls = dict(config.URLS)
+    try:
+        config.use_server(server.start())
+        api = Api(defer_startup=True)
+        assert api.login('client@example.com', 'secret')['success']
+        assert api.create_session('Testing')['success']
+        result = api.update_session(120, 30, is_final_update=True, user_note='Testing')
+        assert result['success'], result
+        assert api.session_id is None
+    finally:
+        config.URLS.clear()
+        config.URLS.update(saved_urls)
+        server.stop()
+
+    summary = server.backend.summary()
+    assert summary['endpoints']['login'] == 1
+    assert summary['endpoints']['sessions.create'] == 1
+    assert summary['endpoints']['sessions.update'] == 1
+    assert summary['open_sessions'] == 0
+    print("HTTP client test passed")
+
+
+if __name__ == "__main__":
+    test_sessions_and_stats_round_trip()
+    test_injected_errors_and_rate_limits()
+    test_client_against_http_server()
@@ -0,0 +1,183 @@
+import os
+import sys
+import json
+import time
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from storage import Database
+from response_cache import ResponseCache
+from clock import SimulatedClock
+
+
+class ReleaseHandler(BaseHTTPRequestHandler):
+    """Local stand-in for an API that supports ETag revalidation"""
+    version = 'v1.0.0'
+    fail = False
+    requests_seen = []
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        etag = f'"{ReleaseHandler.version}"'
+        ReleaseHandler.requests_seen.append(self.headers.get('If-None-Match'))
+        if ReleaseHandler.fail:
+            self.send_response(503)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        data = json.dumps({'tag_name': ReleaseHandler.version}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def _serve():
+    ReleaseHandler.version = 'v1.0.0'
+    ReleaseHandler.fail = False
+    ReleaseHandler.requests_seen = []
+    server = ThreadingHTTPServer(('127.0.0.1', 0), ReleaseHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_address[1]}/releases/latest'
+
+
+def test_fresh_hits_and_etag_revalidation():
+    """Fresh entries skip the network; expired ones are revalidated with a 304"""
+    server, url = _serve()
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, 'tracker.db'))
+        try:
+            db.migrate()
+            cache = ResponseCache(db)
+
+            first = cache.get(url, ttl=60)
+            assert first.source == 'network' and first.json()['tag_name'] == 'v1.0.0'
+            assert cache.get(url, ttl=60).source == 'fresh'
+            assert len(ReleaseHandler.requests_seen) == 1
+
+            cache.expire(url)
+            revalidated = cache.get(url, ttl=60)
+            assert revalidated.source == 'revalidated'
+            assert revalidated.json()['tag_name'] == 'v1.0.0'
+            assert ReleaseHandler.requests_seen[-1] == '"v1.0.0"'
+
+            metrics = cache.get_metrics()
+            assert metrics['not_modified'] == 1
+            assert metrics['hit_ratio'] == round(1 / 3, 3)
+        finally:
+            db.close()
+            server.shutdown()
+    print("Revalidation test passed")
+
+
+def test_entry_age_follows_injected_clock():
+    """Freshness is measured on the cache's clock, so a simulated clock ages entries"""
+    server, url = _serve()
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, 'tracker.db'))
+        try:
+            db.migrate()
+            clock = SimulatedClock()
+            cache = ResponseCache(db, clock=clock.time)
+            assert cache.get(url, ttl=60).source == 'network'
+            clock.advance(59)
+            assert cache.get(url, ttl=60).source == 'fresh'
+            clock.advance(2)
+            assert cache.get(url, ttl=60).source == 'revalidated'
+            assert len(ReleaseHandler.requests_seen) == 2
+        finally:
+            db.close()
+            server.shutdown()
+    print("Injected clock cache test passed")
+
+
+def test_stale_while_revalidate():
+    """Stale entries are answered immediately and refreshed in the background"""
+    server, url = _serve()
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, 'tracker.db'))
+        try:
+            db.migrate()
+            cache = ResponseCache(db)
+            cache.get(url, ttl=0.1, stale=60)
+            ReleaseHandler.version = 'v1.1.0'
+            time.sleep(0.15)
+
+            stale = cache.get(url, ttl=0.1, stale=60)
+            assert stale.source == 'stale' and stale.json()['tag_name'] == 'v1.0.0'
+
+            deadline = time.time() + 5
+            while time.time() < deadline and cache.get(url, ttl=60).json()['tag_name'] != 'v1.1.0':
+                time.sleep(0.02)
+            assert cache.get(url, ttl=60).json()['tag_name'] == 'v1.1.0'
+        finally:
+            db.close()
+            server.shutdown()
+    print("Stale-while-revalidate test passed")
+
+
+def test_persisted_across_restarts_and_served_on_errors():
+    """Entries survive a restart, and a failing server falls back to the cached body"""
+    server, url = _serve()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'tracker.db')
+        db = Database(path)
+        db.migrate()
+        ResponseCache(db).get(url, ttl=60)
+        db.close()
+
+        db = Database(path)
+        try:
+            db.migrate()
+            cache = ResponseCache(db)
+            assert cache.get(url, ttl=60).source == 'fresh'
+            assert len(ReleaseHandler.requests_seen) == 1
+
+            ReleaseHandler.fail = True
+            cache.expire()
+            fallback = cache.get(url, ttl=60)
+            assert fallback.source == 'fallback' and fallback.status_code == 200
+            assert cache.get_metrics()['fallbacks'] == 1
+        finally:
+            db.close()
+            server.shutdown()
+    print("Persistence test passed")
+
+
+def test_uncacheable_responses_are_not_stored():
+    """Responses rejected by the cacheable check are returned but not kept"""
+    server, url = _serve()
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, 'tracker.db'))
+        try:
+            db.migrate()
+            cache = ResponseCache(db)
+            for _ in range(2):
+                assert cache.get(url, ttl=60, cacheable=lambda r: False).source == 'network'
+            assert len(ReleaseHandler.requests_seen) == 2
+            assert cache.get_metrics()['entries'] == 0
+        finally:
+            db.close()
+            server.shutdown()
+    print("Cacheable check test passed")
+
+
+if __name__ == "__main__":
+    test_fresh_hits_and_etag_revalidation()
+    test_entry_age_follows_injected_clock()
+    test_stale_while_revalidate()
+    test_persisted_across_restarts_and_served_on_errors()
+    test_uncacheable_responses_are_not_stored()
@@ -0,0 +1,242 @@
+import os
+import sys
+import time
+import tempfile
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from screenshot_queue import ScreenshotUploadQueue
+
+
+def _make_screenshot(directory, name='shot.png'):
+    path = os.path.join(directory, name)
+    with open(path, 'wb') as f:
+        f.write(b'\x89PNG fake image data')
+    return path
+
+
+def test_upload_and_drain():
+    """Uploaded screenshots are collected per session and removed from the spool"""
+    with tempfile.TemporaryDirectory() as tmp:
+        spool = os.path.join(tmp, 'spool')
+        uploaded = []
+
+        def upload(path, timestamp, cancel_token=None):
+            assert os.path.exists(path), "Queue must keep the file until the upload returns"
+            uploaded.append(path)
+            return {'url': f'https://files.example/{len(uploaded)}.png', 'timestamp': timestamp}
+
+        queue = ScreenshotUploadQueue(upload, spool, workers=2)
+        queue.start()
+        try:
+            assert queue.enqueue(_make_screenshot(tmp, 'a.png'), '2024-01-01T00:00:01.000Z', 'session-1')
+            assert queue.enqueue(_make_screenshot(tmp, 'b.png'), '2024-01-01T00:00:02.000Z', 'session-2')
+            assert queue.flush(timeout=5)
+
+            shots = queue.drain_completed('session-1')
+            assert len(shots) == 1
+            assert shots[0]['timestamp'] == '2024-01-01T00:00:01.000Z'
+            assert shots[0]['imageUrl'].startswith('https://files.example/')
+            assert queue.drain_completed('session-1') == []
+            assert len(queue.drain_completed('session-2')) == 1
+
+            assert os.listdir(spool) == [], "Spool should be empty after successful uploads"
+            metrics = queue.get_metrics()
+            assert metrics['uploaded'] == 2
+            assert metrics['pending'] == 0
+        finally:
+            queue.stop()
+    print("Upload and drain test passed")
+
+
+def test_retry_with_backoff():
+    """A failing upload is retried until it succeeds"""
+    with tempfile.TemporaryDirectory() as tmp:
+        attempts = []
+
+        def flaky_upload(path, timestamp, cancel_token=None):
+            attempts.append(time.monotonic())
+            if len(attempts) < 3:
+                raise ConnectionError("server unavailable")
+            return {'url': 'https://files.example/ok.png', 'timestamp': timestamp}
+
+        queue = ScreenshotUploadQueue(flaky_upload, os.path.join(tmp, 'spool'), workers=1,
+                                      backoff_base=0.05, backoff_max=0.2)
+        queue.start()
+        try:
+            queue.enqueue(_make_screenshot(tmp), '2024-01-01T00:00:00.000Z', 's')
+            deadline = time.time() + 5
+            while not queue.get_metrics()['uploaded'] and time.time() < deadline:
+                time.sleep(0.02)
+
+            metrics = queue.get_metrics()
+            assert metrics['uploaded'] == 1
+            assert metrics['retries'] == 2
+            assert len(queue.drain_completed('s')) == 1
+        finally:
+            queue.stop()
+    print("Retry test passed")
+
+
+def test_spool_survives_restart():
+    """Screenshots that were not uploaded are picked up by a new queue instance"""
+    with tempfile.TemporaryDirectory() as tmp:
+        spool = os.path.join(tmp, 'spool')
+
+        # First run: never started, so nothing is uploaded
+        first = ScreenshotUploadQueue(lambda p, t, cancel_token=None: None, spool)
+        first.enqueue(_make_screenshot(tmp), '2024-01-01T00:00:00.000Z', 'crashed-session')
+        assert len(os.listdir(spool)) == 2, "Image and sidecar should be spooled"
+
+        second = ScreenshotUploadQueue(lambda p, t, cancel_token=None: {'url': 'https://files.example/r.png', 'timestamp': t}, spool)
+        second.start()
+        try:
+            assert second.flush(timeout=5)
+            assert second.get_metrics()['recovered'] == 1
+            shots = second.drain_completed('crashed-session')
+            assert shots == [{'timestamp': '2024-01-01T00:00:00.000Z', 'imageUrl': 'https://files.example/r.png'}]
+        finally:
+            second.stop()
+    print("Spool recovery test passed")
+
+
+def test_bounded_spool():
+    """The oldest pending screenshot is dropped when the spool is full"""
+    with tempfile.TemporaryDirectory() as tmp:
+        spool = os.path.join(tmp, 'spool')
+        queue = ScreenshotUploadQueue(lambda p, t, cancel_token=None: None, spool, max_pending=2)
+
+        for i in range(4):
+            queue.enqueue(_make_screenshot(tmp, f'{i}.png'), f'2024-01-01T00:00:0{i}.000Z', 's')
+
+        metrics = queue.get_metrics()
+        assert metrics['pending'] == 2
+        assert metrics['dropped'] == 2
+        assert len(os.listdir(spool)) == 4, "Only two image/sidecar pairs should remain"
+    print("Bounded spool test passed")
+
+
+def test_cancel_session():
+    """Pending screenshots of a finished session are dropped from the spool"""
+    with tempfile.TemporaryDirectory() as tmp:
+        spool = os.path.join(tmp, 'spool')
+        queue = ScreenshotUploadQueue(lambda p, t, cancel_token=None: None, spool)
+        queue.enqueue(_make_screenshot(tmp, 'a.png'), '2024-01-01T00:00:00.000Z', 'finished')
+        queue.enqueue(_make_screenshot(tmp, 'b.png'), '2024-01-01T00:00:01.000Z', 'running')
+
+        queue.cancel_session('finished')
+
+        metrics = queue.get_metrics()
+        assert metrics['pending'] == 1
+        assert metrics['cancelled'] == 1
+        assert len(os.listdir(spool)) == 2
+    print("Cancel session test passed")
+
+
+def test_cancelled_sessions_are_forgotten():
+    """A session cancelled during an upload is forgotten once that upload returns"""
+    import threading
+
+    with tempfile.TemporaryDirectory() as tmp:
+        started, release = threading.Event(), threading.Event()
+
+        def slow_upload(path, timestamp, cancel_token=None):
+            started.set()
+            release.wait(5)
+            return {'url': 'https://files.example/late.png', 'timestamp': timestamp}
+
+        queue = ScreenshotUploadQueue(slow_upload, os.path.join(tmp, 'spool'), workers=1)
+        queue.start()
+        try:
+            queue.enqueue(_make_screenshot(tmp, 'a.png'), '2024-01-01T00:00:00.000Z', 'finished')
+            assert started.wait(5)
+            queue.cancel_session('finished')
+            assert queue.get_metrics()['cancelled_sessions_in_flight'] == 1
+            # A capture racing the stop is not uploaded either
+            assert not queue.enqueue(_make_screenshot(tmp, 'b.png'), '2024-01-01T00:00:01.000Z', 'finished')
+
+            release.set()
+            assert queue.flush(timeout=5)
+            metrics = queue.get_metrics()
+            assert metrics['cancelled_sessions_in_flight'] == 0
+            assert metrics['cancelled'] == 2 and metrics['completed_waiting'] == 0
+            assert os.listdir(os.path.join(tmp, 'spool')) == []
+        finally:
+            release.set()
+            queue.stop()
+    print("Cancelled session cleanup test passed")
+
+
+def test_cancel_aborts_only_that_sessions_uploads():
+    """Cancelling a session fires its own token; other sessions upload and nothing counts as failed"""
+    import threading
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tokens, both_started = {}, threading.Barrier(3)
+
+        def upload(path, timestamp, cancel_token=None):
+            tokens[timestamp] = cancel_token
+            if timestamp != 'later':
+                both_started.wait(5)
+            deadline = time.monotonic() + 5
+            while timestamp == 'finished' and not cancel_token.cancelled and time.monotonic() < deadline:
+                time.sleep(0.01)
+            if cancel_token.cancelled:
+                return None
+            return {'url': f'https://files.example/{timestamp}.png', 'timestamp': timestamp}
+
+        queue = ScreenshotUploadQueue(upload, os.path.join(tmp, 'spool'), workers=2)
+        queue.start()
+        try:
+            queue.enqueue(_make_screenshot(tmp, 'a.png'), 'finished', 'finished')
+            queue.enqueue(_make_screenshot(tmp, 'b.png'), 'running', 'running')
+            both_started.wait(5)
+            queue.cancel_session('finished')
+            assert queue.flush(timeout=5)
+            assert tokens['finished'].cancelled and not tokens['running'].cancelled
+            assert len(queue.drain_completed('running')) == 1
+
+            # A later upload of the same session id starts with a fresh token
+            queue.enqueue(_make_screenshot(tmp, 'c.png'), 'later', 'finished')
+            assert queue.flush(timeout=5)
+            assert not tokens['later'].cancelled and len(queue.drain_completed('finished')) == 1
+
+            metrics = queue.get_metrics()
+            assert metrics['cancelled'] == 1 and metrics['failed_attempts'] == 0 and metrics['gave_up'] == 0
+        finally:
+            queue.stop()
+    print("Per-session cancel token test passed")
+
+
+def test_recovered_jobs_of_other_sessions_are_cancelled():
+    """Only the kept sessions' recovered screenshots are uploaded and collected"""
+    with tempfile.TemporaryDirectory() as tmp:
+        spool = os.path.join(tmp, 'spool')
+        first = ScreenshotUploadQueue(lambda p, t, cancel_token=None: None, spool)
+        for i, session_id in enumerate(('old-1', 'old-2', 'current')):
+            first.enqueue(_make_screenshot(tmp, f'{i}.png'), f'2024-01-01T00:00:0{i}.000Z', session_id)
+
+        second = ScreenshotUploadQueue(lambda p, t, cancel_token=None: {'url': 'https://files.example/r.png', 'timestamp': t}, spool)
+        second.start()
+        try:
+            assert second.cancel_sessions_except({'current'}) == ['old-1', 'old-2']
+            assert second.flush(timeout=5)
+            assert second.drain_completed('old-1') == [] and second.drain_completed('old-2') == []
+            assert len(second.drain_completed('current')) == 1
+            assert second.get_metrics()['completed_waiting'] == 0
+            assert os.listdir(spool) == []
+        finally:
+            second.stop()
+    print("Recovered job cancellation test passed")
+
+
+if __name__ == "__main__":
+    test_upload_and_drain()
+    test_retry_with_backoff()
+    test_spool_survives_restart()
+    test_bounded_spool()
+    test_cancel_session()
+    test_cancelled_sessions_are_forgotten()
+    test_cancel_aborts_only_that_sessions_uploads()
+    test_recovered_jobs_of_other_sessions_are_cancelled()
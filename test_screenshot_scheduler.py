@@ -0,0 +1,229 @@
+import os
+import sys
+import time
+import random
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from screenshot_scheduler import ScreenshotScheduler, plan_capture_offsets
+from sync_cadence import SyncCadence
+
+
+def test_stratified_offsets():
+    """Every stratum of the capture window gets exactly one capture time"""
+    rng = random.Random(42)
+    for _ in range(1000):
+        offsets = plan_capture_offsets(3, 60, 480, rng)
+        assert len(offsets) == 3
+        assert offsets == sorted(offsets)
+        for i, offset in enumerate(offsets):
+            assert 60 + i * 140 <= offset <= 60 + (i + 1) * 140
+    assert plan_capture_offsets(0, 60, 480) == []
+    print("Stratified offsets test passed")
+
+
+def test_quota_met_within_interval():
+    """All planned captures of an interval are taken before its upload headroom"""
+    captured = []
+    scheduler = ScreenshotScheduler(lambda: captured.append(time.monotonic()) or True,
+                                    per_interval=3, interval=0.6, min_offset=0.05, headroom=0.2)
+    try:
+        start = time.monotonic()
+        scheduler.start_interval(start)
+        time.sleep(0.5)
+        assert scheduler.quota_met()
+        assert len(captured) == 3
+        assert all(t - start <= 0.45 for t in captured), "Captures must leave headroom for uploads"
+        assert scheduler.get_status()['taken'] == 3
+    finally:
+        scheduler.stop()
+    print("Quota test passed")
+
+
+def test_simulated_clock_drives_captures():
+    """Capture times follow the injected clock; wake() takes the ones it made due"""
+    from clock import SimulatedClock
+
+    clock = SimulatedClock()
+    captured = []
+    scheduler = ScreenshotScheduler(lambda: captured.append(clock.monotonic()) or True, per_interval=2,
+                                    interval=600, min_offset=60, headroom=120, clock=clock.monotonic)
+    try:
+        start = clock.monotonic()
+        offsets = scheduler.start_interval()
+        assert scheduler.get_status()['remaining_in'] == [round(offset, 1) for offset in offsets]
+        time.sleep(0.1)
+        assert captured == []
+
+        clock.advance(offsets[0])
+        scheduler.wake()
+        deadline = time.monotonic() + 2
+        while len(captured) < 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert captured == [start + offsets[0]] and not scheduler.quota_met()
+
+        clock.advance(offsets[1] - offsets[0])
+        scheduler.wake()
+        # The capture is counted after capture_func returns
+        while not scheduler.quota_met() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert scheduler.quota_met() and len(captured) == 2
+    finally:
+        scheduler.stop()
+    print("Simulated clock scheduler test passed")
+
+
+def test_run_due_without_thread():
+    """Without the background thread, run_due() takes the due captures and returns the next one"""
+    from clock import SimulatedClock
+
+    clock = SimulatedClock()
+    results = [False, True, True]
+    scheduler = ScreenshotScheduler(lambda: results.pop(0), per_interval=2, interval=600, min_offset=60,
+                                    headroom=120, retry_delay=30, clock=clock.monotonic)
+    start = clock.monotonic()
+    offsets = scheduler.start_interval(background=False)
+    assert scheduler._thread is None
+    assert scheduler.run_due() == start + offsets[0]
+
+    clock.advance(offsets[0])
+    next_due = scheduler.run_due()
+    assert scheduler.get_status()['failed'] == 1
+    assert sorted([start + offsets[1], clock.monotonic() + 30])[0] == next_due
+
+    clock.advance(600)
+    assert scheduler.run_due() is None
+    assert scheduler.quota_met() and results == []
+    print("Foreground scheduler test passed")
+
+
+def test_failed_capture_is_retried():
+    """A failed capture is retried until the quota is met"""
+    attempts = []
+
+    def flaky_capture():
+        attempts.append(time.monotonic())
+        return len(attempts) > 2
+
+    scheduler = ScreenshotScheduler(flaky_capture, per_interval=1, interval=1.0, min_offset=0.0,
+                                    headroom=0.9, retry_delay=0.05, retry_margin=0.1)
+    try:
+        scheduler.start_interval()
+        time.sleep(0.5)
+        status = scheduler.get_status()
+        assert scheduler.quota_met()
+        assert status['failed'] == 2
+        assert len(attempts) == 3
+    finally:
+        scheduler.stop()
+    print("Retry test passed")
+
+
+def test_new_interval_replaces_plan():
+    """Starting a new interval resets the quota, stopping cancels captures"""
+    captured = []
+    scheduler = ScreenshotScheduler(lambda: captured.append(1) or True,
+                                    per_interval=2, interval=10, min_offset=5, headroom=1)
+    try:
+        scheduler.start_interval()
+        assert not scheduler.quota_met()
+        assert len(scheduler.get_status()['remaining_in']) == 2
+        scheduler.stop()
+        assert scheduler.get_status()['remaining_in'] == []
+        assert captured == []
+    finally:
+        scheduler.stop()
+    print("Plan replacement test passed")
+
+
+def _tracker_scheduler(rng):
+    """Scheduler configured like the tracker: 1 screenshot per 600 s, none in the first 60 or last 120 s"""
+    return ScreenshotScheduler(lambda: True, per_interval=1, interval=600, min_offset=60,
+                               headroom=120, rng=rng)
+
+
+def _plan(scheduler, cadence, start):
+    """One tracker interval: the session delay sets the scheduler interval, then the plan is made"""
+    scheduler.interval = cadence.next_delay('session', scheduler.base_interval)
+    offsets = scheduler.start_interval(start)
+    return scheduler.interval, offsets, scheduler.get_status()['quota']
+
+
+def test_half_interval_hint_keeps_rate():
+    """A server hint of half the interval halves the window and takes every other screenshot"""
+    rng = random.Random(7)
+    cadence = SyncCadence(jitter=0.0)
+    scheduler = _tracker_scheduler(rng)
+    start = time.monotonic() + 3600  # far enough ahead that nothing is captured
+    try:
+        quotas = []
+        for _ in range(20):
+            cadence.apply_hints('session', {'nextUpdateIn': 300})
+            interval, offsets, quota = _plan(scheduler, cadence, start)
+            assert interval == 300
+            assert len(offsets) == quota
+            assert all(30 <= offset <= 240 for offset in offsets), offsets
+            quotas.append(quota)
+        assert quotas == [1, 0] * 10, "Same rate: one screenshot per 600 s"
+        assert scheduler.quota_met() == (quotas[-1] == 0)
+    finally:
+        scheduler.stop()
+    print("Half interval hint test passed")
+
+
+def test_jittered_intervals_keep_quota():
+    """The session jitter (+/- 10%) never leaves an ordinary interval without a screenshot"""
+    rng = random.Random(5)
+    cadence = SyncCadence(jitter=0.1, rng=random.Random(3))
+    scheduler = _tracker_scheduler(rng)
+    start = time.monotonic() + 3600
+    try:
+        quotas = [_plan(scheduler, cadence, start)[2] for _ in range(1000)]
+        assert min(quotas) == 1 and max(quotas) == 1, sorted(set(quotas))
+        assert not scheduler.quota_met()
+
+        # A real half-interval hint still carries the fraction: one per 600 s
+        hinted = []
+        for _ in range(100):
+            cadence.apply_hints('session', {'nextUpdateIn': 300})
+            hinted.append(_plan(scheduler, cadence, start)[2])
+        assert set(hinted) == {0, 1} and 45 <= sum(hinted) <= 55, sum(hinted)
+    finally:
+        scheduler.stop()
+    print("Jittered interval quota test passed")
+
+
+def test_low_power_spreads_quota():
+    """Low-power mode stretches the interval; the quota and window stretch with it"""
+    rng = random.Random(11)
+    cadence = SyncCadence(jitter=0.0)
+    cadence.set_low_power(True)
+    scheduler = _tracker_scheduler(rng)
+    start = time.monotonic() + 3600
+    try:
+        for _ in range(100):
+            interval, offsets, quota = _plan(scheduler, cadence, start)
+            assert interval == 1800 and quota == 3
+            # One capture per stratum of [180, 1440]
+            for i, offset in enumerate(offsets):
+                assert 180 + i * 420 <= offset <= 180 + (i + 1) * 420, offsets
+
+        cadence.set_low_power(False)
+        interval, offsets, quota = _plan(scheduler, cadence, start)
+        assert interval == 600 and quota == 1 and 60 <= offsets[0] <= 480
+    finally:
+        scheduler.stop()
+    print("Low power quota test passed")
+
+
+if __name__ == "__main__":
+    test_stratified_offsets()
+    test_quota_met_within_interval()
+    test_simulated_clock_drives_captures()
+    test_run_due_without_thread()
+    test_failed_capture_is_retried()
+    test_new_interval_replaces_plan()
+    test_half_interval_hint_keeps_rate()
+    test_jittered_intervals_keep_quota()
+    test_low_power_spreads_quota()
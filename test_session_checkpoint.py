@@ -0,0 +1,249 @@
+import os
+import sys
+import tempfile
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from storage import Database
+from session_checkpoint import SessionCheckpointer
+
+
+def _state(at, apps, links=None, screenshots=None):
+    return {
+        'checkpoint_at': at,
+        'active_seconds': at - 1000 - 5,
+        'idle_seconds': 5,
+        'keyboard_events': 10,
+        'mouse_events': 20,
+        'keyboard_rate': 1,
+        'mouse_rate': 2,
+        'applications': apps,
+        'links': links or {},
+        'screenshots': screenshots or [],
+    }
+
+
+def test_checkpoints_are_incremental():
+    """Only changed and removed items are written"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, 'tracker.db'))
+        try:
+            db.migrate()
+            checkpointer = SessionCheckpointer(db)
+            checkpointer.begin('s1', 'e1', 'Project', 'note', 1000)
+
+            apps = {'Editor': {'timeSpent': 30, 'lastSeen': 'a'}, 'Browser': {'timeSpent': 5, 'lastSeen': 'a'}}
+            assert checkpointer.checkpoint(_state(1030, apps)) == 2
+            assert checkpointer.checkpoint(_state(1060, apps)) == 0
+
+            apps['Editor'] = {'timeSpent': 60, 'lastSeen': 'b'}
+            assert checkpointer.checkpoint(_state(1090, apps)) == 1
+
+            # A session update cleared the interval
+            assert checkpointer.checkpoint(_state(1120, {})) == 2
+            assert checkpointer.load()[0]['applications'] == {}
+        finally:
+            db.close()
+    print("Incremental checkpoint test passed")
+
+
+def test_orphaned_session_survives_restart():
+    """A new process sees the last checkpoint of a session that was never finished"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'tracker.db')
+        db = Database(path)
+        db.migrate()
+        checkpointer = SessionCheckpointer(db)
+        checkpointer.begin('s1', 'e1', 'Project', 'note', 1000)
+        checkpointer.checkpoint(_state(1300, {'Editor': {'timeSpent': 290, 'lastSeen': 'x'}},
+                                       links={'https://a.example': {'title': 'A', 'timeSpent': 30}},
+                                       screenshots=[{'url': 'one'}, {'url': 'two'}]))
+        db.close()  # simulated crash: nothing but the queued writes reach the disk
+
+        db = Database(path)
+        try:
+            db.migrate()
+            restarted = SessionCheckpointer(db)
+            orphans = restarted.load()
+            assert len(orphans) == 1
+            orphan = orphans[0]
+            assert orphan['session_id'] == 's1' and orphan['employee_id'] == 'e1'
+            assert orphan['start_time'] == 1000 and orphan['checkpoint_at'] == 1300
+            assert orphan['active_seconds'] == 295 and not orphan['stopped']
+            assert orphan['applications'] == {'Editor': {'timeSpent': 290, 'lastSeen': 'x'}}
+            assert orphan['links']['https://a.example']['timeSpent'] == 30
+            assert orphan['screenshots'] == [{'url': 'one'}, {'url': 'two'}]
+
+            # Resuming continues incrementally from what is already stored
+            restarted.adopt(orphan)
+            assert restarted.checkpoint(_state(1330, orphan['applications'], orphan['links'],
+                                               orphan['screenshots'])) == 0
+
+            restarted.finish('s1')
+            assert restarted.load() == []
+        finally:
+            db.close()
+    print("Restart test passed")
+
+
+def test_stopped_sessions_are_flagged():
+    """A session stopped locally whose final update failed is marked as stopped"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, 'tracker.db'))
+        try:
+            db.migrate()
+            checkpointer = SessionCheckpointer(db)
+            checkpointer.begin('s1', 'e1', 'Project', 'note', 1000)
+            checkpointer.checkpoint(_state(1500, {}), stopped=True)
+            checkpointer.begin('s2', 'e1', 'Project', 'note', 2000)
+
+            orphans = checkpointer.load()
+            assert [o['session_id'] for o in orphans] == ['s1', 's2']
+            assert orphans[0]['stopped'] and orphans[0]['checkpoint_at'] == 1500
+            assert not orphans[1]['stopped']
+        finally:
+            db.close()
+    print("Stopped session test passed")
+
+
+def test_uploaded_screenshots_survive_a_crash():
+    """Screenshots uploaded during an interval are checkpointed and sent by the next process"""
+    sys.path.append(os.path.join(os.path.dirname(__file__), 'loadtest'))
+    import config
+    import tracker
+    from clock import SimulatedClock
+    from mock_server import MockTrackerBackend
+    from fleet import InProcessRequests
+
+    class RecordingRequests(InProcessRequests):
+        def __init__(self, backend):
+            super().__init__(backend)
+            self.updates = []
+
+        def patch(self, url, json=None, **kwargs):
+            self.updates.append(json)
+            return self.request('PATCH', url, json=json, **kwargs)
+
+    fake_requests = RecordingRequests(MockTrackerBackend())
+    real_requests, saved_urls = tracker.requests, dict(config.URLS)
+    config.use_server('http://checkpoint.invalid')
+    tracker.requests = fake_requests
+    clock = SimulatedClock()
+    crashed = tracker.Api(defer_startup=True, clock=clock)
+    try:
+        crashed.load_auth_data()  # migrates tracker.db
+        assert crashed.login('crash@example.com', 'secret', True)['success']
+        assert crashed.create_session('Testing')['success']
+        crashed._reset_session_state('Project', 'Testing', clock.time())
+        crashed.checkpointer.begin(crashed.session_id, crashed.user_data.get('employeeId'), 'Project',
+                                   'Testing', clock.time())
+        crashed.upload_queue.upload_func = lambda path, timestamp, cancel_token=None: {'url': 'https://files.example/1.png',
+                                                                    'timestamp': timestamp}
+        with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as shot:
+            shot.write(b'png')
+        assert crashed.upload_queue.enqueue(shot.name, '2024-01-01T00:00:00.000Z', crashed.session_id)
+        crashed.upload_queue.flush()
+        assert crashed.screenshots_for_session == []
+        crashed.checkpoint_session()
+        session_id = crashed.session_id
+        crashed.upload_queue.stop()  # the process dies here
+
+        clock.advance(3600)
+        restarted = tracker.Api(defer_startup=True, clock=clock)
+        restarted.load_auth_data()
+        try:
+            result = restarted.recover_orphaned_session()
+            assert result['finalized'] == [session_id], result
+        finally:
+            restarted.upload_queue.stop()
+    finally:
+        tracker.requests = real_requests
+        config.URLS.clear()
+        config.URLS.update(saved_urls)
+
+    final_update = fake_requests.updates[-1]
+    assert [s['imageUrl'] for s in final_update['screenshots']] == ['https://files.example/1.png']
+    print("Checkpointed screenshot test passed")
+
+
+def test_spooled_screenshots_of_finished_sessions_are_discarded():
+    """After a restart, spooled screenshots go out with their orphaned session or are dropped"""
+    sys.path.append(os.path.join(os.path.dirname(__file__), 'loadtest'))
+    import json
+    import config
+    import tracker
+    from clock import SimulatedClock
+    from mock_server import MockTrackerBackend
+    from fleet import InProcessRequests
+
+    class RecordingRequests(InProcessRequests):
+        def __init__(self, backend):
+            super().__init__(backend)
+            self.updates = []
+
+        def patch(self, url, json=None, **kwargs):
+            self.updates.append(json)
+            return self.request('PATCH', url, json=json, **kwargs)
+
+    def spooled_sessions(queue):
+        names = [name for name in os.listdir(queue.spool_dir) if name.endswith('.json')]
+        sessions = []
+        for name in names:
+            with open(os.path.join(queue.spool_dir, name), encoding='utf-8') as f:
+                sessions.append(json.load(f)['session_id'])
+        return sessions
+
+    fake_requests = RecordingRequests(MockTrackerBackend())
+    real_requests, saved_urls = tracker.requests, dict(config.URLS)
+    config.use_server('http://spool.invalid')
+    tracker.requests = fake_requests
+    clock = SimulatedClock()
+    crashed = tracker.Api(defer_startup=True, clock=clock)
+    try:
+        crashed.load_auth_data()  # migrates tracker.db
+        assert crashed.login('spool@example.com', 'secret', True)['success']
+        assert crashed.create_session('Testing')['success']
+        crashed._reset_session_state('Project', 'Testing', clock.time())
+        crashed.checkpointer.begin(crashed.session_id, crashed.user_data.get('employeeId'), 'Project',
+                                   'Testing', clock.time())
+        crashed.checkpoint_session()
+        session_id = crashed.session_id
+        # Captured but never uploaded: the queue was not started before the crash
+        for name, owner in (('orphaned.png', session_id), ('finished.png', 'finished-session')):
+            with tempfile.NamedTemporaryFile(suffix=name, delete=False) as shot:
+                shot.write(b'png')
+            assert crashed.upload_queue.enqueue(shot.name, '2024-01-01T00:00:00.000Z', owner)
+        crashed.upload_queue.stop()
+
+        clock.advance(3600)
+        restarted = tracker.Api(defer_startup=True, clock=clock)
+        restarted.load_auth_data()
+        restarted.upload_queue.upload_func = lambda path, timestamp, cancel_token=None: {
+            'url': f'https://files.example/{os.path.basename(path)}', 'timestamp': timestamp}
+        try:
+            result = restarted.recover_orphaned_session()
+            assert result['finalized'] == [session_id], result
+            restarted.upload_queue.flush()
+            queue = restarted.upload_queue.get_metrics()
+            assert queue['completed_waiting'] == 0 and queue['pending'] == 0
+            assert queue['cancelled_sessions_in_flight'] == 0
+            assert 'finished-session' not in spooled_sessions(restarted.upload_queue)
+        finally:
+            restarted.upload_queue.stop()
+    finally:
+        tracker.requests = real_requests
+        config.URLS.clear()
+        config.URLS.update(saved_urls)
+
+    final_update = fake_requests.updates[-1]
+    assert len(final_update['screenshots']) == 1, final_update['screenshots']
+    print("Finished session spool test passed")
+
+
+if __name__ == "__main__":
+    test_checkpoints_are_incremental()
+    test_orphaned_session_survives_restart()
+    test_stopped_sessions_are_flagged()
+    test_uploaded_screenshots_survive_a_crash()
+    test_spooled_screenshots_of_finished_sessions_are_discarded()
@@ -0,0 +1,31 @@
+import os
+import sys
+import statistics
+
+# The measurement helpers live with the startup benchmark
+sys.path.append(os.path.join(os.path.dirname(__file__), 'benchmarks'))
+
+from bench_startup import measure_import, eager_heavy_modules
+
+# Generous enough for slow CI machines; importing main eagerly took roughly three
+# times as long as the lazy version before the heavy modules were deferred
+IMPORT_BUDGET_MS = 400
+
+
+def test_heavy_modules_are_not_imported_at_startup():
+    """webview, requests, psutil, pynput, mss, ... load on first use, not with main"""
+    run = measure_import('main')
+    assert eager_heavy_modules(run['rows']) == []
+    print("Lazy import test passed")
+
+
+def test_main_import_time_budget():
+    """Importing main stays within the startup budget"""
+    totals = [measure_import('main')['total_ms'] for _ in range(3)]
+    assert statistics.median(totals) < IMPORT_BUDGET_MS, f"import main took {totals} ms"
+    print("Import budget test passed")
+
+
+if __name__ == "__main__":
+    test_heavy_modules_are_not_imported_at_startup()
+    test_main_import_time_budget()
@@ -0,0 +1,120 @@
+import os
+import sys
+import json
+import time
+import tempfile
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from startup_trace import StartupTracer, TRACE_ENV_VAR
+
+
+def test_configuration_from_environment():
+    """The env flag enables tracing, --profile-startup also prints the summary"""
+    assert not StartupTracer.from_environment(['main.py'], {}).enabled
+    assert not StartupTracer.from_environment(['main.py'], {TRACE_ENV_VAR: '0'}).enabled
+
+    env_default = StartupTracer.from_environment(['main.py'], {TRACE_ENV_VAR: '1'})
+    assert env_default.enabled and env_default.trace_path is None and not env_default.print_summary
+
+    env_path = StartupTracer.from_environment(['main.py'], {TRACE_ENV_VAR: '/tmp/trace.json'})
+    assert env_path.trace_path == '/tmp/trace.json'
+
+    profile = StartupTracer.from_environment(['main.py', '--dev', '--profile-startup'], {})
+    assert profile.enabled and profile.print_summary
+    print("Configuration test passed")
+
+
+def test_spans_written_as_chrome_trace():
+    """Spans and marks end up in a Chrome trace file; recording stops at finish()"""
+    tracer = StartupTracer(enabled=True)
+
+    @tracer.traced('load')
+    def load():
+        time.sleep(0.01)
+        return 42
+
+    with tracer.span('init_db', path='tracker.db'):
+        time.sleep(0.01)
+    assert load() == 42
+    tracer.mark('GUI loop started')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = tracer.finish(default_path=os.path.join(tmp, 'trace.json'))
+        with open(path) as f:
+            trace = json.load(f)
+
+    events = [e for e in trace['traceEvents'] if e['ph'] != 'M']
+    spans = {e['name']: e for e in events if e['ph'] == 'X'}
+    assert set(spans) == {'init_db', 'load'}
+    assert spans['init_db']['dur'] >= 10_000 and spans['init_db']['args'] == {'path': 'tracker.db'}
+    assert spans['load']['ts'] >= spans['init_db']['ts'] + spans['init_db']['dur']
+    assert {'GUI loop started', 'startup finished'} <= {e['name'] for e in events if e['ph'] == 'i'}
+    assert any(e['ph'] == 'M' and e['name'] == 'thread_name' for e in trace['traceEvents'])
+
+    # Calls after startup are not recorded
+    load()
+    assert len([e for e in tracer.events() if e['name'] == 'load']) == 1
+    assert 'init_db' in tracer.summary_table()
+    print("Chrome trace test passed")
+
+
+def test_disabled_tracer_records_nothing():
+    """A disabled tracer neither records nor writes anything"""
+    tracer = StartupTracer(enabled=False)
+    with tracer.span('x'):
+        pass
+    tracer.traced()(lambda: None)()
+    tracer.mark('y')
+    assert tracer.events() == []
+    assert tracer.finish(default_path='/nonexistent/trace.json') is None
+    print("Disabled tracer test passed")
+
+
+def test_finish_logs_instead_of_printing():
+    """finish() reports through the app logger; the summary is info only with --profile-startup"""
+    import io
+    import logging
+    from contextlib import redirect_stdout
+
+    class Records(logging.Handler):
+        def __init__(self):
+            super().__init__(logging.DEBUG)
+            self.records = []
+
+        def emit(self, record):
+            self.records.append(record)
+
+    logger = logging.getLogger('ri_tracker.startup_trace')
+    handler = Records()
+    saved_level = logger.level
+    logger.addHandler(handler)
+    logger.setLevel(logging.DEBUG)
+    stdout = io.StringIO()
+    try:
+        with tempfile.TemporaryDirectory() as tmp, redirect_stdout(stdout):
+            for print_summary in (False, True):
+                tracer = StartupTracer(enabled=True, print_summary=print_summary)
+                with tracer.span('init_db'):
+                    pass
+                assert tracer.finish(default_path=os.path.join(tmp, 'trace.json'))
+            assert StartupTracer(enabled=True).finish(default_path=os.path.join(tmp, 'missing', 'x.json')) is None
+    finally:
+        logger.removeHandler(handler)
+        logger.setLevel(saved_level)
+
+    assert stdout.getvalue() == ''
+    summaries = [r for r in handler.records if r.getMessage().startswith('Startup spans')]
+    assert [r.levelno for r in summaries] == [logging.DEBUG, logging.INFO, logging.DEBUG]
+    assert all('init_db' in r.getMessage() for r in summaries[:2])
+    assert sum(r.getMessage().startswith('Startup trace written') for r in handler.records) == 2
+    assert [r.levelno for r in handler.records if 'Error writing' in r.getMessage()] == [logging.ERROR]
+    print("Startup trace logging test passed")
+
+
+if __name__ == "__main__":
+    test_configuration_from_environment()
+    test_spans_written_as_chrome_trace()
+    test_disabled_tracer_records_nothing()
+    test_finish_logs_instead_of_printing()
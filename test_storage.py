@@ -0,0 +1,187 @@
+import os
+import sys
+import time
+import sqlite3
+import tempfile
+import threading
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from storage import Database, MIGRATIONS, record_time_entry, fetch_time_entries, to_epoch
+
+
+def test_migrates_legacy_database():
+    """A tracker.db created by the old init_db keeps its rows and gets WAL + a schema version"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'tracker.db')
+        with sqlite3.connect(path) as conn:
+            conn.execute('CREATE TABLE time_entries (id INTEGER PRIMARY KEY AUTOINCREMENT, '
+                         'project_name TEXT, timestamp TEXT, duration INTEGER)')
+            conn.execute('CREATE TABLE auth_data (id INTEGER PRIMARY KEY AUTOINCREMENT, token TEXT, user_data TEXT)')
+            conn.execute("INSERT INTO time_entries (project_name, timestamp, duration) VALUES ('p', '2024-01-01 09:00:00', 60)")
+
+        db = Database(path)
+        try:
+            assert db.migrate() == MIGRATIONS[-1][0]
+            assert db.query('SELECT project_name, duration FROM time_entries') == [('p', 60)]
+            assert db.query_one('PRAGMA journal_mode')[0] == 'wal'
+        finally:
+            db.close()
+    print("Legacy migration test passed")
+
+
+def test_failed_migration_rolls_back():
+    """A failing migration leaves neither its changes nor its version behind"""
+    def broken(conn):
+        conn.execute('CREATE TABLE half_done (id INTEGER)')
+        raise RuntimeError("boom")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, 'tracker.db'), migrations=MIGRATIONS + [(99, broken)])
+        try:
+            try:
+                db.migrate()
+                assert False, "Migration should have failed"
+            except RuntimeError:
+                pass
+            assert db.query_one('PRAGMA user_version')[0] == MIGRATIONS[-1][0]
+            assert db.query_one("SELECT name FROM sqlite_master WHERE name = 'half_done'") is None
+        finally:
+            db.close()
+    print("Migration rollback test passed")
+
+
+def test_reads_not_blocked_by_writer():
+    """Readers keep working while a long write transaction is open"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, 'tracker.db'))
+        try:
+            db.migrate()
+            db.insert('INSERT INTO auth_data (token, user_data) VALUES (?, ?)', ('t', '{}'))
+
+            in_transaction = threading.Event()
+            release = threading.Event()
+
+            def slow_write(conn):
+                conn.execute('INSERT INTO auth_data (token, user_data) VALUES (?, ?)', ('t2', '{}'))
+                in_transaction.set()
+                release.wait(5)
+
+            db.transaction(slow_write, wait=False)
+            assert in_transaction.wait(5)
+
+            started = time.perf_counter()
+            rows = db.query('SELECT token FROM auth_data')
+            assert time.perf_counter() - started < 0.5, "Read should not wait for the writer"
+            assert rows == [('t',)], "Uncommitted rows must not be visible"
+
+            release.set()
+            db.flush()
+            assert len(db.query('SELECT token FROM auth_data')) == 2
+        finally:
+            db.close()
+    print("Concurrent read test passed")
+
+
+def test_async_writes_are_ordered():
+    """Writes queued without waiting are applied in order"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, 'tracker.db'))
+        try:
+            db.migrate()
+            for i in range(50):
+                db.execute_async('INSERT INTO time_entries (project_name, timestamp, duration) VALUES (?, ?, ?)',
+                                 (f'p{i}', '2024-01-01 09:00:00', i))
+            db.flush()
+            rows = db.query('SELECT duration FROM time_entries ORDER BY id')
+            assert [r[0] for r in rows] == list(range(50))
+        finally:
+            db.close()
+    print("Async write test passed")
+
+
+def test_time_entry_history_columns():
+    """Legacy rows get a UTC epoch backfilled from their local timestamp"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'tracker.db')
+        db = Database(path, migrations=MIGRATIONS[:1])
+        db.migrate()
+        db.insert("INSERT INTO time_entries (project_name, timestamp, duration) VALUES ('old', '2024-03-01 09:30:00', 60)")
+        db.close()
+
+        db = Database(path)
+        try:
+            db.migrate()
+            entry = fetch_time_entries(db)[0]
+            assert entry['project'] == 'old'
+            assert entry['timestamp_utc'] == to_epoch('2024-03-01T09:30:00')
+            assert entry['session_id'] is None
+        finally:
+            db.close()
+    print("History column migration test passed")
+
+
+def test_time_entry_employee_backfill():
+    """Existing entries are assigned to the user logged in when the employee column is added"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'tracker.db')
+        db = Database(path, migrations=MIGRATIONS[:5])
+        db.migrate()
+        db.insert("INSERT INTO time_entries (project_name, timestamp_utc, duration) VALUES ('old', 1700000000, 60)")
+        db.insert('INSERT INTO auth_data (token, user_data) VALUES (?, ?)', ('t', '{"employeeId": "e1"}'))
+        db.close()
+
+        db = Database(path)
+        try:
+            db.migrate()
+            assert db.query('SELECT project_name, employee_id FROM time_entries') == [('old', 'e1')]
+            record_time_entry(db, 'new', 1_700_000_100, 60, employee_id='e2', wait=True)
+            assert [e['project'] for e in fetch_time_entries(db, employee_id='e2')] == ['new']
+            assert len(fetch_time_entries(db)) == 2
+        finally:
+            db.close()
+    print("Employee column migration test passed")
+
+
+def test_paginated_range_queries():
+    """Entries can be filtered by range and project and are paged newest first"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, 'tracker.db'))
+        try:
+            db.migrate()
+            base = 1_700_000_000
+            for i in range(30):
+                record_time_entry(db, 'alpha' if i % 2 else 'beta', base + i * 3600, 3600,
+                                  session_id=f's{i}', active_seconds=3000, idle_seconds=600)
+            db.flush()
+
+            page1 = fetch_time_entries(db, limit=10)
+            page2 = fetch_time_entries(db, limit=10, offset=10)
+            assert [e['session_id'] for e in page1] == [f's{i}' for i in range(29, 19, -1)]
+            assert page2[0]['session_id'] == 's19'
+
+            ranged = fetch_time_entries(db, start=base + 5 * 3600, end=base + 10 * 3600, limit=100)
+            assert [e['session_id'] for e in ranged] == ['s9', 's8', 's7', 's6', 's5']
+
+            alpha = fetch_time_entries(db, project='alpha', limit=100)
+            assert len(alpha) == 15 and all(e['project'] == 'alpha' for e in alpha)
+            assert alpha[0]['active_time'] == 3000 and alpha[0]['idle_time'] == 600
+
+            plan = ' '.join(str(row) for row in db.query(
+                'EXPLAIN QUERY PLAN SELECT * FROM time_entries WHERE project_name = ? AND timestamp_utc >= ? '
+                'ORDER BY timestamp_utc DESC', ('alpha', base)))
+            assert 'idx_time_entries_project_timestamp' in plan
+        finally:
+            db.close()
+    print("Paginated query test passed")
+
+
+if __name__ == "__main__":
+    test_migrates_legacy_database()
+    test_failed_migration_rolls_back()
+    test_reads_not_blocked_by_writer()
+    test_async_writes_are_ordered()
+    test_time_entry_history_columns()
+    test_time_entry_employee_backfill()
+    test_paginated_range_queries()
@@ -0,0 +1,154 @@
+import os
+import sys
+import json
+import time
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from streaming_upload import stream_upload, CancelToken, UploadCancelled
+
+API_KEY = 'test-api-key'
+
+
+class FileServerHandler(BaseHTTPRequestHandler):
+    """Local stand-in for the /api/files/<folder>/upload endpoint"""
+    response_delay = 0
+    received = []
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        if not (self.path.startswith('/api/files/') and self.path.endswith('/upload')):
+            self.send_response(404)
+            self.end_headers()
+            return
+        if self.headers.get('x-api-key') != API_KEY:
+            self._json(401, {'success': False, 'message': 'Invalid API key'})
+            return
+
+        length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(length)
+        boundary = self.headers.get('Content-Type', '').split('boundary=')[-1].encode()
+
+        # Extract the single file part from the multipart body
+        part = body.split(b'--' + boundary)[1]
+        part_headers, content = part.split(b'\r\n\r\n', 1)
+        content = content[:-2]  # trailing CRLF before the closing boundary
+        FileServerHandler.received.append({'headers': part_headers.decode(), 'content': content})
+
+        if FileServerHandler.response_delay:
+            time.sleep(FileServerHandler.response_delay)
+
+        self._json(201, {'success': True, 'data': {'url': f'http://files.local/{len(content)}.png'}})
+
+    def _json(self, status, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        try:
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+def _start_server():
+    FileServerHandler.received = []
+    FileServerHandler.response_delay = 0
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FileServerHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f'http://127.0.0.1:{server.server_address[1]}/api/files/test-folder/upload'
+    return server, url
+
+
+def _make_file(directory, size):
+    path = os.path.join(directory, 'shot.png')
+    with open(path, 'wb') as f:
+        f.write(os.urandom(size))
+    return path
+
+
+def test_streaming_upload_with_progress():
+    """The file arrives intact and progress reaches the full body size"""
+    server, url = _start_server()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = _make_file(tmp, 300 * 1024)
+            progress = []
+            response = stream_upload(url, path, headers={'x-api-key': API_KEY}, content_type='image/png',
+                                     progress=lambda sent, total: progress.append((sent, total)))
+
+            assert response.status_code == 201
+            assert response.json()['data']['url'] == f'http://files.local/{300 * 1024}.png'
+
+            with open(path, 'rb') as f:
+                assert FileServerHandler.received[0]['content'] == f.read()
+            assert 'filename="shot.png"' in FileServerHandler.received[0]['headers']
+            assert 'image/png' in FileServerHandler.received[0]['headers']
+
+            assert len(progress) > 1, "Body should be sent in several chunks"
+            sent, total = progress[-1]
+            assert sent == total
+    finally:
+        server.shutdown()
+    print("Streaming upload test passed")
+
+
+def test_cancelled_upload():
+    """Cancelling the token aborts the upload between chunks"""
+    server, url = _start_server()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = _make_file(tmp, 1024 * 1024)
+            token = CancelToken()
+
+            def cancel_midway(sent, total):
+                if sent > total // 4:
+                    token.cancel()
+
+            try:
+                stream_upload(url, path, headers={'x-api-key': API_KEY}, cancel_token=token, progress=cancel_midway)
+                assert False, "Upload should have been cancelled"
+            except UploadCancelled:
+                pass
+
+            # A token cancelled before the upload starts never opens a connection
+            try:
+                stream_upload(url, path, headers={'x-api-key': API_KEY}, cancel_token=token)
+                assert False, "Upload should have been cancelled"
+            except UploadCancelled:
+                pass
+    finally:
+        server.shutdown()
+    print("Cancelled upload test passed")
+
+
+def test_read_timeout():
+    """A server that does not answer in time raises a timeout"""
+    server, url = _start_server()
+    FileServerHandler.response_delay = 2
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = _make_file(tmp, 1024)
+            try:
+                stream_upload(url, path, headers={'x-api-key': API_KEY}, read_timeout=0.3)
+                assert False, "Upload should have timed out"
+            except requests.exceptions.Timeout:
+                pass
+    finally:
+        server.shutdown()
+    print("Read timeout test passed")
+
+
+if __name__ == "__main__":
+    test_streaming_upload_with_progress()
+    test_cancelled_upload()
+    test_read_timeout()
@@ -0,0 +1,128 @@
+import os
+import sys
+import random
+
+# Add the backend and loadtest directories to the Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+sys.path.append(os.path.join(os.path.dirname(__file__), 'loadtest'))
+
+from sync_cadence import SyncCadence, parse_retry_after
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_jitter_and_server_hints():
+    """Delays are jittered around the interval; server hints are clamped, one-shot or persistent"""
+    cadence = SyncCadence(jitter=0.1, rng=random.Random(1))
+    delays = [cadence.next_delay('session', 600) for _ in range(200)]
+    assert all(540 <= d <= 660 for d in delays)
+    assert len(set(round(d) for d in delays)) > 50
+
+    # nextUpdateIn applies to the next delay only
+    cadence.apply_hints('session', {'success': True, 'nextUpdateIn': 1200})
+    assert 1080 <= cadence.next_delay('session', 600) <= 1320
+    assert 540 <= cadence.next_delay('session', 600) <= 660
+
+    # syncIntervals persist (also inside data), are clamped to HINT_RANGE and cleared with null
+    cadence.apply_hints('session', {'data': {'syncIntervals': {'stats': 900, 'links': 1}}})
+    assert 810 <= cadence.next_delay('stats', 600) <= 990
+    assert 810 <= cadence.next_delay('stats', 600) <= 990
+    assert 13.5 <= cadence.next_delay('links', 30) <= 16.5
+    cadence.apply_hints('session', {'syncIntervals': {'stats': None}})
+    assert 540 <= cadence.next_delay('stats', 600) <= 660
+    print("Jitter and hints test passed")
+
+
+def test_backoff_and_retry_after():
+    """Server errors back off per sync attempt; success resets; Retry-After is a floor"""
+    clock = FakeClock()
+    cadence = SyncCadence(jitter=0.0, max_backoff=2000, clock=clock)
+
+    cadence.next_delay('stats', 600)
+    # Two failing requests of one attempt count once
+    cadence.record_response('stats', 503)
+    cadence.record_response('stats', 200)
+    cadence.record_failure('stats')
+    assert cadence.next_delay('stats', 600) == 1200
+    cadence.record_response('stats', 500)
+    assert cadence.next_delay('stats', 600) == 2000  # capped at max_backoff
+    cadence.record_response('stats', 404)  # client errors don't back off
+    assert cadence.next_delay('stats', 600) == 600
+
+    # Retry-After pushes the next sync out, but never pulls it in
+    cadence.record_response('session', 429, {'Retry-After': '3000'})
+    assert cadence.next_delay('session', 600) == 3000
+    cadence.record_response('session', 200, {'Retry-After': '10'})
+    assert cadence.next_delay('session', 600) == 600
+
+    assert parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT', now=1445412420) == 60
+    assert parse_retry_after('soon') is None and parse_retry_after(None) is None
+    print("Backoff test passed")
+
+
+def test_low_power_mode():
+    """On battery the intervals are stretched; the mode can be forced either way"""
+    clock = FakeClock()
+    on_battery = [True]
+    cadence = SyncCadence(jitter=0.0, low_power_factor=3, power_source=lambda: on_battery[0],
+                          power_check_interval=60, clock=clock)
+    assert cadence.next_delay('apps', 5) == 15
+
+    # The power source is polled at most every power_check_interval
+    on_battery[0] = False
+    assert cadence.next_delay('apps', 5) == 15
+    clock.now += 60
+    assert cadence.next_delay('apps', 5) == 5
+
+    cadence.set_low_power(True)
+    assert cadence.next_delay('apps', 5) == 15 and cadence.get_status()['low_power_mode'] is True
+    cadence.set_low_power(None)
+    assert cadence.get_status()['low_power'] is False
+    print("Low power test passed")
+
+
+def test_update_session_feeds_cadence():
+    """Session update responses drive the client's cadence (errors and server hints)"""
+    import config
+    import tracker
+    from mock_server import MockTrackerBackend
+    from fleet import InProcessRequests
+
+    backend = MockTrackerBackend()
+    real_requests, saved_urls = tracker.requests, dict(config.URLS)
+    config.use_server('http://cadence.invalid')
+    tracker.requests = InProcessRequests(backend)
+    try:
+        api = tracker.Api(defer_startup=True)
+        api.screenshot_scheduler.quota_met = lambda: True
+        api.sync_cadence.jitter = 0.0
+        assert api.login('cadence@example.com', 'secret')['success']
+        assert api.create_session('Testing')['success']
+
+        backend.configure('sessions.update', error_rate=1.0, error_status=503)
+        assert not api.update_session(60, 0)['success']
+        assert api.sync_cadence.next_delay('session', 600) == 1200
+
+        backend.configure('sessions.update')
+        backend.sync_hints = {'syncIntervals': {'session': 900}}
+        assert api.update_session(120, 0)['success']
+        assert api.sync_cadence.next_delay('session', 600) == 900
+        assert api.get_diagnostics()['sync']['channels']['session']['interval_override'] == 900
+    finally:
+        tracker.requests = real_requests
+        config.URLS.clear()
+        config.URLS.update(saved_urls)
+    print("Session update cadence test passed")
+
+
+if __name__ == "__main__":
+    test_jitter_and_server_hints()
+    test_backoff_and_retry_after()
+    test_low_power_mode()
+    test_update_session_feeds_cadence()
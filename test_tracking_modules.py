@@ -0,0 +1,259 @@
+import os
+import sys
+import time
+import tempfile
+import threading
+
+# Add the backend and benchmarks directories to the Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+sys.path.append(os.path.join(os.path.dirname(__file__), 'benchmarks'))
+
+import apps
+import platforms
+from clock import SimulatedClock
+from apps import ApplicationTracker, AppUsage, is_system_process
+from links import LinkTracker, LinkUsage
+from activity import ActivityEngine
+from screenshots import ScreenshotEngine
+from fixtures import make_chromium_history, make_firefox_history, FakePsutil
+
+
+def test_link_tracker_without_api():
+    """LinkTracker reads the history databases it is given and reports session links"""
+    clock = SimulatedClock()
+    now = clock.time()
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = {
+            'chrome': [make_chromium_history(os.path.join(tmp, 'History'), 40, 8, now, span=600)],
+            'firefox': [make_firefox_history(os.path.join(tmp, 'places.sqlite'), 40, 8, now, span=600)],
+        }
+        tracker = LinkTracker(clock, history_paths=lambda: paths)
+        tracker.check(session_start=now - 3600, lookback=300)
+        clock.advance(300)
+        tracker.check(session_start=now - 3600, lookback=600)
+
+    assert tracker.usage and all(url.startswith('https://example') for url in tracker.usage)
+    links = tracker.prepare_for_session()
+    assert links and all(link['timeSpent'] > 1 for link in links)
+    assert [link['timeSpent'] for link in links] == sorted((link['timeSpent'] for link in links), reverse=True)
+
+    tracker.reset()
+    assert tracker.usage == {} and tracker.last_check_time is None
+    print("Link tracker test passed")
+
+
+def test_application_tracker_without_api():
+    """ApplicationTracker times user applications and leaves system processes out"""
+    assert is_system_process('SVCHOST.EXE', 'C:\\Tools\\svchost.exe', 'Windows')
+    assert is_system_process('helper', 'C:\\WINDOWS\\System32\\helper.exe', 'Windows')
+    assert not is_system_process('code', '/opt/code/code', 'Darwin')
+
+    clock = SimulatedClock()
+    tracker = ApplicationTracker(clock, system='Windows')
+    real_psutil = apps.psutil
+    apps.psutil = FakePsutil(processes=100, apps=5)
+    try:
+        tracker.check()
+        clock.advance(30)
+        tracker.check()
+    finally:
+        apps.psutil = real_psutil
+
+    assert set(tracker.usage) <= {f'app{i}' for i in range(5)} and tracker.usage
+    assert all(app.time_spent == 30 for app in tracker.usage.values())
+    assert [app['timeSpent'] for app in tracker.prepare_for_session()] == [30] * len(tracker.usage)
+    print("Application tracker test passed")
+
+
+def test_system_processes_are_per_platform():
+    """Each platform filters only its own system processes"""
+    # Terminal and Mail are macOS applications, but ordinary names on Windows
+    assert is_system_process('Terminal', '/System/Applications/Utilities/Terminal.app', 'Darwin')
+    assert is_system_process('Mail', '/Applications/Mail.app/Contents/MacOS/Mail', 'Darwin')
+    assert not is_system_process('Terminal', 'C:\\Tools\\Terminal', 'Windows')
+    assert not is_system_process('Mail', 'C:\\Users\\me\\AppData\\Local\\Mail\\Mail', 'Windows')
+    assert not is_system_process('svchost.exe', '/opt/wine/svchost.exe', 'Darwin')
+    assert not is_system_process('launchd', '/opt/launchd', 'Linux')
+
+    clock = SimulatedClock()
+    real_psutil = apps.psutil
+    try:
+        for system in ('Windows', 'Darwin'):
+            apps.psutil = FakePsutil(processes=100, apps=5, system=system)
+            tracker = ApplicationTracker(clock, system=system)
+            tracker.check()
+            assert tracker.usage and set(tracker.usage) <= {f'app{i}' for i in range(5)}
+    finally:
+        apps.psutil = real_psutil
+    print("Per-platform system process test passed")
+
+
+def test_activity_engine_without_api():
+    """ActivityEngine books check intervals as active or idle and ends idleness on input"""
+    clock = SimulatedClock()
+    woken = []
+    engine = ActivityEngine(clock, idle_threshold=60, on_active=lambda: woken.append(clock.monotonic()))
+    engine.reset(clock.monotonic())
+    assert engine.next_check_delay() == 60
+
+    assert engine.record('keyboard') and not engine.record('keyboard')  # throttled
+    clock.advance(30)
+    engine.check()
+    assert engine.active_time == 30 and not engine.is_idle
+    assert engine.next_check_delay() == 30
+
+    clock.advance(40)
+    engine.check()
+    assert engine.is_idle and engine.active_time == 70
+    assert engine.next_check_delay() == engine.max_activity_check_interval
+    clock.advance(20)
+    assert engine.totals() == {'active': 70, 'idle': 20}
+
+    engine.record('mouse')
+    assert not engine.is_idle and engine.idle_time == 20 and woken == [clock.monotonic()]
+    clock.advance(10)
+    engine.book()
+    assert (engine.active_time, engine.idle_time) == (80, 20)
+    assert engine.keyboard_events == 1 and engine.mouse_events == 1
+
+    engine.update_rates(120)
+    assert engine.keyboard_activity_rate == 0 and engine.mouse_activity_rate == 0
+    engine.update_rates(60)
+    assert engine.keyboard_activity_rate == 1 and engine.mouse_activity_rate == 1
+    print("Activity engine test passed")
+
+
+def test_screenshot_engine_without_api():
+    """ScreenshotEngine captures into the upload queue and collects a session's uploads"""
+    clock = SimulatedClock()
+    session = {'id': 's1', 'running': True}
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = ScreenshotEngine(clock, spool_dir=os.path.join(tmp, 'spool'),
+                                  session_id=lambda: session['id'], running=lambda: session['running'])
+
+        def capture(output_path=None):
+            path = os.path.join(tmp, f'shot{len(os.listdir(tmp))}.png')
+            with open(path, 'wb') as f:
+                f.write(b'png')
+            return path
+        engine.capture_service.capture = capture
+        engine.upload_queue.upload_func = lambda path, timestamp, cancel_token=None: {
+            'url': f'https://files.example/{os.path.basename(path)}', 'timestamp': timestamp}
+        try:
+            engine.begin_session()
+            assert engine.capture_and_enqueue() and engine.last_timestamp.endswith('Z')
+            assert engine._take_scheduled()
+            engine.upload_queue.flush()
+            assert len(engine.pending('s1')) == 2
+
+            screenshots = engine.collect('s1')
+            assert len(screenshots) == 2 and all(s['imageUrl'].startswith('https://files.example/') for s in screenshots)
+            engine.add(screenshots)  # already collected
+            assert engine.session_screenshots == screenshots
+            assert engine.get_status()['queue']['uploaded'] == 2
+
+            session['running'] = False
+            assert not engine._take_scheduled()
+            engine.end_session('s1')
+
+            # Finishing one session leaves the uploads of the next one alone
+            session.update(id='s2', running=True)
+            engine.begin_session()
+            assert engine.capture_and_enqueue()
+            engine.upload_queue.flush()
+            assert len(engine.collect('s2', final=True)) == 1
+            assert engine.get_status()['queue']['failed_attempts'] == 0
+        finally:
+            engine.upload_queue.stop()
+    print("Screenshot engine test passed")
+
+
+def test_collect_does_not_wait_for_uploads():
+    """collect() sends completed uploads only; a fallback capture belongs to the next interval"""
+
+    clock = SimulatedClock()
+    release = threading.Event()
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = ScreenshotEngine(clock, spool_dir=os.path.join(tmp, 'spool'),
+                                  session_id=lambda: 's1', running=lambda: True)
+
+        def capture(output_path=None):
+            path = os.path.join(tmp, f'shot{len(os.listdir(tmp))}.png')
+            with open(path, 'wb') as f:
+                f.write(b'png')
+            return path
+
+        def slow_upload(path, timestamp, cancel_token=None):
+            release.wait(5)
+            return {'url': f'https://files.example/{os.path.basename(path)}', 'timestamp': timestamp}
+        engine.capture_service.capture = capture
+        engine.upload_queue.upload_func = slow_upload
+        try:
+            engine.begin_session()
+            engine.scheduler.interval = 600
+            engine.scheduler.start_interval(clock.monotonic() + 3600)  # quota of 1, not met
+
+            # An upload in flight is not waited for, and the unmet quota queues a
+            # fallback capture for the next interval
+            assert engine.capture_and_enqueue()
+            started = time.monotonic()
+            assert engine.collect('s1') == []
+            assert time.monotonic() - started < 1
+            queue = engine.get_status()['queue']
+            assert queue['pending'] + queue['in_flight'] == 2
+
+            # The next update sends both: the late upload and the fallback
+            release.set()
+            engine.upload_queue.flush()
+            engine.session_screenshots = []  # as after a session update
+            assert len(engine.collect('s1')) == 2
+
+            # The final update never captures
+            engine.session_screenshots = []
+            assert engine.collect('s1', final=True) == []
+            queue = engine.get_status()['queue']
+            assert queue['pending'] + queue['in_flight'] == 0
+        finally:
+            release.set()
+            engine.upload_queue.stop()
+    print("Non-blocking collect test passed")
+
+
+def test_usage_checkpoint_round_trip():
+    """Usage entries survive a checkpoint, including ones written with ISO lastSeen"""
+    clock = SimulatedClock()
+    links = LinkTracker(clock, history_paths=dict)
+    links.usage['https://a.example'] = LinkUsage('https://a.example', 'A', 12.5, 1700000000.25)
+    links.restore(links.to_checkpoint())
+    link = links.usage['https://a.example']
+    assert (link.title, link.time_spent, link.last_seen) == ('A', 12.5, 1700000000.25)
+
+    apps_tracker = ApplicationTracker(clock)
+    apps_tracker.restore({'Editor': {'name': 'Editor', 'exe': '/opt/editor', 'timeSpent': 90,
+                                     'lastSeen': '2023-11-14T22:13:20.000Z'}})
+    assert isinstance(apps_tracker.usage['Editor'], AppUsage)
+    assert apps_tracker.prepare_for_session() == [
+        {'name': 'Editor', 'timeSpent': 90, 'timestamp': '2023-11-14T22:13:20.000Z'}]
+    assert not hasattr(apps_tracker.usage['Editor'], '__dict__')
+    print("Usage checkpoint test passed")
+
+
+def test_platform_paths():
+    """Each platform gets its own data directory, release feed and browser list"""
+    assert platforms.release_repo('Darwin').endswith('Mac-Releases')
+    assert platforms.release_repo('Windows') == platforms.release_repo('Linux') == platforms.DEFAULT_RELEASE_REPO
+    assert platforms.data_dir('RI_Tracker', 'Darwin').endswith(os.path.join('Application Support', 'RI_Tracker'))
+    paths = platforms.browser_history_paths('Linux')
+    assert set(paths) == {'chrome', 'brave', 'edge', 'firefox', 'safari'} and paths['safari'] == []
+    print("Platform paths test passed")
+
+
+if __name__ == "__main__":
+    test_link_tracker_without_api()
+    test_application_tracker_without_api()
+    test_system_processes_are_per_platform()
+    test_activity_engine_without_api()
+    test_screenshot_engine_without_api()
+    test_collect_does_not_wait_for_uploads()
+    test_usage_checkpoint_round_trip()
+    test_platform_paths()
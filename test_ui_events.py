@@ -0,0 +1,117 @@
+import os
+import sys
+import json
+import time
+import threading
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from clock import SimulatedClock
+from ui_events import UiEventChannel, JS_RECEIVER
+
+
+class FakeWindow:
+    """Records the batches pushed through evaluate_js; each call takes `delay` seconds"""
+
+    def __init__(self, delay=0.0, fail=False):
+        self.delay = delay
+        self.fail = fail
+        self.batches = []
+        self.delivered = threading.Event()
+
+    def evaluate_js(self, script):
+        if self.fail:
+            raise RuntimeError('window closed')
+        assert script.startswith(f'{JS_RECEIVER} && {JS_RECEIVER}(')
+        time.sleep(self.delay)
+        self.batches.append(json.loads(script[len(JS_RECEIVER) * 2 + 5:-1]))
+        self.delivered.set()
+
+
+def _wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_updates_coalesce_into_batches():
+    """Updates before the UI subscribes are not pushed; later ones coalesce per topic"""
+    channel = UiEventChannel(min_interval=0.2)
+    channel.publish('session', {'elapsed_time': 1})
+    assert channel.snapshot() == {'session': {'elapsed_time': 1}}
+
+    window = FakeWindow(delay=0.3)
+    channel.attach(window)
+    time.sleep(0.05)
+    assert window.batches == []
+
+    channel.publish('session', {'elapsed_time': 2})
+    assert window.delivered.wait(2)
+    # While the slow first call is in flight, 50 updates collapse into one per topic
+    for i in range(50):
+        channel.publish('session', {'elapsed_time': 3 + i})
+        channel.publish('stats', {'n': i})
+    assert _wait_for(lambda: len(window.batches) == 2)
+    time.sleep(0.4)
+
+    assert [batch['seq'] for batch in window.batches] == [1, 2]
+    assert window.batches[0]['events'] == {'session': {'elapsed_time': 2}}
+    assert window.batches[1]['events'] == {'session': {'elapsed_time': 52}, 'stats': {'n': 49}}
+    result = channel.get_metrics()
+    assert result['batches'] == 2 and result['delivered'] == 3 and result['coalesced'] == 98
+    print("UI event coalescing test passed")
+
+
+def test_failed_push_detaches_until_resubscribe():
+    """A window that cannot run the call stops the pushes; subscribing again resumes them"""
+    channel = UiEventChannel(min_interval=0.0)
+    window = FakeWindow(fail=True)
+    channel.attach(window)
+    channel.publish('uploads', {'pending': 1})
+    assert _wait_for(lambda: not channel.attached)
+    channel.publish('uploads', {'pending': 2})
+    assert channel.get_metrics()['failed'] == 1 and channel.get_metrics()['pending'] == 0
+
+    window.fail = False
+    channel.attach(window)
+    channel.publish('uploads', {'pending': 0})
+    assert window.delivered.wait(2)
+    assert window.batches[-1]['events'] == {'uploads': {'pending': 0}}
+    print("UI event detach test passed")
+
+
+def test_api_pushes_session_state():
+    """subscribe_events returns every topic; activity checks push the timer state"""
+    from main import Api
+
+    clock = SimulatedClock()
+    api = Api(defer_startup=True, clock=clock)
+    try:
+        assert not api.subscribe_events()['success']
+        api.window = FakeWindow()
+        api.ui_events.min_interval = 0.0
+        result = api.subscribe_events()
+        assert result['success'] and set(result['state']) == {'session', 'stats', 'uploads'}
+        assert result['state']['session']['running'] is False
+
+        api._reset_session_state('UI test', 'Testing', clock.time())
+        api.last_activity_time = api.last_active_check_time = clock.monotonic()
+        clock.advance(api.idle_threshold + 5)
+        api._activity_tick()
+        assert _wait_for(lambda: any('session' in batch['events'] for batch in api.window.batches))
+        session = [batch['events']['session'] for batch in api.window.batches if 'session' in batch['events']][-1]
+        assert session['running'] and session['is_idle'] and session['elapsed_time'] == api.idle_threshold + 5
+        assert api.get_diagnostics()['ui_events']['attached']
+    finally:
+        api.start_time = None
+        api.ui_events.detach()
+        api.upload_queue.stop()
+    print("UI session push test passed")
+
+
+if __name__ == "__main__":
+    test_updates_coalesce_into_batches()
+    test_failed_push_detaches_until_resubscribe()
+    test_api_pushes_session_state()
@@ -6,10 +6,17 @@ block_cipher = None
 
 a = Analysis(
     ['main.py'],
-    pathex=[],
+    pathex=['../backend'],
     binaries=[],
     datas=[('dist', 'dist')],
-    hiddenimports=[],
+    hiddenimports=[
+        # Loaded through lazy_import (backend/lazy_import.py), which static analysis can't follow
+        'webview', 'requests', 'psutil', 'screeninfo',
+        # Picked at runtime by pynput, pywebview and mss for Windows
+        'pynput.keyboard._win32', 'pynput.mouse._win32',
+        'webview.platforms.winforms', 'webview.platforms.edgechromium',
+        'mss.windows', 'mss.windows.gdi',
+    ],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],